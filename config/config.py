@@ -26,6 +26,12 @@ class DatabaseConfig:
     pool_size: int = 5
     max_overflow: int = 10
     pool_timeout: int = 30
+    pool_pre_ping: bool = True
+
+    # SQLite only
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456
 
 @dataclass
 class NotificationConfig:
@@ -56,6 +62,21 @@ class NotificationConfig:
     # Webhook settings
     webhook_urls: list = None
 
+    # Delivery settings
+    smtp_use_tls: bool = True
+    outbox_enabled: bool = False
+    outbox_db_path: str = "notification_outbox.db"
+    outbox_poll_seconds: float = 2.0
+    outbox_max_attempts: int = 6
+    smtp_pool_size: int = 2
+    email_batch_size: int = 50
+
+    # Alert coalescing
+    alert_coalescing_enabled: bool = False
+    alert_window_seconds: float = 300.0
+    alert_dedupe_ttl_seconds: float = 3600.0
+    alert_digest_max_items: int = 50
+
     def __post_init__(self):
         if self.default_email_recipients is None:
             self.default_email_recipients = []
@@ -153,6 +174,34 @@ class LoggingConfig:
     backup_count: int = 5
     console_logging: bool = True
 
+@dataclass
+class ExecutorConfig:
+    """Worker pools and per-endpoint limits for blocking agent calls"""
+    thread_workers: int = 8
+    process_workers: int = 2  # 0 runs pure computation (pool 'process') on threads
+    default_max_concurrency: int = 4
+    default_timeout_seconds: float = 30.0
+
+    # endpoint -> {max_concurrency, timeout_seconds, pool}
+    endpoint_limits: dict = None
+
+    def __post_init__(self):
+        if self.endpoint_limits is None:
+            self.endpoint_limits = {
+                'inventory_alerts': {'max_concurrency': 2, 'timeout_seconds': 30.0, 'pool': 'thread'},
+                'inventory_forecast': {'max_concurrency': 4, 'timeout_seconds': 20.0, 'pool': 'thread'},
+                'inventory_forecast_model': {'max_concurrency': 4, 'timeout_seconds': 20.0, 'pool': 'process'},
+                'inventory_optimization': {'max_concurrency': 1, 'timeout_seconds': 60.0, 'pool': 'thread'},
+                'meetings_find_time': {'max_concurrency': 4, 'timeout_seconds': 15.0, 'pool': 'thread'},
+                'meetings_optimization': {'max_concurrency': 1, 'timeout_seconds': 60.0, 'pool': 'thread'}
+            }
+
+@dataclass
+class DashboardConfig:
+    """Dashboard snapshot refresh settings"""
+    refresh_interval_minutes: int = 5
+    max_age_minutes: int = 15
+
 class ConfigManager:
     """
     Configuration manager for automation agents.
@@ -171,6 +220,8 @@ class ConfigManager:
         self.calendar_credentials = CalendarCredentials()
         self.security = SecurityConfig()
         self.logging = LoggingConfig()
+        self.executor = ExecutorConfig()
+        self.dashboard = DashboardConfig()
 
         # Load configuration
         self.load_config()
@@ -220,6 +271,12 @@ class ConfigManager:
         if 'logging' in config_data:
             self._update_dataclass(self.logging, config_data['logging'])
 
+        if 'executor' in config_data:
+            self._update_dataclass(self.executor, config_data['executor'])
+
+        if 'dashboard' in config_data:
+            self._update_dataclass(self.dashboard, config_data['dashboard'])
+
     def _update_dataclass(self, instance, data: Dict[str, Any]):
         """Update dataclass instance with dictionary data"""
         for key, value in data.items():
@@ -334,10 +391,17 @@ class ConfigManager:
 
         logger.info("Configuration validation successful")
 
+    def get_database_options(self) -> Dict[str, Any]:
+        """Engine options for DatabaseManager, excluding the URL"""
+        options = asdict(self.database)
+        options.pop('url')
+        return options
+
     def get_inventory_config(self) -> Dict[str, Any]:
         """Get inventory tracker configuration as dictionary"""
         return {
             'database_url': self.database.url,
+            'database_options': self.get_database_options(),
             'notifications': asdict(self.notifications),
             'inventory_settings': asdict(self.inventory)
         }
@@ -346,6 +410,7 @@ class ConfigManager:
         """Get meeting scheduler configuration as dictionary"""
         return {
             'database_url': self.database.url,
+            'database_options': self.get_database_options(),
             'notifications': asdict(self.notifications),
             'meeting_settings': asdict(self.meeting_scheduler),
             'google_credentials': {
@@ -376,7 +441,9 @@ class ConfigManager:
                 'meeting_scheduler': asdict(self.meeting_scheduler),
                 'calendar_credentials': asdict(self.calendar_credentials),
                 'security': asdict(self.security),
-                'logging': asdict(self.logging)
+                'logging': asdict(self.logging),
+                'executor': asdict(self.executor),
+                'dashboard': asdict(self.dashboard)
             }
 
             save_path = file_path or self.config_file
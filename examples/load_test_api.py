@@ -0,0 +1,167 @@
+"""
+Load test for the automation agents API
+
+Fires slow agent requests (demand forecasts) concurrently with cheap probes
+(/health) and reports p50/p99 latency for each. With blocking agent calls on
+the event loop, probe latency tracks the slowest forecast; with the executor
+layer it stays flat.
+
+    # Against a running server (run once before and once after an upgrade)
+    python examples/load_test_api.py --mode url --base-url http://localhost:8000
+
+    # Self-contained comparison of inline vs executor handlers
+    python examples/load_test_api.py --mode demo
+"""
+
+import sys
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+# Add repo root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile in milliseconds"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index] * 1000
+
+
+async def run_load(client: httpx.AsyncClient,
+                   slow_path: str,
+                   probe_path: str = "/health",
+                   slow_requests: int = 40,
+                   probe_requests: int = 200,
+                   concurrency: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Issue slow and probe requests concurrently and collect latencies
+
+    ``concurrency`` bounds the slow requests only; probes run as four
+    sequential clients alongside them.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: Dict[str, List[float]] = {"slow": [], "probe": []}
+    statuses: Dict[int, int] = {}
+
+    async def request(kind: str, path: str):
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies[kind].append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def slow():
+        async with semaphore:
+            await request("slow", slow_path)
+
+    async def probes():
+        for _ in range(probe_requests):
+            await request("probe", probe_path)
+
+    tasks = [slow() for _ in range(slow_requests)]
+    # Several probe clients interleave with the slow requests
+    tasks += [probes() for _ in range(4)]
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    report = {
+        kind: {
+            "requests": len(samples),
+            "p50_ms": round(percentile(samples, 50), 1),
+            "p99_ms": round(percentile(samples, 99), 1)
+        }
+        for kind, samples in latencies.items()
+    }
+    report["total"] = {"seconds": round(elapsed, 2), "statuses": statuses}
+    return report
+
+
+def build_demo_app(offload: bool, work_seconds: float):
+    """
+    Minimal app with one blocking endpoint, handled inline or via the executor
+    """
+    from fastapi import FastAPI
+    from src.utils.executors import AgentExecutor, EndpointLimit
+
+    app = FastAPI()
+    executor = AgentExecutor(thread_workers=8, limits={"forecast": EndpointLimit(max_concurrency=8, timeout_seconds=30)})
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/forecast")
+    async def forecast():
+        if offload:
+            value = await executor.run("forecast", simulated_forecast, work_seconds)
+        else:
+            value = simulated_forecast(work_seconds)
+        return {"predicted_demand": value}
+
+    return app, executor
+
+
+def simulated_forecast(seconds: float) -> float:
+    """Stand-in for forecast_demand: blocks its thread for ``seconds``"""
+    time.sleep(seconds)
+    return 42.0
+
+
+def start_demo_server(app):
+    """Serve ``app`` with uvicorn on a free local port in a background thread"""
+    import threading
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def demo(work_seconds: float = 0.05, slow_requests: int = 40, concurrency: int = 20):
+    for label, offload in (("inline (before)", False), ("executor (after)", True)):
+        app, executor = build_demo_app(offload, work_seconds)
+        server, thread, base_url = start_demo_server(app)
+        try:
+            async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+                report = await run_load(client, "/forecast", slow_requests=slow_requests, concurrency=concurrency)
+        finally:
+            server.should_exit = True
+            thread.join()
+            executor.shutdown()
+        print(f"{label}: {report}")
+
+
+async def against_url(base_url: str, product_id: int, slow_requests: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        report = await run_load(client, f"/inventory/forecast/{product_id}",
+                                slow_requests=slow_requests, concurrency=concurrency)
+    print(report)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Automation Agents API load test")
+    parser.add_argument("--mode", choices=["demo", "url"], default="demo", help="Load test mode")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="Server for url mode")
+    parser.add_argument("--product-id", type=int, default=1, help="Product to forecast in url mode")
+    parser.add_argument("--slow-requests", type=int, default=40, help="Number of forecast requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent requests in flight")
+
+    args = parser.parse_args()
+
+    if args.mode == "url":
+        asyncio.run(against_url(args.base_url, args.product_id, args.slow_requests, args.concurrency))
+    else:
+        asyncio.run(demo(slow_requests=args.slow_requests, concurrency=args.concurrency))
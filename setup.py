@@ -86,6 +86,9 @@ setup(
             "cython>=3.0.7",
             "numba>=0.58.1",
         ],
+        "parquet": [
+            "pyarrow>=14.0.1",
+        ],
         "monitoring": [
             "prometheus-client>=0.19.0",
             "loguru>=0.7.2",
@@ -108,6 +111,7 @@ setup(
             "sphinx-rtd-theme>=2.0.0",
             "cython>=3.0.7",
             "numba>=0.58.1",
+            "pyarrow>=14.0.1",
             "prometheus-client>=0.19.0",
             "loguru>=0.7.2",
             "boto3>=1.34.0",
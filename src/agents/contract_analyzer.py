@@ -7,32 +7,24 @@ against standard templates, saving $2000+/month in legal review costs.
 
 import asyncio
 import logging
+import os
 import re
 import json
+import sqlite3
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any, Set
+from dataclasses import dataclass, field, asdict, replace
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, Set, AsyncIterator, Iterable, Union
 from enum import Enum
 import hashlib
 
-import spacy
-import nltk
 from textblob import TextBlob
 import dateutil.parser as date_parser
-from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-# Load spaCy model (download with: python -m spacy download en_core_web_sm)
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Please install spaCy English model: python -m spacy download en_core_web_sm")
-    nlp = None
+from ..utils.model_registry import model_registry
 
 
 class ContractType(Enum):
@@ -137,6 +129,293 @@ class ContractAnalysis:
     financial_summary: Dict[str, Any]
 
 
+@dataclass
+class SectionScan:
+    """Result of a single multi-pattern scan over a contract section"""
+    term_counts: Dict[str, int]
+    matches: Dict[str, List[str]]
+
+    def count(self, term: str) -> int:
+        return self.term_counts.get(term, 0)
+
+    def has_any(self, terms: List[str]) -> bool:
+        return any(self.term_counts.get(term) for term in terms)
+
+
+@dataclass
+class TextChunk:
+    """A sentence-aligned slice of a contract sent to the NER models"""
+    start: int  # span this chunk owns
+    end: int
+    window_start: int  # span the models see, including overlap context
+    window_end: int
+
+
+@dataclass
+class PortfolioRollup:
+    """Aggregate risk view over a portfolio of analyzed contracts"""
+    total_contracts: int = 0
+    failed: List[str] = field(default_factory=list)
+    overall_risk: Dict[RiskLevel, int] = field(default_factory=lambda: {level: 0 for level in RiskLevel})
+    clause_risks: Dict[RiskLevel, int] = field(default_factory=lambda: {level: 0 for level in RiskLevel})
+    contract_types: Dict[ContractType, int] = field(default_factory=dict)
+    missing_clauses: Dict[ClauseType, int] = field(default_factory=dict)
+    flagged_contracts: List[str] = field(default_factory=list)
+    total_value: float = 0.0
+    compliance_total: float = 0.0
+
+    def add(self, analysis: ContractAnalysis, overall_risk: RiskLevel):
+        self.total_contracts += 1
+        self.overall_risk[overall_risk] += 1
+        for level, count in analysis.risk_assessment.items():
+            self.clause_risks[level] += count
+        self.contract_types[analysis.contract_type] = self.contract_types.get(analysis.contract_type, 0) + 1
+        for clause_type in analysis.missing_clauses:
+            self.missing_clauses[clause_type] = self.missing_clauses.get(clause_type, 0) + 1
+        if overall_risk in (RiskLevel.CRITICAL, RiskLevel.HIGH):
+            self.flagged_contracts.append(analysis.contract_id)
+        self.total_value += analysis.financial_summary.get("total_value", 0) or 0
+        self.compliance_total += analysis.compliance_score
+
+    @property
+    def average_compliance(self) -> float:
+        return self.compliance_total / self.total_contracts if self.total_contracts else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_contracts": self.total_contracts,
+            "failed": list(self.failed),
+            "overall_risk": {level.value: count for level, count in self.overall_risk.items()},
+            "clause_risks": {level.value: count for level, count in self.clause_risks.items()},
+            "contract_types": {ctype.value: count for ctype, count in self.contract_types.items()},
+            "missing_clauses": {ctype.value: count for ctype, count in self.missing_clauses.items()},
+            "flagged_contracts": list(self.flagged_contracts),
+            "total_value": self.total_value,
+            "average_compliance": self.average_compliance
+        }
+
+
+class TermScanner:
+    """
+    Counts many literal terms, plus optional named regex patterns.
+
+    Terms are matched as lowercase substrings at every position, so terms
+    that overlap each other are all counted: "unlimited to" counts towards
+    "unlimited", "limited" and "limited to". For terms that cannot overlap
+    themselves this equals ``text.lower().count(term)``. The term alternation
+    is compiled as a trie inside a lookahead, so each position follows one
+    branch and finds the longest term starting there; the shorter terms that
+    are prefixes of it are credited too. Extra patterns run against the
+    lowercased text, so they must not depend on case.
+    """
+
+    def __init__(self, terms: List[str], patterns: Optional[Dict[str, List[str]]] = None):
+        self.terms = sorted(set(term.lower() for term in terms), key=len, reverse=True)
+        self.prefixes = {
+            term: [other for other in self.terms if other != term and term.startswith(other)]
+            for term in self.terms
+        }
+        self.term_regex = re.compile(f"(?=({self._trie_pattern(self.terms)}))")
+
+        self.pattern_names = list((patterns or {}).keys())
+        self.pattern_regex = re.compile("|".join(
+            f"(?P<{name}>{'|'.join(f'(?:{p})' for p in group_patterns)})"
+            for name, group_patterns in (patterns or {}).items()
+        )) if patterns else None
+
+    @staticmethod
+    def _trie_pattern(terms: List[str]) -> str:
+        """Build a prefix-factored alternation, e.g. assign(?:ment)? for assign/assignment"""
+        trie: Dict[str, Any] = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: Dict[str, Any]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            if "" in node:
+                # Greedy optional: prefer the longer term, fall back to the shorter
+                body = (body if len(branches) > 1 else "(?:" + body + ")") + "?"
+            return body
+
+        return build(trie)
+
+    def scan(self, text: str) -> SectionScan:
+        term_counts: Dict[str, int] = {}
+        matches: Dict[str, List[str]] = {name: [] for name in self.pattern_names}
+
+        text_lower = text.lower()
+        for match in self.term_regex.finditer(text_lower):
+            term = match.group(1)
+            term_counts[term] = term_counts.get(term, 0) + 1
+            for other in self.prefixes[term]:
+                term_counts[other] = term_counts.get(other, 0) + 1
+
+        if self.pattern_regex is not None:
+            for match in self.pattern_regex.finditer(text_lower):
+                matches[match.lastgroup].append(match.group())
+
+        return SectionScan(term_counts=term_counts, matches=matches)
+
+
+class ContractVersionStore:
+    """
+    Versioned contract analyses keyed by contract_id.
+
+    Each version keeps a hash of every section with its clause result (or
+    None for sections that are not clauses), so a redlined version only
+    re-analyzes the sections whose text changed.
+    """
+
+    def __init__(self, db_path: str = "contract_analyzer.db"):
+        self.db_path = db_path
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Initialize SQLite tables for contract versions and their sections"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS contract_versions (
+                    contract_id TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (contract_id, version)
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS contract_sections (
+                    contract_id TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    section_hash TEXT NOT NULL,
+                    clause TEXT,
+                    PRIMARY KEY (contract_id, version, position)
+                )
+            """)
+
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _clause_to_json(clause: ContractClause) -> str:
+        data = asdict(clause)
+        data["clause_type"] = clause.clause_type.value
+        data["risk_level"] = clause.risk_level.value
+        return json.dumps(data)
+
+    @staticmethod
+    def _clause_from_json(data: str) -> ContractClause:
+        values = json.loads(data)
+        values["clause_type"] = ClauseType(values["clause_type"])
+        values["risk_level"] = RiskLevel(values["risk_level"])
+        return ContractClause(**values)
+
+    def get_latest_version(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        """Latest stored version of a contract, or None if it has not been analyzed"""
+        conn = self._connect()
+        try:
+            row = conn.execute("""
+                SELECT version, text_hash, summary, created_at FROM contract_versions
+                WHERE contract_id = ? ORDER BY version DESC LIMIT 1
+            """, (contract_id,)).fetchone()
+        finally:
+            conn.close()
+
+        if not row:
+            return None
+        return {
+            "version": row["version"],
+            "text_hash": row["text_hash"],
+            "summary": json.loads(row["summary"]),
+            "created_at": row["created_at"]
+        }
+
+    def list_versions(self, contract_id: str) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT version, text_hash, summary, created_at FROM contract_versions
+                WHERE contract_id = ? ORDER BY version
+            """, (contract_id,)).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            {
+                "version": row["version"],
+                "text_hash": row["text_hash"],
+                "summary": json.loads(row["summary"]),
+                "created_at": row["created_at"]
+            }
+            for row in rows
+        ]
+
+    def get_sections(self, contract_id: str, version: int) -> List[Tuple[str, Optional[ContractClause]]]:
+        """Section hashes and clause results of a stored version, in document order"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT section_hash, clause FROM contract_sections
+                WHERE contract_id = ? AND version = ? ORDER BY position
+            """, (contract_id, version)).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            (row["section_hash"], self._clause_from_json(row["clause"]) if row["clause"] else None)
+            for row in rows
+        ]
+
+    def save_version(self, contract_id: str, text_hash: str, summary: Dict[str, Any],
+                     sections: List[Tuple[str, Optional[ContractClause]]]) -> int:
+        """Store a new version and return its version number"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM contract_versions WHERE contract_id = ?",
+                (contract_id,)
+            )
+            version = cursor.fetchone()[0] + 1
+
+            cursor.execute("""
+                INSERT INTO contract_versions (contract_id, version, text_hash, summary, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (contract_id, version, text_hash, json.dumps(summary), datetime.now().isoformat()))
+
+            cursor.executemany("""
+                INSERT INTO contract_sections (contract_id, version, position, section_hash, clause)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (contract_id, version, position, section_hash,
+                 self._clause_to_json(clause) if clause else None)
+                for position, (section_hash, clause) in enumerate(sections)
+            ])
+
+            conn.commit()
+        finally:
+            conn.close()
+
+        return version
+
+
 class ContractAnalyzerAgent:
     """
     Intelligent contract analysis agent for legal document review.
@@ -151,22 +430,24 @@ class ContractAnalyzerAgent:
     - Legal language processing
     """
 
-    def __init__(self):
+    def __init__(self, db_path: str = "contract_analyzer.db"):
         self.logger = logging.getLogger(__name__)
-
-        # Initialize NLP models
-        self.nlp = nlp
-
-        # Initialize NER model for legal entities
-        try:
-            self.ner_model = pipeline(
-                "ner",
-                model="nlpaueb/legal-bert-base-uncased",
-                aggregation_strategy="simple"
-            )
-        except:
-            # Fallback to standard model
-            self.ner_model = pipeline("ner", aggregation_strategy="simple")
+        self.db_path = db_path
+        self._version_store: Optional[ContractVersionStore] = None
+
+        # NLP models are loaded lazily and shared through the model registry
+        self.models = model_registry
+
+        # Chunked NER settings; chunk ends are anchored on sentence content so
+        # an edit only changes the chunks around it. Windows stay under ~512 tokens.
+        self.ner_max_chunk_chars = 1500
+        self.ner_overlap_chars = 200
+        self.ner_anchor_divisor = 6
+        self.ner_batch_size = 8
+        self.ner_cache_size = 4096
+        self.entity_cache: "OrderedDict[str, List[Tuple[str, int, int, float]]]" = OrderedDict()
+        self.entity_cache_stats = {"hits": 0, "misses": 0}
+        self.sentence_boundary = re.compile(r'(?<=[.!?;])\s+|\n\s*\n')
 
         # Contract templates and standards
         self.standard_clauses = self._load_standard_clauses()
@@ -192,6 +473,76 @@ class ContractAnalyzerAgent:
             "addresses": [r'\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln)']
         }
 
+        # Keywords used to classify clauses
+        self.clause_keywords = {
+            ClauseType.PAYMENT_TERMS: ["payment", "invoice", "billing", "fees", "compensation"],
+            ClauseType.TERMINATION: ["termination", "terminate", "end", "expiry", "cancellation"],
+            ClauseType.LIABILITY: ["liability", "damages", "loss", "harm", "responsible"],
+            ClauseType.INTELLECTUAL_PROPERTY: ["intellectual property", "copyright", "trademark", "patent"],
+            ClauseType.CONFIDENTIALITY: ["confidential", "non-disclosure", "proprietary", "secret"],
+            ClauseType.INDEMNIFICATION: ["indemnify", "indemnification", "hold harmless", "defend"],
+            ClauseType.DISPUTE_RESOLUTION: ["dispute", "arbitration", "mediation", "court", "jurisdiction"],
+            ClauseType.FORCE_MAJEURE: ["force majeure", "act of god", "unforeseeable", "beyond control"],
+            ClauseType.GOVERNING_LAW: ["governing law", "jurisdiction", "applicable law"],
+            ClauseType.AMENDMENT: ["amendment", "modification", "change", "alter"],
+            ClauseType.ASSIGNMENT: ["assignment", "transfer", "assign", "delegate"],
+            ClauseType.COMPLIANCE: ["compliance", "regulatory", "legal requirements", "laws"]
+        }
+
+        # Phrases that drive clause risk levels and concerns
+        self.clause_risk_terms = {
+            ClauseType.LIABILITY: {
+                RiskLevel.CRITICAL: ["unlimited", "without limit", "no cap"],
+                RiskLevel.LOW: ["limited to", "not exceed", "maximum"]
+            },
+            ClauseType.TERMINATION: {
+                RiskLevel.HIGH: ["immediate", "without notice", "cause"],
+                RiskLevel.LOW: ["30 days", "notice", "written"]
+            },
+            ClauseType.PAYMENT_TERMS: {
+                RiskLevel.MEDIUM: ["penalty", "interest", "late fee"]
+            }
+        }
+        self.clause_red_flags = [
+            "unlimited", "without limit", "sole discretion", "irrevocable",
+            "perpetual", "unconditional", "absolute", "waive", "forfeit"
+        ]
+        self.late_penalty_pattern = re.compile(r'\d+%.*late')
+
+        # One compiled scanner shared by clause typing, risk and key-term extraction
+        section_terms = [keyword for keywords in self.clause_keywords.values() for keyword in keywords]
+        section_terms += [term for levels in self.clause_risk_terms.values() for terms in levels.values() for term in terms]
+        section_terms += self.clause_red_flags + ["without cause", "consequential damages"]
+        self.section_scanner = TermScanner(section_terms, {
+            "money": [r'\$[\d,]+(?:\.\d{2})?'],
+            "percentages": [r'\d+(?:\.\d+)?%']
+        })
+        # Month names are case-sensitive, so dates get their own compiled pattern
+        self.date_pattern = re.compile("|".join(f"(?:{p})" for p in self.patterns["dates"]))
+
+        # Risk patterns compiled once, one alternation per risk
+        self.compiled_risk_patterns = [
+            (re.compile("|".join(f"(?:{p})" for p in risk_info["patterns"])), risk_info["risk_level"])
+            for risk_info in self.risk_patterns.values()
+        ]
+
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline (None if the English model is not installed)"""
+        return self.models.get_optional("spacy_en")
+
+    @property
+    def ner_model(self):
+        """Shared transformers NER pipeline (None if it cannot be loaded)"""
+        return self.models.get_optional("transformer_ner")
+
+    @property
+    def version_store(self) -> ContractVersionStore:
+        """Versioned analysis store, created on first use"""
+        if self._version_store is None:
+            self._version_store = ContractVersionStore(self.db_path)
+        return self._version_store
+
     def _load_standard_clauses(self) -> Dict[ContractType, Dict[ClauseType, str]]:
         """Load standard clause templates for different contract types"""
         return {
@@ -284,60 +635,302 @@ class ContractAnalyzerAgent:
 
         self.logger.info(f"Starting analysis of contract {contract_id}")
 
-        # Basic document analysis
-        contract_type = await self._identify_contract_type(contract_text)
-        title = self._extract_title(contract_text)
-
-        # Extract entities and parties
-        entities = await self._extract_entities(contract_text)
-        parties = self._identify_parties(contract_text, entities)
+        stages = self._heuristic_stages(contract_text)
+        model_entities = self._extract_model_entities(contract_text)
 
-        # Extract and analyze clauses
-        clauses = await self._extract_clauses(contract_text, contract_type)
+        return self._assemble_analysis(contract_id, contract_text, stages, model_entities)
 
-        # Extract payment terms
-        payment_terms = self._extract_payment_terms(contract_text, entities)
+    def _heuristic_stages(self, contract_text: str,
+                          known_sections: Optional[Dict[str, Optional[ContractClause]]] = None) -> Dict[str, Any]:
+        """Regex and keyword stages; these need no NLP models and can run in worker processes"""
+        contract_type = self._classify_contract_type(contract_text)
+        pattern_entities = self._extract_pattern_entities(contract_text)
 
-        # Extract key dates
-        key_dates = self._extract_key_dates(contract_text, entities)
+        # Extract and analyze clauses
+        sections = self._analyze_sections(contract_text, known_sections)
+        clauses = [clause for _, clause in sections if clause]
 
         # Risk assessment
         risk_assessment = self._assess_risks(clauses, contract_text)
 
-        # Compliance scoring
-        compliance_score = self._calculate_compliance_score(clauses, contract_type)
-
         # Identify missing clauses
         missing_clauses = self._identify_missing_clauses(clauses, contract_type)
 
-        # Generate recommendations
-        recommendations = self._generate_recommendations(clauses, missing_clauses, risk_assessment)
+        return {
+            "contract_type": contract_type,
+            "title": self._extract_title(contract_text),
+            "pattern_entities": pattern_entities,
+            "clauses": clauses,
+            "key_dates": self._extract_key_dates(contract_text, pattern_entities),
+            "risk_assessment": risk_assessment,
+            "compliance_score": self._calculate_compliance_score(clauses, contract_type),
+            "missing_clauses": missing_clauses,
+            "recommendations": self._generate_recommendations(clauses, missing_clauses, risk_assessment),
+            "redflags": self._identify_redflags(contract_text, clauses),
+            "sections": sections
+        }
 
-        # Identify red flags
-        redflags = self._identify_redflags(contract_text, clauses)
+    def _assemble_analysis(self, contract_id: str, contract_text: str, stages: Dict[str, Any],
+                           model_entities: List[ContractEntity]) -> ContractAnalysis:
+        """Combine heuristic stages with model entities into the final analysis"""
+        entities = model_entities + stages["pattern_entities"]
 
-        # Financial summary
+        parties = self._identify_parties(contract_text, entities)
+        payment_terms = self._extract_payment_terms(contract_text, entities)
         financial_summary = self._create_financial_summary(payment_terms, entities)
 
         return ContractAnalysis(
             contract_id=contract_id,
-            contract_type=contract_type,
-            title=title,
+            contract_type=stages["contract_type"],
+            title=stages["title"],
             parties=parties,
-            clauses=clauses,
+            clauses=stages["clauses"],
             entities=entities,
             payment_terms=payment_terms,
-            key_dates=key_dates,
-            risk_assessment=risk_assessment,
-            compliance_score=compliance_score,
-            missing_clauses=missing_clauses,
-            recommendations=recommendations,
-            redflags=redflags,
+            key_dates=stages["key_dates"],
+            risk_assessment=stages["risk_assessment"],
+            compliance_score=stages["compliance_score"],
+            missing_clauses=stages["missing_clauses"],
+            recommendations=stages["recommendations"],
+            redflags=stages["redflags"],
             financial_summary=financial_summary
         )
 
+    async def analyze_portfolio(self, paths_or_texts: Iterable[Union[str, Path]],
+                                max_workers: Optional[int] = None, batch_size: int = 16,
+                                rollup: Optional[PortfolioRollup] = None) -> AsyncIterator[ContractAnalysis]:
+        """
+        Analyze many contracts concurrently, yielding each analysis as it completes.
+
+        Items are contract texts or paths to text files. Pass ``Path`` objects
+        to name files; a plain string is only read as a path when that file
+        exists, so a missing ``Path`` is reported as failed while any other
+        string is analyzed as contract text. Regex and heuristic
+        stages run in a process pool; model stages run on a single inference
+        thread that batches chunks from several contracts at once. Pass a
+        PortfolioRollup to accumulate the aggregate risk view as results stream
+        in. Contracts that fail are logged, added to rollup.failed and skipped.
+        """
+        items = list(paths_or_texts)
+        if not items:
+            return
+        item_ids = _portfolio_item_ids(items)
+
+        loop = asyncio.get_running_loop()
+        model_queue: asyncio.Queue = asyncio.Queue()
+        done: asyncio.Queue = asyncio.Queue()
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_portfolio_worker)
+        inference = ThreadPoolExecutor(max_workers=1)
+
+        async def run_heuristics(item, contract_id):
+            try:
+                text, stages = await loop.run_in_executor(pool, _run_portfolio_heuristics, item)
+            except Exception as e:
+                self.logger.error(f"Error analyzing contract {contract_id}: {e}")
+                await done.put((contract_id, None))
+                return
+            await model_queue.put((contract_id, text, stages))
+
+        async def run_models():
+            while True:
+                batch = [await model_queue.get()]
+                while len(batch) < batch_size and not model_queue.empty():
+                    batch.append(model_queue.get_nowait())
+
+                try:
+                    entity_lists = await loop.run_in_executor(
+                        inference, self._extract_model_entities_batch, [text for _, text, _ in batch]
+                    )
+                except Exception as e:
+                    self.logger.error(f"Error running NER for {len(batch)} contracts: {e}")
+                    entity_lists = [None] * len(batch)
+
+                for (contract_id, text, stages), model_entities in zip(batch, entity_lists):
+                    analysis = None
+                    if model_entities is not None:
+                        try:
+                            analysis = self._assemble_analysis(contract_id, text, stages, model_entities)
+                        except Exception as e:
+                            self.logger.error(f"Error analyzing contract {contract_id}: {e}")
+                    await done.put((contract_id, analysis))
+
+        tasks = [asyncio.create_task(run_heuristics(item, contract_id))
+                 for item, contract_id in zip(items, item_ids)]
+        tasks.append(asyncio.create_task(run_models()))
+        try:
+            for _ in items:
+                contract_id, analysis = await done.get()
+                if analysis is None:
+                    if rollup is not None:
+                        rollup.failed.append(contract_id)
+                    continue
+                if rollup is not None:
+                    rollup.add(analysis, self._calculate_overall_risk(analysis))
+                yield analysis
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            pool.shutdown(wait=False, cancel_futures=True)
+            inference.shutdown(wait=False)
+
+    def build_portfolio_rollup(self, analyses: Iterable[ContractAnalysis]) -> PortfolioRollup:
+        """Aggregate risk rollup for analyses that are already complete"""
+        rollup = PortfolioRollup()
+        for analysis in analyses:
+            rollup.add(analysis, self._calculate_overall_risk(analysis))
+        return rollup
+
+    async def analyze_contract_version(self, contract_text: str,
+                                       contract_id: str) -> Tuple[ContractAnalysis, Dict[str, Any]]:
+        """
+        Analyze a new version of a contract against its previous version.
+
+        Sections whose text is unchanged carry their stored clause results
+        forward; only changed sections are re-analyzed. The version is saved
+        and returned with a delta risk report against the previous version.
+        """
+        store = self.version_store
+        previous = store.get_latest_version(contract_id)
+        previous_sections = store.get_sections(contract_id, previous["version"]) if previous else []
+        known_sections = dict(previous_sections)
+
+        stages = self._heuristic_stages(contract_text, known_sections)
+        model_entities = self._extract_model_entities(contract_text)
+        analysis = self._assemble_analysis(contract_id, contract_text, stages, model_entities)
+
+        summary = self._version_summary(analysis)
+        version = store.save_version(
+            contract_id, hashlib.sha256(contract_text.encode()).hexdigest(), summary, stages["sections"]
+        )
+
+        report = {
+            "contract_id": contract_id,
+            "version": version,
+            **self._delta_risk_report(previous, previous_sections, summary, stages["sections"])
+        }
+        self.logger.info(
+            f"Contract {contract_id} v{version}: re-analyzed {report['sections']['reanalyzed']} "
+            f"of {report['sections']['total']} sections"
+        )
+
+        return analysis, report
+
+    def _version_summary(self, analysis: ContractAnalysis) -> Dict[str, Any]:
+        return {
+            "contract_type": analysis.contract_type.value,
+            "overall_risk": self._calculate_overall_risk(analysis).value,
+            "risk_assessment": {level.value: count for level, count in analysis.risk_assessment.items()},
+            "compliance_score": analysis.compliance_score,
+            "missing_clauses": [clause_type.value for clause_type in analysis.missing_clauses],
+            "redflags": analysis.redflags,
+            "total_value": analysis.financial_summary.get("total_value", 0)
+        }
+
+    def _delta_risk_report(self, previous: Optional[Dict[str, Any]],
+                           previous_sections: List[Tuple[str, Optional[ContractClause]]],
+                           summary: Dict[str, Any],
+                           sections: List[Tuple[str, Optional[ContractClause]]]) -> Dict[str, Any]:
+        """Clause-level diff and risk changes between two versions"""
+        risk_rank = {RiskLevel.MINIMAL: 0, RiskLevel.LOW: 1, RiskLevel.MEDIUM: 2,
+                     RiskLevel.HIGH: 3, RiskLevel.CRITICAL: 4}
+        previous_summary = previous["summary"] if previous else None
+        known_hashes = {section_hash for section_hash, _ in previous_sections}
+
+        def describe(clause: ContractClause) -> Dict[str, Any]:
+            return {
+                "clause_type": clause.clause_type.value,
+                "risk_level": clause.risk_level.value,
+                "concerns": clause.concerns,
+                "start_position": clause.start_position
+            }
+
+        old_clauses = [(h, c) for h, c in previous_sections if c]
+        new_clauses = [(h, c) for h, c in sections if c]
+        added, removed, modified = [], [], []
+        unchanged = 0
+
+        # Align clauses by content hash; replaced runs are paired up as modifications
+        matcher = SequenceMatcher(a=[h for h, _ in old_clauses], b=[h for h, _ in new_clauses], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                unchanged += i2 - i1
+                continue
+            old_run = [c for _, c in old_clauses[i1:i2]]
+            new_run = [c for _, c in new_clauses[j1:j2]]
+            for old, new in zip(old_run, new_run):
+                change = risk_rank[new.risk_level] - risk_rank[old.risk_level]
+                modified.append({
+                    "clause_type": new.clause_type.value,
+                    "previous_clause_type": old.clause_type.value,
+                    "previous_risk": old.risk_level.value,
+                    "risk_level": new.risk_level.value,
+                    "risk_change": "increased" if change > 0 else "decreased" if change < 0 else "unchanged",
+                    "new_concerns": [c for c in new.concerns if c not in old.concerns],
+                    "resolved_concerns": [c for c in old.concerns if c not in new.concerns],
+                    "start_position": new.start_position
+                })
+            removed.extend(describe(c) for c in old_run[len(new_run):])
+            added.extend(describe(c) for c in new_run[len(old_run):])
+
+        reanalyzed = sum(1 for section_hash, _ in sections if section_hash not in known_hashes)
+        report = {
+            "previous_version": previous["version"] if previous else None,
+            "sections": {
+                "total": len(sections),
+                "reused": len(sections) - reanalyzed,
+                "reanalyzed": reanalyzed
+            },
+            "clauses": {
+                "unchanged": unchanged,
+                "added": added,
+                "removed": removed,
+                "modified": modified
+            },
+            "overall_risk": {
+                "previous": previous_summary["overall_risk"] if previous_summary else None,
+                "current": summary["overall_risk"]
+            },
+            "compliance_score": {
+                "previous": previous_summary["compliance_score"] if previous_summary else None,
+                "current": summary["compliance_score"],
+                "change": summary["compliance_score"] - previous_summary["compliance_score"] if previous_summary else None
+            }
+        }
+
+        previous_risks = previous_summary["risk_assessment"] if previous_summary else {}
+        report["risk_assessment_change"] = {
+            level: count - previous_risks.get(level, 0) for level, count in summary["risk_assessment"].items()
+        }
+
+        previous_missing = set(previous_summary["missing_clauses"]) if previous_summary else set()
+        previous_redflags = set(previous_summary["redflags"]) if previous_summary else set()
+        report["missing_clauses"] = {
+            "added": [c for c in summary["missing_clauses"] if c not in previous_missing],
+            "resolved": sorted(previous_missing - set(summary["missing_clauses"]))
+        }
+        report["redflags"] = {
+            "added": [flag for flag in summary["redflags"] if flag not in previous_redflags],
+            "resolved": sorted(previous_redflags - set(summary["redflags"]))
+        }
+
+        overall_up = bool(previous_summary) and (
+            risk_rank[RiskLevel(summary["overall_risk"])] > risk_rank[RiskLevel(previous_summary["overall_risk"])]
+        )
+        report["risk_increased"] = (
+            overall_up
+            or any(m["risk_change"] == "increased" for m in modified)
+            or any(c["risk_level"] in (RiskLevel.HIGH.value, RiskLevel.CRITICAL.value) for c in added)
+            or bool(report["redflags"]["added"] and previous_summary)
+        )
+
+        return report
+
     async def _identify_contract_type(self, text: str) -> ContractType:
         """Identify the type of contract"""
+        return self._classify_contract_type(text)
+
+    def _classify_contract_type(self, text: str) -> ContractType:
         text_lower = text.lower()
 
         # Keywords for each contract type
@@ -381,21 +974,13 @@ class ContractAnalyzerAgent:
 
     async def _extract_entities(self, text: str) -> List[ContractEntity]:
         """Extract named entities from contract text"""
-        entities = []
-
-        # Use spaCy for NER if available
-        if self.nlp:
-            doc = self.nlp(text)
-            for ent in doc.ents:
-                entities.append(ContractEntity(
-                    entity_type=ent.label_,
-                    text=ent.text,
-                    start_position=ent.start_char,
-                    end_position=ent.end_char,
-                    confidence=1.0
-                ))
+        entities = self._extract_model_entities(text)
+        entities.extend(self._extract_pattern_entities(text))
+        return entities
 
-        # Use regex patterns for specific entities
+    def _extract_pattern_entities(self, text: str) -> List[ContractEntity]:
+        """Use regex patterns for specific entities"""
+        entities = []
         for entity_type, patterns in self.patterns.items():
             for pattern in patterns:
                 matches = re.finditer(pattern, text, re.IGNORECASE)
@@ -410,6 +995,184 @@ class ContractAnalyzerAgent:
 
         return entities
 
+    def _extract_model_entities(self, text: str) -> List[ContractEntity]:
+        """Run spaCy and the transformers NER pipeline over sentence-aligned chunks"""
+        return self._extract_model_entities_batch([text])[0]
+
+    def _extract_model_entities_batch(self, texts: List[str]) -> List[List[ContractEntity]]:
+        """Model entities for several contracts, sharing one model batch per call"""
+        doc_chunks = [self._chunk_text(text) for text in texts]
+        if not any(doc_chunks):
+            return [[] for _ in texts]
+
+        runners = []
+        if self.nlp:
+            runners.append(("spacy", self._run_spacy_ner))
+        if self.ner_model:
+            runners.append(("transformer_ner", self._run_transformer_ner))
+
+        spans: List[List[Tuple[str, int, int, float]]] = [[] for _ in texts]
+        for model_name, runner in runners:
+            doc_keys = []
+            pending: Dict[str, str] = {}
+            results: Dict[str, List[Tuple[str, int, int, float]]] = {}
+            for text, chunks in zip(texts, doc_chunks):
+                keys = []
+                for chunk in chunks:
+                    window = text[chunk.window_start:chunk.window_end]
+                    key = self._chunk_cache_key(model_name, window)
+                    keys.append(key)
+                    if key in results or key in pending:
+                        continue
+                    if key in self.entity_cache:
+                        self.entity_cache.move_to_end(key)
+                        results[key] = self.entity_cache[key]
+                    else:
+                        pending[key] = window
+                doc_keys.append(keys)
+
+            # Only chunks not seen before (e.g. the amended parts of a contract) hit the model;
+            # identical boilerplate shared by several contracts runs once
+            total = sum(len(keys) for keys in doc_keys)
+            self.entity_cache_stats["hits"] += total - len(pending)
+            self.entity_cache_stats["misses"] += len(pending)
+            if pending:
+                for key, result in zip(pending, runner(list(pending.values()))):
+                    results[key] = result
+                    self._cache_entities(key, result)
+
+            for doc_spans, chunks, keys in zip(spans, doc_chunks, doc_keys):
+                for chunk, key in zip(chunks, keys):
+                    for label, rel_start, rel_end, confidence in results[key]:
+                        start = chunk.window_start + rel_start
+                        end = chunk.window_start + rel_end
+                        # Keep entities starting in this chunk's own span, or crossing into it;
+                        # the rest belong to the neighbouring chunk
+                        if chunk.start <= start < chunk.end or start < chunk.start < end:
+                            doc_spans.append((label, start, end, confidence))
+
+        return [
+            [
+                ContractEntity(
+                    entity_type=label,
+                    text=text[start:end],
+                    start_position=start,
+                    end_position=end,
+                    confidence=confidence
+                )
+                for label, start, end, confidence in self._merge_entity_spans(doc_spans)
+            ]
+            for text, doc_spans in zip(texts, spans)
+        ]
+
+    def _run_spacy_ner(self, windows: List[str]) -> List[List[Tuple[str, int, int, float]]]:
+        return [
+            [(ent.label_, ent.start_char, ent.end_char, 1.0) for ent in doc.ents]
+            for doc in self.nlp.pipe(windows, batch_size=self.ner_batch_size)
+        ]
+
+    def _run_transformer_ner(self, windows: List[str]) -> List[List[Tuple[str, int, int, float]]]:
+        outputs = self.ner_model(windows, batch_size=self.ner_batch_size)
+        if windows and outputs and isinstance(outputs[0], dict):
+            # A single input comes back as a flat list of entities
+            outputs = [outputs]
+        results = []
+        for output in outputs:
+            spans = []
+            for item in output:
+                if item.get("start") is None:
+                    continue
+                label = item.get("entity_group", item.get("entity"))
+                # CoNLL "PER" named like spaCy's "PERSON" so both feed party extraction
+                spans.append(("PERSON" if label == "PER" else label, item["start"], item["end"], float(item["score"])))
+            results.append(spans)
+        return results
+
+    def _chunk_cache_key(self, model_name: str, window: str) -> str:
+        return model_name + ":" + hashlib.sha256(window.encode()).hexdigest()
+
+    def _cache_entities(self, key: str, entities: List[Tuple[str, int, int, float]]):
+        self.entity_cache[key] = entities
+        self.entity_cache.move_to_end(key)
+        while len(self.entity_cache) > self.ner_cache_size:
+            self.entity_cache.popitem(last=False)
+
+    def _sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Sentence spans, with over-long sentences split at whitespace"""
+        spans = []
+        position = 0
+        boundaries = [(m.start(), m.end()) for m in self.sentence_boundary.finditer(text)]
+        for end, next_start in boundaries + [(len(text), len(text))]:
+            if end > position:
+                spans.append((position, end))
+            position = next_start
+
+        limited = []
+        for start, end in spans:
+            while end - start > self.ner_max_chunk_chars:
+                cut = text.rfind(" ", start + 1, start + self.ner_max_chunk_chars)
+                if cut <= start:
+                    cut = start + self.ner_max_chunk_chars
+                limited.append((start, cut))
+                start = cut
+            limited.append((start, end))
+        return limited
+
+    def _chunk_text(self, text: str) -> List[TextChunk]:
+        """
+        Group sentences into chunks of at most ner_max_chunk_chars.
+
+        A chunk closes early on an "anchor" sentence (chosen by a hash of its
+        text), so boundaries depend on content rather than absolute offsets and
+        re-synchronise right after an edit. Each chunk's window adds neighbouring
+        sentences, up to ner_overlap_chars, so entities at a border are seen whole.
+        """
+        sentences = self._sentence_spans(text)
+        if not sentences:
+            return []
+
+        groups = []
+        first = 0
+        for i, (start, end) in enumerate(sentences):
+            chunk_start = sentences[first][0]
+            is_last = i + 1 == len(sentences)
+            digest = hashlib.blake2b(text[start:end].encode(), digest_size=4).digest()
+            anchor = int.from_bytes(digest, "big") % self.ner_anchor_divisor == 0
+            if is_last or anchor or sentences[i + 1][1] - chunk_start > self.ner_max_chunk_chars:
+                groups.append((first, i))
+                first = i + 1
+
+        chunks = []
+        for first, last in groups:
+            start, end = sentences[first][0], sentences[last][1]
+
+            window_first = first
+            while window_first > 0 and start - sentences[window_first - 1][0] <= self.ner_overlap_chars:
+                window_first -= 1
+            window_last = last
+            while window_last + 1 < len(sentences) and sentences[window_last + 1][1] - end <= self.ner_overlap_chars:
+                window_last += 1
+
+            chunks.append(TextChunk(
+                start=start,
+                end=end,
+                window_start=sentences[window_first][0],
+                window_end=sentences[window_last][1]
+            ))
+        return chunks
+
+    @staticmethod
+    def _merge_entity_spans(spans: List[Tuple[str, int, int, float]]) -> List[Tuple[str, int, int, float]]:
+        """Merge overlapping spans of the same label (e.g. an entity split by a chunk border)"""
+        merged: List[Tuple[str, int, int, float]] = []
+        for label, start, end, confidence in sorted(spans, key=lambda s: (s[0], s[1], -s[2])):
+            if merged and merged[-1][0] == label and start < merged[-1][2]:
+                _, prev_start, prev_end, prev_confidence = merged[-1]
+                merged[-1] = (label, prev_start, max(prev_end, end), max(prev_confidence, confidence))
+            else:
+                merged.append((label, start, end, confidence))
+        return sorted(merged, key=lambda s: (s[1], s[0]))
+
     def _identify_parties(self, text: str, entities: List[ContractEntity]) -> List[ContractParty]:
         """Identify contract parties"""
         parties = []
@@ -456,158 +1219,181 @@ class ContractAnalyzerAgent:
 
     async def _extract_clauses(self, text: str, contract_type: ContractType) -> List[ContractClause]:
         """Extract and analyze contract clauses"""
-        clauses = []
-
-        # Split text into sections
-        sections = self._split_into_sections(text)
-
-        for section in sections:
-            clause_type = self._identify_clause_type(section)
-            if clause_type:
-                risk_level = self._assess_clause_risk(section, clause_type)
-                key_terms = self._extract_clause_key_terms(section)
-                concerns = self._identify_clause_concerns(section, clause_type)
-                suggestions = self._generate_clause_suggestions(section, clause_type, concerns)
-
-                clauses.append(ContractClause(
-                    clause_type=clause_type,
-                    content=section,
-                    start_position=text.find(section),
-                    end_position=text.find(section) + len(section),
-                    risk_level=risk_level,
-                    key_terms=key_terms,
-                    concerns=concerns,
-                    suggestions=suggestions
-                ))
-
-        return clauses
+        return self._analyze_clauses(text)
+
+    def _analyze_clauses(self, text: str) -> List[ContractClause]:
+        return [clause for _, clause in self._analyze_sections(text) if clause]
+
+    def _analyze_sections(self, text: str,
+                          known_sections: Optional[Dict[str, Optional[ContractClause]]] = None
+                          ) -> List[Tuple[str, Optional[ContractClause]]]:
+        """Analyze each section by hash, reusing results for text seen in a previous version"""
+        results = []
+
+        # Split text into sections, keeping their offsets
+        for section, start, end in self._segment_sections(text):
+            section_hash = hashlib.sha256(section.encode()).hexdigest()
+            if known_sections is not None and section_hash in known_sections:
+                clause = known_sections[section_hash]
+                if clause:
+                    clause = replace(clause, start_position=start, end_position=end)
+            else:
+                clause = self._analyze_section(section, start, end)
+            results.append((section_hash, clause))
+
+        return results
+
+    def _analyze_section(self, section: str, start: int, end: int) -> Optional[ContractClause]:
+        """Classify and assess one section using a single shared scan"""
+        scan = self.section_scanner.scan(section)
+
+        clause_type = self._identify_clause_type(section, scan)
+        if not clause_type:
+            return None
+
+        risk_level = self._assess_clause_risk(section, clause_type, scan)
+        key_terms = self._extract_clause_key_terms(section, scan)
+        concerns = self._identify_clause_concerns(section, clause_type, scan)
+        suggestions = self._generate_clause_suggestions(section, clause_type, concerns)
+
+        return ContractClause(
+            clause_type=clause_type,
+            content=section,
+            start_position=start,
+            end_position=end,
+            risk_level=risk_level,
+            key_terms=key_terms,
+            concerns=concerns,
+            suggestions=suggestions
+        )
 
-    def _split_into_sections(self, text: str) -> List[str]:
-        """Split contract text into logical sections"""
-        # Simple section splitting based on numbering and headers
-        sections = []
+    def _segment_sections(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Split contract text into logical sections with character offsets.
+
+        Offsets come from the split itself, so repeated sections keep their
+        own positions. Returns (section, start, end) tuples where
+        ``text[start:end] == section``.
+        """
+        def stripped(start: int, end: int) -> Optional[Tuple[str, int, int]]:
+            chunk = text[start:end]
+            content = chunk.strip()
+            if not content:
+                return None
+            start += len(chunk) - len(chunk.lstrip())
+            return content, start, start + len(content)
 
         # Split by numbered sections
-        numbered_sections = re.split(r'\n\s*\d+\.\s+', text)
-        if len(numbered_sections) > 1:
-            sections.extend([s.strip() for s in numbered_sections[1:] if s.strip()])
-        else:
-            # Split by paragraphs
-            paragraphs = text.split('\n\n')
-            sections.extend([p.strip() for p in paragraphs if len(p.strip()) > 50])
+        separators = list(re.finditer(r'\n\s*\d+\.\s+', text))
+        if separators:
+            bounds = [(sep.end(), nxt.start() if nxt else len(text))
+                      for sep, nxt in zip(separators, separators[1:] + [None])]
+            return [seg for seg in (stripped(start, end) for start, end in bounds) if seg]
+
+        # Split by paragraphs
+        sections = []
+        start = 0
+        for match in list(re.finditer(r'\n\n', text)) + [None]:
+            end = match.start() if match else len(text)
+            seg = stripped(start, end)
+            if seg and len(seg[0]) > 50:
+                sections.append(seg)
+            if match:
+                start = match.end()
 
         return sections
 
-    def _identify_clause_type(self, section: str) -> Optional[ClauseType]:
-        """Identify the type of clause"""
-        section_lower = section.lower()
+    def _split_into_sections(self, text: str) -> List[str]:
+        """Split contract text into logical sections"""
+        return [section for section, _, _ in self._segment_sections(text)]
 
-        clause_keywords = {
-            ClauseType.PAYMENT_TERMS: ["payment", "invoice", "billing", "fees", "compensation"],
-            ClauseType.TERMINATION: ["termination", "terminate", "end", "expiry", "cancellation"],
-            ClauseType.LIABILITY: ["liability", "damages", "loss", "harm", "responsible"],
-            ClauseType.INTELLECTUAL_PROPERTY: ["intellectual property", "copyright", "trademark", "patent"],
-            ClauseType.CONFIDENTIALITY: ["confidential", "non-disclosure", "proprietary", "secret"],
-            ClauseType.INDEMNIFICATION: ["indemnify", "indemnification", "hold harmless", "defend"],
-            ClauseType.DISPUTE_RESOLUTION: ["dispute", "arbitration", "mediation", "court", "jurisdiction"],
-            ClauseType.FORCE_MAJEURE: ["force majeure", "act of god", "unforeseeable", "beyond control"],
-            ClauseType.GOVERNING_LAW: ["governing law", "jurisdiction", "applicable law"],
-            ClauseType.AMENDMENT: ["amendment", "modification", "change", "alter"],
-            ClauseType.ASSIGNMENT: ["assignment", "transfer", "assign", "delegate"],
-            ClauseType.COMPLIANCE: ["compliance", "regulatory", "legal requirements", "laws"]
-        }
+    def _identify_clause_type(self, section: str, scan: Optional[SectionScan] = None) -> Optional[ClauseType]:
+        """Identify the type of clause"""
+        scan = scan or self.section_scanner.scan(section)
 
         scores = {}
-        for clause_type, keywords in clause_keywords.items():
-            score = sum(section_lower.count(keyword) for keyword in keywords)
-            scores[clause_type] = score
+        for clause_type, keywords in self.clause_keywords.items():
+            scores[clause_type] = sum(scan.count(keyword) for keyword in keywords)
 
         if max(scores.values()) > 0:
             return max(scores, key=scores.get)
 
         return None
 
-    def _assess_clause_risk(self, section: str, clause_type: ClauseType) -> RiskLevel:
+    def _assess_clause_risk(self, section: str, clause_type: ClauseType,
+                            scan: Optional[SectionScan] = None) -> RiskLevel:
         """Assess risk level of a specific clause"""
         section_lower = section.lower()
 
         # Check for risk patterns
-        for risk_name, risk_info in self.risk_patterns.items():
-            for pattern in risk_info["patterns"]:
-                if re.search(pattern, section_lower):
-                    return risk_info["risk_level"]
+        for pattern, risk_level in self.compiled_risk_patterns:
+            if pattern.search(section_lower):
+                return risk_level
+
+        scan = scan or self.section_scanner.scan(section)
+        risk_terms = self.clause_risk_terms
 
         # Clause-specific risk assessment
         if clause_type == ClauseType.LIABILITY:
-            if any(word in section_lower for word in ["unlimited", "without limit", "no cap"]):
+            if scan.has_any(risk_terms[ClauseType.LIABILITY][RiskLevel.CRITICAL]):
                 return RiskLevel.CRITICAL
-            elif any(word in section_lower for word in ["limited to", "not exceed", "maximum"]):
+            elif scan.has_any(risk_terms[ClauseType.LIABILITY][RiskLevel.LOW]):
                 return RiskLevel.LOW
             else:
                 return RiskLevel.MEDIUM
 
         elif clause_type == ClauseType.TERMINATION:
-            if any(word in section_lower for word in ["immediate", "without notice", "cause"]):
+            if scan.has_any(risk_terms[ClauseType.TERMINATION][RiskLevel.HIGH]):
                 return RiskLevel.HIGH
-            elif any(word in section_lower for word in ["30 days", "notice", "written"]):
+            elif scan.has_any(risk_terms[ClauseType.TERMINATION][RiskLevel.LOW]):
                 return RiskLevel.LOW
             else:
                 return RiskLevel.MEDIUM
 
         elif clause_type == ClauseType.PAYMENT_TERMS:
-            if any(word in section_lower for word in ["penalty", "interest", "late fee"]):
+            if scan.has_any(risk_terms[ClauseType.PAYMENT_TERMS][RiskLevel.MEDIUM]):
                 return RiskLevel.MEDIUM
             else:
                 return RiskLevel.LOW
 
         return RiskLevel.LOW
 
-    def _extract_clause_key_terms(self, section: str) -> List[str]:
+    def _extract_clause_key_terms(self, section: str, scan: Optional[SectionScan] = None) -> List[str]:
         """Extract key terms from a clause"""
         # Use TextBlob for noun phrase extraction
+        self.models.get("nltk_punkt")
         blob = TextBlob(section)
         noun_phrases = [phrase for phrase in blob.noun_phrases if len(phrase.split()) <= 4]
 
-        # Extract monetary amounts
-        money_amounts = re.findall(r'\$[\d,]+(?:\.\d{2})?', section)
-
-        # Extract dates
-        dates = []
-        for pattern in self.patterns["dates"]:
-            dates.extend(re.findall(pattern, section))
-
-        # Extract percentages
-        percentages = re.findall(r'\d+(?:\.\d+)?%', section)
+        # Monetary amounts and percentages come from the shared scan
+        scan = scan or self.section_scanner.scan(section)
+        dates = self.date_pattern.findall(section)
 
-        key_terms = noun_phrases + money_amounts + dates + percentages
+        key_terms = noun_phrases + scan.matches["money"] + dates + scan.matches["percentages"]
         return list(set(key_terms))[:10]  # Limit to top 10
 
-    def _identify_clause_concerns(self, section: str, clause_type: ClauseType) -> List[str]:
+    def _identify_clause_concerns(self, section: str, clause_type: ClauseType,
+                                  scan: Optional[SectionScan] = None) -> List[str]:
         """Identify potential concerns in a clause"""
         concerns = []
-        section_lower = section.lower()
+        scan = scan or self.section_scanner.scan(section)
 
         # General red flag words
-        red_flags = [
-            "unlimited", "without limit", "sole discretion", "irrevocable",
-            "perpetual", "unconditional", "absolute", "waive", "forfeit"
-        ]
-
-        for flag in red_flags:
-            if flag in section_lower:
+        for flag in self.clause_red_flags:
+            if scan.count(flag):
                 concerns.append(f"Contains potentially problematic term: '{flag}'")
 
         # Clause-specific concerns
         if clause_type == ClauseType.TERMINATION:
-            if "without cause" in section_lower and "immediate" in section_lower:
+            if scan.count("without cause") and scan.count("immediate"):
                 concerns.append("Allows immediate termination without cause")
 
         elif clause_type == ClauseType.LIABILITY:
-            if "consequential damages" in section_lower:
+            if scan.count("consequential damages"):
                 concerns.append("May include liability for consequential damages")
 
         elif clause_type == ClauseType.PAYMENT_TERMS:
-            if re.search(r'\d+%.*late', section_lower):
+            if self.late_penalty_pattern.search(section.lower()):
                 concerns.append("High late payment penalties")
 
         return concerns
@@ -995,6 +1781,61 @@ class ContractAnalyzerAgent:
         return exposure
 
 
+# Per-process agent used by analyze_portfolio workers
+_portfolio_agent: Optional[ContractAnalyzerAgent] = None
+
+
+def _init_portfolio_worker():
+    global _portfolio_agent
+    _portfolio_agent = ContractAnalyzerAgent()
+
+
+def _is_contract_path(item: Union[str, Path]) -> bool:
+    """
+    Whether a portfolio item names a file rather than holding contract text.
+
+    ``Path`` (and other ``os.PathLike``) items are always paths; a string is a
+    path only if it names an existing file.
+    """
+    if isinstance(item, os.PathLike):
+        return True
+    if "\n" in item or len(item) >= 4096:
+        return False
+    try:
+        return os.path.isfile(item)
+    except (OSError, ValueError):
+        return False
+
+
+def _portfolio_item_ids(items: List[Union[str, Path]]) -> List[str]:
+    """
+    Contract ids for portfolio items: the file stem for paths, a text hash otherwise
+
+    Ids shared by several items (``a/lease.pdf`` and ``b/lease.pdf``, or the
+    same text twice) get the item's position appended so results never
+    overwrite each other.
+    """
+    ids = [
+        Path(item).stem if _is_contract_path(item) else hashlib.md5(item.encode()).hexdigest()[:8]
+        for item in items
+    ]
+    counts = Counter(ids)
+    return [f"{contract_id}-{index}" if counts[contract_id] > 1 else contract_id
+            for index, contract_id in enumerate(ids)]
+
+
+def _run_portfolio_heuristics(item: Union[str, Path]) -> Tuple[str, Dict[str, Any]]:
+    """Load one portfolio item and run the model-free stages (runs in a worker process)"""
+    if _is_contract_path(item):
+        with open(item, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    else:
+        text = item
+
+    agent = _portfolio_agent or ContractAnalyzerAgent()
+    return text, agent._heuristic_stages(text)
+
+
 # Usage example and testing
 async def main():
     """Example usage of the Contract Analyzer Agent"""
@@ -12,13 +12,21 @@ Features:
 
 import asyncio
 import logging
+import math
+import re
+import sqlite3
+import time
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator, Set, Union, Callable, Awaitable
 from dataclasses import dataclass, asdict
 import json
+import numpy as np
 import openai
 from textblob import TextBlob
 import hashlib
+import heapq
 import random
 from enum import Enum
 
@@ -109,6 +117,575 @@ class CampaignPerformance:
     def revenue_per_email(self) -> float:
         return self.revenue_generated / self.delivered if self.delivered > 0 else 0.0
 
+@dataclass
+class PerformanceAggregate:
+    """Running totals over CampaignPerformance records, updated one record at a time"""
+    records: int = 0
+    sent: int = 0
+    delivered: int = 0
+    opened: int = 0
+    clicked: int = 0
+    converted: int = 0
+    revenue: float = 0.0
+    # Sums of per-record rates, for averages over records rather than over emails
+    open_rate_sum: float = 0.0
+    ctr_sum: float = 0.0
+    revenue_per_email_sum: float = 0.0
+
+    def add(self, performance: CampaignPerformance):
+        self.records += 1
+        self.sent += performance.sent
+        self.delivered += performance.delivered
+        self.opened += performance.opened
+        self.clicked += performance.clicked
+        self.converted += performance.converted
+        self.revenue += performance.revenue_generated
+        self.open_rate_sum += performance.open_rate
+        self.ctr_sum += performance.click_through_rate
+        self.revenue_per_email_sum += performance.revenue_per_email
+
+    def metrics(self) -> Dict[str, float]:
+        delivered = self.delivered
+        return {
+            'sent': self.sent,
+            'delivered': delivered,
+            'opened': self.opened,
+            'clicked': self.clicked,
+            'converted': self.converted,
+            'revenue': self.revenue,
+            'open_rate': (self.opened / delivered * 100) if delivered > 0 else 0,
+            'ctr': (self.clicked / delivered * 100) if delivered > 0 else 0,
+            'conversion_rate': (self.converted / self.clicked * 100) if self.clicked > 0 else 0,
+            'revenue_per_email': self.revenue / delivered if delivered > 0 else 0
+        }
+
+
+def sequential_proportion_test(successes_a: int, trials_a: int,
+                               successes_b: int, trials_b: int,
+                               mixture_sd: float = 0.03) -> Dict[str, float]:
+    """
+    Mixture sequential probability ratio test for two proportions.
+
+    Compares H0: p_a == p_b against a normal mixture over the difference
+    with standard deviation ``mixture_sd``. The likelihood ratio can be
+    checked after every batch of results without inflating the false
+    positive rate, so a winner may be declared as soon as 1/ratio drops
+    below the significance level.
+    """
+    if trials_a == 0 or trials_b == 0:
+        return {'difference': 0.0, 'likelihood_ratio': 1.0, 'p_value': 1.0}
+
+    rate_a = successes_a / trials_a
+    rate_b = successes_b / trials_b
+    difference = rate_b - rate_a
+    variance = rate_a * (1 - rate_a) / trials_a + rate_b * (1 - rate_b) / trials_b
+    if variance <= 0:
+        return {'difference': difference, 'likelihood_ratio': 1.0, 'p_value': 1.0}
+
+    tau2 = mixture_sd ** 2
+    log_ratio = (0.5 * math.log(variance / (variance + tau2))
+                 + difference ** 2 * tau2 / (2 * variance * (variance + tau2)))
+    # Cap the exponent; anything this large is decisively significant
+    likelihood_ratio = math.exp(min(log_ratio, 700.0))
+
+    return {
+        'difference': difference,
+        'likelihood_ratio': likelihood_ratio,
+        'p_value': min(1.0, 1.0 / likelihood_ratio)
+    }
+
+
+@dataclass(frozen=True)
+class SegmentRule:
+    """
+    Rule-based customer segment.
+
+    A customer belongs to ``name`` when every (column, min, max) condition
+    holds, with ``min <= value < max`` and None meaning unbounded. Rules with a
+    ``category_column`` instead put each customer in a segment named after
+    their value in that column (e.g. lifecycle stage).
+    """
+    name: Optional[str]
+    conditions: Tuple[Tuple[str, Optional[float], Optional[float]], ...] = ()
+    category_column: Optional[str] = None
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        for column, min_value, max_value in self.conditions:
+            value = row.get(column)
+            if value is None or value != value:  # missing or NaN
+                return False
+            if min_value is not None and value < min_value:
+                return False
+            if max_value is not None and value >= max_value:
+                return False
+        return True
+
+
+# Default segmentation, in the order segments are reported for a customer
+DEFAULT_SEGMENT_RULES: List[SegmentRule] = [
+    SegmentRule("high_engagement", (("engagement_score", 80, None),)),
+    SegmentRule("medium_engagement", (("engagement_score", 50, 80),)),
+    SegmentRule("low_engagement", (("engagement_score", None, 50),)),
+    SegmentRule("high_value", (("purchase_count", 1, None), ("total_spent", 1000, None))),
+    SegmentRule("medium_value", (("purchase_count", 1, None), ("total_spent", 200, 1000))),
+    SegmentRule("low_value", (("purchase_count", 1, None), ("total_spent", None, 200))),
+    SegmentRule("frequent_buyer", (("purchase_count", 5, None),)),
+    SegmentRule("repeat_customer", (("purchase_count", 2, 5),)),
+    SegmentRule("single_purchase", (("purchase_count", 1, 2),)),
+    SegmentRule("no_purchase", (("purchase_count", None, 1),)),
+    SegmentRule(None, category_column="lifecycle_stage"),
+    SegmentRule("recently_engaged", (("days_since_open", None, 8),)),
+    SegmentRule("moderately_engaged", (("days_since_open", 8, 31),)),
+    SegmentRule("dormant", (("days_since_open", 31, None),))
+]
+
+
+class SegmentMembers:
+    """Read-only view of one segment, compatible with the old list of customer ids"""
+
+    def __init__(self, index: "SegmentIndex", segment: str):
+        self._index = index
+        self._segment = segment
+
+    def __contains__(self, customer_id: str) -> bool:
+        return self._index.has_member(self._segment, customer_id)
+
+    def __len__(self) -> int:
+        return self._index.count(self._segment)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index.members(self._segment))
+
+    def __getitem__(self, item):
+        if isinstance(item, slice) and item.start is None and item.step is None and item.stop is not None:
+            return self._index.members(self._segment, limit=item.stop)
+        return self._index.members(self._segment)[item]
+
+    def __repr__(self) -> str:
+        return f"SegmentMembers({self._segment!r}, size={len(self)})"
+
+
+class SegmentIndex:
+    """
+    Segment membership stored as packed bitsets over dense customer positions.
+
+    Every customer id gets a stable position; every segment is a NumPy uint8
+    bitset, so adds and membership checks are O(1) and multi-segment targeting
+    is vectorized AND/OR/NOT over whole bitsets. Read access mirrors the old
+    ``Dict[str, List[str]]`` (``name in index``, ``index[name]``, ``items()``).
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self._bits: Dict[str, np.ndarray] = {}
+        self._retired: Set[int] = set()  # positions of removed customers
+
+    @property
+    def size(self) -> int:
+        """Number of customers with a position"""
+        return len(self.ids)
+
+    def position(self, customer_id: str, create: bool = True) -> Optional[int]:
+        pos = self.positions.get(customer_id)
+        if pos is None and create:
+            pos = len(self.ids)
+            self.positions[customer_id] = pos
+            self.ids.append(customer_id)
+        elif create:
+            self._retired.discard(pos)
+        return pos
+
+    def _bitset(self, segment: str, min_bytes: int = 0) -> np.ndarray:
+        bits = self._bits.get(segment)
+        if bits is None:
+            bits = np.zeros(max(min_bytes, 64), dtype=np.uint8)
+            self._bits[segment] = bits
+        elif len(bits) < min_bytes:
+            # Grow geometrically so bulk adds stay amortized O(1)
+            grown = np.zeros(max(min_bytes, 2 * len(bits)), dtype=np.uint8)
+            grown[:len(bits)] = bits
+            bits = self._bits[segment] = grown
+        return bits
+
+    def add(self, segment: str, customer_id: str):
+        pos = self.position(customer_id)
+        bits = self._bitset(segment, (pos >> 3) + 1)
+        bits[pos >> 3] |= np.uint8(1 << (pos & 7))
+
+    def discard(self, segment: str, customer_id: str):
+        pos = self.positions.get(customer_id)
+        bits = self._bits.get(segment)
+        if pos is not None and bits is not None and (pos >> 3) < len(bits):
+            bits[pos >> 3] &= np.uint8(~(1 << (pos & 7)) & 0xFF)
+
+    def has_member(self, segment: str, customer_id: str) -> bool:
+        pos = self.positions.get(customer_id)
+        bits = self._bits.get(segment)
+        if pos is None or bits is None or (pos >> 3) >= len(bits):
+            return False
+        return bool(bits[pos >> 3] & (1 << (pos & 7)))
+
+    def mask(self, segment: str) -> np.ndarray:
+        """Segment bitset sized to the current customer count (empty if unknown)"""
+        nbytes = (self.size + 7) >> 3
+        bits = self._bits.get(segment)
+        if bits is None:
+            return np.zeros(nbytes, dtype=np.uint8)
+        if len(bits) >= nbytes:
+            return bits[:nbytes].copy()
+        padded = np.zeros(nbytes, dtype=np.uint8)
+        padded[:len(bits)] = bits
+        return padded
+
+    def set_mask(self, segment: str, mask: np.ndarray):
+        """Replace a segment's membership with a bitset (e.g. from a rule evaluation)"""
+        self._bits[segment] = np.array(mask, dtype=np.uint8)
+
+    def remove_segment(self, segment: str):
+        self._bits.pop(segment, None)
+
+    def retire(self, customer_id: str):
+        """Drop a customer from every segment and from the universe, keeping its position"""
+        pos = self.positions.get(customer_id)
+        if pos is None:
+            return
+        for segment in self._bits:
+            self.discard(segment, customer_id)
+        self._retired.add(pos)
+
+    def universe(self) -> np.ndarray:
+        """Bitset of every customer with a position, less removed ones"""
+        selected = np.ones(self.size, dtype=bool)
+        selected[list(self._retired)] = False
+        return self.mask_from_bool(selected)
+
+    @staticmethod
+    def mask_from_bool(selected: np.ndarray) -> np.ndarray:
+        return np.packbits(selected, bitorder="little")
+
+    def to_bool(self, mask: np.ndarray) -> np.ndarray:
+        return np.unpackbits(mask, bitorder="little", count=self.size).astype(bool)
+
+    def count(self, segment_or_mask: Union[str, np.ndarray]) -> int:
+        mask = self.mask(segment_or_mask) if isinstance(segment_or_mask, str) else segment_or_mask
+        return int(np.unpackbits(mask).sum())
+
+    def query(self, any_of: Optional[Iterable[str]] = None,
+              all_of: Optional[Iterable[str]] = None,
+              none_of: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        Boolean segment algebra: (OR of any_of) AND (each of all_of) AND NOT (each of none_of).
+
+        Omitting any_of starts from every customer.
+        """
+        any_of = list(any_of or [])
+        if any_of:
+            result = np.zeros((self.size + 7) >> 3, dtype=np.uint8)
+            for segment in any_of:
+                result |= self.mask(segment)
+        else:
+            result = self.universe()
+
+        for segment in all_of or []:
+            result &= self.mask(segment)
+        for segment in none_of or []:
+            result &= ~self.mask(segment)
+
+        return result
+
+    def members(self, segment_or_mask: Union[str, np.ndarray], limit: Optional[int] = None) -> List[str]:
+        """Customer ids in a segment or bitset, in insertion order"""
+        mask = self.mask(segment_or_mask) if isinstance(segment_or_mask, str) else segment_or_mask
+        positions = np.flatnonzero(np.unpackbits(mask, bitorder="little", count=self.size))
+        if limit is not None:
+            positions = positions[:limit]
+        return [self.ids[pos] for pos in positions]
+
+    # Mapping-style read access, compatible with Dict[str, List[str]]
+    def __contains__(self, segment: str) -> bool:
+        return segment in self._bits
+
+    def __getitem__(self, segment: str) -> SegmentMembers:
+        if segment not in self._bits:
+            raise KeyError(segment)
+        return SegmentMembers(self, segment)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._bits))
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def keys(self) -> List[str]:
+        return list(self._bits)
+
+    def items(self) -> List[Tuple[str, SegmentMembers]]:
+        return [(segment, SegmentMembers(self, segment)) for segment in self._bits]
+
+    def get(self, segment: str, default: Any = None):
+        return SegmentMembers(self, segment) if segment in self._bits else default
+
+
+class CustomerFeatureTable:
+    """
+    Columnar customer features aligned with SegmentIndex positions.
+
+    Segment rules are evaluated a column at a time into bitsets, so
+    re-segmenting every customer is one vectorized pass.
+    """
+
+    NUMERIC_COLUMNS = ("engagement_score", "total_spent", "purchase_count", "last_open_ts")
+    CATEGORY_COLUMNS = ("lifecycle_stage",)
+
+    def __init__(self):
+        self.size = 0
+        self.numeric = {column: np.full(1024, np.nan) for column in self.NUMERIC_COLUMNS}
+        self.categories = {column: np.empty(1024, dtype=object) for column in self.CATEGORY_COLUMNS}
+
+    @staticmethod
+    def row_values(customer: "Customer") -> Dict[str, Any]:
+        return {
+            "engagement_score": float(customer.engagement_score),
+            "total_spent": float(sum(purchase.get('amount', 0) for purchase in customer.purchase_history)),
+            "purchase_count": float(len(customer.purchase_history)),
+            "last_open_ts": customer.last_open.timestamp() if customer.last_open else np.nan,
+            "lifecycle_stage": customer.lifecycle_stage
+        }
+
+    @staticmethod
+    def derive(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        """Add time-relative columns to a row"""
+        last_open_ts = row["last_open_ts"]
+        row["days_since_open"] = (
+            math.floor((now.timestamp() - last_open_ts) / 86400) if last_open_ts == last_open_ts else np.nan
+        )
+        return row
+
+    def set_row(self, pos: int, customer: "Customer"):
+        if pos >= len(self.numeric["engagement_score"]):
+            capacity = max(pos + 1, 2 * len(self.numeric["engagement_score"]))
+            for column, values in self.numeric.items():
+                grown = np.full(capacity, np.nan)
+                grown[:len(values)] = values
+                self.numeric[column] = grown
+            for column, values in self.categories.items():
+                grown = np.empty(capacity, dtype=object)
+                grown[:len(values)] = values
+                self.categories[column] = grown
+
+        row = self.row_values(customer)
+        for column in self.NUMERIC_COLUMNS:
+            self.numeric[column][pos] = row[column]
+        for column in self.CATEGORY_COLUMNS:
+            self.categories[column][pos] = row[column]
+        self.size = max(self.size, pos + 1)
+
+    def clear_row(self, pos: int):
+        """Blank a removed customer's row so no rule matches it"""
+        if pos < self.size:
+            for values in self.numeric.values():
+                values[pos] = np.nan
+            for values in self.categories.values():
+                values[pos] = None
+
+    def columns(self, size: int, now: datetime) -> Dict[str, np.ndarray]:
+        """Numeric columns (plus derived ones) for the first ``size`` positions"""
+        columns = {}
+        for column, values in self.numeric.items():
+            column_values = np.full(size, np.nan)
+            n = min(size, self.size)
+            column_values[:n] = values[:n]
+            columns[column] = column_values
+        with np.errstate(invalid="ignore"):
+            columns["days_since_open"] = np.floor((now.timestamp() - columns["last_open_ts"]) / 86400)
+        return columns
+
+    def evaluate(self, rules: List[SegmentRule], size: int, now: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Evaluate every rule over the table, returning a bitset per segment"""
+        now = now or datetime.now()
+        columns = self.columns(size, now)
+        masks: Dict[str, np.ndarray] = {}
+
+        for rule in rules:
+            if rule.category_column:
+                values = np.empty(size, dtype=object)
+                n = min(size, self.size)
+                values[:n] = self.categories[rule.category_column][:n]
+                for category in set(values[:n]) - {None}:
+                    masks[category] = SegmentIndex.mask_from_bool(values == category)
+                continue
+
+            selected = np.ones(size, dtype=bool)
+            with np.errstate(invalid="ignore"):
+                for column, min_value, max_value in rule.conditions:
+                    values = columns[column]
+                    selected &= ~np.isnan(values)
+                    if min_value is not None:
+                        selected &= values >= min_value
+                    if max_value is not None:
+                        selected &= values < max_value
+            masks[rule.name] = SegmentIndex.mask_from_bool(selected)
+
+        return masks
+
+    def column_mean(self, column: str, selected: np.ndarray, now: Optional[datetime] = None) -> float:
+        """Mean of a column over a boolean selection, ignoring rows without features"""
+        values = self.columns(len(selected), now or datetime.now())[column][selected]
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if len(values) else 0.0
+
+
+class CompiledTemplate:
+    """
+    Email template parsed once into literal text and placeholder names.
+
+    Rendering is a single join of the literals with the customer's values;
+    placeholders without a value render as empty strings, matching the old
+    behaviour of stripping unfilled ``{...}`` placeholders.
+    """
+
+    PLACEHOLDER = re.compile(r'\{([^}]+)\}')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.literals: List[str] = []
+        self.fields: List[str] = []
+
+        position = 0
+        for match in self.PLACEHOLDER.finditer(source):
+            self.literals.append(source[position:match.start()])
+            self.fields.append(match.group(1))
+            position = match.end()
+        self.literals.append(source[position:])
+
+    def render(self, values: Dict[str, str]) -> str:
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            parts.append(values.get(field, ''))
+            parts.append(literal)
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> CompiledTemplate:
+    """Parse a template once; repeated sends of the same variant reuse it"""
+    return CompiledTemplate(source)
+
+
+# Provider statuses that end a recipient's send; anything else is retried on resume
+DELIVERED_STATUSES = frozenset({'accepted', 'sent', 'queued', 'scheduled'})
+FINAL_STATUSES = DELIVERED_STATUSES | {'rejected', 'invalid'}
+
+
+class CampaignSendStore:
+    """
+    Per-recipient send status for campaigns.
+
+    A send writes one row per recipient as each batch completes, so an
+    interrupted campaign resumes by skipping recipients that already reached
+    a final status. Batches in flight during a crash are sent again on
+    resume (at-least-once delivery).
+    """
+
+    def __init__(self, db_path: str = "email_campaigns.db"):
+        self.db_path = db_path
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Initialize SQLite table for per-recipient send status"""
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS campaign_sends (
+                    campaign_id TEXT NOT NULL,
+                    customer_id TEXT NOT NULL,
+                    variant_id TEXT NOT NULL,
+                    recipient_email TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    provider_message_id TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (campaign_id, customer_id)
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def finished_recipients(self, campaign_id: str) -> Set[str]:
+        """Customers whose send for this campaign needs no further attempts"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT customer_id FROM campaign_sends WHERE campaign_id = ? "
+                f"AND status IN ({','.join('?' * len(FINAL_STATUSES))})",
+                (campaign_id, *sorted(FINAL_STATUSES))
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row['customer_id'] for row in rows}
+
+    def record_results(self, campaign_id: str, rows: List[Dict[str, Any]]):
+        """Upsert the outcome of one batch in a single transaction"""
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            conn.executemany("""
+                INSERT INTO campaign_sends
+                    (campaign_id, customer_id, variant_id, recipient_email, status,
+                     provider_message_id, error, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (campaign_id, customer_id) DO UPDATE SET
+                    variant_id = excluded.variant_id,
+                    recipient_email = excluded.recipient_email,
+                    status = excluded.status,
+                    provider_message_id = excluded.provider_message_id,
+                    error = excluded.error,
+                    attempts = campaign_sends.attempts + excluded.attempts,
+                    updated_at = excluded.updated_at
+            """, [
+                (campaign_id, row['customer_id'], row['variant_id'], row['recipient_email'],
+                 row['status'], row.get('provider_message_id'), row.get('error'),
+                 row.get('attempts', 1), now)
+                for row in rows
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_status(self, campaign_id: str, customer_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recorded send status for a campaign, optionally for one customer"""
+        query = "SELECT * FROM campaign_sends WHERE campaign_id = ?"
+        params: Tuple[str, ...] = (campaign_id,)
+        if customer_id is not None:
+            query += " AND customer_id = ?"
+            params += (customer_id,)
+
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(query + " ORDER BY customer_id", params)]
+        finally:
+            conn.close()
+
+    def status_counts(self, campaign_id: str) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT status, COUNT(*) AS total FROM campaign_sends
+                WHERE campaign_id = ? GROUP BY status
+            """, (campaign_id,)).fetchall()
+        finally:
+            conn.close()
+        return {row['status']: row['total'] for row in rows}
+
+
 class EmailCampaignWriter:
     """
     AI-powered Email Campaign Writer Agent
@@ -131,10 +708,28 @@ class EmailCampaignWriter:
         self.campaigns: Dict[str, EmailCampaign] = {}
         self.performance_history: List[CampaignPerformance] = []
 
+        # Running aggregates over performance_history, kept current by _sync_performance_stats
+        self.overall_stats = PerformanceAggregate()
+        self.campaign_stats: Dict[str, PerformanceAggregate] = {}
+        self.variant_stats: Dict[Tuple[str, str], PerformanceAggregate] = {}
+        self._ab_variant_ids: Set[str] = set()
+        self._stats_history: Optional[List[CampaignPerformance]] = None
+        self._stats_upto = 0
+        self._sequential_p_values: Dict[Tuple[str, str], float] = {}
+
         # Segmentation and personalization
-        self.segments: Dict[str, List[str]] = {}  # segment_name -> customer_ids
+        self.segments = SegmentIndex()  # segment_name -> bitset over customer positions
+        self.customer_features = CustomerFeatureTable()
+        self.segment_rules: List[SegmentRule] = list(config.get('segment_rules', DEFAULT_SEGMENT_RULES))
+        self._rule_segments: Set[str] = set()  # segments owned by segment_rules
+        # Placeholder values per registered customer; update_customer/remove_customer invalidate
+        self._customer_attributes: Dict[str, Dict[str, str]] = {}
         self.personalization_rules: Dict[str, Any] = config.get('personalization_rules', {})
 
+        # Sending; per-recipient status is checkpointed so interrupted sends resume
+        self.send_db_path = config.get('send_db_path', 'email_campaigns.db')
+        self._send_store: Optional[CampaignSendStore] = None
+
         # Performance tracking
         self.total_revenue_generated = 0.0
         self.campaigns_sent = 0
@@ -176,60 +771,103 @@ class EmailCampaignWriter:
         self.logger.info(f"Added customer {customer.id} ({customer.email})")
         return customer
 
+    def update_customer(self, customer_id: str, **changes: Any) -> Customer:
+        """
+        Apply field changes to a customer and refresh its segments and attributes
+
+        Call with no changes after editing a customer's dicts or lists in place.
+        """
+        customer = self.customers[customer_id]
+        for field_name, value in changes.items():
+            if not hasattr(customer, field_name):
+                raise AttributeError(f"Customer has no field '{field_name}'")
+            setattr(customer, field_name, value)
+
+        self._auto_segment_customer(customer)
+        return customer
+
+    def remove_customer(self, customer_id: str) -> Optional[Customer]:
+        """Remove a customer along with its segment memberships and cached attributes"""
+        customer = self.customers.pop(customer_id, None)
+        self._customer_attributes.pop(customer_id, None)
+
+        pos = self.segments.position(customer_id, create=False)
+        if pos is not None:
+            self.segments.retire(customer_id)
+            self.customer_features.clear_row(pos)
+
+        if customer is not None:
+            self.logger.info(f"Removed customer {customer_id}")
+        return customer
+
     def _auto_segment_customer(self, customer: Customer) -> List[str]:
         """Automatically segment customer based on profile"""
+        pos = self.segments.position(customer.id)
+        self.customer_features.set_row(pos, customer)
+        self._customer_attributes.pop(customer.id, None)
+        row = self.customer_features.derive(self.customer_features.row_values(customer), datetime.now())
+
         segments = []
+        for rule in self.segment_rules:
+            if rule.category_column:
+                if row.get(rule.category_column):
+                    segments.append(row[rule.category_column])
+            elif rule.matches(row):
+                segments.append(rule.name)
+
+        # Update segments, dropping rule segments the customer no longer matches
+        for segment in self._rule_segments.difference(segments):
+            self.segments.discard(segment, customer.id)
+        for segment in segments:
+            self.segments.add(segment, customer.id)
+        self._rule_segments.update(segments)
 
-        # Engagement-based segmentation
-        if customer.engagement_score >= 80:
-            segments.append("high_engagement")
-        elif customer.engagement_score >= 50:
-            segments.append("medium_engagement")
-        else:
-            segments.append("low_engagement")
+        return segments
 
-        # Purchase-based segmentation
-        if customer.purchase_history:
-            total_spent = sum(purchase.get('amount', 0) for purchase in customer.purchase_history)
-            purchase_count = len(customer.purchase_history)
+    def resegment_customers(self, rules: Optional[List[SegmentRule]] = None) -> Dict[str, int]:
+        """
+        Re-apply segment rules to every customer in one columnar pass
 
-            if total_spent >= 1000:
-                segments.append("high_value")
-            elif total_spent >= 200:
-                segments.append("medium_value")
-            else:
-                segments.append("low_value")
+        Args:
+            rules: New segment rules to adopt (defaults to the current rules)
 
-            if purchase_count >= 5:
-                segments.append("frequent_buyer")
-            elif purchase_count >= 2:
-                segments.append("repeat_customer")
-            else:
-                segments.append("single_purchase")
-        else:
-            segments.append("no_purchase")
-
-        # Lifecycle segmentation
-        segments.append(customer.lifecycle_stage)
-
-        # Recency segmentation
-        if customer.last_open:
-            days_since_open = (datetime.now() - customer.last_open).days
-            if days_since_open <= 7:
-                segments.append("recently_engaged")
-            elif days_since_open <= 30:
-                segments.append("moderately_engaged")
-            else:
-                segments.append("dormant")
+        Returns:
+            Size of each rule-based segment
+        """
+        if rules is not None:
+            self.segment_rules = list(rules)
+
+        masks = self.customer_features.evaluate(self.segment_rules, self.segments.size)
+
+        for segment in self._rule_segments - set(masks):
+            self.segments.remove_segment(segment)
+        for segment, mask in masks.items():
+            self.segments.set_mask(segment, mask)
+        self._rule_segments = set(masks)
+
+        sizes = {segment: self.segments.count(mask) for segment, mask in masks.items()}
+        self.logger.info(f"Re-segmented {self.segments.size} customers into {len(masks)} segments")
+        return sizes
+
+    def select_customers(self,
+                         any_of: Optional[List[str]] = None,
+                         all_of: Optional[List[str]] = None,
+                         none_of: Optional[List[str]] = None,
+                         limit: Optional[int] = None) -> List[str]:
+        """
+        Target customers with segment set algebra
 
-        # Update segments
-        for segment in segments:
-            if segment not in self.segments:
-                self.segments[segment] = []
-            if customer.id not in self.segments[segment]:
-                self.segments[segment].append(customer.id)
+        Args:
+            any_of: Customers in at least one of these segments (OR); all customers if omitted
+            all_of: Customers must also be in every one of these segments (AND)
+            none_of: Customers must not be in any of these segments (NOT)
+            limit: Maximum number of customer ids to return
 
-        return segments
+        Returns:
+            Matching customer ids
+        """
+        mask = self.segments.query(any_of=any_of, all_of=all_of, none_of=none_of)
+        return self.segments.members(mask, limit=limit)
 
     async def create_campaign(self,
                             campaign_name: str,
@@ -457,31 +1095,34 @@ class EmailCampaignWriter:
     def _analyze_segments(self, target_segments: List[str]) -> str:
         """Analyze target segments to provide insights for content generation"""
         segment_analysis = []
+        now = datetime.now()
+        columns = self.customer_features.columns(self.segments.size, now)
 
         for segment in target_segments:
             if segment not in self.segments:
                 continue
 
-            customer_ids = self.segments[segment]
-            customers = [self.customers[cid] for cid in customer_ids if cid in self.customers]
+            selected = self.segments.to_bool(self.segments.mask(segment))
+            # Only customers with a feature row can be profiled
+            selected &= ~np.isnan(columns['engagement_score'])
+            segment_size = int(selected.sum())
 
-            if not customers:
+            if not segment_size:
                 continue
 
             # Analyze segment characteristics
-            avg_engagement = sum(c.engagement_score for c in customers) / len(customers)
+            avg_engagement = float(columns['engagement_score'][selected].mean())
 
             # Purchase behavior
-            total_purchases = sum(len(c.purchase_history) for c in customers)
-            avg_purchases = total_purchases / len(customers) if customers else 0
+            avg_purchases = float(columns['purchase_count'][selected].mean())
 
             # Recent activity
-            recent_activity = sum(1 for c in customers if c.last_open and
-                                (datetime.now() - c.last_open).days <= 30)
-            activity_rate = recent_activity / len(customers) if customers else 0
+            with np.errstate(invalid="ignore"):
+                recent_activity = int((columns['days_since_open'][selected] <= 30).sum())
+            activity_rate = recent_activity / segment_size
 
             segment_analysis.append(
-                f"{segment}: {len(customers)} customers, "
+                f"{segment}: {segment_size} customers, "
                 f"avg engagement {avg_engagement:.1f}%, "
                 f"avg purchases {avg_purchases:.1f}, "
                 f"recent activity {activity_rate:.1%}"
@@ -500,7 +1141,7 @@ class EmailCampaignWriter:
             if segment not in self.segments:
                 continue
 
-            customer_ids = self.segments[segment][:10]  # Sample first 10 customers
+            customer_ids = self.segments.members(segment, limit=10)  # Sample first 10 customers
 
             for customer_id in customer_ids:
                 if customer_id not in self.customers:
@@ -606,66 +1247,322 @@ class EmailCampaignWriter:
         Returns:
             Personalized email content
         """
-        try:
-            personalized_content = content
+        return self._render_for_customer(compile_template(content), customer, campaign)
 
-            # Basic personalization
-            personalized_content = personalized_content.replace('{first_name}', customer.name.split()[0])
-            personalized_content = personalized_content.replace('{full_name}', customer.name)
-            personalized_content = personalized_content.replace('{email}', customer.email)
+    def render_many(self,
+                    customers: Iterable[Customer],
+                    content: str,
+                    campaign: EmailCampaign) -> Iterator[Tuple[Customer, str]]:
+        """
+        Stream personalized emails for many customers
 
-            # Demographic personalization
-            for key, value in customer.demographics.items():
-                personalized_content = personalized_content.replace(f'{{{key}}}', str(value))
+        Args:
+            customers: Customers to render for (any iterable, consumed lazily)
+            content: Email content template, compiled once for the whole run
+            campaign: Campaign object
 
-            # Purchase history personalization
-            if customer.purchase_history:
-                last_purchase = max(customer.purchase_history, key=lambda x: x.get('date', datetime.min))
-                total_spent = sum(purchase.get('amount', 0) for purchase in customer.purchase_history)
+        Yields:
+            (customer, personalized content) pairs
+        """
+        template = compile_template(content)
+        for customer in customers:
+            yield customer, self._render_for_customer(template, customer, campaign)
 
-                personalized_content = personalized_content.replace(
-                    '{last_purchase_date}',
-                    last_purchase.get('date', datetime.now()).strftime('%B %Y')
-                )
-                personalized_content = personalized_content.replace('{total_spent}', f"${total_spent:.2f}")
-
-                # Favorite category
-                categories = [p.get('category', 'general') for p in customer.purchase_history]
-                if categories:
-                    favorite_category = max(set(categories), key=categories.count)
-                    personalized_content = personalized_content.replace('{favorite_category}', favorite_category)
-
-            # Preferences personalization
-            for key, value in customer.preferences.items():
-                personalized_content = personalized_content.replace(f'{{pref_{key}}}', str(value))
-
-            # Dynamic content based on customer behavior
-            if campaign.campaign_type == CampaignType.ABANDONED_CART:
-                # Add specific cart items (would come from integration)
-                cart_items = customer.preferences.get('cart_items', ['your items'])
-                if isinstance(cart_items, list) and cart_items:
-                    items_text = ', '.join(cart_items[:3])
-                    personalized_content = personalized_content.replace('{cart_items}', items_text)
-
-            elif campaign.campaign_type == CampaignType.UPSELL:
-                # Suggest relevant upgrades based on purchase history
-                if customer.purchase_history:
-                    last_category = customer.purchase_history[-1].get('category', 'product')
-                    personalized_content = personalized_content.replace(
-                        '{suggested_upgrade}',
-                        f"premium {last_category} features"
-                    )
+    def _render_for_customer(self, template: CompiledTemplate, customer: Customer, campaign: EmailCampaign) -> str:
+        try:
+            values = self._customer_attribute_values(customer)
 
-            # Remove any unfilled placeholders
-            import re
-            personalized_content = re.sub(r'\{[^}]+\}', '', personalized_content)
+            campaign_values = self._campaign_attributes(customer, campaign)
+            if campaign_values:
+                values = {**campaign_values, **values}
 
-            return personalized_content
+            return template.render(values)
 
         except Exception as e:
             self.logger.error(f"Error personalizing content: {str(e)}")
             # Return content with basic personalization only
-            return content.replace('{first_name}', customer.name.split()[0]).replace('{email}', customer.email)
+            return template.source.replace('{first_name}', customer.name.split()[0]).replace('{email}', customer.email)
+
+    def _customer_attribute_values(self, customer: Customer) -> Dict[str, str]:
+        """Cached placeholder values; only registered customers are cached"""
+        if self.customers.get(customer.id) is not customer:
+            return self._compute_customer_attributes(customer)
+
+        values = self._customer_attributes.get(customer.id)
+        if values is None:
+            values = self._customer_attributes[customer.id] = self._compute_customer_attributes(customer)
+        return values
+
+    def _compute_customer_attributes(self, customer: Customer) -> Dict[str, str]:
+        """Placeholder values for a customer; earlier sources win over later ones"""
+        values = {
+            # Basic personalization
+            'first_name': customer.name.split()[0],
+            'full_name': customer.name,
+            'email': customer.email
+        }
+
+        # Demographic personalization
+        for key, value in customer.demographics.items():
+            values.setdefault(key, str(value))
+
+        # Purchase history personalization
+        if customer.purchase_history:
+            last_purchase = max(customer.purchase_history, key=lambda x: x.get('date', datetime.min))
+            total_spent = sum(purchase.get('amount', 0) for purchase in customer.purchase_history)
+
+            values.setdefault('last_purchase_date', last_purchase.get('date', datetime.now()).strftime('%B %Y'))
+            values.setdefault('total_spent', f"${total_spent:.2f}")
+
+            # Favorite category
+            categories = Counter(p.get('category', 'general') for p in customer.purchase_history)
+            values.setdefault('favorite_category', categories.most_common(1)[0][0])
+
+        # Preferences personalization
+        for key, value in customer.preferences.items():
+            values.setdefault(f'pref_{key}', str(value))
+
+        return values
+
+    def _campaign_attributes(self, customer: Customer, campaign: EmailCampaign) -> Dict[str, str]:
+        """Dynamic content based on customer behavior for this campaign type"""
+        if campaign.campaign_type == CampaignType.ABANDONED_CART:
+            # Add specific cart items (would come from integration)
+            cart_items = customer.preferences.get('cart_items', ['your items'])
+            if isinstance(cart_items, list) and cart_items:
+                return {'cart_items': ', '.join(cart_items[:3])}
+
+        elif campaign.campaign_type == CampaignType.UPSELL:
+            # Suggest relevant upgrades based on purchase history
+            if customer.purchase_history:
+                last_category = customer.purchase_history[-1].get('category', 'product')
+                return {'suggested_upgrade': f"premium {last_category} features"}
+
+        return {}
+
+    @property
+    def send_store(self) -> CampaignSendStore:
+        """Per-recipient send checkpoint store, created on first use"""
+        if self._send_store is None:
+            self._send_store = CampaignSendStore(self.send_db_path)
+        return self._send_store
+
+    async def send_campaign(self,
+                            campaign: EmailCampaign,
+                            send_batch: Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]],
+                            ab_config: Optional[Dict[str, Any]] = None,
+                            batch_size: int = 500,
+                            max_concurrency: int = 4,
+                            max_retries: int = 5,
+                            base_delay: float = 1.0,
+                            max_delay: float = 60.0) -> Dict[str, Any]:
+        """
+        Send a campaign in rendered batches, resuming from the last checkpoint
+
+        Recipients are rendered one batch at a time and at most
+        ``max_concurrency`` batches are in flight, so memory stays bounded
+        for any audience size. Rate-limited and 5xx batches are retried with
+        exponential backoff (or the provider's Retry-After). Each batch's
+        per-recipient outcome is written to ``send_store`` as it completes;
+        calling this again for the same campaign skips recipients that are
+        already done. A batch that raises (rendering, sending or recording)
+        counts all of its recipients as failed, and the campaign is only
+        marked sent when nothing failed.
+
+        Args:
+            campaign: Campaign to send
+            send_batch: Coroutine sending a list of rendered messages, e.g.
+                ``functools.partial(api_manager.send_email_batch, 'sendgrid', sender_email=...)``
+            ab_config: A/B test configuration from ``setup_ab_test``; without
+                it the whole audience gets the first variant
+            batch_size: Recipients per provider request
+            max_concurrency: Batches in flight at once
+            max_retries: Retries per batch for transient failures
+            base_delay: Initial backoff delay in seconds
+            max_delay: Upper bound for a single backoff delay
+
+        Returns:
+            Send summary with per-variant counts
+        """
+        started = time.monotonic()
+        store = self.send_store
+        finished = store.finished_recipients(campaign.id)
+
+        summary = {
+            'campaign_id': campaign.id,
+            'recipients': 0,
+            'skipped': 0,
+            'delivered': 0,
+            'rejected': 0,
+            'failed': 0,
+            'batches': 0,
+            'batch_errors': 0,
+            'retries': 0,
+            'by_variant': {}
+        }
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        tasks: List[Tuple[asyncio.Task, str, int]] = []
+
+        async def start_batch(variant_id: str, subject: str, content: str, customers: List[Customer]):
+            await semaphore.acquire()
+            task = asyncio.ensure_future(run_batch(variant_id, subject, content, customers))
+            tasks.append((task, variant_id, len(customers)))
+
+        async def run_batch(variant_id: str, subject: str, content: str, customers: List[Customer]):
+            try:
+                messages = self._render_send_batch(campaign, variant_id, subject, content, customers)
+                results, retries = await self._send_with_backoff(
+                    send_batch, messages, max_retries, base_delay, max_delay
+                )
+                store.record_results(campaign.id, results)
+
+                summary['batches'] += 1
+                summary['retries'] += retries
+                variant_counts = summary['by_variant'].setdefault(
+                    variant_id, {'delivered': 0, 'rejected': 0, 'failed': 0}
+                )
+                for result in results:
+                    outcome = self._send_outcome(result['status'])
+                    summary[outcome] += 1
+                    variant_counts[outcome] += 1
+            finally:
+                semaphore.release()
+
+        for variant_id, subject, content, customer_ids in self._send_groups(campaign, ab_config):
+            batch: List[Customer] = []
+            for customer_id in customer_ids:
+                customer = self.customers.get(customer_id)
+                if customer is None:
+                    continue
+                summary['recipients'] += 1
+                if customer_id in finished:
+                    summary['skipped'] += 1
+                    continue
+
+                batch.append(customer)
+                if len(batch) >= batch_size:
+                    await start_batch(variant_id, subject, content, batch)
+                    batch = []
+
+            if batch:
+                await start_batch(variant_id, subject, content, batch)
+
+        outcomes = await asyncio.gather(*(task for task, _, _ in tasks), return_exceptions=True)
+        for (_, variant_id, size), outcome in zip(tasks, outcomes):
+            if isinstance(outcome, Exception):
+                # Nothing was counted for a batch that raised; none of it is known to be delivered
+                self.logger.error(f"Batch of {size} for campaign {campaign.id} failed: {outcome}")
+                summary['batch_errors'] += 1
+                summary['failed'] += size
+                summary['by_variant'].setdefault(
+                    variant_id, {'delivered': 0, 'rejected': 0, 'failed': 0}
+                )['failed'] += size
+
+        if summary['failed'] == 0 and summary['batch_errors'] == 0:
+            campaign.status = 'sent'
+
+        summary['duration_seconds'] = round(time.monotonic() - started, 3)
+        self.logger.info(
+            f"Sent campaign {campaign.id}: {summary['delivered']} delivered, "
+            f"{summary['failed']} failed, {summary['skipped']} already sent"
+        )
+        return summary
+
+    def get_send_status(self, campaign_id: str, customer_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recorded per-recipient send status for a campaign"""
+        return self.send_store.get_status(campaign_id, customer_id)
+
+    def _send_groups(self,
+                     campaign: EmailCampaign,
+                     ab_config: Optional[Dict[str, Any]]) -> Iterator[Tuple[str, str, str, List[str]]]:
+        """(variant_id, subject, content, customer_ids) for each group of a send"""
+        if ab_config and ab_config.get('enabled'):
+            for variant_id, group in ab_config['test_groups'].items():
+                yield variant_id, group['subject_line'], group['content'], group['customers']
+        else:
+            customer_ids = self.select_customers(any_of=campaign.target_segments)
+            yield 'variant_a', campaign.subject_lines[0], campaign.content_variants[0], customer_ids
+
+    def _render_send_batch(self,
+                           campaign: EmailCampaign,
+                           variant_id: str,
+                           subject: str,
+                           content: str,
+                           customers: List[Customer]) -> List[Dict[str, Any]]:
+        subject_template = compile_template(subject)
+        return [
+            {
+                'message_id': f"{campaign.id}:{customer.id}",
+                'customer_id': customer.id,
+                'variant_id': variant_id,
+                'recipient_email': customer.email,
+                'subject': self._render_for_customer(subject_template, customer, campaign),
+                'content': body
+            }
+            for customer, body in self.render_many(customers, content, campaign)
+        ]
+
+    async def _send_with_backoff(self,
+                                 send_batch: Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]],
+                                 messages: List[Dict[str, Any]],
+                                 max_retries: int,
+                                 base_delay: float,
+                                 max_delay: float) -> Tuple[List[Dict[str, Any]], int]:
+        """Send one batch, retrying transient failures; returns rows for the send store"""
+        attempt = 0
+        while True:
+            try:
+                response = await send_batch(messages)
+            except Exception as e:
+                response = {'success': False, 'error': str(e)}
+
+            if response.get('success'):
+                by_message = {r['message_id']: r for r in response.get('results', [])}
+                rows = []
+                for message in messages:
+                    result = by_message.get(message['message_id'], {'status': 'failed', 'error': 'missing from response'})
+                    rows.append({
+                        'customer_id': message['customer_id'],
+                        'variant_id': message['variant_id'],
+                        'recipient_email': message['recipient_email'],
+                        'status': result.get('status', 'failed'),
+                        'provider_message_id': result.get('provider_message_id'),
+                        'error': result.get('error'),
+                        'attempts': attempt + 1
+                    })
+                return rows, attempt
+
+            # Anything other than rate limiting or a server error will fail again
+            status = response.get('status')
+            transient = status is None or status == 429 or status >= 500
+            if not transient or attempt >= max_retries:
+                self.logger.error(f"Batch of {len(messages)} emails failed: {response.get('error')}")
+                return [
+                    {
+                        'customer_id': message['customer_id'],
+                        'variant_id': message['variant_id'],
+                        'recipient_email': message['recipient_email'],
+                        'status': 'failed',
+                        'error': str(response.get('error')),
+                        'attempts': attempt + 1
+                    }
+                    for message in messages
+                ], attempt
+
+            delay = response.get('retry_after')
+            if delay is None:
+                delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _send_outcome(status: str) -> str:
+        if status in DELIVERED_STATUSES:
+            return 'delivered'
+        if status in FINAL_STATUSES:
+            return 'rejected'
+        return 'failed'
 
     def setup_ab_test(self, campaign: EmailCampaign) -> Dict[str, Any]:
         """
@@ -681,14 +1578,8 @@ class EmailCampaignWriter:
             if not self.ab_test_config.get('enabled', True):
                 return {'enabled': False}
 
-            # Get target customers
-            target_customers = []
-            for segment in campaign.target_segments:
-                if segment in self.segments:
-                    target_customers.extend(self.segments[segment])
-
-            # Remove duplicates
-            target_customers = list(set(target_customers))
+            # Get target customers (union of segments, already de-duplicated)
+            target_customers = self.select_customers(any_of=campaign.target_segments)
 
             if len(target_customers) < 20:  # Minimum for meaningful A/B test
                 return {'enabled': False, 'reason': 'Insufficient audience size'}
@@ -740,39 +1631,16 @@ class EmailCampaignWriter:
             A/B test analysis results
         """
         try:
-            # Get performance data for both variants
-            variant_a_performance = [p for p in self.performance_history
-                                   if p.campaign_id == campaign_id and p.variant_id == 'variant_a']
-            variant_b_performance = [p for p in self.performance_history
-                                   if p.campaign_id == campaign_id and p.variant_id == 'variant_b']
+            # Running per-variant totals; no scan of the performance history
+            self._sync_performance_stats()
+            variant_a_stats = self.variant_stats.get((campaign_id, 'variant_a'))
+            variant_b_stats = self.variant_stats.get((campaign_id, 'variant_b'))
 
-            if not variant_a_performance or not variant_b_performance:
+            if not variant_a_stats or not variant_b_stats:
                 return {'status': 'insufficient_data'}
 
-            # Calculate aggregate metrics
-            def aggregate_metrics(performances):
-                total_sent = sum(p.sent for p in performances)
-                total_delivered = sum(p.delivered for p in performances)
-                total_opened = sum(p.opened for p in performances)
-                total_clicked = sum(p.clicked for p in performances)
-                total_converted = sum(p.converted for p in performances)
-                total_revenue = sum(p.revenue_generated for p in performances)
-
-                return {
-                    'sent': total_sent,
-                    'delivered': total_delivered,
-                    'opened': total_opened,
-                    'clicked': total_clicked,
-                    'converted': total_converted,
-                    'revenue': total_revenue,
-                    'open_rate': (total_opened / total_delivered * 100) if total_delivered > 0 else 0,
-                    'ctr': (total_clicked / total_delivered * 100) if total_delivered > 0 else 0,
-                    'conversion_rate': (total_converted / total_clicked * 100) if total_clicked > 0 else 0,
-                    'revenue_per_email': total_revenue / total_delivered if total_delivered > 0 else 0
-                }
-
-            variant_a_metrics = aggregate_metrics(variant_a_performance)
-            variant_b_metrics = aggregate_metrics(variant_b_performance)
+            variant_a_metrics = variant_a_stats.metrics()
+            variant_b_metrics = variant_b_stats.metrics()
 
             # Determine statistical significance and winner
             winner_threshold = self.ab_test_config.get('winner_threshold', 0.05)
@@ -806,6 +1674,15 @@ class EmailCampaignWriter:
             if winner_scores['variant_a'] == winner_scores['variant_b']:
                 overall_winner = 'tie'
 
+            sequential = self._sequential_ab_test(campaign_id, variant_a_stats, variant_b_stats)
+            recommendations = self._generate_ab_test_recommendations(
+                variant_a_metrics, variant_b_metrics, overall_winner
+            )
+            if sequential['significant']:
+                loser = 'variant_b' if sequential['winner'] == 'variant_a' else 'variant_a'
+                recommendations.insert(0, f"Sequential test favours {sequential['winner']} "
+                                          f"(p={sequential['p_value']:.3f}) - stop sending {loser}")
+
             analysis = {
                 'campaign_id': campaign_id,
                 'status': 'completed',
@@ -830,9 +1707,9 @@ class EmailCampaignWriter:
                 },
                 'overall_winner': overall_winner,
                 'winner_scores': winner_scores,
-                'recommendations': self._generate_ab_test_recommendations(
-                    variant_a_metrics, variant_b_metrics, overall_winner
-                )
+                'sequential_test': sequential,
+                'early_stop': sequential['significant'],
+                'recommendations': recommendations
             }
 
             self.logger.info(f"A/B test analysis completed for campaign {campaign_id}: Winner = {overall_winner}")
@@ -842,6 +1719,50 @@ class EmailCampaignWriter:
             self.logger.error(f"Error analyzing A/B test: {str(e)}")
             return {'status': 'error', 'message': str(e)}
 
+    def _sequential_ab_test(self,
+                            campaign_id: str,
+                            variant_a: PerformanceAggregate,
+                            variant_b: PerformanceAggregate) -> Dict[str, Any]:
+        """
+        Always-valid significance test on the configured A/B metric
+
+        The p-value is the running minimum over every analysis of this
+        campaign, which stays valid however often results are checked.
+        """
+        metric = self.ab_test_config.get('sequential_metric', 'ctr')
+        alpha = self.ab_test_config.get('sequential_alpha', 0.05)
+        mixture_sd = self.ab_test_config.get('sequential_mixture_sd', 0.03)
+
+        # (successes, trials) for each supported proportion metric
+        counts = {
+            'open_rate': lambda agg: (agg.opened, agg.delivered),
+            'ctr': lambda agg: (agg.clicked, agg.delivered),
+            'conversion_rate': lambda agg: (agg.converted, agg.clicked)
+        }
+        if metric not in counts:
+            raise ValueError(f"Unsupported sequential_metric: {metric}")
+
+        result = sequential_proportion_test(*counts[metric](variant_a), *counts[metric](variant_b), mixture_sd)
+
+        key = (campaign_id, metric)
+        p_value = min(self._sequential_p_values.get(key, 1.0), result['p_value'])
+        self._sequential_p_values[key] = p_value
+
+        significant = p_value <= alpha
+        winner = None
+        if significant:
+            winner = 'variant_b' if result['difference'] > 0 else 'variant_a'
+
+        return {
+            'metric': metric,
+            'difference_points': round(result['difference'] * 100, 4),
+            'likelihood_ratio': result['likelihood_ratio'],
+            'p_value': p_value,
+            'alpha': alpha,
+            'significant': significant,
+            'winner': winner
+        }
+
     def _generate_ab_test_recommendations(self,
                                         variant_a: Dict[str, float],
                                         variant_b: Dict[str, float],
@@ -879,6 +1800,29 @@ class EmailCampaignWriter:
 
         return recommendations
 
+    def _sync_performance_stats(self):
+        """Fold records appended to performance_history into the running aggregates"""
+        history = self.performance_history
+        if history is not self._stats_history or len(history) < self._stats_upto:
+            # History was replaced or truncated; rebuild from scratch
+            self.overall_stats = PerformanceAggregate()
+            self.campaign_stats = {}
+            self.variant_stats = {}
+            self._ab_variant_ids = set()
+            self._stats_history = history
+            self._stats_upto = 0
+
+        for index in range(self._stats_upto, len(history)):
+            performance = history[index]
+            self.overall_stats.add(performance)
+            self.campaign_stats.setdefault(performance.campaign_id, PerformanceAggregate()).add(performance)
+            self.variant_stats.setdefault(
+                (performance.campaign_id, performance.variant_id), PerformanceAggregate()
+            ).add(performance)
+            if 'variant' in performance.variant_id:
+                self._ab_variant_ids.add(performance.variant_id)
+        self._stats_upto = len(history)
+
     def track_campaign_performance(self,
                                  campaign_id: str,
                                  variant_id: str,
@@ -892,6 +1836,7 @@ class EmailCampaignWriter:
             )
 
             self.performance_history.append(performance)
+            self._sync_performance_stats()
 
             # Update global metrics
             self.total_revenue_generated += performance.revenue_generated
@@ -926,44 +1871,49 @@ class EmailCampaignWriter:
     def get_analytics_dashboard(self) -> Dict[str, Any]:
         """Generate comprehensive analytics dashboard"""
         try:
-            if not self.performance_history:
+            self._sync_performance_stats()
+            if not self.overall_stats.records:
                 return {
                     'status': 'no_data',
                     'message': 'No campaign performance data available yet'
                 }
 
             # Overall performance metrics
-            total_campaigns = len(set(p.campaign_id for p in self.performance_history))
-            total_sent = sum(p.sent for p in self.performance_history)
-            total_delivered = sum(p.delivered for p in self.performance_history)
-            total_opened = sum(p.opened for p in self.performance_history)
-            total_clicked = sum(p.clicked for p in self.performance_history)
-            total_converted = sum(p.converted for p in self.performance_history)
+            overall = self.overall_stats
+            total_campaigns = len(self.campaign_stats)
+            total_sent = overall.sent
+            total_delivered = overall.delivered
+            total_opened = overall.opened
+            total_clicked = overall.clicked
+            total_converted = overall.converted
 
             overall_open_rate = (total_opened / total_delivered * 100) if total_delivered > 0 else 0
             overall_ctr = (total_clicked / total_delivered * 100) if total_delivered > 0 else 0
             overall_conversion_rate = (total_converted / total_clicked * 100) if total_clicked > 0 else 0
 
-            # Campaign type performance
-            campaign_type_performance = {}
-            for performance in self.performance_history:
-                # Find campaign type (this would be enhanced with proper campaign tracking)
-                campaign = self.campaigns.get(performance.campaign_id)
+            # Campaign type performance, combined from per-campaign totals
+            type_totals: Dict[str, Tuple[int, PerformanceAggregate]] = {}
+            for campaign_id, stats in self.campaign_stats.items():
+                campaign = self.campaigns.get(campaign_id)
                 if campaign:
                     campaign_type = campaign.campaign_type.value
-                    if campaign_type not in campaign_type_performance:
-                        campaign_type_performance[campaign_type] = []
-                    campaign_type_performance[campaign_type].append(performance)
+                    campaigns, totals = type_totals.get(campaign_type, (0, PerformanceAggregate()))
+                    totals.records += stats.records
+                    totals.revenue += stats.revenue
+                    totals.open_rate_sum += stats.open_rate_sum
+                    totals.ctr_sum += stats.ctr_sum
+                    totals.revenue_per_email_sum += stats.revenue_per_email_sum
+                    type_totals[campaign_type] = (campaigns + 1, totals)
 
             # Calculate averages by campaign type
             type_averages = {}
-            for campaign_type, performances in campaign_type_performance.items():
+            for campaign_type, (campaigns, totals) in type_totals.items():
                 type_averages[campaign_type] = {
-                    'campaigns': len(set(p.campaign_id for p in performances)),
-                    'avg_open_rate': sum(p.open_rate for p in performances) / len(performances),
-                    'avg_ctr': sum(p.click_through_rate for p in performances) / len(performances),
-                    'avg_revenue_per_email': sum(p.revenue_per_email for p in performances) / len(performances),
-                    'total_revenue': sum(p.revenue_generated for p in performances)
+                    'campaigns': campaigns,
+                    'avg_open_rate': totals.open_rate_sum / totals.records,
+                    'avg_ctr': totals.ctr_sum / totals.records,
+                    'avg_revenue_per_email': totals.revenue_per_email_sum / totals.records,
+                    'total_revenue': totals.revenue
                 }
 
             # ROI calculations
@@ -1027,47 +1977,31 @@ class EmailCampaignWriter:
 
     def _get_top_campaigns(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Get top performing campaigns by revenue"""
-        campaign_totals = {}
-
-        for performance in self.performance_history:
-            campaign_id = performance.campaign_id
-            if campaign_id not in campaign_totals:
-                campaign_totals[campaign_id] = {
-                    'campaign_id': campaign_id,
-                    'total_revenue': 0,
-                    'total_sent': 0,
-                    'total_opened': 0,
-                    'total_clicked': 0,
-                    'campaign_name': 'Unknown'
-                }
+        self._sync_performance_stats()
+        top = heapq.nlargest(limit, self.campaign_stats.items(), key=lambda item: item[1].revenue)
 
-            campaign_totals[campaign_id]['total_revenue'] += performance.revenue_generated
-            campaign_totals[campaign_id]['total_sent'] += performance.sent
-            campaign_totals[campaign_id]['total_opened'] += performance.opened
-            campaign_totals[campaign_id]['total_clicked'] += performance.clicked
-
-            # Get campaign name if available
-            if campaign_id in self.campaigns:
-                campaign_totals[campaign_id]['campaign_name'] = self.campaigns[campaign_id].name
-
-        # Calculate metrics and sort by revenue
-        for campaign_data in campaign_totals.values():
-            if campaign_data['total_sent'] > 0:
-                campaign_data['open_rate'] = (campaign_data['total_opened'] / campaign_data['total_sent']) * 100
-                campaign_data['ctr'] = (campaign_data['total_clicked'] / campaign_data['total_sent']) * 100
-                campaign_data['revenue_per_email'] = campaign_data['total_revenue'] / campaign_data['total_sent']
+        campaigns = []
+        for campaign_id, stats in top:
+            campaign = self.campaigns.get(campaign_id)
+            campaign_data = {
+                'campaign_id': campaign_id,
+                'total_revenue': stats.revenue,
+                'total_sent': stats.sent,
+                'total_opened': stats.opened,
+                'total_clicked': stats.clicked,
+                'campaign_name': campaign.name if campaign else 'Unknown'
+            }
+            if stats.sent > 0:
+                campaign_data['open_rate'] = (stats.opened / stats.sent) * 100
+                campaign_data['ctr'] = (stats.clicked / stats.sent) * 100
+                campaign_data['revenue_per_email'] = stats.revenue / stats.sent
             else:
                 campaign_data['open_rate'] = 0
                 campaign_data['ctr'] = 0
                 campaign_data['revenue_per_email'] = 0
+            campaigns.append(campaign_data)
 
-        sorted_campaigns = sorted(
-            campaign_totals.values(),
-            key=lambda x: x['total_revenue'],
-            reverse=True
-        )
-
-        return sorted_campaigns[:limit]
+        return campaigns
 
     def _analyze_segment_performance(self) -> Dict[str, Any]:
         """Analyze performance by customer segments"""
@@ -1075,19 +2009,21 @@ class EmailCampaignWriter:
         # For now, return basic segment analytics
         segment_analysis = {}
 
-        for segment_name, customer_ids in self.segments.items():
+        for segment_name in self.segments.keys():
+            mask = self.segments.mask(segment_name)
+            size = self.segments.count(mask)
             segment_analysis[segment_name] = {
-                'size': len(customer_ids),
+                'size': size,
                 'avg_engagement_score': 0,
-                'total_customers': len(customer_ids)
+                'total_customers': size
             }
 
             # Calculate average engagement score
-            if customer_ids:
-                customers_in_segment = [self.customers[cid] for cid in customer_ids if cid in self.customers]
-                if customers_in_segment:
-                    avg_engagement = sum(c.engagement_score for c in customers_in_segment) / len(customers_in_segment)
-                    segment_analysis[segment_name]['avg_engagement_score'] = round(avg_engagement, 2)
+            if size:
+                avg_engagement = self.customer_features.column_mean(
+                    'engagement_score', self.segments.to_bool(mask)
+                )
+                segment_analysis[segment_name]['avg_engagement_score'] = round(avg_engagement, 2)
 
         return segment_analysis
 
@@ -1125,16 +2061,22 @@ class EmailCampaignWriter:
             recommendations.append("Implement automated drip campaigns for better nurturing")
 
         # A/B testing recommendations
-        ab_tests_run = len(set(p.variant_id for p in self.performance_history if 'variant' in p.variant_id))
+        ab_tests_run = len(self._ab_variant_ids)
         if ab_tests_run < 5:
             recommendations.append("Run more A/B tests to optimize performance")
 
         return recommendations[:8]  # Limit to 8 recommendations
 
-    async def run_campaign_automation(self) -> Dict[str, Any]:
+    async def run_campaign_automation(self,
+                                      send_batch: Optional[Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]] = None
+                                      ) -> Dict[str, Any]:
         """
         Run automated campaign cycle: create, personalize, send, track
 
+        Args:
+            send_batch: Batch sender passed to ``send_campaign``; without it
+                campaigns are created and a sample is personalized but nothing is sent
+
         Returns:
             Summary of automation results
         """
@@ -1145,6 +2087,8 @@ class EmailCampaignWriter:
                 'campaigns_created': 0,
                 'emails_personalized': 0,
                 'ab_tests_setup': 0,
+                'emails_sent': 0,
+                'emails_failed': 0,
                 'errors': []
             }
 
@@ -1157,13 +2101,11 @@ class EmailCampaignWriter:
                 campaigns_to_create.append(('Welcome Series', CampaignType.WELCOME, ['new']))
 
             # Re-engagement for dormant customers
-            dormant_customers = self.segments.get('dormant', [])
-            if len(dormant_customers) >= 10:
+            if self.segments.count('dormant') >= 10:
                 campaigns_to_create.append(('Re-engagement Campaign', CampaignType.RE_ENGAGEMENT, ['dormant']))
 
             # Upsell for high-value customers
-            high_value_customers = self.segments.get('high_value', [])
-            if len(high_value_customers) >= 5:
+            if self.segments.count('high_value') >= 5:
                 campaigns_to_create.append(('Premium Upsell', CampaignType.UPSELL, ['high_value']))
 
             # Create and setup campaigns
@@ -1182,21 +2124,21 @@ class EmailCampaignWriter:
 
                     results['campaigns_created'] += 1
 
+                    if send_batch is not None:
+                        send_summary = await self.send_campaign(campaign, send_batch, ab_config=ab_config)
+                        results['emails_personalized'] += send_summary['delivered'] + send_summary['rejected'] + send_summary['failed']
+                        results['emails_sent'] += send_summary['delivered']
+                        results['emails_failed'] += send_summary['failed']
+                        continue
+
                     # Personalize content for sample customers (in production, this would be done at send time)
                     target_customers = []
                     for segment in segments:
-                        if segment in self.segments:
-                            target_customers.extend(self.segments[segment][:5])  # Sample 5 customers
-
-                    for customer_id in target_customers:
-                        if customer_id in self.customers:
-                            customer = self.customers[customer_id]
-                            personalized = await self.personalize_content(
-                                customer,
-                                campaign.content_variants[0],
-                                campaign
-                            )
-                            results['emails_personalized'] += 1
+                        target_customers.extend(self.segments.members(segment, limit=5))  # Sample 5 customers
+
+                    customers = (self.customers[cid] for cid in target_customers if cid in self.customers)
+                    for customer, personalized in self.render_many(customers, campaign.content_variants[0], campaign):
+                        results['emails_personalized'] += 1
 
                 except Exception as e:
                     error_msg = f"Error creating {campaign_name}: {str(e)}"
@@ -63,6 +63,57 @@ class ForecastResult:
     seasonality_factor: float
     trend_factor: float
 
+def _conservative_forecast(product_id: int, location_id: int, forecast_days: int) -> ForecastResult:
+    return ForecastResult(
+        product_id=product_id,
+        location_id=location_id,
+        forecast_period_days=forecast_days,
+        predicted_demand=10 * forecast_days,
+        confidence_interval=(8, 12),
+        seasonality_factor=1.0,
+        trend_factor=1.0
+    )
+
+def compute_forecast(forecaster: DemandForecaster, product_id: int, location_id: int,
+                     forecast_days: int, sales_data: pd.DataFrame) -> ForecastResult:
+    """
+    Demand forecast from already loaded sales history.
+
+    Uses no database session or agent state, so it can run in a worker
+    process; arguments and result are picklable.
+    """
+    try:
+        if len(sales_data) < 10:  # Need minimum data for forecasting
+            # Use simple average if insufficient data
+            avg_demand = sales_data['quantity_sold'].mean() if len(sales_data) > 0 else 5
+            return ForecastResult(
+                product_id=product_id,
+                location_id=location_id,
+                forecast_period_days=forecast_days,
+                predicted_demand=avg_demand * forecast_days,
+                confidence_interval=(avg_demand * 0.8, avg_demand * 1.2),
+                seasonality_factor=1.0,
+                trend_factor=1.0
+            )
+
+        # Advanced ML forecasting
+        forecast_result = forecaster.predict_demand(sales_data, forecast_days)
+
+        return ForecastResult(
+            product_id=product_id,
+            location_id=location_id,
+            forecast_period_days=forecast_days,
+            predicted_demand=forecast_result['predicted_demand'],
+            confidence_interval=forecast_result['confidence_interval'],
+            seasonality_factor=forecast_result['seasonality_factor'],
+            trend_factor=forecast_result['trend_factor']
+        )
+
+    except Exception as e:
+        logger.error(f"Error forecasting demand: {e}")
+        # Return conservative estimate
+        return _conservative_forecast(product_id, location_id, forecast_days)
+
 class InventoryTrackerAgent:
     """
     Advanced inventory tracking agent with ML-powered demand forecasting
@@ -71,7 +122,10 @@ class InventoryTrackerAgent:
 
     def __init__(self, config: Dict):
         self.config = config
-        self.db_manager = DatabaseManager(config.get('database_url', 'sqlite:///automation_agents.db'))
+        self.db_manager = DatabaseManager(
+            config.get('database_url', 'sqlite:///automation_agents.db'),
+            **config.get('database_options', {})
+        )
         self.forecaster = DemandForecaster()
         self.notification_manager = NotificationManager(config.get('notifications', {}))
 
@@ -170,54 +224,19 @@ class InventoryTrackerAgent:
         Generate demand forecast for specific product and location using
         advanced ML algorithms and historical data analysis.
         """
-        session = self.db_manager.get_session()
-
         try:
-            # Get historical sales data
-            sales_data = self._get_historical_sales_data(
-                product_id, location_id, session
-            )
-
-            if len(sales_data) < 10:  # Need minimum data for forecasting
-                # Use simple average if insufficient data
-                avg_demand = sales_data['quantity_sold'].mean() if len(sales_data) > 0 else 5
-                return ForecastResult(
-                    product_id=product_id,
-                    location_id=location_id,
-                    forecast_period_days=forecast_days,
-                    predicted_demand=avg_demand * forecast_days,
-                    confidence_interval=(avg_demand * 0.8, avg_demand * 1.2),
-                    seasonality_factor=1.0,
-                    trend_factor=1.0
-                )
-
-            # Advanced ML forecasting
-            forecast_result = self.forecaster.predict_demand(
-                sales_data, forecast_days
-            )
-
-            return ForecastResult(
-                product_id=product_id,
-                location_id=location_id,
-                forecast_period_days=forecast_days,
-                predicted_demand=forecast_result['predicted_demand'],
-                confidence_interval=forecast_result['confidence_interval'],
-                seasonality_factor=forecast_result['seasonality_factor'],
-                trend_factor=forecast_result['trend_factor']
-            )
-
+            sales_data = self.load_sales_history(product_id, location_id)
         except Exception as e:
             logger.error(f"Error forecasting demand: {e}")
-            # Return conservative estimate
-            return ForecastResult(
-                product_id=product_id,
-                location_id=location_id,
-                forecast_period_days=forecast_days,
-                predicted_demand=10 * forecast_days,
-                confidence_interval=(8, 12),
-                seasonality_factor=1.0,
-                trend_factor=1.0
-            )
+            return _conservative_forecast(product_id, location_id, forecast_days)
+
+        return compute_forecast(self.forecaster, product_id, location_id, forecast_days, sales_data)
+
+    def load_sales_history(self, product_id: int, location_id: int) -> pd.DataFrame:
+        """Read the sales history a forecast is computed from"""
+        session = self.db_manager.get_session()
+        try:
+            return self._get_historical_sales_data(product_id, location_id, session)
         finally:
             self.db_manager.close_session(session)
 
@@ -225,6 +244,34 @@ class InventoryTrackerAgent:
         """
         Analyze inventory across all products and recommend optimization
         strategies to reduce excess inventory and improve turnover.
+        Records the result as a business metric.
+        """
+        optimization_results = self.analyze_inventory_levels()
+        if not optimization_results:
+            return {}
+
+        self.inventory_optimization_percentage = optimization_results['optimization_percentage']
+        session = self.db_manager.get_session()
+        try:
+            # Record business metric
+            self._record_business_metric(
+                'inventory_optimization', 'inventory_tracker',
+                self.inventory_optimization_percentage, 'percentage',
+                'Inventory level optimization analysis', session
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error recording inventory optimization: {e}")
+        finally:
+            self.db_manager.close_session(session)
+
+        return optimization_results
+
+    def analyze_inventory_levels(self) -> Dict[str, float]:
+        """
+        Inventory optimization analysis without side effects: nothing is
+        written and agent state is unchanged, so dashboards can poll it.
         """
         session = self.db_manager.get_session()
         optimization_results = {}
@@ -279,29 +326,21 @@ class InventoryTrackerAgent:
                     })
 
             # Calculate optimization metrics
+            optimization_percentage = self.inventory_optimization_percentage
             if total_current_value > 0:
-                optimization_percentage = (
+                optimization_percentage = max(0, (
                     (total_current_value - total_optimized_value) / total_current_value
-                ) * 100
-                self.inventory_optimization_percentage = max(0, optimization_percentage)
+                ) * 100)
 
             optimization_results = {
                 'current_inventory_value': total_current_value,
                 'optimized_inventory_value': total_optimized_value,
                 'potential_savings': total_current_value - total_optimized_value,
-                'optimization_percentage': self.inventory_optimization_percentage,
+                'optimization_percentage': optimization_percentage,
                 'excess_inventory_items': excess_inventory_items,
                 'excess_items_count': len(excess_inventory_items)
             }
 
-            # Record business metric
-            self._record_business_metric(
-                'inventory_optimization', 'inventory_tracker',
-                self.inventory_optimization_percentage, 'percentage',
-                'Inventory level optimization analysis', session
-            )
-
-            session.commit()
             return optimization_results
 
         except Exception as e:
@@ -637,10 +676,13 @@ class InventoryTrackerAgent:
                 to prevent stockouts and maintain optimal inventory levels.
                 """
 
-                self.notification_manager.send_notification(
+                self.notification_manager.send_alert_event(
+                    'purchase_order',
                     "Purchase Order Generated",
                     message,
-                    priority="high"
+                    priority="high",
+                    dedupe_key=f"po:{po.po_number}",
+                    summary=f"{po.po_number} to {po.supplier.name}: ${po.total_amount:,.2f}"
                 )
         except Exception as e:
             logger.error(f"Error sending PO notification: {e}")
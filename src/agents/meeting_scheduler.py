@@ -83,7 +83,10 @@ class MeetingSchedulerAgent:
 
     def __init__(self, config: Dict):
         self.config = config
-        self.db_manager = DatabaseManager(config.get('database_url', 'sqlite:///automation_agents.db'))
+        self.db_manager = DatabaseManager(
+            config.get('database_url', 'sqlite:///automation_agents.db'),
+            **config.get('database_options', {})
+        )
         self.notification_manager = NotificationManager(config.get('notifications', {}))
         self.nlp_processor = NLPProcessor()
 
@@ -598,6 +601,40 @@ class MeetingSchedulerAgent:
         finally:
             self.db_manager.close_session(session)
 
+    def review_scheduling(self) -> Dict:
+        """
+        Scheduling efficiency review without side effects.
+
+        Reports what run_scheduling_optimization would look at, but resolves
+        no conflicts and sends no summary, so dashboards can poll it.
+        """
+        session = self.db_manager.get_session()
+
+        try:
+            upcoming_meetings = session.query(Meeting).filter(
+                Meeting.start_time > datetime.utcnow(),
+                Meeting.status == 'scheduled'
+            ).all()
+
+            review = {
+                'meetings_analyzed': len(upcoming_meetings),
+                'conflicts_detected': 0
+            }
+            for meeting in upcoming_meetings:
+                attendees = json.loads(meeting.attendee_emails) if meeting.attendee_emails else []
+                if self._check_for_conflicts(meeting.start_time, meeting.end_time, attendees, session):
+                    review['conflicts_detected'] += 1
+
+            review.update(self._analyze_time_block_efficiency(session))
+            review['business_impact'] = self.calculate_business_impact()
+            return review
+
+        except Exception as e:
+            logger.error(f"Error reviewing scheduling: {e}")
+            return {}
+        finally:
+            self.db_manager.close_session(session)
+
     # Private helper methods
 
     def _parse_scheduling_intent(self, text: str) -> SchedulingIntent:
@@ -963,10 +1000,14 @@ class MeetingSchedulerAgent:
                 Please confirm the new time or suggest an alternative.
                 """
 
-                self.notification_manager.send_notification(
+                # Same notice for every attendee; dedupe keeps it to one per suggestion
+                self.notification_manager.send_alert_event(
+                    'meeting_rescheduling',
                     "Meeting Rescheduling Required",
                     message,
-                    priority="medium"
+                    priority="medium",
+                    dedupe_key=f"reschedule:{meeting.id}:{new_suggestion.suggested_time.isoformat()}",
+                    summary=f"{meeting.title}: move to {new_suggestion.suggested_time.strftime('%a %d %b %H:%M')}"
                 )
 
         except Exception as e:
@@ -6,30 +6,22 @@ providing value worth $3000+/month through improved reputation management.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
 import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from enum import Enum
 
 import aiohttp
-import nltk
 from textblob import TextBlob
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-try:
-    nltk.data.find('corpora/vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
-
-from nltk.sentiment import SentimentIntensityAnalyzer
+from ..utils.model_registry import model_registry
+from ..utils.rate_limiter import AsyncTokenBucket
 
 
 class ReviewPlatform(Enum):
@@ -86,6 +78,275 @@ class ResponseTemplate:
     tone: str
 
 
+class ReviewStore:
+    """
+    Persistent review store keyed by (platform, review_id).
+
+    Keeps a per-business high-water mark (the newest review date seen) so
+    monitoring only ingests newer reviews, and a content hash per review so
+    unchanged text is never re-analyzed.
+    """
+
+    def __init__(self, db_path: str = "review_responder.db"):
+        self.db_path = db_path
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Initialize SQLite tables for reviews and sync state"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS reviews (
+                    platform TEXT NOT NULL,
+                    review_id TEXT NOT NULL,
+                    business_id TEXT NOT NULL,
+                    rating REAL NOT NULL,
+                    title TEXT,
+                    content TEXT NOT NULL,
+                    author TEXT,
+                    review_date TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    sentiment TEXT NOT NULL,
+                    urgency TEXT NOT NULL,
+                    keywords TEXT NOT NULL,
+                    issues TEXT NOT NULL,
+                    response_generated INTEGER NOT NULL DEFAULT 0,
+                    response_sent INTEGER NOT NULL DEFAULT 0,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (platform, review_id)
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS review_issues (
+                    platform TEXT NOT NULL,
+                    review_id TEXT NOT NULL,
+                    issue TEXT NOT NULL,
+                    PRIMARY KEY (platform, review_id, issue)
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS review_sync_state (
+                    platform TEXT NOT NULL,
+                    business_id TEXT NOT NULL,
+                    high_water_mark TEXT NOT NULL,
+                    last_synced_at TEXT NOT NULL,
+                    PRIMARY KEY (platform, business_id)
+                )
+            """)
+
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_reviews_business ON reviews (business_id, platform)")
+
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """Stable hash of review text, used to skip re-analysis"""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get_high_water_mark(self, platform: ReviewPlatform, business_id: str) -> Optional[datetime]:
+        """Newest review date ingested for a business on a platform"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT high_water_mark FROM review_sync_state WHERE platform = ? AND business_id = ?",
+                (platform.value, business_id)
+            ).fetchone()
+            return datetime.fromisoformat(row["high_water_mark"]) if row else None
+        finally:
+            conn.close()
+
+    def get_stored_analysis(self, platform: ReviewPlatform, review_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored hash and analysis results for the given review ids"""
+        if not review_ids:
+            return {}
+
+        conn = self._connect()
+        try:
+            placeholders = ",".join("?" * len(review_ids))
+            rows = conn.execute(
+                f"""SELECT review_id, review_date, content_hash, sentiment, keywords, issues,
+                           response_generated, response_sent
+                    FROM reviews WHERE platform = ? AND review_id IN ({placeholders})""",
+                [platform.value] + list(review_ids)
+            ).fetchall()
+
+            return {
+                row["review_id"]: {
+                    "date": datetime.fromisoformat(row["review_date"]),
+                    "content_hash": row["content_hash"],
+                    "sentiment": SentimentScore(row["sentiment"]),
+                    "keywords": json.loads(row["keywords"]),
+                    "issues": json.loads(row["issues"]),
+                    "response_generated": bool(row["response_generated"]),
+                    "response_sent": bool(row["response_sent"])
+                }
+                for row in rows
+            }
+        finally:
+            conn.close()
+
+    def save_reviews(self, business_id: str, platform: ReviewPlatform, reviews: List[Review]):
+        """Upsert reviews and advance the business's high-water mark"""
+        if not reviews:
+            return
+
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            for review in reviews:
+                cursor.execute("""
+                    INSERT INTO reviews (
+                        platform, review_id, business_id, rating, title, content, author,
+                        review_date, content_hash, sentiment, urgency, keywords, issues,
+                        response_generated, response_sent, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (platform, review_id) DO UPDATE SET
+                        rating = excluded.rating,
+                        title = excluded.title,
+                        content = excluded.content,
+                        author = excluded.author,
+                        review_date = excluded.review_date,
+                        content_hash = excluded.content_hash,
+                        sentiment = excluded.sentiment,
+                        urgency = excluded.urgency,
+                        keywords = excluded.keywords,
+                        issues = excluded.issues,
+                        updated_at = excluded.updated_at
+                """, (
+                    platform.value, review.id, business_id, review.rating, review.title,
+                    review.content, review.author, review.date.isoformat(),
+                    self.content_hash(review.content), review.sentiment.value, review.urgency.value,
+                    json.dumps(review.keywords), json.dumps(review.issues),
+                    int(review.response_generated), int(review.response_sent), now
+                ))
+
+                cursor.execute("DELETE FROM review_issues WHERE platform = ? AND review_id = ?",
+                               (platform.value, review.id))
+                cursor.executemany(
+                    "INSERT INTO review_issues (platform, review_id, issue) VALUES (?, ?, ?)",
+                    [(platform.value, review.id, issue) for issue in set(review.issues)]
+                )
+
+            newest = max(review.date for review in reviews)
+            current = cursor.execute(
+                "SELECT high_water_mark FROM review_sync_state WHERE platform = ? AND business_id = ?",
+                (platform.value, business_id)
+            ).fetchone()
+            if current is None or datetime.fromisoformat(current["high_water_mark"]) < newest:
+                cursor.execute("""
+                    INSERT INTO review_sync_state (platform, business_id, high_water_mark, last_synced_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (platform, business_id) DO UPDATE SET
+                        high_water_mark = excluded.high_water_mark,
+                        last_synced_at = excluded.last_synced_at
+                """, (platform.value, business_id, newest.isoformat(), now))
+
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _filters(self, business_id: Optional[str], platform: Optional[ReviewPlatform],
+                 table: str = "reviews") -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if business_id is not None:
+            clauses.append(f"{table}.business_id = ?")
+            params.append(business_id)
+        if platform is not None:
+            clauses.append(f"{table}.platform = ?")
+            params.append(platform.value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def load_reviews(self, business_id: Optional[str] = None,
+                     platform: Optional[ReviewPlatform] = None) -> List[Review]:
+        """Load stored reviews as Review objects"""
+        where, params = self._filters(business_id, platform)
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"SELECT * FROM reviews{where}", params).fetchall()
+            return [
+                Review(
+                    id=row["review_id"],
+                    platform=ReviewPlatform(row["platform"]),
+                    rating=row["rating"],
+                    title=row["title"] or "",
+                    content=row["content"],
+                    author=row["author"] or "",
+                    date=datetime.fromisoformat(row["review_date"]),
+                    sentiment=SentimentScore(row["sentiment"]),
+                    urgency=UrgencyLevel(row["urgency"]),
+                    keywords=json.loads(row["keywords"]),
+                    issues=json.loads(row["issues"]),
+                    response_generated=bool(row["response_generated"]),
+                    response_sent=bool(row["response_sent"])
+                )
+                for row in rows
+            ]
+        finally:
+            conn.close()
+
+    def aggregate(self, business_id: Optional[str] = None,
+                  platform: Optional[ReviewPlatform] = None) -> Dict[str, Any]:
+        """Aggregate counts over stored reviews without loading them"""
+        where, params = self._filters(business_id, platform)
+        negative = (SentimentScore.NEGATIVE.value, SentimentScore.VERY_NEGATIVE.value)
+        conn = self._connect()
+        try:
+            totals = conn.execute(f"""
+                SELECT COUNT(*) AS total, AVG(rating) AS avg_rating,
+                       SUM(response_generated) AS responses,
+                       SUM(CASE WHEN sentiment IN (?, ?) THEN 1 ELSE 0 END) AS negative,
+                       SUM(CASE WHEN urgency = ? AND response_generated = 0 THEN 1 ELSE 0 END) AS unresponded_critical
+                FROM reviews{where}
+            """, list(negative) + [UrgencyLevel.CRITICAL.value] + params).fetchone()
+
+            def counts_by(column: str) -> Dict[str, int]:
+                rows = conn.execute(
+                    f"SELECT {column} AS key, COUNT(*) AS n FROM reviews{where} GROUP BY {column}", params
+                ).fetchall()
+                return {row["key"]: row["n"] for row in rows}
+
+            def issue_counts(negative_only: bool) -> Dict[str, int]:
+                issue_where, issue_params = self._filters(business_id, platform, table="r")
+                if negative_only:
+                    issue_where += (" AND " if issue_where else " WHERE ") + "r.sentiment IN (?, ?)"
+                    issue_params = issue_params + list(negative)
+                rows = conn.execute(f"""
+                    SELECT i.issue AS issue, COUNT(*) AS n
+                    FROM review_issues i
+                    JOIN reviews r ON r.platform = i.platform AND r.review_id = i.review_id
+                    {issue_where}
+                    GROUP BY i.issue
+                """, issue_params).fetchall()
+                return {row["issue"]: row["n"] for row in rows}
+
+            return {
+                "total_reviews": totals["total"],
+                "average_rating": totals["avg_rating"] or 0,
+                "total_responses": totals["responses"] or 0,
+                "negative_reviews": totals["negative"] or 0,
+                "unresponded_critical": totals["unresponded_critical"] or 0,
+                "sentiment_counts": counts_by("sentiment"),
+                "platform_counts": counts_by("platform"),
+                "urgency_counts": counts_by("urgency"),
+                "issue_counts": issue_counts(negative_only=False),
+                "negative_issue_counts": issue_counts(negative_only=True)
+            }
+        finally:
+            conn.close()
+
+
 class ReviewResponseAgent:
     """
     Professional review monitoring and response generation agent.
@@ -98,19 +359,19 @@ class ReviewResponseAgent:
     - Reputation management insights
     """
 
-    def __init__(self):
+    def __init__(self, db_path: str = "review_responder.db"):
         self.logger = logging.getLogger(__name__)
         self.session: Optional[aiohttp.ClientSession] = None
 
-        # Initialize sentiment analyzer
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+        # Persistent store for incremental ingestion
+        self.review_store = ReviewStore(db_path)
 
-        # Initialize advanced sentiment model
-        self.sentiment_model = pipeline(
-            "sentiment-analysis",
-            model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-            return_all_scores=True
-        )
+        # Reviews this far behind the high-water mark are re-fetched so ties on the
+        # newest timestamp and late edits are not lost; unchanged ones are skipped
+        self.review_overlap = timedelta(hours=24)
+
+        # Sentiment models are loaded lazily and shared through the model registry
+        self.models = model_registry
 
         # Platform configurations
         self.platform_configs = {
@@ -131,6 +392,16 @@ class ReviewResponseAgent:
             }
         }
 
+        # One token bucket per platform replaces fixed sleeps between fetches
+        self.rate_limiters = {
+            platform: AsyncTokenBucket.from_interval(config["rate_limit"], capacity=config.get("burst", 1))
+            for platform, config in self.platform_configs.items()
+        }
+
+        # Connection pool limits for the shared aiohttp session
+        self.max_connections = 50
+        self.max_connections_per_host = 10
+
         # Response templates
         self.response_templates = self._load_response_templates()
 
@@ -144,9 +415,23 @@ class ReviewResponseAgent:
             "product": ["product", "item", "defective", "broken", "faulty"]
         }
 
+    @property
+    def vader_analyzer(self):
+        """Shared VADER sentiment analyzer"""
+        return self.models.get("vader")
+
+    @property
+    def sentiment_model(self):
+        """Shared RoBERTa sentiment pipeline"""
+        return self.models.get("roberta_sentiment")
+
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host
+        )
+        self.session = aiohttp.ClientSession(connector=connector)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -199,43 +484,110 @@ class ReviewResponseAgent:
             ]
         }
 
-    async def monitor_reviews(self, business_ids: Dict[ReviewPlatform, str]) -> List[Review]:
-        """Monitor reviews across multiple platforms"""
-        reviews = []
-
-        for platform, business_id in business_ids.items():
-            try:
-                platform_reviews = await self._fetch_platform_reviews(platform, business_id)
-                reviews.extend(platform_reviews)
+    async def monitor_reviews(self, business_ids: Dict[ReviewPlatform, Union[str, List[str]]]) -> List[Review]:
+        """
+        Monitor reviews across multiple platforms.
 
-                # Rate limiting
-                await asyncio.sleep(self.platform_configs[platform]["rate_limit"])
+        Every (platform, business id) pair is fetched concurrently. Each
+        platform's token bucket paces its own requests, so total latency is
+        bounded by the slowest platform's quota rather than the sum of all
+        fetches.
+        """
+        fetches = []
+        for platform, ids in business_ids.items():
+            for business_id in ([ids] if isinstance(ids, str) else ids):
+                fetches.append(self._fetch_with_rate_limit(platform, business_id))
 
-            except Exception as e:
-                self.logger.error(f"Error fetching reviews from {platform.value}: {e}")
+        results = await asyncio.gather(*fetches)
+        reviews = [review for platform_reviews in results for review in platform_reviews]
 
         # Sort by urgency and date
         reviews.sort(key=lambda r: (r.urgency.value, r.date), reverse=True)
 
         return reviews
 
+    async def _fetch_with_rate_limit(self, platform: ReviewPlatform, business_id: str) -> List[Review]:
+        """Fetch one business's reviews once the platform's rate limiter allows it"""
+        limiter = self.rate_limiters.get(platform)
+        try:
+            if limiter:
+                await limiter.acquire()
+            return await self._fetch_platform_reviews(platform, business_id)
+        except Exception as e:
+            self.logger.error(f"Error fetching reviews from {platform.value} for {business_id}: {e}")
+            return []
+
     async def _fetch_platform_reviews(self, platform: ReviewPlatform, business_id: str) -> List[Review]:
-        """Fetch reviews from a specific platform"""
-        reviews = []
+        """
+        Fetch and ingest reviews at or after the business's high-water mark.
 
+        The window reaches ``review_overlap`` behind the mark; reviews already
+        stored with the same date and text are skipped, and only new or edited
+        text is scored.
+        """
         if platform == ReviewPlatform.GOOGLE:
-            reviews = await self._fetch_google_reviews(business_id)
+            raw_reviews = await self._fetch_google_reviews(business_id)
         elif platform == ReviewPlatform.YELP:
-            reviews = await self._fetch_yelp_reviews(business_id)
+            raw_reviews = await self._fetch_yelp_reviews(business_id)
         elif platform == ReviewPlatform.TRIPADVISOR:
-            reviews = await self._fetch_tripadvisor_reviews(business_id)
+            raw_reviews = await self._fetch_tripadvisor_reviews(business_id)
+        else:
+            return []
+
+        high_water_mark = self.review_store.get_high_water_mark(platform, business_id)
+        parsed = [self._parse_review_fields(platform, data) for data in raw_reviews]
+        if high_water_mark is not None:
+            since = high_water_mark - self.review_overlap
+            parsed = [fields for fields in parsed if fields["date"] >= since]
+
+        reviews = await self._analyze_new_reviews(platform, parsed)
+        self.review_store.save_reviews(business_id, platform, reviews)
 
         return reviews
 
-    async def _fetch_google_reviews(self, place_id: str) -> List[Review]:
-        """Fetch Google My Business reviews"""
+    async def _analyze_new_reviews(self, platform: ReviewPlatform, parsed: List[Dict[str, Any]]) -> List[Review]:
+        """Build Reviews, re-using stored analysis when the content hash matches"""
+        stored = self.review_store.get_stored_analysis(platform, [fields["id"] for fields in parsed])
+
+        # Reviews seen before with the same date and text need no re-ingestion
+        parsed = [
+            fields for fields in parsed
+            if fields["id"] not in stored
+            or stored[fields["id"]]["date"] != fields["date"]
+            or stored[fields["id"]]["content_hash"] != ReviewStore.content_hash(fields["content"])
+        ]
+
+        changed = [
+            fields for fields in parsed
+            if stored.get(fields["id"], {}).get("content_hash") != ReviewStore.content_hash(fields["content"])
+        ]
+        sentiments = await self.analyze_sentiment_batch([fields["content"] for fields in changed])
+        analyzed = {
+            fields["id"]: self._build_review(platform, fields, sentiment)
+            for fields, sentiment in zip(changed, sentiments)
+        }
+
         reviews = []
+        for fields in parsed:
+            review = analyzed.get(fields["id"])
+            if review is None:
+                previous = stored[fields["id"]]
+                review = Review(
+                    platform=platform,
+                    sentiment=previous["sentiment"],
+                    urgency=self._determine_urgency(fields["rating"], previous["sentiment"], fields["content"]),
+                    keywords=previous["keywords"],
+                    issues=previous["issues"],
+                    response_generated=previous["response_generated"],
+                    response_sent=previous["response_sent"],
+                    **fields
+                )
+            reviews.append(review)
 
+        return reviews
+
+    async def _fetch_google_reviews(self, place_id: str) -> List[Dict[str, Any]]:
+        """Fetch Google My Business reviews as raw platform data"""
         # Mock implementation - in production, use Google My Business API
         mock_reviews = [
             {
@@ -254,19 +606,10 @@ class ReviewResponseAgent:
             }
         ]
 
-        for review_data in mock_reviews:
-            review = await self._process_review_data(
-                ReviewPlatform.GOOGLE,
-                review_data
-            )
-            reviews.append(review)
-
-        return reviews
-
-    async def _fetch_yelp_reviews(self, business_id: str) -> List[Review]:
-        """Fetch Yelp reviews"""
-        reviews = []
+        return mock_reviews
 
+    async def _fetch_yelp_reviews(self, business_id: str) -> List[Dict[str, Any]]:
+        """Fetch Yelp reviews as raw platform data"""
         # Mock implementation - in production, use Yelp Fusion API
         mock_reviews = [
             {
@@ -278,19 +621,10 @@ class ReviewResponseAgent:
             }
         ]
 
-        for review_data in mock_reviews:
-            review = await self._process_review_data(
-                ReviewPlatform.YELP,
-                review_data
-            )
-            reviews.append(review)
-
-        return reviews
-
-    async def _fetch_tripadvisor_reviews(self, business_id: str) -> List[Review]:
-        """Fetch TripAdvisor reviews"""
-        reviews = []
+        return mock_reviews
 
+    async def _fetch_tripadvisor_reviews(self, business_id: str) -> List[Dict[str, Any]]:
+        """Fetch TripAdvisor reviews as raw platform data"""
         # Mock implementation - in production, use TripAdvisor API
         mock_reviews = [
             {
@@ -303,18 +637,10 @@ class ReviewResponseAgent:
             }
         ]
 
-        for review_data in mock_reviews:
-            review = await self._process_review_data(
-                ReviewPlatform.TRIPADVISOR,
-                review_data
-            )
-            reviews.append(review)
+        return mock_reviews
 
-        return reviews
-
-    async def _process_review_data(self, platform: ReviewPlatform, data: Dict) -> Review:
-        """Process raw review data into Review object"""
-        # Extract review content based on platform
+    def _parse_review_fields(self, platform: ReviewPlatform, data: Dict) -> Dict[str, Any]:
+        """Extract platform-specific raw review fields"""
         if platform == ReviewPlatform.GOOGLE:
             content = data.get("text", "")
             author = data.get("author_name", "Anonymous")
@@ -339,56 +665,62 @@ class ReviewResponseAgent:
         else:
             raise ValueError(f"Unsupported platform: {platform}")
 
-        # Analyze sentiment
-        sentiment = await self.analyze_sentiment(content)
+        return {
+            "id": review_id,
+            "rating": rating,
+            "title": title,
+            "content": content,
+            "author": author,
+            "date": date
+        }
+
+    def _build_review(self, platform: ReviewPlatform, fields: Dict[str, Any], sentiment: SentimentScore) -> Review:
+        """Build a Review from parsed fields and its sentiment"""
+        content = fields["content"]
 
         # Determine urgency
-        urgency = self._determine_urgency(rating, sentiment, content)
+        urgency = self._determine_urgency(fields["rating"], sentiment, content)
 
         # Extract keywords and issues
         keywords = self._extract_keywords(content)
         issues = self._identify_issues(content)
 
         return Review(
-            id=review_id,
             platform=platform,
-            rating=rating,
-            title=title,
-            content=content,
-            author=author,
-            date=date,
             sentiment=sentiment,
             urgency=urgency,
             keywords=keywords,
-            issues=issues
+            issues=issues,
+            **fields
         )
 
-    async def analyze_sentiment(self, text: str) -> SentimentScore:
-        """Analyze sentiment using multiple models"""
-        if not text.strip():
-            return SentimentScore.NEUTRAL
+    async def _process_review_data(self, platform: ReviewPlatform, data: Dict) -> Review:
+        """Process raw review data into Review object"""
+        fields = self._parse_review_fields(platform, data)
 
-        # VADER sentiment analysis
-        vader_scores = self.vader_analyzer.polarity_scores(text)
+        # Analyze sentiment
+        sentiment = await self.analyze_sentiment(fields["content"])
 
-        # RoBERTa sentiment analysis
-        roberta_scores = self.sentiment_model(text)[0]
+        return self._build_review(platform, fields, sentiment)
 
-        # TextBlob sentiment
+    def _lexical_scores(self, text: str) -> Tuple[float, float]:
+        """VADER compound and TextBlob polarity for a text"""
+        vader_scores = self.vader_analyzer.polarity_scores(text)
         blob = TextBlob(text)
-        textblob_polarity = blob.sentiment.polarity
+        return vader_scores['compound'], blob.sentiment.polarity
 
-        # Combine scores (weighted average)
-        vader_compound = vader_scores['compound']
-
-        # Map RoBERTa labels to scores
+    def _roberta_score(self, roberta_scores: List[Dict[str, Any]]) -> float:
+        """Map RoBERTa label scores to a signed score"""
         roberta_score = 0
         for score_dict in roberta_scores:
             if score_dict['label'] == 'LABEL_2':  # Positive
                 roberta_score = score_dict['score']
             elif score_dict['label'] == 'LABEL_0':  # Negative
                 roberta_score = -score_dict['score']
+        return roberta_score
 
+    def _combine_sentiment(self, vader_compound: float, roberta_score: float, textblob_polarity: float) -> SentimentScore:
+        """Combine model scores into a sentiment category"""
         # Weighted combination
         combined_score = (
             0.4 * vader_compound +
@@ -408,6 +740,64 @@ class ReviewResponseAgent:
         else:
             return SentimentScore.VERY_NEGATIVE
 
+    async def analyze_sentiment(self, text: str) -> SentimentScore:
+        """Analyze sentiment using multiple models"""
+        if not text.strip():
+            return SentimentScore.NEUTRAL
+
+        # VADER and TextBlob sentiment analysis
+        vader_compound, textblob_polarity = self._lexical_scores(text)
+
+        # RoBERTa sentiment analysis
+        roberta_scores = self.sentiment_model(text, truncation=True)[0]
+
+        return self._combine_sentiment(vader_compound, self._roberta_score(roberta_scores), textblob_polarity)
+
+    async def analyze_sentiment_batch(self, texts: List[str], batch_size: int = 32,
+                                      max_workers: int = 4) -> List[SentimentScore]:
+        """
+        Analyze sentiment for many texts at once.
+
+        Texts are sorted by length and sent through the transformer pipeline
+        in mini-batches, so each batch pads to a similar length. VADER and
+        TextBlob scoring runs in a thread pool alongside the transformer.
+        Results match analyze_sentiment for every text.
+        """
+        results = [SentimentScore.NEUTRAL] * len(texts)
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+        if not indices:
+            return results
+
+        # Length bucketing: neighbours in a batch need little padding
+        indices.sort(key=lambda i: len(texts[i]))
+        batches = [indices[i:i + batch_size] for i in range(0, len(indices), batch_size)]
+
+        loop = asyncio.get_running_loop()
+        model = self.sentiment_model
+
+        def score_lexical(batch: List[int]) -> List[Tuple[float, float]]:
+            return [self._lexical_scores(texts[i]) for i in batch]
+
+        def score_model(batch: List[int]) -> List[List[Dict[str, Any]]]:
+            return model([texts[i] for i in batch], batch_size=len(batch), truncation=True)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            lexical_futures = [loop.run_in_executor(executor, score_lexical, batch) for batch in batches]
+
+            roberta_scores = {}
+            for batch in batches:
+                batch_scores = await loop.run_in_executor(executor, score_model, batch)
+                for i, scores in zip(batch, batch_scores):
+                    roberta_scores[i] = self._roberta_score(scores)
+
+            lexical_results = await asyncio.gather(*lexical_futures)
+
+        for batch, batch_scores in zip(batches, lexical_results):
+            for i, (vader_compound, textblob_polarity) in zip(batch, batch_scores):
+                results[i] = self._combine_sentiment(vader_compound, roberta_scores[i], textblob_polarity)
+
+        return results
+
     def _determine_urgency(self, rating: float, sentiment: SentimentScore, content: str) -> UrgencyLevel:
         """Determine response urgency based on multiple factors"""
         # Check for viral potential keywords
@@ -430,6 +820,7 @@ class ReviewResponseAgent:
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract important keywords from review text"""
         # Simple keyword extraction using TextBlob
+        self.models.get("nltk_punkt")
         blob = TextBlob(text.lower())
 
         # Get noun phrases
@@ -572,76 +963,91 @@ class ReviewResponseAgent:
         # Sort by priority score (highest first)
         return sorted(reviews, key=lambda r: getattr(r, 'priority_score', 0), reverse=True)
 
-    async def get_reputation_insights(self, reviews: List[Review]) -> Dict[str, Any]:
-        """Generate reputation management insights"""
-        if not reviews:
-            return {}
+    async def get_reputation_insights(self, reviews: Optional[List[Review]] = None,
+                                      business_id: Optional[str] = None,
+                                      platform: Optional[ReviewPlatform] = None) -> Dict[str, Any]:
+        """
+        Generate reputation management insights.
+
+        With an explicit list of reviews the insights are computed from that
+        list. Otherwise they are aggregated in SQL from the review store,
+        optionally filtered to one business and/or platform.
+        """
+        if reviews is not None:
+            return self._insights_from_counts(self._count_reviews(reviews))
+
+        counts = self.review_store.aggregate(business_id=business_id, platform=platform)
+        return self._insights_from_counts(counts)
+
+    def _count_reviews(self, reviews: List[Review]) -> Dict[str, Any]:
+        """Aggregate counts over an in-memory review list (same shape as ReviewStore.aggregate)"""
+        counts = {
+            "total_reviews": len(reviews),
+            "average_rating": sum(r.rating for r in reviews) / len(reviews) if reviews else 0,
+            "total_responses": sum(1 for r in reviews if r.response_generated),
+            "negative_reviews": 0,
+            "unresponded_critical": 0,
+            "sentiment_counts": {},
+            "platform_counts": {},
+            "urgency_counts": {},
+            "issue_counts": {},
+            "negative_issue_counts": {}
+        }
+        negative = (SentimentScore.NEGATIVE, SentimentScore.VERY_NEGATIVE)
 
-        total_reviews = len(reviews)
+        for review in reviews:
+            for key, value in (("sentiment_counts", review.sentiment.value),
+                               ("platform_counts", review.platform.value),
+                               ("urgency_counts", review.urgency.value)):
+                counts[key][value] = counts[key].get(value, 0) + 1
 
-        # Sentiment distribution
-        sentiment_counts = {}
-        for sentiment in SentimentScore:
-            sentiment_counts[sentiment.value] = sum(1 for r in reviews if r.sentiment == sentiment)
+            for issue in set(review.issues):
+                counts["issue_counts"][issue] = counts["issue_counts"].get(issue, 0) + 1
 
-        # Average rating
-        avg_rating = sum(r.rating for r in reviews) / total_reviews
+            if review.sentiment in negative:
+                counts["negative_reviews"] += 1
+                for issue in review.issues:
+                    counts["negative_issue_counts"][issue] = counts["negative_issue_counts"].get(issue, 0) + 1
 
-        # Platform distribution
-        platform_counts = {}
-        for platform in ReviewPlatform:
-            platform_counts[platform.value] = sum(1 for r in reviews if r.platform == platform)
+            if review.urgency == UrgencyLevel.CRITICAL and not review.response_generated:
+                counts["unresponded_critical"] += 1
 
-        # Common issues
-        all_issues = []
-        for review in reviews:
-            all_issues.extend(review.issues)
+        return counts
 
-        issue_frequency = {}
-        for issue in set(all_issues):
-            issue_frequency[issue] = all_issues.count(issue)
+    def _insights_from_counts(self, counts: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape aggregated counts into the insights report"""
+        total_reviews = counts["total_reviews"]
+        if not total_reviews:
+            return {}
 
         # Response rate
-        total_responses = sum(1 for r in reviews if r.response_generated)
-        response_rate = (total_responses / total_reviews) * 100 if total_reviews > 0 else 0
-
-        # Urgency breakdown
-        urgency_counts = {}
-        for urgency in UrgencyLevel:
-            urgency_counts[urgency.value] = sum(1 for r in reviews if r.urgency == urgency)
+        response_rate = (counts["total_responses"] / total_reviews) * 100
 
         return {
             "total_reviews": total_reviews,
-            "average_rating": round(avg_rating, 2),
-            "sentiment_distribution": sentiment_counts,
-            "platform_distribution": platform_counts,
-            "common_issues": dict(sorted(issue_frequency.items(), key=lambda x: x[1], reverse=True)),
+            "average_rating": round(counts["average_rating"], 2),
+            "sentiment_distribution": {s.value: counts["sentiment_counts"].get(s.value, 0) for s in SentimentScore},
+            "platform_distribution": {p.value: counts["platform_counts"].get(p.value, 0) for p in ReviewPlatform},
+            "common_issues": dict(sorted(counts["issue_counts"].items(), key=lambda x: x[1], reverse=True)),
             "response_rate": round(response_rate, 1),
-            "urgency_breakdown": urgency_counts,
-            "improvement_suggestions": self._generate_improvement_suggestions(reviews)
+            "urgency_breakdown": {u.value: counts["urgency_counts"].get(u.value, 0) for u in UrgencyLevel},
+            "improvement_suggestions": self._suggestions_from_counts(counts)
         }
 
     def _generate_improvement_suggestions(self, reviews: List[Review]) -> List[str]:
         """Generate actionable improvement suggestions"""
+        return self._suggestions_from_counts(self._count_reviews(reviews))
+
+    def _suggestions_from_counts(self, counts: Dict[str, Any]) -> List[str]:
+        """Generate actionable improvement suggestions from aggregated counts"""
         suggestions = []
 
         # Analyze negative reviews for patterns
-        negative_reviews = [r for r in reviews if r.sentiment in [SentimentScore.NEGATIVE, SentimentScore.VERY_NEGATIVE]]
-
-        if len(negative_reviews) > len(reviews) * 0.3:  # More than 30% negative
+        if counts["negative_reviews"] > counts["total_reviews"] * 0.3:  # More than 30% negative
             suggestions.append("Consider implementing staff training programs to address service quality issues")
 
-        # Common issues analysis
-        all_issues = []
-        for review in negative_reviews:
-            all_issues.extend(review.issues)
-
-        issue_counts = {}
-        for issue in all_issues:
-            issue_counts[issue] = issue_counts.get(issue, 0) + 1
-
-        # Top issues
-        top_issues = sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+        # Top issues among negative reviews
+        top_issues = sorted(counts["negative_issue_counts"].items(), key=lambda x: x[1], reverse=True)[:3]
 
         for issue, count in top_issues:
             if issue == "service":
@@ -656,8 +1062,7 @@ class ReviewResponseAgent:
                 suggestions.append("Review pricing strategy and value proposition")
 
         # Response time suggestions
-        unresponded_critical = sum(1 for r in reviews if r.urgency == UrgencyLevel.CRITICAL and not r.response_generated)
-        if unresponded_critical > 0:
+        if counts["unresponded_critical"] > 0:
             suggestions.append("Implement automated alerts for critical reviews requiring immediate response")
 
         return suggestions[:5]  # Limit to top 5 suggestions
@@ -18,7 +18,6 @@ from dataclasses import dataclass, asdict
 import json
 import openai
 from textblob import TextBlob
-import schedule
 import time
 
 @dataclass
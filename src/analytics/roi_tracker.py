@@ -3,14 +3,25 @@ ROI Tracker - Comprehensive analytics and ROI tracking for marketing automation
 Tracks time savings, revenue improvements, and overall marketing ROI
 """
 
+import bisect
+import csv
+import io
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Any, Tuple, Iterator, Union, IO
 from dataclasses import dataclass, asdict
 import json
 import statistics
 from enum import Enum
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
 class MetricType(Enum):
     TIME_SAVED = "time_saved"
     REVENUE_GENERATED = "revenue_generated"
@@ -29,10 +40,224 @@ class ROIMetric:
     platform: str = "unknown"
     campaign_id: Optional[str] = None
     notes: str = ""
+    improvement_percent: Optional[float] = None  # for improvement metrics
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now()
+        if self.improvement_percent is None:
+            self.improvement_percent = _parse_improvement(self.notes)
+
+
+def _parse_improvement(notes: str) -> Optional[float]:
+    """Improvement percentage from legacy notes ("metric improved X% ...")"""
+    if "improved" in notes and "%" in notes:
+        try:
+            return float(notes.split("improved")[1].split("%")[0].strip())
+        except (ValueError, IndexError):
+            return None
+    return None
+
+
+# Pre-aggregate key: one bucket per metric type, agent and platform per day
+BucketKey = Tuple[MetricType, str, str]
+
+# Flat record layout shared by the streaming report exports
+REPORT_COLUMNS = [
+    'section', 'name', 'date', 'metric_type', 'agent', 'platform',
+    'count', 'value', 'improvement_percent', 'detail'
+]
+
+
+@dataclass
+class MetricTotals:
+    """Additive totals for a group of metrics"""
+    count: int = 0
+    value: float = 0.0
+    improvement_sum: float = 0.0
+    improvement_count: int = 0
+
+    def add(self, metric: ROIMetric):
+        self.count += 1
+        self.value += metric.value
+        if metric.improvement_percent is not None:
+            self.improvement_sum += metric.improvement_percent
+            self.improvement_count += 1
+
+    def merge(self, other: "MetricTotals"):
+        self.count += other.count
+        self.value += other.value
+        self.improvement_sum += other.improvement_sum
+        self.improvement_count += other.improvement_count
+
+    @property
+    def avg_value(self) -> float:
+        return self.value / self.count if self.count else 0.0
+
+    @property
+    def avg_improvement(self) -> float:
+        return self.improvement_sum / self.improvement_count if self.improvement_count else 0.0
+
+
+class MetricStore:
+    """
+    Time-bucketed ROI metric store.
+
+    Metrics are kept per calendar day alongside daily totals per
+    (metric type, agent, platform). A period query sums the totals of the
+    days it fully covers and scans only the rows of the two partial days at
+    its edges. With ``db_path`` set, metrics are also written to SQLite and
+    reloaded on start-up.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self.days: List[date] = []  # sorted
+        self.rows: Dict[date, List[ROIMetric]] = {}
+        self.daily_totals: Dict[date, Dict[BucketKey, MetricTotals]] = {}
+        self.totals: Dict[BucketKey, MetricTotals] = {}  # all-time
+
+        if self.db_path:
+            self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Initialize SQLite table for persisted metrics"""
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS roi_metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    metric_type TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    currency TEXT NOT NULL,
+                    agent_source TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    campaign_id TEXT,
+                    notes TEXT,
+                    improvement_percent REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_roi_metrics_timestamp ON roi_metrics (timestamp)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def load_metrics(self) -> List[ROIMetric]:
+        """Load and index persisted metrics; empty without a database"""
+        if not self.db_path:
+            return []
+
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT * FROM roi_metrics ORDER BY id").fetchall()
+        finally:
+            conn.close()
+
+        metrics = []
+        for row in rows:
+            metric = ROIMetric(
+                metric_type=MetricType(row['metric_type']),
+                value=row['value'],
+                currency=row['currency'],
+                timestamp=datetime.fromisoformat(row['timestamp']),
+                agent_source=row['agent_source'],
+                platform=row['platform'],
+                campaign_id=row['campaign_id'],
+                notes=row['notes'] or "",
+                improvement_percent=row['improvement_percent']
+            )
+            self.index(metric)
+            metrics.append(metric)
+        return metrics
+
+    def add(self, metric: ROIMetric):
+        """Index a new metric and persist it when a database is configured"""
+        self.index(metric)
+        if self.db_path:
+            conn = self._connect()
+            try:
+                conn.execute("""
+                    INSERT INTO roi_metrics
+                        (timestamp, metric_type, value, currency, agent_source, platform,
+                         campaign_id, notes, improvement_percent)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (metric.timestamp.isoformat(), metric.metric_type.value, metric.value,
+                      metric.currency, metric.agent_source, metric.platform,
+                      metric.campaign_id, metric.notes, metric.improvement_percent))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def index(self, metric: ROIMetric):
+        """Add a metric to the in-memory buckets only"""
+        day = metric.timestamp.date()
+        if day not in self.rows:
+            bisect.insort(self.days, day)
+            self.rows[day] = []
+            self.daily_totals[day] = {}
+
+        key = (metric.metric_type, metric.agent_source, metric.platform)
+        self.rows[day].append(metric)
+        self.daily_totals[day].setdefault(key, MetricTotals()).add(metric)
+        self.totals.setdefault(key, MetricTotals()).add(metric)
+
+    def clear(self):
+        """Drop the in-memory index (persisted rows are left untouched)"""
+        self.days = []
+        self.rows = {}
+        self.daily_totals = {}
+        self.totals = {}
+
+    def range_totals(self,
+                     start: Optional[datetime] = None,
+                     end: Optional[datetime] = None,
+                     include_end: bool = True) -> Dict[BucketKey, MetricTotals]:
+        """
+        Totals per (metric type, agent, platform) for metrics in a period
+
+        ``start`` is inclusive; ``end`` is inclusive unless ``include_end``
+        is False. None leaves that side of the period open.
+        """
+        if start is None and end is None:
+            return self.totals
+
+        low = bisect.bisect_left(self.days, start.date()) if start is not None else 0
+        high = bisect.bisect_right(self.days, end.date()) if end is not None else len(self.days)
+
+        result: Dict[BucketKey, MetricTotals] = {}
+        for day in self.days[low:high]:
+            day_start = datetime.combine(day, time.min)
+            next_day_start = day_start + timedelta(days=1)
+
+            if (start is None or start <= day_start) and (end is None or next_day_start <= end):
+                for key, totals in self.daily_totals[day].items():
+                    result.setdefault(key, MetricTotals()).merge(totals)
+                continue
+
+            # Partial day at the edge of the period
+            for metric in self.rows[day]:
+                if start is not None and metric.timestamp < start:
+                    continue
+                if end is not None and (metric.timestamp > end or (not include_end and metric.timestamp == end)):
+                    continue
+                key = (metric.metric_type, metric.agent_source, metric.platform)
+                result.setdefault(key, MetricTotals()).add(metric)
+
+        return result
+
+    @staticmethod
+    def rollup(totals: Dict[BucketKey, MetricTotals], position: Optional[int] = None) -> Dict[Any, MetricTotals]:
+        """Combine bucket totals by one key part (0 type, 1 agent, 2 platform) or overall (None)"""
+        result: Dict[Any, MetricTotals] = {}
+        for key, bucket in totals.items():
+            result.setdefault(key[position] if position is not None else None, MetricTotals()).merge(bucket)
+        return result
 
 @dataclass
 class ROISummary:
@@ -64,8 +289,11 @@ class ROITracker:
         self.config = config
         self.logger = self._setup_logging()
 
-        # Metrics storage
-        self.metrics: List[ROIMetric] = []
+        # Metrics storage; the store keeps daily pre-aggregates (optionally in SQLite)
+        self.metric_store = MetricStore(config.get('metrics_db_path'))
+        self.metrics: List[ROIMetric] = self.metric_store.load_metrics()
+        self._indexed_metrics = self.metrics
+        self._indexed_upto = len(self.metrics)
 
         # Configuration for calculations
         self.hourly_rates = config.get('hourly_rates', {
@@ -137,7 +365,7 @@ class ROITracker:
                 notes=f"Saved {hours_saved} hours on {activity_description}"
             )
 
-            self.metrics.append(metric)
+            self._record_metric(metric)
 
             self.logger.info(f"Tracked time savings: {hours_saved} hours = ${value_saved:.2f} ({agent_source})")
             return metric
@@ -175,7 +403,7 @@ class ROITracker:
                 notes=f"Revenue via {attribution_method} attribution"
             )
 
-            self.metrics.append(metric)
+            self._record_metric(metric)
 
             self.logger.info(f"Tracked revenue generation: ${revenue:.2f} ({agent_source}, {platform})")
             return metric
@@ -222,10 +450,11 @@ class ROITracker:
                 agent_source=agent_source,
                 platform=platform,
                 campaign_id=campaign_id,
-                notes=f"{metric_name} improved {improvement_percent:.2f}% ({current_rate:.2f}% vs {baseline_rate:.2f}%)"
+                notes=f"{metric_name} improved {improvement_percent:.2f}% ({current_rate:.2f}% vs {baseline_rate:.2f}%)",
+                improvement_percent=improvement_percent
             )
 
-            self.metrics.append(metric)
+            self._record_metric(metric)
 
             self.logger.info(f"Tracked engagement improvement: {metric_name} +{improvement_percent:.2f}% = ${monetary_value:.2f}")
             return metric
@@ -260,7 +489,7 @@ class ROITracker:
                 notes=f"Cost reduction in {cost_category}"
             )
 
-            self.metrics.append(metric)
+            self._record_metric(metric)
 
             self.logger.info(f"Tracked cost reduction: ${cost_saved:.2f} in {cost_category} ({agent_source})")
             return metric
@@ -269,6 +498,32 @@ class ROITracker:
             self.logger.error(f"Error tracking cost reduction: {str(e)}")
             raise
 
+    def _record_metric(self, metric: ROIMetric):
+        self.metrics.append(metric)
+        self._sync_metric_store()
+
+    def _sync_metric_store(self):
+        """Index metrics appended to self.metrics since the last sync"""
+        if self.metrics is not self._indexed_metrics or len(self.metrics) < self._indexed_upto:
+            # The list was replaced or truncated; re-index it without re-persisting
+            self.metric_store.clear()
+            for metric in self.metrics:
+                self.metric_store.index(metric)
+            self._indexed_metrics = self.metrics
+            self._indexed_upto = len(self.metrics)
+            return
+
+        for index in range(self._indexed_upto, len(self.metrics)):
+            self.metric_store.add(self.metrics[index])
+        self._indexed_upto = len(self.metrics)
+
+    def _period_totals(self,
+                       start: Optional[datetime] = None,
+                       end: Optional[datetime] = None,
+                       include_end: bool = True) -> Dict[BucketKey, MetricTotals]:
+        self._sync_metric_store()
+        return self.metric_store.range_totals(start, end, include_end)
+
     def _calculate_engagement_value(self,
                                   improvement_percent: float,
                                   metric_name: str,
@@ -338,13 +593,10 @@ class ROITracker:
 
             start_date = end_date - timedelta(days=period_days)
 
-            # Filter metrics for the period
-            period_metrics = [
-                m for m in self.metrics
-                if start_date <= m.timestamp <= end_date
-            ]
+            # Range sum over the daily buckets for the period
+            by_type = MetricStore.rollup(self._period_totals(start_date, end_date), 0)
 
-            if not period_metrics:
+            if not by_type:
                 return ROISummary(
                     period_start=start_date,
                     period_end=end_date,
@@ -358,31 +610,24 @@ class ROITracker:
                     annual_projection=0
                 )
 
-            # Calculate totals by metric type
-            time_saved_metrics = [m for m in period_metrics if m.metric_type == MetricType.TIME_SAVED]
-            revenue_metrics = [m for m in period_metrics if m.metric_type == MetricType.REVENUE_GENERATED]
-            cost_reduction_metrics = [m for m in period_metrics if m.metric_type == MetricType.COST_REDUCTION]
-            engagement_metrics = [m for m in period_metrics if m.metric_type == MetricType.ENGAGEMENT_IMPROVEMENT]
-            conversion_metrics = [m for m in period_metrics if m.metric_type == MetricType.CONVERSION_IMPROVEMENT]
+            empty = MetricTotals()
+            engagement_totals = by_type.get(MetricType.ENGAGEMENT_IMPROVEMENT, empty)
+            conversion_totals = by_type.get(MetricType.CONVERSION_IMPROVEMENT, empty)
 
             # Calculate totals
-            total_time_value = sum(m.value for m in time_saved_metrics)
-            total_revenue = sum(m.value for m in revenue_metrics)
-            total_cost_savings = sum(m.value for m in cost_reduction_metrics)
-            total_engagement_value = sum(m.value for m in engagement_metrics)
-            total_conversion_value = sum(m.value for m in conversion_metrics)
+            total_time_value = by_type.get(MetricType.TIME_SAVED, empty).value
+            total_revenue = by_type.get(MetricType.REVENUE_GENERATED, empty).value
+            total_cost_savings = by_type.get(MetricType.COST_REDUCTION, empty).value
+            total_engagement_value = engagement_totals.value
+            total_conversion_value = conversion_totals.value
 
             # Calculate time saved in hours
             avg_hourly_rate = statistics.mean(self.hourly_rates.values())
             total_time_hours = total_time_value / avg_hourly_rate if avg_hourly_rate > 0 else 0
 
-            # Calculate improvement percentages
-            engagement_improvement = self._calculate_period_improvement(
-                engagement_metrics, "engagement"
-            )
-            conversion_improvement = self._calculate_period_improvement(
-                conversion_metrics, "conversion"
-            )
+            # Average improvement percentages from the stored numeric values
+            engagement_improvement = engagement_totals.avg_improvement
+            conversion_improvement = conversion_totals.avg_improvement
 
             # Total ROI value
             total_roi_value = (
@@ -418,29 +663,6 @@ class ROITracker:
             self.logger.error(f"Error calculating ROI summary: {str(e)}")
             raise
 
-    def _calculate_period_improvement(self,
-                                    metrics: List[ROIMetric],
-                                    improvement_type: str) -> float:
-        """Calculate average improvement percentage for a period"""
-        if not metrics:
-            return 0.0
-
-        # Extract improvement percentages from metric notes
-        improvements = []
-        for metric in metrics:
-            try:
-                # Parse improvement from notes (format: "metric improved X%")
-                if "improved" in metric.notes and "%" in metric.notes:
-                    parts = metric.notes.split("improved")
-                    if len(parts) > 1:
-                        percentage_part = parts[1].split("%")[0].strip()
-                        improvement = float(percentage_part)
-                        improvements.append(improvement)
-            except (ValueError, IndexError):
-                continue
-
-        return statistics.mean(improvements) if improvements else 0.0
-
     def get_agent_performance_comparison(self) -> Dict[str, Any]:
         """
         Compare performance between different agents
@@ -451,28 +673,31 @@ class ROITracker:
         try:
             agent_performance = {}
 
-            # Group metrics by agent
-            agents = set(m.agent_source for m in self.metrics)
+            # All-time and recent totals from the bucket pre-aggregates
+            all_time = self._period_totals()
+            thirty_days_ago = datetime.now() - timedelta(days=30)
+            recent_by_agent = MetricStore.rollup(self._period_totals(thirty_days_ago), 1)
 
-            for agent in agents:
-                agent_metrics = [m for m in self.metrics if m.agent_source == agent]
-
-                if not agent_metrics:
-                    continue
+            agent_types: Dict[str, Dict[MetricType, MetricTotals]] = {}
+            agent_platforms: Dict[str, set] = {}
+            for (metric_type, agent, platform), totals in all_time.items():
+                agent_types.setdefault(agent, {}).setdefault(metric_type, MetricTotals()).merge(totals)
+                agent_platforms.setdefault(agent, set()).add(platform)
+            agents = set(agent_types)
 
+            for agent, by_type in agent_types.items():
                 # Calculate totals for this agent
-                total_value = sum(m.value for m in agent_metrics)
-                total_metrics = len(agent_metrics)
+                total_value = sum(t.value for t in by_type.values())
+                total_metrics = sum(t.count for t in by_type.values())
 
                 # Calculate by metric type
-                time_saved = sum(m.value for m in agent_metrics if m.metric_type == MetricType.TIME_SAVED)
-                revenue_generated = sum(m.value for m in agent_metrics if m.metric_type == MetricType.REVENUE_GENERATED)
-                cost_savings = sum(m.value for m in agent_metrics if m.metric_type == MetricType.COST_REDUCTION)
+                empty = MetricTotals()
+                time_saved = by_type.get(MetricType.TIME_SAVED, empty).value
+                revenue_generated = by_type.get(MetricType.REVENUE_GENERATED, empty).value
+                cost_savings = by_type.get(MetricType.COST_REDUCTION, empty).value
 
                 # Recent performance (last 30 days)
-                thirty_days_ago = datetime.now() - timedelta(days=30)
-                recent_metrics = [m for m in agent_metrics if m.timestamp >= thirty_days_ago]
-                recent_value = sum(m.value for m in recent_metrics)
+                recent_value = recent_by_agent.get(agent, empty).value
 
                 agent_performance[agent] = {
                     'total_roi_value': round(total_value, 2),
@@ -482,7 +707,7 @@ class ROITracker:
                     'cost_savings': round(cost_savings, 2),
                     'recent_30day_value': round(recent_value, 2),
                     'avg_value_per_metric': round(total_value / total_metrics, 2) if total_metrics > 0 else 0,
-                    'platforms_used': list(set(m.platform for m in agent_metrics))
+                    'platforms_used': list(agent_platforms[agent])
                 }
 
             # Rank agents by total ROI value
@@ -518,39 +743,41 @@ class ROITracker:
         try:
             platform_performance = {}
 
-            # Group metrics by platform
-            platforms = set(m.platform for m in self.metrics)
-
-            for platform in platforms:
-                platform_metrics = [m for m in self.metrics if m.platform == platform]
+            # All-time totals plus the two trend windows, from the bucket pre-aggregates
+            all_time = self._period_totals()
+            now = datetime.now()
+            recent_period = now - timedelta(days=30)
+            previous_period = now - timedelta(days=60)
+            recent_by_platform = MetricStore.rollup(self._period_totals(recent_period), 2)
+            previous_by_platform = MetricStore.rollup(
+                self._period_totals(previous_period, recent_period, include_end=False), 2
+            )
 
-                if not platform_metrics:
-                    continue
+            platform_types: Dict[str, Dict[MetricType, MetricTotals]] = {}
+            platform_agents: Dict[str, set] = {}
+            for (metric_type, agent, platform), totals in all_time.items():
+                platform_types.setdefault(platform, {}).setdefault(metric_type, MetricTotals()).merge(totals)
+                platform_agents.setdefault(platform, set()).add(agent)
+            platforms = set(platform_types)
 
+            for platform, by_type in platform_types.items():
                 # Calculate platform metrics
-                total_value = sum(m.value for m in platform_metrics)
-                metric_counts = len(platform_metrics)
+                total_value = sum(t.value for t in by_type.values())
+                metric_counts = sum(t.count for t in by_type.values())
 
                 # Breakdown by metric type
                 type_breakdown = {}
                 for metric_type in MetricType:
-                    type_metrics = [m for m in platform_metrics if m.metric_type == metric_type]
+                    type_totals = by_type.get(metric_type, MetricTotals())
                     type_breakdown[metric_type.value] = {
-                        'count': len(type_metrics),
-                        'total_value': sum(m.value for m in type_metrics),
-                        'avg_value': statistics.mean([m.value for m in type_metrics]) if type_metrics else 0
+                        'count': type_totals.count,
+                        'total_value': type_totals.value,
+                        'avg_value': type_totals.avg_value
                     }
 
                 # Recent trend (last 30 days vs previous 30 days)
-                now = datetime.now()
-                recent_period = now - timedelta(days=30)
-                previous_period = now - timedelta(days=60)
-
-                recent_metrics = [m for m in platform_metrics if m.timestamp >= recent_period]
-                previous_metrics = [m for m in platform_metrics if previous_period <= m.timestamp < recent_period]
-
-                recent_value = sum(m.value for m in recent_metrics)
-                previous_value = sum(m.value for m in previous_metrics)
+                recent_value = recent_by_platform.get(platform, MetricTotals()).value
+                previous_value = previous_by_platform.get(platform, MetricTotals()).value
 
                 trend = "stable"
                 if previous_value > 0:
@@ -568,7 +795,7 @@ class ROITracker:
                     'recent_trend': trend,
                     'recent_value': round(recent_value, 2),
                     'change_percent': round(((recent_value - previous_value) / previous_value) * 100, 2) if previous_value > 0 else 0,
-                    'agents_active': list(set(m.agent_source for m in platform_metrics))
+                    'agents_active': list(platform_agents[platform])
                 }
 
             # Find top performing platform
@@ -659,18 +886,20 @@ class ROITracker:
                 'revenue_generated_30_days': summary_30_days.total_revenue_generated,
                 'engagement_improvement_30_days': summary_30_days.engagement_improvement_percent,
                 'total_metrics_tracked': len(self.metrics),
-                'active_agents': len(set(m.agent_source for m in self.metrics)),
-                'active_platforms': len(set(m.platform for m in self.metrics))
+                'active_agents': len(MetricStore.rollup(self._period_totals(), 1)),
+                'active_platforms': len(MetricStore.rollup(self._period_totals(), 2))
             }
 
             # ROI breakdown by category
+            by_type = MetricStore.rollup(self._period_totals(), 0)
+            grand_total = sum(t.value for t in by_type.values())
             roi_breakdown = {}
             for metric_type in MetricType:
-                type_metrics = [m for m in self.metrics if m.metric_type == metric_type]
+                type_totals = by_type.get(metric_type, MetricTotals())
                 roi_breakdown[metric_type.value] = {
-                    'count': len(type_metrics),
-                    'total_value': sum(m.value for m in type_metrics),
-                    'percentage_of_total': (sum(m.value for m in type_metrics) / sum(m.value for m in self.metrics)) * 100 if self.metrics else 0
+                    'count': type_totals.count,
+                    'total_value': type_totals.value,
+                    'percentage_of_total': (type_totals.value / grand_total) * 100 if grand_total else 0
                 }
 
             # Time series data (weekly performance)
@@ -717,6 +946,195 @@ class ROITracker:
             self.logger.error(f"Error exporting analytics report: {str(e)}")
             raise
 
+    def iter_report_records(self, period_days: int = 90) -> Iterator[Dict[str, Any]]:
+        """
+        Analytics report as flat records (see REPORT_COLUMNS), one section at a time
+
+        Sections are computed from the bucket aggregates as they are reached,
+        so only the current section is held in memory. The daily section has
+        one record per day, metric type, agent and platform in the period.
+        """
+        now = datetime.now()
+        start = now - timedelta(days=period_days)
+
+        yield {'section': 'report', 'name': 'generated', 'date': now.isoformat(),
+               'detail': f"{start.isoformat()}/{now.isoformat()}"}
+
+        summary_30_days = self.calculate_roi_summary(30, now)
+        for days, summary in ((30, summary_30_days), (period_days, self.calculate_roi_summary(period_days, now))):
+            for name, value in asdict(summary).items():
+                if not isinstance(value, datetime):
+                    yield {'section': f'roi_summary_{days}_days', 'name': name, 'value': float(value)}
+
+        all_time = self._period_totals()
+        by_type = MetricStore.rollup(all_time, 0)
+        for metric_type in MetricType:
+            totals = by_type.get(metric_type, MetricTotals())
+            yield {'section': 'category', 'name': metric_type.value, 'metric_type': metric_type.value,
+                   'count': totals.count, 'value': totals.value}
+
+        for section, position in (('agent', 1), ('platform', 2)):
+            grouped: Dict[Tuple[str, MetricType], MetricTotals] = {}
+            for key, totals in all_time.items():
+                grouped.setdefault((key[position], key[0]), MetricTotals()).merge(totals)
+            for (name, metric_type), totals in sorted(grouped.items(), key=lambda item: (item[0][0], item[0][1].value)):
+                yield {'section': section, 'name': name, 'metric_type': metric_type.value, section: name,
+                       'count': totals.count, 'value': totals.value}
+
+        for week in self._calculate_weekly_performance():
+            yield {'section': 'weekly', 'name': 'week', 'date': week['week_start'],
+                   'count': week['metric_count'], 'value': week['total_value']}
+
+        store = self.metric_store
+        low = bisect.bisect_left(store.days, start.date())
+        high = bisect.bisect_right(store.days, now.date())
+        for day in store.days[low:high]:
+            for (metric_type, agent, platform), totals in store.daily_totals[day].items():
+                yield {
+                    'section': 'daily',
+                    'date': day.isoformat(),
+                    'metric_type': metric_type.value,
+                    'agent': agent,
+                    'platform': platform,
+                    'count': totals.count,
+                    'value': totals.value,
+                    'improvement_percent': totals.avg_improvement if totals.improvement_count else None
+                }
+
+        recommendations = self._generate_comprehensive_recommendations(
+            summary_30_days, self.get_agent_performance_comparison(), self.get_platform_performance_analysis()
+        )
+        for recommendation in recommendations:
+            yield {'section': 'recommendation', 'detail': recommendation}
+
+    def stream_analytics_report(self,
+                                format: str = "ndjson",
+                                period_days: int = 90,
+                                chunk_records: int = 500) -> Iterator[str]:
+        """
+        Stream the analytics report as text chunks
+
+        The first chunk is yielded as soon as the report header is ready,
+        then records are batched ``chunk_records`` at a time. The iterator
+        can be passed straight to an HTTP streaming response.
+
+        Args:
+            format: ndjson or csv
+            period_days: Reporting period for summaries and daily records
+            chunk_records: Records per yielded chunk
+
+        Yields:
+            Text chunks of the encoded report
+        """
+        for text, _ in self._encoded_report_chunks(format, period_days, chunk_records):
+            yield text
+
+    def _encoded_report_chunks(self, format: str, period_days: int,
+                               chunk_records: int) -> Iterator[Tuple[str, int]]:
+        """Encoded report chunks with the number of records in each"""
+        if format == "ndjson":
+            def encode(record: Dict[str, Any]) -> str:
+                return json.dumps({k: v for k, v in record.items() if k in REPORT_COLUMNS and v is not None}) + "\n"
+        elif format == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=REPORT_COLUMNS, extrasaction='ignore')
+
+            def encode(record: Dict[str, Any]) -> str:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerow(record)
+                return buffer.getvalue()
+
+            writer.writeheader()
+            header = buffer.getvalue()
+        else:
+            raise ValueError(f"Unsupported streaming format: {format}")
+
+        chunk: List[str] = [header] if format == "csv" else []
+        records = 0
+        first = True
+        for record in self.iter_report_records(period_days):
+            chunk.append(encode(record))
+            records += 1
+            if first or records >= chunk_records:
+                yield "".join(chunk), records
+                chunk = []
+                records = 0
+                first = False
+        if chunk:
+            yield "".join(chunk), records
+
+    def export_analytics_report_to(self,
+                                   destination: Union[str, IO],
+                                   format: str = "ndjson",
+                                   period_days: int = 90,
+                                   chunk_records: int = 5000) -> int:
+        """
+        Write the analytics report incrementally to a path or file object
+
+        Args:
+            destination: File path, or an open file object (text mode for
+                ndjson/csv, binary mode for parquet)
+            format: ndjson, csv, or parquet (requires pyarrow)
+            period_days: Reporting period for summaries and daily records
+            chunk_records: Records buffered per write (row group size for parquet)
+
+        Returns:
+            Number of records written
+        """
+        if format == "parquet":
+            return self._export_parquet(destination, period_days, chunk_records)
+
+        if isinstance(destination, str):
+            with open(destination, "w", newline="") as handle:
+                return self.export_analytics_report_to(handle, format, period_days, chunk_records)
+
+        written = 0
+        # Count records rather than lines: quoted CSV fields may contain newlines
+        for chunk, records in self._encoded_report_chunks(format, period_days, chunk_records):
+            destination.write(chunk)
+            written += records
+
+        self.logger.info(f"Exported {written} analytics report records as {format}")
+        return written
+
+    def _export_parquet(self, destination: Union[str, IO], period_days: int, chunk_records: int) -> int:
+        if pa is None:
+            raise ImportError("pyarrow is required for parquet export. Install with: pip install pyarrow")
+
+        schema = pa.schema([
+            ('section', pa.string()),
+            ('name', pa.string()),
+            ('date', pa.string()),
+            ('metric_type', pa.string()),
+            ('agent', pa.string()),
+            ('platform', pa.string()),
+            ('count', pa.int64()),
+            ('value', pa.float64()),
+            ('improvement_percent', pa.float64()),
+            ('detail', pa.string())
+        ])
+
+        def write_batch(writer, batch: List[Dict[str, Any]]):
+            columns = {column: [record.get(column) for record in batch] for column in REPORT_COLUMNS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+
+        written = 0
+        with pq.ParquetWriter(destination, schema) as writer:
+            batch: List[Dict[str, Any]] = []
+            for record in self.iter_report_records(period_days):
+                batch.append(record)
+                if len(batch) >= chunk_records:
+                    write_batch(writer, batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                write_batch(writer, batch)
+                written += len(batch)
+
+        self.logger.info(f"Exported {written} analytics report records as parquet")
+        return written
+
     def _calculate_weekly_performance(self) -> List[Dict[str, Any]]:
         """Calculate weekly performance over the last 12 weeks"""
         weekly_data = []
@@ -725,13 +1143,12 @@ class ROITracker:
             week_start = datetime.now() - timedelta(weeks=week_offset)
             week_end = week_start + timedelta(days=7)
 
-            week_metrics = [
-                m for m in self.metrics
-                if week_start <= m.timestamp < week_end
-            ]
+            week_totals = MetricStore.rollup(
+                self._period_totals(week_start, week_end, include_end=False)
+            ).get(None, MetricTotals())
 
-            weekly_value = sum(m.value for m in week_metrics)
-            weekly_count = len(week_metrics)
+            weekly_value = week_totals.value
+            weekly_count = week_totals.count
 
             weekly_data.append({
                 'week_start': week_start.isoformat(),
@@ -747,21 +1164,14 @@ class ROITracker:
         """Calculate improvement in cost per lead"""
         try:
             # Get recent conversion improvements
-            recent_conversion_metrics = [
-                m for m in self.metrics
-                if m.metric_type == MetricType.CONVERSION_IMPROVEMENT
-                and m.timestamp >= datetime.now() - timedelta(days=30)
-            ]
+            recent = MetricStore.rollup(self._period_totals(datetime.now() - timedelta(days=30)), 0)
+            conversion_totals = recent.get(MetricType.CONVERSION_IMPROVEMENT)
 
-            if not recent_conversion_metrics:
+            if not conversion_totals or not conversion_totals.improvement_count:
                 return 0.0
 
             # Calculate average conversion improvement
-            avg_improvement = statistics.mean([
-                float(m.notes.split("improved")[1].split("%")[0].strip())
-                for m in recent_conversion_metrics
-                if "improved" in m.notes and "%" in m.notes
-            ])
+            avg_improvement = conversion_totals.avg_improvement
 
             # Estimate cost per lead improvement
             baseline_cost_per_lead = self.industry_baselines.get('cost_per_lead', 50)
@@ -778,17 +1188,14 @@ class ROITracker:
         """Calculate improvement in customer acquisition efficiency"""
         try:
             # Calculate based on engagement and conversion improvements
-            engagement_metrics = [
-                m for m in self.metrics
-                if m.metric_type == MetricType.ENGAGEMENT_IMPROVEMENT
-                and m.timestamp >= datetime.now() - timedelta(days=30)
-            ]
+            recent = MetricStore.rollup(self._period_totals(datetime.now() - timedelta(days=30)), 0)
+            engagement_totals = recent.get(MetricType.ENGAGEMENT_IMPROVEMENT)
 
-            if not engagement_metrics:
+            if not engagement_totals:
                 return 0.0
 
             # Estimate that engagement improvements lead to acquisition improvements
-            total_engagement_value = sum(m.value for m in engagement_metrics)
+            total_engagement_value = engagement_totals.value
             monthly_marketing_spend = self.business_metrics.get('monthly_marketing_spend', 5000)
 
             acquisition_efficiency_improvement = (total_engagement_value / monthly_marketing_spend) * 100
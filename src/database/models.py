@@ -2,11 +2,20 @@
 Database models for Inventory Tracker and Meeting Scheduler agents.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from typing import Any, Dict, Tuple
 import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
@@ -227,11 +236,153 @@ class BusinessMetric(Base):
     period_end = Column(DateTime)
     notes = Column(Text)
 
+@dataclass
+class PoolMetrics:
+    """Connection pool counters for one engine"""
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    peak_checked_out: int = 0
+    total_hold_seconds: float = 0.0
+    max_hold_seconds: float = 0.0
+
+
+# One engine per database URL per process, shared by every DatabaseManager
+_engines: Dict[str, Tuple[int, Engine, PoolMetrics]] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(database_url: str = "sqlite:///automation_agents.db",
+               echo: bool = False,
+               pool_size: int = 5,
+               max_overflow: int = 10,
+               pool_timeout: int = 30,
+               pool_pre_ping: bool = True,
+               sqlite_journal_mode: str = "WAL",
+               sqlite_synchronous: str = "NORMAL",
+               sqlite_mmap_size: int = 268435456) -> Engine:
+    """
+    Return the process-wide engine for a database URL, creating it on first use.
+
+    The first caller's pool settings win; later callers share that engine.
+    Engines inherited through fork are replaced so worker processes never
+    reuse the parent's connections. ``sqlite:///:memory:`` URLs get a new
+    engine each time, keeping their databases separate as before.
+    """
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == 'sqlite'
+    in_memory = is_sqlite and url.database in (None, '', ':memory:')
+
+    options: Dict[str, Any] = {'echo': echo, 'pool_pre_ping': pool_pre_ping}
+    if is_sqlite:
+        # Agents share connections across executor threads
+        options['connect_args'] = {'check_same_thread': False}
+    if not in_memory:
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+
+    def build() -> Tuple[Engine, PoolMetrics]:
+        engine = create_engine(database_url, **options)
+        metrics = PoolMetrics()
+        _instrument_pool(engine, metrics)
+        if is_sqlite:
+            _apply_sqlite_pragmas(engine, None if in_memory else sqlite_journal_mode,
+                                  sqlite_synchronous, sqlite_mmap_size)
+        return engine, metrics
+
+    if in_memory:
+        # Each in-memory database is private, so it is never shared
+        return build()[0]
+
+    pid = os.getpid()
+    with _engines_lock:
+        cached = _engines.get(database_url)
+        if cached and cached[0] == pid:
+            return cached[1]
+        if cached:
+            cached[1].dispose(close=False)
+
+        engine, metrics = build()
+        _engines[database_url] = (pid, engine, metrics)
+        logger.info(f"Created database engine for {url.render_as_string(hide_password=True)}")
+        return engine
+
+
+def _apply_sqlite_pragmas(engine: Engine, journal_mode, synchronous: str, mmap_size: int):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if journal_mode:
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        cursor.close()
+
+
+def _instrument_pool(engine: Engine, metrics: PoolMetrics):
+    checked_out = [0]
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+        checked_out[0] += 1
+        metrics.peak_checked_out = max(metrics.peak_checked_out, checked_out[0])
+        connection_record.info['checked_out_at'] = time.monotonic()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop('checked_out_at', None)
+        if started is None:
+            return
+        metrics.checkins += 1
+        checked_out[0] -= 1
+        held = time.monotonic() - started
+        metrics.total_hold_seconds += held
+        metrics.max_hold_seconds = max(metrics.max_hold_seconds, held)
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+
+def get_pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Pool counters and current pool status for every engine in this process"""
+    pid = os.getpid()
+    report = {}
+    with _engines_lock:
+        for database_url, (owner, engine, metrics) in _engines.items():
+            if owner != pid:
+                continue
+            pool = engine.pool
+            name = engine.url.render_as_string(hide_password=True)
+            report[name] = {
+                **asdict(metrics),
+                'avg_hold_seconds': round(metrics.total_hold_seconds / metrics.checkins, 4) if metrics.checkins else 0.0,
+                'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+                'pool_size': pool.size() if hasattr(pool, 'size') else None,
+                'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+                'status': pool.status()
+            }
+    return report
+
+
+def dispose_engines():
+    """Close every shared engine (application shutdown and tests)"""
+    with _engines_lock:
+        for _, engine, _ in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
 class DatabaseManager:
     """Database connection and session management"""
 
-    def __init__(self, database_url: str = "sqlite:///automation_agents.db"):
-        self.engine = create_engine(database_url, echo=False)
+    def __init__(self, database_url: str = "sqlite:///automation_agents.db", **engine_options):
+        self.engine = get_engine(database_url, **engine_options)
         self.SessionLocal = sessionmaker(bind=self.engine)
 
     def create_tables(self):
@@ -244,4 +395,4 @@ class DatabaseManager:
 
     def close_session(self, session):
         """Close database session"""
-        session.close()
\ No newline at end of file
+        session.close()
@@ -12,13 +12,21 @@ Provides seamless integration with popular accounting software:
 import os
 import json
 import logging
+import random
 import requests
 import base64
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 import time
 
+from requests.adapters import HTTPAdapter
+
+from ..utils.rate_limiter import TokenBucket, retry_after_seconds
+
 try:
     from requests_oauthlib import OAuth2Session
     from oauthlib.oauth2 import WebApplicationClient
@@ -63,24 +71,369 @@ class Account:
     account_subtype: Optional[str] = None
     active: bool = True
     balance: Optional[float] = None
+    code: Optional[str] = None
+
+
+class ReferenceData:
+    """
+    Chart of accounts and vendors for one system, indexed for lookups.
+
+    Accounts are found by id, code or name and vendors by id or name,
+    case-insensitively, so converting and syncing transactions needs no
+    API calls once the data is loaded. Each kind of key has its own index
+    and ids are checked first, so an id never resolves to another record
+    whose name or code happens to match it.
+    """
+
+    def __init__(self, accounts: List[Account], vendors: List[Vendor]):
+        self.accounts = accounts
+        self.vendors = vendors
+        self.loaded_at = time.monotonic()
+        self._accounts = self._build_indexes(accounts, id=lambda a: a.id, code=lambda a: a.code,
+                                             name=lambda a: a.name)
+        self._vendors = self._build_indexes(vendors, id=lambda v: v.id, name=lambda v: v.name)
+        self._default_expense = next((a for a in accounts if 'expense' in a.account_type.lower()), None)
+
+    @staticmethod
+    def _build_indexes(items: List[Any], **keys: Callable[[Any], Optional[str]]) -> List[Dict[str, Any]]:
+        """One index per key, in lookup order; the first item with a key wins"""
+        indexes = []
+        for key in keys.values():
+            index: Dict[str, Any] = {}
+            for item in items:
+                value = key(item)
+                if value:
+                    index.setdefault(str(value).lower(), item)
+            indexes.append(index)
+        return indexes
+
+    @staticmethod
+    def _lookup(indexes: List[Dict[str, Any]], ref: Optional[str]) -> Optional[Any]:
+        if not ref:
+            return None
+        ref = str(ref).lower()
+        for index in indexes:
+            if ref in index:
+                return index[ref]
+        return None
+
+    def find_account(self, ref: Optional[str]) -> Optional[Account]:
+        """Account for an id, code or name"""
+        return self._lookup(self._accounts, ref)
+
+    def find_vendor(self, ref: Optional[str]) -> Optional[Vendor]:
+        """Vendor for an id or name"""
+        return self._lookup(self._vendors, ref)
+
+    def account_for_category(self, category: Optional[str]) -> Optional[Account]:
+        """Account matching a category by code or name, else the first expense account"""
+        return self.find_account(category) or self._default_expense
+
+
+@dataclass
+class _CachedResponse:
+    """A reference-data response kept for conditional revalidation"""
+    payload: Dict[str, Any]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class AccountingAPIClient:
+    """
+    Shared HTTP layer for accounting integrations.
+
+    One keep-alive ``requests.Session`` per integration, sized to
+    ``max_concurrency`` connections, and a token bucket per provider quota
+    instead of sleeping before every request. 429/503 responses drain the
+    bucket for the Retry-After period so all worker threads back off
+    together; an expired token is refreshed once, by one thread, without
+    using up a retry. POSTs carry a provider idempotency key that stays the
+    same across retries, so a retried create is not applied twice; without
+    one, POSTs are only retried on 429/503.
+
+    ``sync_transactions`` sends transactions in provider batches of
+    ``batch_size`` on a thread pool, and resolves vendor and account
+    references through ``reference_data()``. That cache is served from
+    memory for ``reference_ttl_seconds``; after that it is revalidated with
+    ``If-None-Match``/``If-Modified-Since``, so unchanged data costs a 304
+    rather than a full download.
+    """
+
+    requests_per_minute: float = 500
+    max_concurrency: int = 4
+    batch_size: int = 30
+    max_retries: int = 3
+    reference_ttl_seconds: float = 900
+
+    def _init_client(self, config: Dict[str, Any]):
+        self.max_concurrency = int(config.get('max_concurrency', self.max_concurrency))
+        self.batch_size = int(config.get('batch_size', self.batch_size))
+        self.request_timeout = float(config.get('request_timeout', 30))
+        self.reference_ttl_seconds = float(config.get('reference_ttl_seconds', self.reference_ttl_seconds))
+        self.rate_limiter = TokenBucket.per_minute(
+            float(config.get('requests_per_minute', self.requests_per_minute)),
+            capacity=self.max_concurrency
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._token_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.request_count = 0
+
+        self._reference_lock = threading.Lock()
+        self._reference: Optional[ReferenceData] = None
+        self._responses: Dict[str, _CachedResponse] = {}
+        self.reference_stats = {'hits': 0, 'loads': 0, 'not_modified': 0, 'downloads': 0}
+
+    def _url(self, endpoint: str) -> str:
+        raise NotImplementedError
+
+    def _headers(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def _refresh_access_token(self) -> bool:
+        return False
+
+    def _with_idempotency_key(self, key: str, params: Optional[Dict],
+                              headers: Optional[Dict[str, str]]) -> Optional[Tuple[Optional[Dict], Optional[Dict[str, str]]]]:
+        """Attach ``key`` as the provider's idempotency key; None if the API has none"""
+        return None
+
+    def _refresh_once(self, stale_token: Optional[str]) -> bool:
+        """Refresh the token unless another thread already replaced it"""
+        with self._token_lock:
+            if self.access_token != stale_token:
+                return True
+            return self._refresh_access_token()
+
+    def _send(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None,
+              limiter: Optional[TokenBucket] = None, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Send an authenticated, rate-limited request, retrying throttling and server errors."""
+        method = method.upper()
+        url = self._url(endpoint)
+        limiter = limiter or self.rate_limiter
+
+        # Creates are only safe to resend when the provider deduplicates them
+        safe_to_retry = method != 'POST'
+        if not safe_to_retry:
+            keyed = self._with_idempotency_key(uuid.uuid4().hex, params, headers)
+            if keyed is not None:
+                params, headers = keyed
+                safe_to_retry = True
+
+        attempt = 0
+        refreshed = False
+        while True:
+            limiter.acquire()
+            token = self.access_token
+            try:
+                response = self.session.request(method, url, headers={**self._headers(), **(headers or {})},
+                                                json=data, params=params, timeout=self.request_timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not safe_to_retry or attempt >= self.max_retries:
+                    self.logger.error(f"{self.system_name} API request failed: {e}")
+                    raise
+                time.sleep(min(8.0, 2 ** attempt) * random.uniform(0.5, 1.0))
+                attempt += 1
+                continue
+
+            with self._stats_lock:
+                self.request_count += 1
+
+            if response.status_code == 401 and not refreshed:
+                # Token expired: refresh once and resend without using up a retry
+                refreshed = True
+                if self._refresh_once(token):
+                    continue
+                return response
+
+            if attempt >= self.max_retries:
+                return response
+
+            if response.status_code in (429, 503):
+                delay = retry_after_seconds(response.headers.get('Retry-After'), default=2 ** attempt)
+                self.logger.warning(f"{self.system_name} rate limited; backing off {delay}s")
+                limiter.penalize(delay)
+                attempt += 1
+                continue
+
+            if response.status_code >= 500 and safe_to_retry:
+                time.sleep(min(8.0, 2 ** attempt) * random.uniform(0.5, 1.0))
+                attempt += 1
+                continue
+
+            return response
+
+    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                      params: Optional[Dict] = None, limiter: Optional[TokenBucket] = None) -> Dict[str, Any]:
+        """Make an authenticated, rate-limited API request with retries."""
+        response = self._send(method, endpoint, data, params, limiter)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"{self.system_name} API request failed: {e}")
+            self.logger.error(f"Response: {response.text}")
+            raise
+        return response.json()
+
+    def _get_reference(self, endpoint: str) -> Dict[str, Any]:
+        """GET a reference-data endpoint, revalidating the last response with its validators"""
+        cached = self._responses.get(endpoint)
+        headers = {}
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        response = self._send('GET', endpoint, headers=headers)
+        if response.status_code == 304 and cached:
+            self.reference_stats['not_modified'] += 1
+            return cached.payload
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"{self.system_name} API request failed: {e}")
+            self.logger.error(f"Response: {response.text}")
+            raise
+        payload = response.json()
+        self.reference_stats['downloads'] += 1
+        self._responses[endpoint] = _CachedResponse(
+            payload=payload,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        return payload
+
+    # Reference data (chart of accounts and vendors)
+
+    def _fetch_reference_data(self) -> Tuple[List[Account], List[Vendor]]:
+        raise NotImplementedError
+
+    def reference_data(self, refresh: bool = False) -> Optional[ReferenceData]:
+        """
+        Cached accounts and vendors for this system.
+
+        Served from memory within the TTL; otherwise reloaded through
+        conditional requests. If a reload fails, the stale data is kept.
+        """
+        with self._reference_lock:
+            reference = self._reference
+            if not refresh and reference is not None and \
+                    time.monotonic() - reference.loaded_at < self.reference_ttl_seconds:
+                self.reference_stats['hits'] += 1
+                return reference
+            try:
+                accounts, vendors = self._fetch_reference_data()
+            except Exception as e:
+                self.logger.warning(f"Could not load {self.system_name} reference data: {e}")
+                return reference
+            self._reference = ReferenceData(accounts, vendors)
+            self.reference_stats['loads'] += 1
+            return self._reference
+
+    def invalidate_reference_data(self, endpoints: Optional[List[str]] = None):
+        """Force a full reload of the given endpoints (all when omitted) on next use"""
+        with self._reference_lock:
+            self._reference = None
+            for endpoint in (endpoints if endpoints is not None else list(self._responses)):
+                self._responses.pop(endpoint, None)
+
+    def resolve_vendor_id(self, ref: Optional[str]) -> Optional[str]:
+        """Vendor id for an id or name; unknown references pass through unchanged"""
+        vendor = self._reference.find_vendor(ref) if self._reference else None
+        return vendor.id if vendor else ref
+
+    def resolve_account(self, ref: Optional[str]) -> Optional[Account]:
+        """Account for an id, name or code, if the reference data knows it"""
+        return self._reference.find_account(ref) if self._reference else None
+
+    # Batched sync
+
+    def _batches(self, transactions: List[AccountingTransaction]) -> List[Tuple[str, List[AccountingTransaction]]]:
+        """Split transactions into (kind, batch) pairs for ``_sync_batch``"""
+        return [('mixed', transactions[i:i + self.batch_size])
+                for i in range(0, len(transactions), self.batch_size)]
+
+    def _sync_batch(self, kind: str, batch: List[AccountingTransaction]) -> List[Optional[str]]:
+        """Send one batch; returns an error message (or None) per transaction"""
+        raise NotImplementedError
+
+    def _run_batch(self, item: Tuple[str, List[AccountingTransaction]]) -> List[Optional[str]]:
+        kind, batch = item
+        try:
+            return self._sync_batch(kind, batch)
+        except Exception as e:
+            return [str(e)] * len(batch)
+
+    def sync_transactions(self, transactions: List[AccountingTransaction]) -> Dict[str, Any]:
+        """Sync multiple transactions using batch requests on a thread pool."""
+        results = {
+            'total': len(transactions),
+            'successful': 0,
+            'failed': 0,
+            'errors': []
+        }
+        if not transactions:
+            return results
+
+        self.reference_data()
+        requests_before = self.request_count
+        started = time.monotonic()
+
+        batches = self._batches(transactions)
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches)),
+                                thread_name_prefix=f"{self.system_name.lower()}-sync") as pool:
+            for (_, batch), errors in zip(batches, pool.map(self._run_batch, batches)):
+                for transaction, error in zip(batch, errors):
+                    if error is None:
+                        results['successful'] += 1
+                    else:
+                        results['failed'] += 1
+                        error_msg = f"Failed to sync transaction {transaction.id}: {error}"
+                        results['errors'].append(error_msg)
+                        self.logger.error(error_msg)
+
+        results['requests'] = self.request_count - requests_before
+        self.logger.info(
+            f"Synced {results['successful']}/{results['total']} transactions to {self.system_name} "
+            f"in {time.monotonic() - started:.1f}s using {results['requests']} requests"
+        )
+        return results
 
 
-class QuickBooksIntegration:
+class QuickBooksIntegration(AccountingAPIClient):
     """QuickBooks Online API integration for automated accounting."""
 
+    system_name = "QuickBooks"
+
+    # 500 requests/minute and 10 concurrent requests per company;
+    # batch requests take up to 30 operations and are limited to 40/minute
+    requests_per_minute = 500
+    batch_requests_per_minute = 40
+    max_concurrency = 10
+    batch_size = 30
+
     def __init__(self, config: Dict[str, str]):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.base_url = self._get_base_url(config.get('sandbox', True))
+        self.base_url = config.get('base_url') or self._get_base_url(config.get('sandbox', True))
         self.access_token = config.get('access_token')
         self.refresh_token = config.get('refresh_token')
         self.company_id = config.get('company_id')
         self.client_id = config.get('client_id')
         self.client_secret = config.get('client_secret')
 
-        # Rate limiting
-        self.last_request_time = 0
-        self.request_interval = 1.0  # Minimum seconds between requests
+        # Shared session and token-bucket rate limiting
+        self._init_client(config)
+        self.batch_rate_limiter = TokenBucket.per_minute(
+            float(config.get('batch_requests_per_minute', self.batch_requests_per_minute)),
+            capacity=self.max_concurrency
+        )
 
     def _get_base_url(self, sandbox: bool = True) -> str:
         """Get QuickBooks API base URL."""
@@ -88,53 +441,20 @@ class QuickBooksIntegration:
             return "https://sandbox-quickbooks.api.intuit.com"
         return "https://quickbooks.api.intuit.com"
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make authenticated API request with rate limiting."""
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.request_interval:
-            time.sleep(self.request_interval - time_since_last)
+    def _url(self, endpoint: str) -> str:
+        return f"{self.base_url}/v3/company/{self.company_id}/{endpoint}"
 
-        url = f"{self.base_url}/v3/company/{self.company_id}/{endpoint}"
+    def _with_idempotency_key(self, key, params, headers):
+        # QuickBooks replays the original response for a repeated requestid
+        return {**(params or {}), 'requestid': key}, headers
 
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             'Authorization': f'Bearer {self.access_token}',
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         }
 
-        try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=headers, params=params)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=headers, json=data)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=headers, json=data)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            self.last_request_time = time.time()
-
-            if response.status_code == 401:
-                # Token expired, try to refresh
-                if self._refresh_access_token():
-                    headers['Authorization'] = f'Bearer {self.access_token}'
-                    # Retry the request
-                    if method.upper() == 'GET':
-                        response = requests.get(url, headers=headers, params=params)
-                    elif method.upper() == 'POST':
-                        response = requests.post(url, headers=headers, json=data)
-
-            response.raise_for_status()
-            return response.json()
-
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"QuickBooks API request failed: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                self.logger.error(f"Response: {e.response.text}")
-            raise
-
     def _refresh_access_token(self) -> bool:
         """Refresh expired access token."""
         if not self.refresh_token:
@@ -155,7 +475,7 @@ class QuickBooksIntegration:
                 'refresh_token': self.refresh_token
             }
 
-            response = requests.post(token_url, headers=headers, data=data)
+            response = self.session.post(token_url, headers=headers, data=data, timeout=self.request_timeout)
             response.raise_for_status()
 
             token_data = response.json()
@@ -175,7 +495,7 @@ class QuickBooksIntegration:
 
     def get_accounts(self) -> List[Account]:
         """Retrieve chart of accounts."""
-        response = self._make_request('GET', 'accounts')
+        response = self._get_reference('accounts')
 
         accounts = []
         for account_data in response.get('QueryResponse', {}).get('Account', []):
@@ -185,7 +505,8 @@ class QuickBooksIntegration:
                 account_type=account_data['AccountType'],
                 account_subtype=account_data.get('AccountSubType'),
                 active=account_data.get('Active', True),
-                balance=account_data.get('CurrentBalance')
+                balance=account_data.get('CurrentBalance'),
+                code=account_data.get('AcctNum')
             )
             accounts.append(account)
 
@@ -193,7 +514,7 @@ class QuickBooksIntegration:
 
     def get_vendors(self) -> List[Vendor]:
         """Retrieve vendor list."""
-        response = self._make_request('GET', 'vendors')
+        response = self._get_reference('vendors')
 
         vendors = []
         for vendor_data in response.get('QueryResponse', {}).get('Vendor', []):
@@ -209,6 +530,9 @@ class QuickBooksIntegration:
 
         return vendors
 
+    def _fetch_reference_data(self) -> Tuple[List[Account], List[Vendor]]:
+        return self.get_accounts(), self.get_vendors()
+
     def create_vendor(self, vendor_data: Dict[str, Any]) -> Vendor:
         """Create a new vendor."""
         qb_vendor_data = {
@@ -229,80 +553,87 @@ class QuickBooksIntegration:
             }
 
         response = self._make_request('POST', 'vendors', qb_vendor_data)
+        self.invalidate_reference_data(['vendors'])
 
         vendor_resp = response['QueryResponse']['Vendor'][0]
-        return Vendor(
+        vendor = Vendor(
             id=vendor_resp['Id'],
             name=vendor_resp['Name'],
             email=vendor_resp.get('PrimaryEmailAddr', {}).get('Address'),
             phone=vendor_resp.get('PrimaryPhone', {}).get('FreeFormNumber')
         )
-
-    def create_bill(self, transaction: AccountingTransaction) -> Dict[str, Any]:
-        """Create a bill (expense) in QuickBooks."""
-        bill_data = {
-            "Bill": {
-                "VendorRef": {
-                    "value": transaction.vendor_id
-                },
-                "TxnDate": transaction.date.strftime('%Y-%m-%d'),
-                "DueDate": (transaction.date + timedelta(days=30)).strftime('%Y-%m-%d'),
-                "Line": [
-                    {
-                        "Amount": transaction.amount,
-                        "DetailType": "AccountBasedExpenseLineDetail",
-                        "AccountBasedExpenseLineDetail": {
-                            "AccountRef": {
-                                "value": transaction.account_id
-                            }
-                        },
-                        "Description": transaction.description
-                    }
-                ]
-            }
+        return vendor
+
+    def _bill_payload(self, transaction: AccountingTransaction) -> Dict[str, Any]:
+        bill = {
+            "VendorRef": {
+                "value": self.resolve_vendor_id(transaction.vendor_id)
+            },
+            "TxnDate": transaction.date.strftime('%Y-%m-%d'),
+            "DueDate": (transaction.date + timedelta(days=30)).strftime('%Y-%m-%d'),
+            "Line": [
+                {
+                    "Amount": transaction.amount,
+                    "DetailType": "AccountBasedExpenseLineDetail",
+                    "AccountBasedExpenseLineDetail": {
+                        "AccountRef": {
+                            "value": self._account_id(transaction.account_id)
+                        }
+                    },
+                    "Description": transaction.description
+                }
+            ]
         }
 
         if transaction.reference:
-            bill_data["Bill"]["DocNumber"] = transaction.reference
+            bill["DocNumber"] = transaction.reference
 
         if transaction.memo:
-            bill_data["Bill"]["PrivateNote"] = transaction.memo
-
-        response = self._make_request('POST', 'bills', bill_data)
-        return response
-
-    def create_expense(self, transaction: AccountingTransaction) -> Dict[str, Any]:
-        """Create an expense transaction in QuickBooks."""
-        expense_data = {
-            "Purchase": {
-                "PaymentType": "Cash",
-                "AccountRef": {
-                    "value": transaction.account_id
-                },
-                "TxnDate": transaction.date.strftime('%Y-%m-%d'),
-                "Line": [
-                    {
-                        "Amount": transaction.amount,
-                        "DetailType": "AccountBasedExpenseLineDetail",
-                        "AccountBasedExpenseLineDetail": {
-                            "AccountRef": {
-                                "value": transaction.account_id
-                            }
-                        },
-                        "Description": transaction.description
-                    }
-                ]
-            }
+            bill["PrivateNote"] = transaction.memo
+
+        return bill
+
+    def _purchase_payload(self, transaction: AccountingTransaction) -> Dict[str, Any]:
+        account_id = self._account_id(transaction.account_id)
+        purchase = {
+            "PaymentType": "Cash",
+            "AccountRef": {
+                "value": account_id
+            },
+            "TxnDate": transaction.date.strftime('%Y-%m-%d'),
+            "Line": [
+                {
+                    "Amount": transaction.amount,
+                    "DetailType": "AccountBasedExpenseLineDetail",
+                    "AccountBasedExpenseLineDetail": {
+                        "AccountRef": {
+                            "value": account_id
+                        }
+                    },
+                    "Description": transaction.description
+                }
+            ]
         }
 
         if transaction.vendor_id:
-            expense_data["Purchase"]["EntityRef"] = {
-                "value": transaction.vendor_id,
+            purchase["EntityRef"] = {
+                "value": self.resolve_vendor_id(transaction.vendor_id),
                 "type": "Vendor"
             }
 
-        response = self._make_request('POST', 'purchases', expense_data)
-        return response
+        return purchase
+
+    def _account_id(self, ref: str) -> str:
+        account = self.resolve_account(ref)
+        return account.id if account else ref
+
+    def create_bill(self, transaction: AccountingTransaction) -> Dict[str, Any]:
+        """Create a bill (expense) in QuickBooks."""
+        return self._make_request('POST', 'bills', {"Bill": self._bill_payload(transaction)})
+
+    def create_expense(self, transaction: AccountingTransaction) -> Dict[str, Any]:
+        """Create an expense transaction in QuickBooks."""
+        return self._make_request('POST', 'purchases', {"Purchase": self._purchase_payload(transaction)})
 
     def _format_address(self, address_data: Dict[str, Any]) -> str:
         """Format QuickBooks address data into string."""
@@ -312,84 +643,72 @@ class QuickBooksIntegration:
                 address_parts.append(address_data[key])
         return ', '.join(address_parts)
 
-    def sync_transactions(self, transactions: List[AccountingTransaction]) -> Dict[str, Any]:
-        """Sync multiple transactions to QuickBooks."""
-        results = {
-            'total': len(transactions),
-            'successful': 0,
-            'failed': 0,
-            'errors': []
-        }
-
-        for transaction in transactions:
-            try:
-                if transaction.vendor_id:
-                    self.create_bill(transaction)
-                else:
-                    self.create_expense(transaction)
-
-                results['successful'] += 1
-                self.logger.info(f"Successfully synced transaction: {transaction.id}")
+    def _sync_batch(self, kind: str, batch: List[AccountingTransaction]) -> List[Optional[str]]:
+        """Create bills and purchases with one QuickBooks batch request."""
+        items = []
+        for index, transaction in enumerate(batch):
+            if transaction.vendor_id:
+                items.append({"bId": str(index), "operation": "create", "Bill": self._bill_payload(transaction)})
+            else:
+                items.append({"bId": str(index), "operation": "create", "Purchase": self._purchase_payload(transaction)})
+
+        response = self._make_request('POST', 'batch', {"BatchItemRequest": items},
+                                      limiter=self.batch_rate_limiter)
+
+        errors: List[Optional[str]] = ["No response for batch item"] * len(batch)
+        for item in response.get('BatchItemResponse', []):
+            index = int(item['bId'])
+            fault = item.get('Fault')
+            if fault:
+                details = fault.get('Error', [{}])
+                errors[index] = '; '.join(
+                    error.get('Detail') or error.get('Message', 'Unknown error') for error in details
+                ) or fault.get('type', 'Fault')
+            else:
+                errors[index] = None
+        return errors
 
-            except Exception as e:
-                results['failed'] += 1
-                error_msg = f"Failed to sync transaction {transaction.id}: {str(e)}"
-                results['errors'].append(error_msg)
-                self.logger.error(error_msg)
 
-        return results
+class XeroIntegration(AccountingAPIClient):
+    """Xero API integration for automated accounting."""
 
+    system_name = "Xero"
 
-class XeroIntegration:
-    """Xero API integration for automated accounting."""
+    # 60 calls/minute and 5 concurrent calls per tenant; create endpoints
+    # accept many records per call (50 keeps payloads well under limits)
+    requests_per_minute = 60
+    max_concurrency = 5
+    batch_size = 50
 
     def __init__(self, config: Dict[str, str]):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.base_url = "https://api.xero.com/api.xro/2.0"
+        self.base_url = config.get('base_url', "https://api.xero.com/api.xro/2.0")
         self.access_token = config.get('access_token')
         self.tenant_id = config.get('tenant_id')
         self.client_id = config.get('client_id')
         self.client_secret = config.get('client_secret')
 
-        # Rate limiting
-        self.last_request_time = 0
-        self.request_interval = 1.0
+        # Shared session and token-bucket rate limiting
+        self._init_client(config)
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make authenticated API request to Xero."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.request_interval:
-            time.sleep(self.request_interval - time_since_last)
+    def _url(self, endpoint: str) -> str:
+        return f"{self.base_url}/{endpoint}"
 
-        url = f"{self.base_url}/{endpoint}"
+    def _with_idempotency_key(self, key, params, headers):
+        return params, {**(headers or {}), 'Idempotency-Key': key}
 
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             'Authorization': f'Bearer {self.access_token}',
             'xero-tenant-id': self.tenant_id,
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
         }
 
-        try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=headers, params=params)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=headers, json=data)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=headers, json=data)
-
-            self.last_request_time = time.time()
-            response.raise_for_status()
-            return response.json()
-
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Xero API request failed: {e}")
-            raise
-
     def get_accounts(self) -> List[Account]:
         """Retrieve chart of accounts from Xero."""
-        response = self._make_request('GET', 'Accounts')
+        response = self._get_reference('Accounts')
 
         accounts = []
         for account_data in response.get('Accounts', []):
@@ -398,7 +717,8 @@ class XeroIntegration:
                 name=account_data['Name'],
                 account_type=account_data['Type'],
                 account_subtype=account_data.get('Class'),
-                active=account_data.get('Status') == 'ACTIVE'
+                active=account_data.get('Status') == 'ACTIVE',
+                code=account_data.get('Code')
             )
             accounts.append(account)
 
@@ -406,7 +726,7 @@ class XeroIntegration:
 
     def get_contacts(self) -> List[Vendor]:
         """Retrieve contacts (vendors/suppliers) from Xero."""
-        response = self._make_request('GET', 'Contacts')
+        response = self._get_reference('Contacts')
 
         vendors = []
         for contact_data in response.get('Contacts', []):
@@ -422,6 +742,9 @@ class XeroIntegration:
 
         return vendors
 
+    def _fetch_reference_data(self) -> Tuple[List[Account], List[Vendor]]:
+        return self.get_accounts(), self.get_contacts()
+
     def create_contact(self, vendor_data: Dict[str, Any]) -> Vendor:
         """Create a new contact in Xero."""
         contact_data = {
@@ -445,100 +768,102 @@ class XeroIntegration:
             ]
 
         response = self._make_request('POST', 'Contacts', contact_data)
+        self.invalidate_reference_data(['Contacts'])
 
         contact_resp = response['Contacts'][0]
-        return Vendor(
+        vendor = Vendor(
             id=contact_resp['ContactID'],
             name=contact_resp['Name'],
             email=contact_resp.get('EmailAddress'),
             phone=contact_resp.get('Phones', [{}])[0].get('PhoneNumber') if contact_resp.get('Phones') else None
         )
-
-    def create_bill(self, transaction: AccountingTransaction) -> Dict[str, Any]:
-        """Create a bill in Xero."""
-        bill_data = {
-            "Invoices": [
+        return vendor
+
+    def _account_code(self, ref: str) -> str:
+        account = self.resolve_account(ref)
+        return account.code if account and account.code else ref
+
+    def _bill_payload(self, transaction: AccountingTransaction) -> Dict[str, Any]:
+        bill = {
+            "Type": "ACCPAY",  # Accounts Payable
+            "Contact": {
+                "ContactID": self.resolve_vendor_id(transaction.vendor_id)
+            },
+            "Date": transaction.date.strftime('%Y-%m-%d'),
+            "DueDate": (transaction.date + timedelta(days=30)).strftime('%Y-%m-%d'),
+            "LineItems": [
                 {
-                    "Type": "ACCPAY",  # Accounts Payable
-                    "Contact": {
-                        "ContactID": transaction.vendor_id
-                    },
-                    "Date": transaction.date.strftime('%Y-%m-%d'),
-                    "DueDate": (transaction.date + timedelta(days=30)).strftime('%Y-%m-%d'),
-                    "LineItems": [
-                        {
-                            "Description": transaction.description,
-                            "UnitAmount": transaction.amount,
-                            "AccountCode": transaction.account_id
-                        }
-                    ]
+                    "Description": transaction.description,
+                    "UnitAmount": transaction.amount,
+                    "AccountCode": self._account_code(transaction.account_id)
                 }
             ]
         }
 
         if transaction.reference:
-            bill_data["Invoices"][0]["InvoiceNumber"] = transaction.reference
+            bill["InvoiceNumber"] = transaction.reference
 
-        response = self._make_request('POST', 'Invoices', bill_data)
-        return response
+        return bill
 
-    def create_bank_transaction(self, transaction: AccountingTransaction) -> Dict[str, Any]:
-        """Create a bank transaction in Xero."""
-        transaction_data = {
-            "BankTransactions": [
+    def _bank_transaction_payload(self, transaction: AccountingTransaction) -> Dict[str, Any]:
+        bank_transaction = {
+            "Type": "SPEND",
+            "Date": transaction.date.strftime('%Y-%m-%d'),
+            "LineItems": [
                 {
-                    "Type": "SPEND",
-                    "Contact": {
-                        "ContactID": transaction.vendor_id
-                    } if transaction.vendor_id else None,
-                    "Date": transaction.date.strftime('%Y-%m-%d'),
-                    "LineItems": [
-                        {
-                            "Description": transaction.description,
-                            "UnitAmount": transaction.amount,
-                            "AccountCode": transaction.account_id
-                        }
-                    ],
-                    "BankAccount": {
-                        "AccountID": transaction.account_id
-                    }
+                    "Description": transaction.description,
+                    "UnitAmount": transaction.amount,
+                    "AccountCode": self._account_code(transaction.account_id)
                 }
-            ]
-        }
-
-        # Remove None contact if no vendor
-        if not transaction.vendor_id:
-            del transaction_data["BankTransactions"][0]["Contact"]
-
-        response = self._make_request('POST', 'BankTransactions', transaction_data)
-        return response
-
-    def sync_transactions(self, transactions: List[AccountingTransaction]) -> Dict[str, Any]:
-        """Sync multiple transactions to Xero."""
-        results = {
-            'total': len(transactions),
-            'successful': 0,
-            'failed': 0,
-            'errors': []
+            ],
+            "BankAccount": {
+                "AccountID": transaction.account_id
+            }
         }
 
-        for transaction in transactions:
-            try:
-                if transaction.vendor_id:
-                    self.create_bill(transaction)
-                else:
-                    self.create_bank_transaction(transaction)
+        if transaction.vendor_id:
+            bank_transaction["Contact"] = {"ContactID": self.resolve_vendor_id(transaction.vendor_id)}
 
-                results['successful'] += 1
-                self.logger.info(f"Successfully synced transaction to Xero: {transaction.id}")
+        return bank_transaction
 
-            except Exception as e:
-                results['failed'] += 1
-                error_msg = f"Failed to sync transaction {transaction.id}: {str(e)}"
-                results['errors'].append(error_msg)
-                self.logger.error(error_msg)
+    def create_bill(self, transaction: AccountingTransaction) -> Dict[str, Any]:
+        """Create a bill in Xero."""
+        return self._make_request('POST', 'Invoices', {"Invoices": [self._bill_payload(transaction)]})
 
-        return results
+    def create_bank_transaction(self, transaction: AccountingTransaction) -> Dict[str, Any]:
+        """Create a bank transaction in Xero."""
+        return self._make_request('POST', 'BankTransactions',
+                                  {"BankTransactions": [self._bank_transaction_payload(transaction)]})
+
+    def _batches(self, transactions: List[AccountingTransaction]) -> List[Tuple[str, List[AccountingTransaction]]]:
+        # Bills and bank transactions go to different endpoints
+        bills = [t for t in transactions if t.vendor_id]
+        spends = [t for t in transactions if not t.vendor_id]
+        return [
+            (kind, group[i:i + self.batch_size])
+            for kind, group in (('Invoices', bills), ('BankTransactions', spends))
+            for i in range(0, len(group), self.batch_size)
+        ]
+
+    def _sync_batch(self, kind: str, batch: List[AccountingTransaction]) -> List[Optional[str]]:
+        """Create many invoices or bank transactions in one Xero request."""
+        build = self._bill_payload if kind == 'Invoices' else self._bank_transaction_payload
+        response = self._make_request('POST', kind, {kind: [build(t) for t in batch]},
+                                      params={'summarizeErrors': 'false'})
+
+        # With summarizeErrors=false each record reports its own validation status
+        errors: List[Optional[str]] = []
+        records = response.get(kind, [])
+        for index in range(len(batch)):
+            record = records[index] if index < len(records) else None
+            if record is None:
+                errors.append("No response for record")
+            elif record.get('HasErrors') or record.get('StatusAttributeString') == 'ERROR':
+                messages = [error.get('Message', '') for error in record.get('ValidationErrors', [])]
+                errors.append('; '.join(messages) or 'Validation error')
+            else:
+                errors.append(None)
+        return errors
 
 
 class AccountingIntegrationManager:
@@ -574,47 +899,57 @@ class AccountingIntegrationManager:
             # Sync to specific system
             return self.integrations[target_system].sync_transactions(transactions)
 
-        # Sync to all configured systems
-        results = {}
-        for system_name, integration in self.integrations.items():
+        # Sync to all configured systems in parallel; each keeps its own quota
+        def sync(item):
+            system_name, integration = item
             try:
-                results[system_name] = integration.sync_transactions(transactions)
+                return system_name, integration.sync_transactions(transactions)
             except Exception as e:
-                results[system_name] = {
+                return system_name, {
                     'error': str(e),
                     'successful': 0,
                     'failed': len(transactions)
                 }
 
-        return results
+        if not self.integrations:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(self.integrations)) as pool:
+            return dict(pool.map(sync, self.integrations.items()))
 
-    def get_chart_of_accounts(self, system: str) -> List[Account]:
-        """Get chart of accounts from specified system."""
+    def get_reference_data(self, system: str, refresh: bool = False) -> ReferenceData:
+        """Get cached, indexed accounts and vendors for specified system."""
         if system not in self.integrations:
             raise ValueError(f"Integration not available: {system}")
 
-        return self.integrations[system].get_accounts()
+        reference = self.integrations[system].reference_data(refresh=refresh)
+        if reference is None:
+            raise RuntimeError(f"Reference data unavailable for {system}")
+        return reference
 
-    def get_vendors(self, system: str) -> List[Vendor]:
-        """Get vendor list from specified system."""
-        if system not in self.integrations:
-            raise ValueError(f"Integration not available: {system}")
+    def get_chart_of_accounts(self, system: str, refresh: bool = False) -> List[Account]:
+        """Get chart of accounts from specified system."""
+        return self.get_reference_data(system, refresh).accounts
 
-        if system == 'quickbooks':
-            return self.integrations[system].get_vendors()
-        elif system == 'xero':
-            return self.integrations[system].get_contacts()
+    def get_vendors(self, system: str, refresh: bool = False) -> List[Vendor]:
+        """Get vendor list from specified system."""
+        return self.get_reference_data(system, refresh).vendors
 
     def create_vendor(self, vendor_data: Dict[str, Any], system: str) -> Vendor:
         """Create vendor in specified system."""
         if system not in self.integrations:
             raise ValueError(f"Integration not available: {system}")
 
+        # The integrations drop their cached vendor list after creating one
         if system == 'quickbooks':
             return self.integrations[system].create_vendor(vendor_data)
         elif system == 'xero':
             return self.integrations[system].create_contact(vendor_data)
 
+    def convert_transactions(self, transactions_data: List[Dict[str, Any]], system: str) -> List[AccountingTransaction]:
+        """Convert generic transaction data using the system's cached reference data."""
+        reference = self.get_reference_data(system)
+        return [convert_to_accounting_transaction(data, reference) for data in transactions_data]
+
     def test_connection(self, system: str) -> Dict[str, Any]:
         """Test connection to accounting software."""
         if system not in self.integrations:
@@ -661,7 +996,8 @@ class AccountingIntegrationManager:
             status['systems'][system_name] = {
                 'connected': connection_test['success'],
                 'last_tested': datetime.now().isoformat(),
-                'details': connection_test
+                'details': connection_test,
+                'reference_cache': dict(self.integrations[system_name].reference_stats)
             }
 
         return status
@@ -689,20 +1025,18 @@ def create_sample_config() -> Dict[str, Any]:
     }
 
 
-def convert_to_accounting_transaction(transaction_data: Dict[str, Any], system_accounts: List[Account]) -> AccountingTransaction:
+def convert_to_accounting_transaction(transaction_data: Dict[str, Any],
+                                      system_accounts: Union[ReferenceData, List[Account]]) -> AccountingTransaction:
     """Convert generic transaction data to AccountingTransaction format."""
-    # Map category to account ID
-    account_id = None
-    for account in system_accounts:
-        if account.name.lower() == transaction_data.get('category', '').lower():
-            account_id = account.id
-            break
-
-    # Fallback to first expense account if no match
-    if not account_id:
-        expense_accounts = [a for a in system_accounts if 'expense' in a.account_type.lower()]
-        if expense_accounts:
-            account_id = expense_accounts[0].id
+    # Pass ReferenceData (see AccountingIntegrationManager.get_reference_data)
+    # when converting many transactions so the index is built only once
+    reference = system_accounts if isinstance(system_accounts, ReferenceData) else ReferenceData(system_accounts, [])
+
+    # Map category to account ID, falling back to the first expense account
+    account = reference.account_for_category(transaction_data.get('category'))
+    account_id = account.id if account else None
+
+    vendor = reference.find_vendor(transaction_data.get('vendor_id'))
 
     return AccountingTransaction(
         id=transaction_data.get('id', str(hash(transaction_data.get('description', '')))),
@@ -711,7 +1045,7 @@ def convert_to_accounting_transaction(transaction_data: Dict[str, Any], system_a
         amount=float(transaction_data['amount']),
         account_id=account_id or '1',  # Fallback to account 1
         category=transaction_data.get('category', 'Uncategorized'),
-        vendor_id=transaction_data.get('vendor_id'),
+        vendor_id=vendor.id if vendor else transaction_data.get('vendor_id'),
         invoice_number=transaction_data.get('invoice_number'),
         reference=transaction_data.get('reference'),
         memo=transaction_data.get('memo')
@@ -3,18 +3,54 @@ CRM Integration utilities for lead management
 """
 
 import asyncio
-import json
-import requests
-from typing import Dict, Any, Optional, List
+import random
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Union
 from abc import ABC, abstractmethod
+from collections import deque
 from datetime import datetime
 import logging
 
+import aiohttp
+
+from ..utils.rate_limiter import AsyncTokenBucket, retry_after_seconds
+
 logger = logging.getLogger(__name__)
 
+# Statuses where a smaller batch may succeed (payload too large, one bad record)
+SPLITTABLE_STATUSES = {400, 413, 422}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE"}
+
+
+class CRMRequestError(Exception):
+    """A CRM API request that failed after retries"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
 
 class CRMIntegration(ABC):
-    """Abstract base class for CRM integrations"""
+    """
+    Abstract base class for CRM integrations
+
+    Subclasses share one keep-alive ``aiohttp`` session and a token bucket
+    sized to the provider's documented rate limit. ``create_leads`` sends
+    leads in provider batches of up to ``max_batch_size``; a batch rejected
+    as too large or invalid is split in half until the offending record is
+    isolated, and the working batch size shrinks for the rest of the run.
+    """
+
+    requests_per_second: float = 10.0
+    burst: float = 10.0
+    max_batch_size: int = 1
+    max_concurrency: int = 4
+    max_retries: int = 3
+    request_timeout_seconds: float = 20.0
+
+    headers: Dict[str, str] = {}
+    _session: Optional[aiohttp.ClientSession] = None
+    _bucket: Optional[AsyncTokenBucket] = None
 
     @abstractmethod
     async def create_lead(self, lead_data: Dict[str, Any]) -> str:
@@ -31,47 +67,153 @@ class CRMIntegration(ABC):
         """Get lead data from the CRM"""
         pass
 
+    async def _create_batch(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Create several leads in one request; providers with batch endpoints override this"""
+        return [await self.create_lead(leads[0])]
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout_seconds)
+            )
+        return self._session
+
+    @property
+    def rate_limiter(self) -> AsyncTokenBucket:
+        if self._bucket is None:
+            self._bucket = AsyncTokenBucket(rate=self.requests_per_second, capacity=self.burst)
+        return self._bucket
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def _request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs) -> Any:
+        """
+        Rate-limited request with retries; returns decoded JSON
+
+        Idempotent requests (by method, or upserts passing ``idempotent=True``)
+        are retried on 429/5xx and connection errors. Other POSTs may already
+        have created records, so they are only retried on 429, which the
+        provider rejects before processing.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        session = await self._get_session()
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    if response.status < 300:
+                        if response.content_type == 'application/json':
+                            return await response.json()
+                        return None
+
+                    text = await response.text()
+                    error = CRMRequestError(f"HTTP {response.status}: {text[:200]}", response.status)
+                    retryable = response.status in RETRYABLE_STATUSES if idempotent else response.status == 429
+                    if not retryable or attempt == self.max_retries:
+                        raise error
+                    delay = retry_after_seconds(response.headers.get('Retry-After'))
+                    if response.status == 429:
+                        # Hold every caller of this integration, not just this one
+                        self.rate_limiter.penalize(delay if delay is not None else 1.0)
+                        delay = 0.0
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not idempotent or attempt == self.max_retries:
+                    raise CRMRequestError(f"{type(e).__name__}: {e}") from e
+                delay = None
+
+            await asyncio.sleep(delay if delay is not None else min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+    async def create_leads(self, leads: List[Dict[str, Any]]) -> List[Union[str, Exception]]:
+        """
+        Create many leads using batch requests
+
+        Returns one entry per input lead, in order: the CRM id, or the
+        exception that prevented that lead from being created.
+        """
+        results: List[Union[str, Exception, None]] = [None] * len(leads)
+        pending = deque(range(len(leads)))
+        chunk_size = max(1, self.max_batch_size)
+
+        async def send(indices: List[int]):
+            nonlocal chunk_size
+            try:
+                ids = await self._create_batch([leads[i] for i in indices])
+            except CRMRequestError as e:
+                if len(indices) > 1 and e.status in SPLITTABLE_STATUSES:
+                    half = len(indices) // 2
+                    chunk_size = max(1, min(chunk_size, half))
+                    await send(indices[:half])
+                    await send(indices[half:])
+                    return
+                for i in indices:
+                    results[i] = e
+                return
+            except Exception as e:
+                for i in indices:
+                    results[i] = e
+                return
+            for i, lead_id in zip(indices, ids):
+                results[i] = lead_id
+
+        async def worker():
+            while pending:
+                indices = [pending.popleft() for _ in range(min(chunk_size, len(pending)))]
+                await send(indices)
+
+        await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+        return results
+
 
 class SupabaseCRM(CRMIntegration):
     """Supabase integration for lead management"""
 
-    def __init__(self, url: str, key: str, table_name: str = "leads"):
+    requests_per_second = 20.0
+    burst = 20.0
+    max_batch_size = 500
+
+    def __init__(self, url: str, key: str, table_name: str = "leads",
+                 conflict_column: Optional[str] = None):
         self.url = url.rstrip('/')
         self.key = key
         self.table_name = table_name
+        # Bulk writes upsert on this column when set (needs a unique constraint)
+        self.conflict_column = conflict_column
         self.headers = {
             "apikey": key,
             "Authorization": f"Bearer {key}",
-            "Content-Type": "application/json"
+            "Content-Type": "application/json",
+            "Prefer": "return=representation"
+        }
+
+    def _to_row(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.now().isoformat()
+        return {
+            "email": lead_data["email"],
+            "first_name": lead_data["first_name"],
+            "last_name": lead_data["last_name"],
+            "company": lead_data["company"],
+            "job_title": lead_data["job_title"],
+            "phone": lead_data.get("phone"),
+            "website": lead_data.get("website"),
+            "company_size": lead_data.get("company_size"),
+            "industry": lead_data.get("industry"),
+            "source": lead_data.get("source", "unknown"),
+            "status": lead_data.get("status", "new"),
+            "bant_score": lead_data.get("bant_score"),
+            "created_at": now,
+            "updated_at": now
         }
 
     async def create_lead(self, lead_data: Dict[str, Any]) -> str:
         """Create lead in Supabase"""
         try:
-            # Prepare data for Supabase
-            supabase_data = {
-                "email": lead_data["email"],
-                "first_name": lead_data["first_name"],
-                "last_name": lead_data["last_name"],
-                "company": lead_data["company"],
-                "job_title": lead_data["job_title"],
-                "phone": lead_data.get("phone"),
-                "website": lead_data.get("website"),
-                "company_size": lead_data.get("company_size"),
-                "industry": lead_data.get("industry"),
-                "source": lead_data.get("source", "unknown"),
-                "status": lead_data.get("status", "new"),
-                "bant_score": lead_data.get("bant_score"),
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            }
-
             url = f"{self.url}/rest/v1/{self.table_name}"
-
-            response = requests.post(url, headers=self.headers, json=supabase_data)
-            response.raise_for_status()
-
-            result = response.json()
+            result = await self._request("POST", url, json=self._to_row(lead_data))
             lead_id = result[0]["id"] if result else None
 
             logger.info(f"Created lead in Supabase: {lead_id}")
@@ -81,15 +223,27 @@ class SupabaseCRM(CRMIntegration):
             logger.error(f"Failed to create lead in Supabase: {e}")
             raise
 
+    async def _create_batch(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Insert (or upsert) rows with one PostgREST request"""
+        url = f"{self.url}/rest/v1/{self.table_name}"
+        params, headers = None, None
+        if self.conflict_column:
+            params = {"on_conflict": self.conflict_column}
+            headers = {"Prefer": "resolution=merge-duplicates,return=representation"}
+
+        rows = await self._request("POST", url, json=[self._to_row(lead) for lead in leads],
+                                   idempotent=self.conflict_column is not None,
+                                   params=params, headers=headers)
+        # PostgREST returns rows in insertion order
+        return [str(row["id"]) for row in rows]
+
     async def update_lead(self, lead_id: str, updates: Dict[str, Any]) -> bool:
         """Update lead in Supabase"""
         try:
-            updates["updated_at"] = datetime.now().isoformat()
+            updates = {**updates, "updated_at": datetime.now().isoformat()}
 
             url = f"{self.url}/rest/v1/{self.table_name}?id=eq.{lead_id}"
-
-            response = requests.patch(url, headers=self.headers, json=updates)
-            response.raise_for_status()
+            await self._request("PATCH", url, json=updates)
 
             logger.info(f"Updated lead in Supabase: {lead_id}")
             return True
@@ -102,11 +256,7 @@ class SupabaseCRM(CRMIntegration):
         """Get lead from Supabase"""
         try:
             url = f"{self.url}/rest/v1/{self.table_name}?id=eq.{lead_id}"
-
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            result = response.json()
+            result = await self._request("GET", url)
             return result[0] if result else None
 
         except Exception as e:
@@ -117,44 +267,46 @@ class SupabaseCRM(CRMIntegration):
 class AirtableCRM(CRMIntegration):
     """Airtable integration for lead management"""
 
-    def __init__(self, api_key: str, base_id: str, table_name: str = "Leads"):
+    # Airtable allows 5 requests/second per base and 10 records per request
+    requests_per_second = 5.0
+    burst = 5.0
+    max_batch_size = 10
+    max_concurrency = 5
+
+    def __init__(self, api_key: str, base_id: str, table_name: str = "Leads",
+                 api_url: str = "https://api.airtable.com"):
         self.api_key = api_key
         self.base_id = base_id
         self.table_name = table_name
-        self.base_url = f"https://api.airtable.com/v0/{base_id}/{table_name}"
+        self.base_url = f"{api_url.rstrip('/')}/v0/{base_id}/{table_name}"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
 
+    def _to_fields(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "Email": lead_data["email"],
+            "First Name": lead_data["first_name"],
+            "Last Name": lead_data["last_name"],
+            "Company": lead_data["company"],
+            "Job Title": lead_data["job_title"],
+            "Phone": lead_data.get("phone", ""),
+            "Website": lead_data.get("website", ""),
+            "Company Size": lead_data.get("company_size", ""),
+            "Industry": lead_data.get("industry", ""),
+            "Source": lead_data.get("source", "unknown"),
+            "Status": lead_data.get("status", "new"),
+            "BANT Score": lead_data.get("bant_score", 0),
+            "Created": datetime.now().isoformat()
+        }
+
     async def create_lead(self, lead_data: Dict[str, Any]) -> str:
         """Create lead in Airtable"""
         try:
-            # Prepare data for Airtable
-            airtable_data = {
-                "records": [{
-                    "fields": {
-                        "Email": lead_data["email"],
-                        "First Name": lead_data["first_name"],
-                        "Last Name": lead_data["last_name"],
-                        "Company": lead_data["company"],
-                        "Job Title": lead_data["job_title"],
-                        "Phone": lead_data.get("phone", ""),
-                        "Website": lead_data.get("website", ""),
-                        "Company Size": lead_data.get("company_size", ""),
-                        "Industry": lead_data.get("industry", ""),
-                        "Source": lead_data.get("source", "unknown"),
-                        "Status": lead_data.get("status", "new"),
-                        "BANT Score": lead_data.get("bant_score", 0),
-                        "Created": datetime.now().isoformat()
-                    }
-                }]
-            }
+            airtable_data = {"records": [{"fields": self._to_fields(lead_data)}]}
 
-            response = requests.post(self.base_url, headers=self.headers, json=airtable_data)
-            response.raise_for_status()
-
-            result = response.json()
+            result = await self._request("POST", self.base_url, json=airtable_data)
             record_id = result["records"][0]["id"]
 
             logger.info(f"Created lead in Airtable: {record_id}")
@@ -164,6 +316,15 @@ class AirtableCRM(CRMIntegration):
             logger.error(f"Failed to create lead in Airtable: {e}")
             raise
 
+    async def _create_batch(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Upsert up to 10 records on Email, so a retried batch does not duplicate leads"""
+        data = {
+            "performUpsert": {"fieldsToMergeOn": ["Email"]},
+            "records": [{"fields": self._to_fields(lead)} for lead in leads]
+        }
+        result = await self._request("PATCH", self.base_url, json=data)
+        return [record["id"] for record in result["records"]]
+
     async def update_lead(self, lead_id: str, updates: Dict[str, Any]) -> bool:
         """Update lead in Airtable"""
         try:
@@ -189,8 +350,7 @@ class AirtableCRM(CRMIntegration):
                 }]
             }
 
-            response = requests.patch(self.base_url, headers=self.headers, json=data)
-            response.raise_for_status()
+            await self._request("PATCH", self.base_url, json=data)
 
             logger.info(f"Updated lead in Airtable: {lead_id}")
             return True
@@ -202,12 +362,7 @@ class AirtableCRM(CRMIntegration):
     async def get_lead(self, lead_id: str) -> Optional[Dict[str, Any]]:
         """Get lead from Airtable"""
         try:
-            url = f"{self.base_url}/{lead_id}"
-
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            result = response.json()
+            result = await self._request("GET", f"{self.base_url}/{lead_id}")
             return result.get("fields")
 
         except Exception as e:
@@ -218,40 +373,39 @@ class AirtableCRM(CRMIntegration):
 class HubSpotCRM(CRMIntegration):
     """HubSpot integration for lead management"""
 
-    def __init__(self, api_key: str):
+    # 100 requests per 10 seconds; batch endpoints take up to 100 inputs
+    requests_per_second = 10.0
+    burst = 10.0
+    max_batch_size = 100
+
+    def __init__(self, api_key: str, base_url: str = "https://api.hubapi.com"):
         self.api_key = api_key
-        self.base_url = "https://api.hubapi.com"
+        self.base_url = base_url.rstrip('/')
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
 
+    def _to_properties(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "email": lead_data["email"],
+            "firstname": lead_data["first_name"],
+            "lastname": lead_data["last_name"],
+            "company": lead_data["company"],
+            "jobtitle": lead_data["job_title"],
+            "phone": lead_data.get("phone", ""),
+            "website": lead_data.get("website", ""),
+            "company_size": lead_data.get("company_size", ""),
+            "industry": lead_data.get("industry", ""),
+            "hs_lead_status": lead_data.get("status", "NEW"),
+            "bant_score": str(lead_data.get("bant_score", 0))
+        }
+
     async def create_lead(self, lead_data: Dict[str, Any]) -> str:
         """Create contact in HubSpot"""
         try:
-            # Prepare data for HubSpot
-            hubspot_data = {
-                "properties": {
-                    "email": lead_data["email"],
-                    "firstname": lead_data["first_name"],
-                    "lastname": lead_data["last_name"],
-                    "company": lead_data["company"],
-                    "jobtitle": lead_data["job_title"],
-                    "phone": lead_data.get("phone", ""),
-                    "website": lead_data.get("website", ""),
-                    "company_size": lead_data.get("company_size", ""),
-                    "industry": lead_data.get("industry", ""),
-                    "hs_lead_status": lead_data.get("status", "NEW"),
-                    "bant_score": str(lead_data.get("bant_score", 0))
-                }
-            }
-
             url = f"{self.base_url}/crm/v3/objects/contacts"
-
-            response = requests.post(url, headers=self.headers, json=hubspot_data)
-            response.raise_for_status()
-
-            result = response.json()
+            result = await self._request("POST", url, json={"properties": self._to_properties(lead_data)})
             contact_id = result["id"]
 
             logger.info(f"Created contact in HubSpot: {contact_id}")
@@ -261,6 +415,24 @@ class HubSpotCRM(CRMIntegration):
             logger.error(f"Failed to create contact in HubSpot: {e}")
             raise
 
+    async def _create_batch(self, leads: List[Dict[str, Any]]) -> List[str]:
+        """Upsert up to 100 contacts keyed by email"""
+        url = f"{self.base_url}/crm/v3/objects/contacts/batch/upsert"
+        data = {
+            "inputs": [
+                {"idProperty": "email", "id": lead["email"], "properties": self._to_properties(lead)}
+                for lead in leads
+            ]
+        }
+        result = await self._request("POST", url, json=data, idempotent=True)
+
+        # Batch results are not guaranteed to come back in request order
+        by_email = {
+            item.get("properties", {}).get("email", "").lower(): item["id"]
+            for item in result["results"]
+        }
+        return [by_email.get(lead["email"].lower()) for lead in leads]
+
     async def update_lead(self, lead_id: str, updates: Dict[str, Any]) -> bool:
         """Update contact in HubSpot"""
         try:
@@ -277,12 +449,8 @@ class HubSpotCRM(CRMIntegration):
                 hubspot_key = field_mapping.get(key, key)
                 hubspot_updates[hubspot_key] = str(value)
 
-            data = {"properties": hubspot_updates}
-
             url = f"{self.base_url}/crm/v3/objects/contacts/{lead_id}"
-
-            response = requests.patch(url, headers=self.headers, json=data)
-            response.raise_for_status()
+            await self._request("PATCH", url, json={"properties": hubspot_updates})
 
             logger.info(f"Updated contact in HubSpot: {lead_id}")
             return True
@@ -295,11 +463,7 @@ class HubSpotCRM(CRMIntegration):
         """Get contact from HubSpot"""
         try:
             url = f"{self.base_url}/crm/v3/objects/contacts/{lead_id}"
-
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            result = response.json()
+            result = await self._request("GET", url)
             return result.get("properties")
 
         except Exception as e:
@@ -310,48 +474,114 @@ class HubSpotCRM(CRMIntegration):
 class CRMManager:
     """Manager class for handling multiple CRM integrations"""
 
-    def __init__(self):
+    def __init__(self, timeout_seconds: float = 30.0):
         self.integrations: Dict[str, CRMIntegration] = {}
+        self.timeout_seconds = timeout_seconds
 
     def add_integration(self, name: str, integration: CRMIntegration):
         """Add a CRM integration"""
         self.integrations[name] = integration
         logger.info(f"Added CRM integration: {name}")
 
-    async def sync_lead_to_all(self, lead_data: Dict[str, Any]) -> Dict[str, str]:
-        """Sync lead to all configured CRM systems"""
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Close every integration's HTTP session"""
+        await asyncio.gather(*(integration.close() for integration in self.integrations.values()))
+
+    async def _fan_out(self, calls: Dict[str, Callable[[], Awaitable[Any]]],
+                       timeout: Optional[float]) -> Dict[str, Any]:
+        """Run one call per integration concurrently; failures come back as exceptions"""
+        async def run(call):
+            if timeout is None:
+                return await call()
+            return await asyncio.wait_for(call(), timeout)
+
+        names = list(calls)
+        outcomes = await asyncio.gather(*(run(calls[name]) for name in names), return_exceptions=True)
         results = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                outcome = CRMRequestError(f"timed out after {timeout}s")
+            results[name] = outcome
+        return results
 
-        for name, integration in self.integrations.items():
-            try:
-                lead_id = await integration.create_lead(lead_data)
-                results[name] = lead_id
-                logger.info(f"Synced lead to {name}: {lead_id}")
-            except Exception as e:
-                logger.error(f"Failed to sync lead to {name}: {e}")
-                results[name] = f"ERROR: {e}"
+    async def sync_lead_to_all(self, lead_data: Dict[str, Any]) -> Dict[str, str]:
+        """Sync lead to all configured CRM systems concurrently"""
+        outcomes = await self._fan_out(
+            {name: (lambda i=integration: i.create_lead(lead_data)) for name, integration in self.integrations.items()},
+            self.timeout_seconds
+        )
+
+        results = {}
+        for name, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to sync lead to {name}: {outcome}")
+                results[name] = f"ERROR: {outcome}"
+            else:
+                results[name] = outcome
+                logger.info(f"Synced lead to {name}: {outcome}")
 
         return results
 
     async def update_lead_in_all(self, lead_ids: Dict[str, str], updates: Dict[str, Any]) -> Dict[str, bool]:
-        """Update lead in all CRM systems"""
+        """Update lead in all CRM systems concurrently"""
+        calls = {
+            name: (lambda i=self.integrations[name], lead_id=lead_id: i.update_lead(lead_id, updates))
+            for name, lead_id in lead_ids.items()
+            if name in self.integrations and not lead_id.startswith("ERROR")
+        }
+        outcomes = await self._fan_out(calls, self.timeout_seconds)
+
         results = {}
+        for name, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to update lead in {name}: {outcome}")
+                results[name] = False
+            else:
+                results[name] = outcome
+
+        return results
 
-        for name, lead_id in lead_ids.items():
-            if name in self.integrations and not lead_id.startswith("ERROR"):
-                try:
-                    success = await self.integrations[name].update_lead(lead_id, updates)
-                    results[name] = success
-                except Exception as e:
-                    logger.error(f"Failed to update lead in {name}: {e}")
-                    results[name] = False
+    async def sync_leads_bulk(self, leads: List[Dict[str, Any]],
+                              timeout_seconds: Optional[float] = None) -> Dict[str, List[str]]:
+        """
+        Sync many leads to every CRM using batch endpoints
+
+        Integrations run concurrently, each within its own rate limit.
+        Returns, per CRM, one entry per lead in input order: the CRM id or
+        an ``"ERROR: ..."`` string, as in ``sync_lead_to_all``.
+        """
+        outcomes = await self._fan_out(
+            {name: (lambda i=integration: i.create_leads(leads)) for name, integration in self.integrations.items()},
+            timeout_seconds
+        )
+
+        results = {}
+        for name, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                logger.error(f"Bulk sync to {name} failed: {outcome}")
+                results[name] = [f"ERROR: {outcome}"] * len(leads)
+                continue
+
+            results[name] = [
+                f"ERROR: {item}" if isinstance(item, Exception) else
+                item if item is not None else "ERROR: no id returned"
+                for item in outcome
+            ]
+            failed = sum(1 for item in results[name] if item.startswith("ERROR"))
+            logger.info(f"Bulk synced {len(leads) - failed}/{len(leads)} leads to {name}")
 
         return results
 
 
 def setup_crm_integrations(config: Dict[str, Any]) -> CRMManager:
     """Set up CRM integrations based on configuration"""
-    manager = CRMManager()
+    manager = CRMManager(timeout_seconds=config.get("timeout_seconds", 30.0))
 
     # Supabase
     if "supabase" in config:
@@ -360,7 +590,8 @@ def setup_crm_integrations(config: Dict[str, Any]) -> CRMManager:
             integration = SupabaseCRM(
                 url=supabase_config["url"],
                 key=supabase_config["key"],
-                table_name=supabase_config.get("table", "leads")
+                table_name=supabase_config.get("table", "leads"),
+                conflict_column=supabase_config.get("conflict_column")
             )
             manager.add_integration("supabase", integration)
 
@@ -371,7 +602,8 @@ def setup_crm_integrations(config: Dict[str, Any]) -> CRMManager:
             integration = AirtableCRM(
                 api_key=airtable_config["api_key"],
                 base_id=airtable_config["base_id"],
-                table_name=airtable_config.get("table", "Leads")
+                table_name=airtable_config.get("table", "Leads"),
+                api_url=airtable_config.get("api_url", "https://api.airtable.com")
             )
             manager.add_integration("airtable", integration)
 
@@ -379,7 +611,10 @@ def setup_crm_integrations(config: Dict[str, Any]) -> CRMManager:
     if "hubspot" in config:
         hubspot_config = config["hubspot"]
         if "api_key" in hubspot_config:
-            integration = HubSpotCRM(api_key=hubspot_config["api_key"])
+            integration = HubSpotCRM(
+                api_key=hubspot_config["api_key"],
+                base_url=hubspot_config.get("base_url", "https://api.hubapi.com")
+            )
             manager.add_integration("hubspot", integration)
 
-    return manager
\ No newline at end of file
+    return manager
@@ -4,13 +4,43 @@ Connects to social media platforms and email services
 """
 
 import asyncio
+import bisect
 import logging
-from typing import Dict, List, Optional, Any
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Any, AsyncIterator
 from datetime import datetime
 import json
 import aiohttp
 from dataclasses import dataclass
 
+from ..utils.rate_limiter import AsyncTokenBucket, retry_after_seconds
+
+# SendGrid limits for a single mail/send request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+SENDGRID_MAX_SUBSTITUTION_BYTES = 10000
+SENDGRID_BODY_TAG = '-body-'
+
+# Production API roots; PlatformConfig.base_url overrides them
+DEFAULT_BASE_URLS = {
+    'twitter': 'https://api.twitter.com',
+    'linkedin': 'https://api.linkedin.com',
+    'instagram': 'https://graph.facebook.com',
+    'facebook': 'https://graph.facebook.com'
+}
+
+# Default request quotas (per hour) when PlatformConfig.rate_limit is unset.
+# Email providers send campaigns in many batch requests, so they get a
+# provider-scale quota (600 requests/minute, SendGrid's v3 limit; Mailchimp
+# caps simultaneous connections instead, which max_concurrency covers)
+# rather than the conservative social-posting default.
+DEFAULT_RATE_LIMITS = {
+    'sendgrid': 36000,
+    'mailchimp': 36000
+}
+DEFAULT_RATE_LIMIT = 100
+
 @dataclass
 class PlatformConfig:
     """Configuration for platform API integration"""
@@ -20,7 +50,144 @@ class PlatformConfig:
     access_token: Optional[str] = None
     access_token_secret: Optional[str] = None
     base_url: Optional[str] = None
-    rate_limit: int = 100  # requests per hour
+    rate_limit: Optional[int] = None  # requests per hour; defaults per platform (DEFAULT_RATE_LIMITS)
+    burst: Optional[int] = None  # requests allowed at once; defaults to rate_limit
+    max_concurrency: int = 4  # open requests per platform
+    max_retries: int = 3  # retries after 429/5xx responses
+
+    def __post_init__(self):
+        if self.rate_limit is None:
+            self.rate_limit = DEFAULT_RATE_LIMITS.get(self.platform, DEFAULT_RATE_LIMIT)
+
+
+class LatencyHistogram:
+    """Fixed-bucket request latency histogram (milliseconds)"""
+
+    BOUNDS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of requests"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS_MS, self.counts):
+            seen += count
+            if seen >= target:
+                return float(min(bound, self.max_ms))
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f'le_{bound}ms' for bound in self.BOUNDS_MS] + ['inf']
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': round(self.max_ms, 2),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class PlatformHTTPClient:
+    """
+    Rate-limited HTTP access to one platform over the shared session
+
+    Each request takes a token from the platform's bucket (``rate_limit``
+    per hour, bursts up to ``burst``) and a slot from its connection limit.
+    429/503 responses drain the bucket for the Retry-After period, so every
+    caller on the platform backs off together. GET requests are retried on
+    429 and other 5xx responses and on connection errors; other methods
+    may already have taken effect, so they are only retried on 429 or a
+    503 with Retry-After. Latency is recorded per platform.
+    """
+
+    def __init__(self, platform: str, session: aiohttp.ClientSession, config: PlatformConfig,
+                 base_delay: float = 1.0):
+        self.platform = platform
+        self.session = session
+        self.max_retries = config.max_retries
+        self.base_delay = base_delay
+        self.rate_limiter = AsyncTokenBucket(
+            rate=config.rate_limit / 3600.0,
+            capacity=config.burst or config.rate_limit
+        )
+        self._slots = asyncio.Semaphore(config.max_concurrency)
+        self.latency = LatencyHistogram()
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'errors': 0, 'in_flight': 0}
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, retries: Optional[int] = None,
+                      **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Send a request and yield the final response
+
+        ``retries=0`` hands throttling responses straight back to the
+        caller (the bucket is still drained) for callers that schedule
+        their own retries.
+        """
+        retries = self.max_retries if retries is None else retries
+        idempotent = method.upper() in ('GET', 'HEAD')
+        for attempt in range(retries + 1):
+            backoff = self.base_delay * 2 ** attempt * random.uniform(0.5, 1.0)
+            await self.rate_limiter.acquire()
+            async with self._slots:
+                self.stats['requests'] += 1
+                self.stats['in_flight'] += 1
+                started = time.monotonic()
+                try:
+                    response = await self.session.request(method, url, **kwargs)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if not idempotent or attempt == retries:
+                        self.stats['errors'] += 1
+                        raise
+                    response = None
+                finally:
+                    self.latency.record(time.monotonic() - started)
+                    self.stats['in_flight'] -= 1
+
+                if response is not None:
+                    delay = retry_after_seconds(response.headers.get('Retry-After'))
+                    if idempotent:
+                        retryable = response.status >= 500 or response.status == 429
+                    else:
+                        # The server declined the request, so resending cannot duplicate it
+                        retryable = response.status == 429 or (response.status == 503 and delay is not None)
+                    if response.status in (429, 503):
+                        self.stats['throttled'] += 1
+                        if delay is None:
+                            delay = backoff
+                        if delay > 0:
+                            self.rate_limiter.penalize(delay)
+                        # The drained bucket paces the retry
+                        backoff = 0.0
+                    if not retryable or attempt == retries:
+                        if response.status >= 400:
+                            self.stats['errors'] += 1
+                        try:
+                            yield response
+                        finally:
+                            response.release()
+                        return
+                    response.release()
+
+            self.stats['retries'] += 1
+            if backoff:
+                await asyncio.sleep(backoff)
+
 
 class PlatformAPIManager:
     """
@@ -33,6 +200,10 @@ class PlatformAPIManager:
     - Facebook Graph API
     - Mailchimp API
     - SendGrid API
+
+    All calls go through one session and a ``PlatformHTTPClient`` per
+    platform, so ``publish_many`` and ``fetch_analytics_many`` can run
+    requests concurrently while each platform stays within its quota.
     """
 
     def __init__(self, configs: List[PlatformConfig]):
@@ -40,8 +211,8 @@ class PlatformAPIManager:
         self.logger = self._setup_logging()
         self.session = None
 
-        # Rate limiting tracking
-        self.rate_limits = {}
+        # Per-platform rate-limited clients, created on first use
+        self.clients: Dict[str, PlatformHTTPClient] = {}
 
         self.logger.info(f"Initialized API manager for {len(configs)} platforms")
 
@@ -62,7 +233,10 @@ class PlatformAPIManager:
 
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        connections = sum(config.max_concurrency for config in self.configs.values()) or 10
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=connections))
+        # Clients hold the session they were created with; start fresh ones on re-entry
+        self.clients = {}
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -70,6 +244,70 @@ class PlatformAPIManager:
         if self.session:
             await self.session.close()
 
+    def _client(self, platform: str) -> PlatformHTTPClient:
+        """Rate-limited client for a platform"""
+        client = self.clients.get(platform)
+        if client is None:
+            config = self.configs.get(platform) or PlatformConfig(platform=platform, api_key='')
+            client = self.clients[platform] = PlatformHTTPClient(platform, self.session, config)
+        return client
+
+    def _request(self, platform: str, method: str, url: str, **kwargs):
+        """``async with`` a rate-limited request on the platform's client"""
+        return self._client(platform).request(method, url, **kwargs)
+
+    def _base_url(self, platform: str) -> str:
+        config = self.configs.get(platform)
+        return (config.base_url if config and config.base_url else DEFAULT_BASE_URLS[platform]).rstrip('/')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-platform request counters and latency histograms"""
+        return {
+            platform: {**client.stats, 'latency': client.latency.to_dict()}
+            for platform, client in self.clients.items()
+        }
+
+    async def publish_many(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Publish several posts concurrently within each platform's quota
+
+        Args:
+            posts: Dicts with ``platform``, ``content`` and optional
+                ``media_urls`` (``media_url`` for Instagram)
+
+        Returns:
+            One result per post, in order
+        """
+        publishers = {
+            'twitter': lambda post: self.post_to_twitter(post['content'], post.get('media_urls')),
+            'linkedin': lambda post: self.post_to_linkedin(post['content'], post.get('media_urls')),
+            'instagram': lambda post: self.post_to_instagram(
+                post['content'], post.get('media_url') or (post.get('media_urls') or [None])[0]),
+            'facebook': lambda post: self.post_to_facebook(post['content'], post.get('media_urls'))
+        }
+
+        async def publish(post: Dict[str, Any]) -> Dict[str, Any]:
+            publisher = publishers.get(post.get('platform'))
+            if publisher is None:
+                return {'success': False, 'error': f"Publishing not supported for {post.get('platform')}"}
+            return await publisher(post)
+
+        return list(await asyncio.gather(*(publish(post) for post in posts)))
+
+    async def fetch_analytics_many(self, posts: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Fetch analytics for several posts concurrently within each platform's quota
+
+        Args:
+            posts: Dicts with ``platform`` and ``post_id``
+
+        Returns:
+            One analytics result per post, in order
+        """
+        return list(await asyncio.gather(
+            *(self.get_post_analytics(post['platform'], post['post_id']) for post in posts)
+        ))
+
     # Social Media Platform Methods
 
     async def post_to_twitter(self, content: str, media_urls: List[str] = None) -> Dict[str, Any]:
@@ -104,9 +342,9 @@ class PlatformAPIManager:
                 if media_ids:
                     payload['media'] = {'media_ids': media_ids}
 
-            url = 'https://api.twitter.com/2/tweets'
+            url = f"{self._base_url('twitter')}/2/tweets"
 
-            async with self.session.post(url, headers=headers, json=payload) as response:
+            async with self._request('twitter', 'POST', url, headers=headers, json=payload) as response:
                 if response.status == 201:
                     result = await response.json()
                     self.logger.info(f"Successfully posted to Twitter: {result['data']['id']}")
@@ -149,8 +387,8 @@ class PlatformAPIManager:
             }
 
             # Get user profile ID (in production, cache this)
-            profile_url = 'https://api.linkedin.com/v2/me'
-            async with self.session.get(profile_url, headers=headers) as response:
+            profile_url = f"{self._base_url('linkedin')}/v2/me"
+            async with self._request('linkedin', 'GET', profile_url, headers=headers) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     return {'success': False, 'error': f"Profile fetch failed: {error_text}"}
@@ -180,9 +418,9 @@ class PlatformAPIManager:
                 payload['specificContent']['com.linkedin.ugc.ShareContent']['shareMediaCategory'] = 'IMAGE'
                 # In production, upload media first and get asset URNs
 
-            url = 'https://api.linkedin.com/v2/ugcPosts'
+            url = f"{self._base_url('linkedin')}/v2/ugcPosts"
 
-            async with self.session.post(url, headers=headers, json=payload) as response:
+            async with self._request('linkedin', 'POST', url, headers=headers, json=payload) as response:
                 if response.status == 201:
                     result = await response.json()
                     post_id = result['id']
@@ -239,9 +477,9 @@ class PlatformAPIManager:
             if not account_id:
                 return {'success': False, 'error': 'Could not get Instagram account ID'}
 
-            container_url = f'https://graph.facebook.com/v18.0/{account_id}/media'
+            container_url = f"{self._base_url('instagram')}/v18.0/{account_id}/media"
 
-            async with self.session.post(container_url, json=container_payload) as response:
+            async with self._request('instagram', 'POST', container_url, json=container_payload) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     return {'success': False, 'error': f"Container creation failed: {error_text}"}
@@ -255,9 +493,9 @@ class PlatformAPIManager:
                 'access_token': config.access_token
             }
 
-            publish_url = f'https://graph.facebook.com/v18.0/{account_id}/media_publish'
+            publish_url = f"{self._base_url('instagram')}/v18.0/{account_id}/media_publish"
 
-            async with self.session.post(publish_url, json=publish_payload) as response:
+            async with self._request('instagram', 'POST', publish_url, json=publish_payload) as response:
                 if response.status == 200:
                     result = await response.json()
                     post_id = result['id']
@@ -311,9 +549,9 @@ class PlatformAPIManager:
                 # For multiple media, would need to create album
                 pass
 
-            url = f'https://graph.facebook.com/v18.0/{page_id}/feed'
+            url = f"{self._base_url('facebook')}/v18.0/{page_id}/feed"
 
-            async with self.session.post(url, json=payload) as response:
+            async with self._request('facebook', 'POST', url, json=payload) as response:
                 if response.status == 200:
                     result = await response.json()
                     post_id = result['id']
@@ -386,7 +624,7 @@ class PlatformAPIManager:
 
             content_url = f'https://{datacenter}.api.mailchimp.com/3.0/campaigns/{campaign_id}/content'
 
-            async with self.session.put(content_url, headers=headers, json=content_payload) as response:
+            async with self._request('mailchimp', 'PUT', content_url, headers=headers, json=content_payload) as response:
                 if response.status != 200:
                     error_text = await response.text()
                     return {'success': False, 'error': f"Content update failed: {error_text}"}
@@ -394,7 +632,7 @@ class PlatformAPIManager:
             # Send campaign
             send_url = f'https://{datacenter}.api.mailchimp.com/3.0/campaigns/{campaign_id}/actions/send'
 
-            async with self.session.post(send_url, headers=headers) as response:
+            async with self._request('mailchimp', 'POST', send_url, headers=headers) as response:
                 if response.status == 204:  # Mailchimp returns 204 for successful send
                     self.logger.info(f"Successfully sent Mailchimp campaign: {campaign_id}")
                     return {
@@ -467,9 +705,9 @@ class PlatformAPIManager:
                 }
             }
 
-            url = 'https://api.sendgrid.com/v3/mail/send'
+            url = f"{config.base_url or 'https://api.sendgrid.com'}/v3/mail/send"
 
-            async with self.session.post(url, headers=headers, json=payload) as response:
+            async with self._request('sendgrid', 'POST', url, headers=headers, json=payload) as response:
                 if response.status == 202:  # SendGrid returns 202 for accepted
                     # Get message ID from response headers
                     message_id = response.headers.get('X-Message-Id', 'unknown')
@@ -489,6 +727,206 @@ class PlatformAPIManager:
             self.logger.error(f"Error sending via SendGrid: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    async def send_email_batch(self,
+                               platform: str,
+                               messages: List[Dict[str, Any]],
+                               sender_email: str) -> Dict[str, Any]:
+        """
+        Send a batch of already-rendered emails through a provider batch endpoint
+
+        Each message needs ``message_id``, ``recipient_email``, ``subject`` and
+        ``content``. The result carries one entry per message under ``results``
+        so callers can record per-recipient status. Failed batches report the
+        HTTP ``status`` and any ``retry_after`` hint so callers can back off.
+
+        Args:
+            platform: Email platform (mailchimp, sendgrid)
+            messages: Rendered messages to send
+            sender_email: Sender email
+
+        Returns:
+            Batch send result
+        """
+        if platform == 'sendgrid':
+            return await self.send_email_batch_sendgrid(messages, sender_email)
+        elif platform == 'mailchimp':
+            return await self.send_email_batch_mailchimp(messages, sender_email)
+        return {'success': False, 'error': f'Batch email not supported for {platform}'}
+
+    async def send_email_batch_sendgrid(self,
+                                        messages: List[Dict[str, Any]],
+                                        sender_email: str) -> Dict[str, Any]:
+        """
+        Send up to 1000 rendered emails in a single SendGrid mail/send request
+
+        SendGrid shares one content block across personalizations, so each
+        rendered body travels as a per-personalization substitution. Bodies
+        over SendGrid's substitution size limit are sent individually.
+        """
+        try:
+            config = self.configs.get('sendgrid')
+            if not config:
+                raise ValueError("SendGrid configuration not found")
+            if len(messages) > SENDGRID_MAX_PERSONALIZATIONS:
+                raise ValueError(f"SendGrid accepts at most {SENDGRID_MAX_PERSONALIZATIONS} recipients per request")
+
+            batched = [m for m in messages if len(m['content'].encode('utf-8')) <= SENDGRID_MAX_SUBSTITUTION_BYTES]
+            oversized = [m for m in messages if len(m['content'].encode('utf-8')) > SENDGRID_MAX_SUBSTITUTION_BYTES]
+
+            results = []
+            if batched:
+                headers = {
+                    'Authorization': f'Bearer {config.api_key}',
+                    'Content-Type': 'application/json'
+                }
+                payload = {
+                    'personalizations': [
+                        {
+                            'to': [{'email': message['recipient_email']}],
+                            'subject': message['subject'],
+                            'substitutions': {SENDGRID_BODY_TAG: message['content']},
+                            'custom_args': {'message_id': message['message_id']}
+                        }
+                        for message in batched
+                    ],
+                    'from': {'email': sender_email},
+                    'content': [
+                        {
+                            'type': 'text/html',
+                            'value': SENDGRID_BODY_TAG
+                        }
+                    ],
+                    'tracking_settings': {
+                        'click_tracking': {'enable': True},
+                        'open_tracking': {'enable': True}
+                    }
+                }
+
+                # The caller schedules retries from the status and retry_after it gets back
+                base_url = config.base_url or 'https://api.sendgrid.com'
+                async with self._request('sendgrid', 'POST', f'{base_url}/v3/mail/send', retries=0,
+                                         headers=headers, json=payload) as response:
+                    if response.status != 202:
+                        return await self._batch_error('sendgrid', response)
+                    provider_id = response.headers.get('X-Message-Id', 'unknown')
+
+                results.extend(
+                    {
+                        'message_id': message['message_id'],
+                        'recipient': message['recipient_email'],
+                        'status': 'accepted',
+                        'provider_message_id': provider_id
+                    }
+                    for message in batched
+                )
+
+            for message in oversized:
+                single = await self.send_email_sendgrid(
+                    recipient_email=message['recipient_email'],
+                    sender_email=sender_email,
+                    subject=message['subject'],
+                    content=message['content']
+                )
+                results.append({
+                    'message_id': message['message_id'],
+                    'recipient': message['recipient_email'],
+                    'status': 'accepted' if single.get('success') else 'failed',
+                    'provider_message_id': single.get('message_id'),
+                    'error': single.get('error')
+                })
+
+            self.logger.info(f"SendGrid accepted batch of {len(messages)} emails")
+            return {'success': True, 'platform': 'sendgrid', 'results': results}
+
+        except Exception as e:
+            self.logger.error(f"Error sending SendGrid batch: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    async def send_email_batch_mailchimp(self,
+                                         messages: List[Dict[str, Any]],
+                                         sender_email: str) -> Dict[str, Any]:
+        """
+        Send rendered emails in one Mailchimp Transactional messages/send call
+
+        Every recipient gets their own body and subject through handlebars
+        merge vars; the response reports a status per recipient.
+        """
+        try:
+            config = self.configs.get('mailchimp')
+            if not config:
+                raise ValueError("Mailchimp configuration not found")
+
+            payload = {
+                'key': config.api_key,
+                'message': {
+                    'html': '{{{body}}}',
+                    'subject': '{{subject}}',
+                    'from_email': sender_email,
+                    'to': [{'email': m['recipient_email'], 'type': 'to'} for m in messages],
+                    'merge_language': 'handlebars',
+                    'merge_vars': [
+                        {
+                            'rcpt': m['recipient_email'],
+                            'vars': [
+                                {'name': 'body', 'content': m['content']},
+                                {'name': 'subject', 'content': m['subject']}
+                            ]
+                        }
+                        for m in messages
+                    ],
+                    'recipient_metadata': [
+                        {'rcpt': m['recipient_email'], 'values': {'message_id': m['message_id']}}
+                        for m in messages
+                    ],
+                    'preserve_recipients': False,
+                    'track_opens': True,
+                    'track_clicks': True
+                }
+            }
+
+            base_url = config.base_url or 'https://mandrillapp.com/api/1.0'
+            async with self._request('mailchimp', 'POST', f'{base_url}/messages/send.json', retries=0,
+                                     json=payload) as response:
+                if response.status != 200:
+                    return await self._batch_error('mailchimp', response)
+                statuses = await response.json()
+
+            # Responses are keyed by address; the same address may appear more than once
+            by_email: Dict[str, List[Dict[str, Any]]] = {}
+            for status in statuses:
+                by_email.setdefault(status.get('email', '').lower(), []).append(status)
+
+            results = []
+            for message in messages:
+                matches = by_email.get(message['recipient_email'].lower())
+                status = matches.pop(0) if matches else {'status': 'failed', 'reject_reason': 'missing from response'}
+                results.append({
+                    'message_id': message['message_id'],
+                    'recipient': message['recipient_email'],
+                    'status': status.get('status', 'failed'),
+                    'provider_message_id': status.get('_id'),
+                    'error': status.get('reject_reason')
+                })
+
+            self.logger.info(f"Mailchimp processed batch of {len(messages)} emails")
+            return {'success': True, 'platform': 'mailchimp', 'results': results}
+
+        except Exception as e:
+            self.logger.error(f"Error sending Mailchimp batch: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    async def _batch_error(self, platform: str, response) -> Dict[str, Any]:
+        """Describe a failed batch request, including any Retry-After hint"""
+        error_text = await response.text()
+        self.logger.error(f"{platform} batch error: {response.status} - {error_text}")
+
+        return {
+            'success': False,
+            'error': error_text,
+            'status': response.status,
+            'retry_after': retry_after_seconds(response.headers.get('Retry-After'))
+        }
+
     # Analytics and Engagement Methods
 
     async def get_post_analytics(self, platform: str, post_id: str) -> Dict[str, Any]:
@@ -564,9 +1002,9 @@ class PlatformAPIManager:
             config = self.configs.get('twitter')
             headers = {'Authorization': f'Bearer {config.access_token}'}
 
-            url = f'https://api.twitter.com/2/tweets/{post_id}?tweet.fields=public_metrics'
+            url = f"{self._base_url('twitter')}/2/tweets/{post_id}?tweet.fields=public_metrics"
 
-            async with self.session.get(url, headers=headers) as response:
+            async with self._request('twitter', 'GET', url, headers=headers) as response:
                 if response.status == 200:
                     result = await response.json()
                     metrics = result['data']['public_metrics']
@@ -596,9 +1034,9 @@ class PlatformAPIManager:
                 'X-Restli-Protocol-Version': '2.0.0'
             }
 
-            url = f'https://api.linkedin.com/v2/socialActions/{post_id}'
+            url = f"{self._base_url('linkedin')}/v2/socialActions/{post_id}"
 
-            async with self.session.get(url, headers=headers) as response:
+            async with self._request('linkedin', 'GET', url, headers=headers) as response:
                 if response.status == 200:
                     result = await response.json()
                     return {
@@ -622,9 +1060,9 @@ class PlatformAPIManager:
             config = self.configs.get('instagram')
             headers = {'Authorization': f'Bearer {config.access_token}'}
 
-            url = f'https://graph.facebook.com/v18.0/{post_id}/insights?metric=impressions,reach,likes,comments,shares'
+            url = f"{self._base_url('instagram')}/v18.0/{post_id}/insights?metric=impressions,reach,likes,comments,shares"
 
-            async with self.session.get(url, headers=headers) as response:
+            async with self._request('instagram', 'GET', url, headers=headers) as response:
                 if response.status == 200:
                     result = await response.json()
                     metrics = {item['name']: item['values'][0]['value'] for item in result['data']}
@@ -650,9 +1088,9 @@ class PlatformAPIManager:
         try:
             config = self.configs.get('facebook')
 
-            url = f'https://graph.facebook.com/v18.0/{post_id}/insights?metric=post_impressions,post_engaged_users,post_clicks&access_token={config.access_token}'
+            url = f"{self._base_url('facebook')}/v18.0/{post_id}/insights?metric=post_impressions,post_engaged_users,post_clicks&access_token={config.access_token}"
 
-            async with self.session.get(url) as response:
+            async with self._request('facebook', 'GET', url) as response:
                 if response.status == 200:
                     result = await response.json()
                     metrics = {item['name']: item['values'][0]['value'] for item in result['data']}
@@ -680,7 +1118,7 @@ class PlatformAPIManager:
             headers = {'Authorization': f'Bearer {config.api_key}'}
             url = f'https://{datacenter}.api.mailchimp.com/3.0/campaigns/{campaign_id}'
 
-            async with self.session.get(url, headers=headers) as response:
+            async with self._request('mailchimp', 'GET', url, headers=headers) as response:
                 if response.status == 200:
                     result = await response.json()
                     stats = result.get('emails_sent', 0)
@@ -707,7 +1145,7 @@ class PlatformAPIManager:
             # SendGrid uses different endpoint structure
             url = f'https://api.sendgrid.com/v3/campaigns/{campaign_id}/stats'
 
-            async with self.session.get(url, headers=headers) as response:
+            async with self._request('sendgrid', 'GET', url, headers=headers) as response:
                 if response.status == 200:
                     result = await response.json()
                     return {
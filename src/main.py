@@ -13,22 +13,27 @@ import asyncio
 import logging
 import signal
 import sys
+from collections import Counter
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-import schedule
-import time
-import threading
 
 from config.config import setup_config, get_config
-from src.agents.inventory_tracker import InventoryTrackerAgent
+from src.agents.inventory_tracker import InventoryTrackerAgent, compute_forecast
 from src.agents.meeting_scheduler import MeetingSchedulerAgent
-from src.database.models import DatabaseManager
+from src.database.models import DatabaseManager, get_pool_metrics, dispose_engines
+from src.utils.executors import AgentExecutor, EndpointLimit, EndpointBusyError, EndpointTimeoutError
+from src.utils.snapshots import SnapshotService
+from src.utils.job_scheduler import AsyncJobScheduler, IntervalTrigger, DailyTrigger, WeeklyTrigger, MonthlyTrigger
+from src.utils.notifications import NotificationManager
+from src.utils.notification_outbox import NotificationDispatcher
 
 # Setup logging and configuration
 config = setup_config()
@@ -37,8 +42,10 @@ logger = logging.getLogger(__name__)
 # Global agent instances
 inventory_agent: Optional[InventoryTrackerAgent] = None
 meeting_agent: Optional[MeetingSchedulerAgent] = None
-scheduler_thread: Optional[threading.Thread] = None
-shutdown_event = threading.Event()
+job_scheduler: Optional[AsyncJobScheduler] = None
+agent_executor: Optional[AgentExecutor] = None
+dashboard_snapshots: Optional[SnapshotService] = None
+notification_dispatcher: Optional[NotificationDispatcher] = None
 
 # FastAPI models
 class SchedulingRequest(BaseModel):
@@ -92,13 +99,13 @@ app.add_middleware(
 
 async def startup():
     """Application startup tasks"""
-    global inventory_agent, meeting_agent, scheduler_thread
+    global inventory_agent, meeting_agent, job_scheduler, agent_executor, dashboard_snapshots, notification_dispatcher
 
     logger.info("Starting Automation Agents application")
 
     try:
-        # Initialize database
-        db_manager = DatabaseManager(config.database.url)
+        # Initialize database; agents share this process-wide engine
+        db_manager = DatabaseManager(config.database.url, **config.get_database_options())
         db_manager.create_tables()
         logger.info("Database initialized")
 
@@ -109,14 +116,25 @@ async def startup():
         inventory_agent = InventoryTrackerAgent(inventory_config)
         meeting_agent = MeetingSchedulerAgent(meeting_config)
 
+        agent_executor = create_agent_executor()
+
+        dashboard_snapshots = SnapshotService(
+            sections={'inventory': build_inventory_dashboard, 'scheduling': build_scheduling_dashboard},
+            assemble=assemble_dashboard,
+            max_age_seconds=config.dashboard.max_age_minutes * 60
+        )
+
         logger.info("Automation agents initialized")
 
-        # Setup scheduled tasks
-        setup_scheduled_tasks()
+        # Agents enqueue notifications; this drains the shared outbox
+        if config.notifications.outbox_enabled:
+            notification_dispatcher = NotificationDispatcher(NotificationManager(asdict(config.notifications)))
+            notification_dispatcher.start()
 
-        # Start scheduler thread
-        scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
+        # Setup and start scheduled tasks on the event loop
+        job_scheduler = AsyncJobScheduler()
+        setup_scheduled_tasks(job_scheduler)
+        job_scheduler.start()
 
         logger.info("Scheduled tasks started")
 
@@ -126,43 +144,108 @@ async def startup():
 
 async def shutdown():
     """Application shutdown tasks"""
-    global scheduler_thread
-
     logger.info("Shutting down Automation Agents application")
 
-    # Signal scheduler to stop
-    shutdown_event.set()
+    # Stop scheduling and give running jobs a moment to finish
+    if job_scheduler:
+        await job_scheduler.stop(timeout=5)
+
+    if agent_executor:
+        agent_executor.shutdown(wait=False)
+
+    # Pending digests go out (or into the outbox) before the dispatcher stops
+    flush_alert_digests(force=True)
 
-    # Wait for scheduler thread to finish
-    if scheduler_thread and scheduler_thread.is_alive():
-        scheduler_thread.join(timeout=5)
+    # Deliver whatever is already due; the rest stays queued for next start
+    if notification_dispatcher:
+        await notification_dispatcher.stop(drain=True)
+
+    dispose_engines()
 
     logger.info("Application shutdown complete")
 
-def setup_scheduled_tasks():
+def create_agent_executor() -> AgentExecutor:
+    """Build the executor that runs blocking agent calls off the event loop"""
+    settings = config.executor
+    return AgentExecutor(
+        thread_workers=settings.thread_workers,
+        process_workers=settings.process_workers,
+        default_limit=EndpointLimit(
+            max_concurrency=settings.default_max_concurrency,
+            timeout_seconds=settings.default_timeout_seconds
+        ),
+        limits={
+            endpoint: EndpointLimit(**limit)
+            for endpoint, limit in settings.endpoint_limits.items()
+        }
+    )
+
+@contextmanager
+def executor_errors():
+    """Yield the agent executor, mapping its limits to HTTP errors"""
+    if agent_executor is None:
+        raise HTTPException(status_code=503, detail="Agent executor not initialized")
+    try:
+        yield agent_executor
+    except EndpointBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except EndpointTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+async def run_agent_call(endpoint: str, agent: Any, method: str, *args) -> Any:
+    """Run a blocking agent method on a worker thread"""
+    with executor_errors() as executor:
+        return await executor.run_agent(endpoint, agent, method, *args)
+
+async def run_compute_call(endpoint: str, func, *args) -> Any:
+    """Run pure computation on the endpoint's pool (a worker process if configured)"""
+    with executor_errors() as executor:
+        return await executor.run(endpoint, func, *args)
+
+def setup_scheduled_tasks(scheduler: AsyncJobScheduler):
     """Setup automated monitoring and task schedules"""
 
     # Inventory monitoring every hour
-    schedule.every(config.inventory.monitoring_interval_minutes).minutes.do(
-        run_inventory_monitoring
+    scheduler.add_job(
+        'inventory_monitoring', run_inventory_monitoring,
+        IntervalTrigger(config.inventory.monitoring_interval_minutes * 60),
+        jitter_seconds=30
     )
 
     # Daily business metrics calculation
-    schedule.every().day.at("08:00").do(calculate_daily_metrics)
+    scheduler.add_job('daily_metrics', calculate_daily_metrics, DailyTrigger("08:00"))
 
     # Weekly optimization analysis
-    schedule.every().monday.at("09:00").do(run_weekly_optimization)
+    scheduler.add_job('weekly_optimization', run_weekly_optimization, WeeklyTrigger("monday", "09:00"))
 
     # Monthly reporting
-    schedule.every().month.do(generate_monthly_report)
+    scheduler.add_job('monthly_report', generate_monthly_report, MonthlyTrigger(day=1, at="09:00"))
+
+    # Keep the dashboard snapshot warm
+    scheduler.add_job(
+        'dashboard_refresh', refresh_dashboard_snapshot,
+        IntervalTrigger(config.dashboard.refresh_interval_minutes * 60),
+        catch_up=False
+    )
+
+    # Send alert digests whose coalescing window has closed
+    if config.notifications.alert_coalescing_enabled:
+        scheduler.add_job(
+            'alert_digests', flush_alert_digests,
+            IntervalTrigger(max(config.notifications.alert_window_seconds / 5, 10)),
+            catch_up=False
+        )
 
     logger.info("Scheduled tasks configured")
 
-def run_scheduler():
-    """Run the scheduler in a separate thread"""
-    while not shutdown_event.is_set():
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+def flush_alert_digests(force: bool = False):
+    """Send pending alert digests from each agent's notification manager"""
+    for agent in (inventory_agent, meeting_agent):
+        if agent:
+            try:
+                agent.notification_manager.flush_alerts(force=force)
+            except Exception as e:
+                logger.error(f"Alert digest flush failed: {e}")
 
 def run_inventory_monitoring():
     """Scheduled inventory monitoring task"""
@@ -170,6 +253,7 @@ def run_inventory_monitoring():
         if inventory_agent:
             logger.info("Running scheduled inventory monitoring")
             results = inventory_agent.run_monitoring_cycle()
+            invalidate_dashboard('inventory')
             logger.info(f"Inventory monitoring completed: {results}")
     except Exception as e:
         logger.error(f"Scheduled inventory monitoring failed: {e}")
@@ -206,6 +290,20 @@ def run_weekly_optimization():
     except Exception as e:
         logger.error(f"Weekly optimization failed: {e}")
 
+async def refresh_dashboard_snapshot():
+    """Rebuild the dashboard snapshot"""
+    try:
+        if dashboard_snapshots:
+            snapshot = await dashboard_snapshots.refresh(force=True)
+            logger.info(f"Dashboard snapshot refreshed (version {snapshot.version})")
+    except Exception as e:
+        logger.error(f"Dashboard snapshot refresh failed: {e}")
+
+def invalidate_dashboard(*sections: str):
+    """Mark dashboard sections stale after a write that changes them"""
+    if dashboard_snapshots:
+        dashboard_snapshots.invalidate(*sections)
+
 def generate_monthly_report():
     """Generate monthly business impact report"""
     try:
@@ -262,7 +360,7 @@ async def health_check():
 async def get_inventory_alerts(agent: InventoryTrackerAgent = Depends(get_inventory_agent)):
     """Get current inventory alerts"""
     try:
-        alerts = agent.monitor_inventory_levels()
+        alerts = await run_agent_call('inventory_alerts', agent, 'monitor_inventory_levels')
         return [
             InventoryAlert(
                 product_id=alert.product_id,
@@ -276,6 +374,8 @@ async def get_inventory_alerts(agent: InventoryTrackerAgent = Depends(get_invent
             )
             for alert in alerts
         ]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting inventory alerts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -297,8 +397,9 @@ async def generate_purchase_orders(
 async def run_po_generation(agent: InventoryTrackerAgent):
     """Background task for PO generation"""
     try:
-        alerts = agent.monitor_inventory_levels()
-        po_ids = agent.generate_purchase_orders(alerts)
+        alerts = await run_agent_call('inventory_alerts', agent, 'monitor_inventory_levels')
+        po_ids = await run_agent_call('inventory_generate_pos', agent, 'generate_purchase_orders', alerts)
+        invalidate_dashboard('inventory')
         logger.info(f"Generated {len(po_ids)} purchase orders")
     except Exception as e:
         logger.error(f"Background PO generation failed: {e}")
@@ -312,7 +413,11 @@ async def get_demand_forecast(
 ):
     """Get demand forecast for specific product"""
     try:
-        forecast = agent.forecast_demand(product_id, location_id, days)
+        # The history is read here; only the model fit runs in a worker process
+        sales_data = await run_agent_call('inventory_forecast', agent, 'load_sales_history', product_id, location_id)
+        forecast = await run_compute_call(
+            'inventory_forecast_model', compute_forecast, agent.forecaster, product_id, location_id, days, sales_data
+        )
         return {
             "product_id": forecast.product_id,
             "location_id": forecast.location_id,
@@ -322,6 +427,8 @@ async def get_demand_forecast(
             "seasonality_factor": forecast.seasonality_factor,
             "trend_factor": forecast.trend_factor
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting demand forecast: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -330,8 +437,10 @@ async def get_demand_forecast(
 async def get_inventory_optimization(agent: InventoryTrackerAgent = Depends(get_inventory_agent)):
     """Get inventory optimization recommendations"""
     try:
-        optimization = agent.optimize_inventory_levels()
+        optimization = await run_agent_call('inventory_optimization', agent, 'optimize_inventory_levels')
         return optimization
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting inventory optimization: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -340,8 +449,10 @@ async def get_inventory_optimization(agent: InventoryTrackerAgent = Depends(get_
 async def get_inventory_metrics(agent: InventoryTrackerAgent = Depends(get_inventory_agent)):
     """Get inventory business impact metrics"""
     try:
-        metrics = agent.calculate_business_impact()
+        metrics = await run_agent_call('inventory_metrics', agent, 'calculate_business_impact')
         return metrics
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting inventory metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -355,10 +466,14 @@ async def schedule_meeting(
 ):
     """Process natural language scheduling request"""
     try:
-        result = agent.process_natural_language_request(
+        result = await run_agent_call(
+            'meetings_schedule', agent, 'process_natural_language_request',
             request.request_text, request.requester_email
         )
+        invalidate_dashboard('scheduling')
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing scheduling request: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -371,8 +486,11 @@ async def confirm_meeting(
 ):
     """Confirm and schedule meeting from suggestions"""
     try:
-        result = agent.schedule_meeting(request_id, time_index)
+        result = await run_agent_call('meetings_confirm', agent, 'schedule_meeting', request_id, time_index)
+        invalidate_dashboard('scheduling')
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error confirming meeting: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -384,8 +502,11 @@ async def resolve_conflicts(
 ):
     """Resolve scheduling conflicts for existing meeting"""
     try:
-        result = agent.resolve_scheduling_conflicts(meeting_id)
+        result = await run_agent_call('meetings_conflicts', agent, 'resolve_scheduling_conflicts', meeting_id)
+        invalidate_dashboard('scheduling')
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error resolving conflicts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -405,7 +526,8 @@ async def find_optimal_time(
         start_dt = datetime.fromisoformat(start_date)
         end_dt = datetime.fromisoformat(end_date)
 
-        suggestions = agent.find_optimal_meeting_time(
+        suggestions = await run_agent_call(
+            'meetings_find_time', agent, 'find_optimal_meeting_time',
             attendees, duration_minutes, (start_dt, end_dt), timezone
         )
 
@@ -419,6 +541,8 @@ async def find_optimal_time(
             }
             for s in suggestions
         ]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error finding optimal time: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -427,8 +551,10 @@ async def find_optimal_time(
 async def get_meeting_metrics(agent: MeetingSchedulerAgent = Depends(get_meeting_agent)):
     """Get meeting scheduler business impact metrics"""
     try:
-        metrics = agent.calculate_business_impact()
+        metrics = await run_agent_call('meetings_metrics', agent, 'calculate_business_impact')
         return metrics
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting meeting metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -457,8 +583,10 @@ async def get_business_impact(
 ):
     """Get combined business impact metrics"""
     try:
-        inventory_metrics = inventory_agent.calculate_business_impact()
-        scheduling_metrics = meeting_agent.calculate_business_impact()
+        inventory_metrics, scheduling_metrics = await asyncio.gather(
+            run_agent_call('inventory_metrics', inventory_agent, 'calculate_business_impact'),
+            run_agent_call('meetings_metrics', meeting_agent, 'calculate_business_impact')
+        )
 
         # Calculate combined metrics
         combined_monthly_savings = (
@@ -476,56 +604,134 @@ async def get_business_impact(
             combined_savings=combined_monthly_savings,
             roi_percentage=combined_roi
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting business impact: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+URGENCY_LEVELS = ('critical', 'high', 'medium', 'low')
+
+async def build_inventory_dashboard() -> Dict[str, Any]:
+    """Inventory section of the dashboard snapshot"""
+    alerts, impact, optimization = await asyncio.gather(
+        run_agent_call('inventory_alerts', inventory_agent, 'monitor_inventory_levels'),
+        run_agent_call('inventory_metrics', inventory_agent, 'calculate_business_impact'),
+        # Read-only analyses: a timed refresh must not record metrics or send summaries
+        run_agent_call('inventory_optimization', inventory_agent, 'analyze_inventory_levels')
+    )
+    urgency_counts = Counter(alert.urgency_level for alert in alerts)
+    return jsonable_encoder({
+        "total_alerts": len(alerts),
+        "alerts_by_urgency": {level: urgency_counts.get(level, 0) for level in URGENCY_LEVELS},
+        "monthly_metrics": impact,
+        "optimization_opportunities": optimization
+    })
+
+async def build_scheduling_dashboard() -> Dict[str, Any]:
+    """Scheduling section of the dashboard snapshot"""
+    impact, optimization = await asyncio.gather(
+        run_agent_call('meetings_metrics', meeting_agent, 'calculate_business_impact'),
+        run_agent_call('meetings_optimization', meeting_agent, 'review_scheduling')
+    )
+    return jsonable_encoder({
+        "monthly_metrics": impact,
+        "optimization_status": optimization
+    })
+
+def assemble_dashboard(sections: Dict[str, Any], generated_at: datetime) -> Dict[str, Any]:
+    """Combine dashboard sections into the response payload"""
+    inventory = sections['inventory']
+    scheduling = sections['scheduling']
+    return {
+        "overview": {
+            "total_alerts": inventory["total_alerts"],
+            "critical_alerts": inventory["alerts_by_urgency"]["critical"],
+            "monthly_savings": inventory["monthly_metrics"].get('monthly_cost_savings', 0) +
+                             scheduling["monthly_metrics"].get('monthly_cost_savings', 0),
+            "automation_rate": 92.5,  # Percentage of tasks automated
+            "last_updated": generated_at.isoformat()
+        },
+        "inventory": {
+            "alerts_by_urgency": inventory["alerts_by_urgency"],
+            "monthly_metrics": inventory["monthly_metrics"],
+            "optimization_opportunities": inventory["optimization_opportunities"]
+        },
+        "scheduling": scheduling
+    }
+
 @app.get("/metrics/dashboard")
 async def get_dashboard_metrics(
+    request: Request,
     inventory_agent: InventoryTrackerAgent = Depends(get_inventory_agent),
     meeting_agent: MeetingSchedulerAgent = Depends(get_meeting_agent)
 ):
-    """Get comprehensive dashboard metrics"""
+    """
+    Get comprehensive dashboard metrics
+
+    Serves the last snapshot immediately; stale snapshots are rebuilt in the
+    background. ``last_updated`` and Last-Modified give when the content last
+    changed, the Age header how long ago it was last rebuilt, and
+    If-None-Match with the current ETag returns 304.
+    """
     try:
-        # Get current alerts and status
-        inventory_alerts = inventory_agent.monitor_inventory_levels()
-        critical_alerts = [a for a in inventory_alerts if a.urgency_level == 'critical']
-
-        # Get business metrics
-        inventory_impact = inventory_agent.calculate_business_impact()
-        scheduling_impact = meeting_agent.calculate_business_impact()
-
-        dashboard_data = {
-            "overview": {
-                "total_alerts": len(inventory_alerts),
-                "critical_alerts": len(critical_alerts),
-                "monthly_savings": inventory_impact.get('monthly_cost_savings', 0) +
-                                 scheduling_impact.get('monthly_cost_savings', 0),
-                "automation_rate": 92.5,  # Percentage of tasks automated
-                "last_updated": datetime.utcnow().isoformat()
-            },
-            "inventory": {
-                "alerts_by_urgency": {
-                    "critical": len([a for a in inventory_alerts if a.urgency_level == 'critical']),
-                    "high": len([a for a in inventory_alerts if a.urgency_level == 'high']),
-                    "medium": len([a for a in inventory_alerts if a.urgency_level == 'medium']),
-                    "low": len([a for a in inventory_alerts if a.urgency_level == 'low'])
-                },
-                "monthly_metrics": inventory_impact,
-                "optimization_opportunities": inventory_agent.optimize_inventory_levels()
-            },
-            "scheduling": {
-                "monthly_metrics": scheduling_impact,
-                "optimization_status": meeting_agent.run_scheduling_optimization()
-            }
+        if dashboard_snapshots is None:
+            raise HTTPException(status_code=503, detail="Dashboard snapshots not initialized")
+
+        snapshot = await dashboard_snapshots.get()
+        headers = {
+            "ETag": snapshot.etag,
+            "Cache-Control": "no-cache",
+            "Age": str(int(snapshot.age_seconds)),
+            "Last-Modified": snapshot.generated_at.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "X-Snapshot-Stale": "true" if dashboard_snapshots.is_stale else "false"
         }
 
-        return dashboard_data
+        if SnapshotService.etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(content=snapshot.data, headers=headers)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting dashboard metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics/executor")
+async def get_executor_metrics():
+    """Get per-endpoint executor counters and limits"""
+    if agent_executor is None:
+        raise HTTPException(status_code=503, detail="Agent executor not initialized")
+    return agent_executor.get_stats()
+
+@app.get("/metrics/scheduler")
+async def get_scheduler_metrics():
+    """Get per-job run counts, durations and next run times"""
+    if job_scheduler is None:
+        raise HTTPException(status_code=503, detail="Job scheduler not initialized")
+    return job_scheduler.get_stats()
+
+@app.get("/metrics/notifications")
+async def get_notification_metrics():
+    """Get outbox depth, delivery counters and SMTP pool usage"""
+    if notification_dispatcher is None:
+        raise HTTPException(status_code=503, detail="Notification outbox not enabled")
+    return notification_dispatcher.get_stats()
+
+@app.get("/metrics/alerts")
+async def get_alert_metrics():
+    """Get alert coalescing counters per agent"""
+    return {
+        name: agent.notification_manager.coalescer.get_stats()
+        for name, agent in (('inventory', inventory_agent), ('scheduling', meeting_agent))
+        if agent and agent.notification_manager.coalescer
+    }
+
+@app.get("/metrics/database")
+async def get_database_metrics():
+    """Get connection pool checkout metrics for the shared engine"""
+    return get_pool_metrics()
+
 # Configuration Management
 
 @app.get("/config")
@@ -569,7 +775,6 @@ async def global_exception_handler(request, exc):
 def signal_handler(signum, frame):
     """Handle shutdown signals"""
     logger.info(f"Received signal {signum}, shutting down...")
-    shutdown_event.set()
     sys.exit(0)
 
 if __name__ == "__main__":
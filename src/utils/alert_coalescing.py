@@ -0,0 +1,224 @@
+"""
+Alert coalescing for notification fan-out.
+
+Handles:
+- Grouping alerts by type, priority and recipients within a time window
+- One digest notification per group instead of one message per event
+- TTL deduplication of repeated alerts
+- Immediate delivery for critical alerts
+- Requeueing digests whose delivery failed
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GroupKey = Tuple[str, str, Optional[Tuple[str, ...]]]
+
+
+@dataclass
+class PendingAlert:
+    """An alert waiting in a digest group"""
+    title: str
+    message: str
+    summary: str
+    dedupe_key: Optional[str] = None
+
+
+@dataclass
+class AlertGroup:
+    """Alerts of one type, priority and recipient set collected in a window"""
+    alert_type: str
+    priority: str
+    recipients: Optional[List[str]]
+    opened_at: float
+    alerts: List[PendingAlert] = field(default_factory=list)
+    attempts: int = 0
+
+
+class AlertCoalescer:
+    """
+    Turns bursts of alerts into digests.
+
+    The first alert for a (type, priority, recipients) group opens a window
+    of ``window_seconds``; alerts arriving before it closes join the same
+    digest, which is sent by ``flush_due`` once the window has passed or
+    as soon as ``max_digest_items`` alerts are waiting. An alert whose
+    ``dedupe_key`` was seen within ``dedupe_ttl_seconds`` is dropped.
+    Priorities in ``bypass_priorities`` skip the window and are sent at
+    once, but are still deduplicated.
+
+    A digest that fails to send is put back and retried after another
+    window; after ``max_send_attempts`` it is dropped and its dedupe keys
+    are released so the same alerts can be raised again.
+
+    ``send`` has the signature of ``NotificationManager.send_notification``
+    (title, message, priority, recipients) and returns per-channel results.
+    """
+
+    def __init__(self, send: Callable[..., Dict[str, bool]],
+                 window_seconds: float = 300.0,
+                 dedupe_ttl_seconds: float = 3600.0,
+                 max_digest_items: int = 50,
+                 bypass_priorities: Tuple[str, ...] = ('critical',),
+                 max_send_attempts: int = 3,
+                 clock: Callable[[], float] = time.monotonic):
+        self.send = send
+        self.window_seconds = window_seconds
+        self.dedupe_ttl_seconds = dedupe_ttl_seconds
+        self.max_digest_items = max_digest_items
+        self.bypass_priorities = set(bypass_priorities)
+        self.max_send_attempts = max_send_attempts
+        self.clock = clock
+
+        self._groups: Dict[GroupKey, AlertGroup] = {}
+        self._seen: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'received': 0,
+            'deduplicated': 0,
+            'bypassed': 0,
+            'digests_sent': 0,
+            'alerts_in_digests': 0,
+            'send_failures': 0,
+            'digests_requeued': 0,
+            'alerts_dropped': 0
+        }
+
+    def submit(self, alert_type: str, title: str, message: str,
+               priority: str = 'medium',
+               recipients: Optional[List[str]] = None,
+               dedupe_key: Optional[str] = None,
+               summary: Optional[str] = None,
+               dedupe_ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Accept an alert for delivery.
+
+        Returns True if the alert was sent (bypass) or queued for a digest,
+        False if it was a duplicate or an immediate send failed.
+        """
+        now = self.clock()
+        ready: List[AlertGroup] = []
+
+        with self._lock:
+            self.stats['received'] += 1
+            if dedupe_key is not None:
+                expires_at = self._seen.get(dedupe_key)
+                if expires_at is not None and expires_at > now:
+                    self.stats['deduplicated'] += 1
+                    logger.debug(f"Alert {dedupe_key} suppressed as duplicate")
+                    return False
+                ttl = self.dedupe_ttl_seconds if dedupe_ttl_seconds is None else dedupe_ttl_seconds
+                self._seen[dedupe_key] = now + ttl
+
+            if priority not in self.bypass_priorities:
+                key = self._group_key(alert_type, priority, recipients)
+                group = self._groups.get(key)
+                if group is None:
+                    group = self._groups[key] = AlertGroup(alert_type, priority, recipients, opened_at=now)
+                group.alerts.append(PendingAlert(title, message, summary or title, dedupe_key))
+                if len(group.alerts) >= self.max_digest_items:
+                    ready.append(self._groups.pop(key))
+            else:
+                self.stats['bypassed'] += 1
+
+        if priority in self.bypass_priorities:
+            success = self._deliver(title, message, priority, recipients)
+            if not success and dedupe_key is not None:
+                with self._lock:
+                    self._seen.pop(dedupe_key, None)  # allow a retry
+            return success
+
+        for group in ready:
+            self._send_digest(group)
+        return True
+
+    def flush_due(self) -> int:
+        """Send digests whose window has closed; returns the number sent"""
+        now = self.clock()
+        with self._lock:
+            due = [key for key, group in self._groups.items()
+                   if now - group.opened_at >= self.window_seconds]
+            ready = [self._groups.pop(key) for key in due]
+            self._seen = {key: expires for key, expires in self._seen.items() if expires > now}
+
+        for group in ready:
+            self._send_digest(group)
+        return len(ready)
+
+    def flush(self) -> int:
+        """Send every pending digest now (e.g. on shutdown)"""
+        with self._lock:
+            ready = list(self._groups.values())
+            self._groups.clear()
+
+        for group in ready:
+            self._send_digest(group)
+        return len(ready)
+
+    @staticmethod
+    def _group_key(alert_type: str, priority: str, recipients: Optional[List[str]]) -> GroupKey:
+        return (alert_type, priority, tuple(sorted(recipients)) if recipients else None)
+
+    def _deliver(self, title: str, message: str, priority: str,
+                 recipients: Optional[List[str]]) -> bool:
+        try:
+            success = any(self.send(title, message, priority, recipients).values())
+        except Exception as e:
+            logger.error(f"Error sending alert '{title}': {e}")
+            success = False
+        if not success:
+            self.stats['send_failures'] += 1
+        return success
+
+    def _send_digest(self, group: AlertGroup):
+        alerts = group.alerts
+        if len(alerts) == 1:
+            title, message = alerts[0].title, alerts[0].message
+        else:
+            label = group.alert_type.replace('_', ' ')
+            title = f"{len(alerts)} {label} alerts ({group.priority})"
+            lines = [f"- {alert.summary}" for alert in alerts]
+            message = f"{len(alerts)} {label} alerts:\n\n" + "\n".join(lines)
+
+        if self._deliver(title, message, group.priority, group.recipients):
+            self.stats['digests_sent'] += 1
+            self.stats['alerts_in_digests'] += len(alerts)
+        else:
+            self._requeue(group)
+
+    def _requeue(self, group: AlertGroup):
+        """Put a failed digest back for the next window, or drop it after max_send_attempts"""
+        group.attempts += 1
+        with self._lock:
+            if group.attempts >= self.max_send_attempts:
+                for alert in group.alerts:
+                    if alert.dedupe_key is not None:
+                        self._seen.pop(alert.dedupe_key, None)
+                self.stats['alerts_dropped'] += len(group.alerts)
+                logger.error(f"Dropped {len(group.alerts)} {group.alert_type} alerts "
+                             f"after {group.attempts} failed digest sends")
+                return
+
+            key = self._group_key(group.alert_type, group.priority, group.recipients)
+            pending = self._groups.get(key)
+            if pending is not None:
+                # Alerts that arrived meanwhile join the retried digest
+                group.alerts.extend(pending.alerts)
+            group.opened_at = self.clock()
+            self._groups[key] = group
+            self.stats['digests_requeued'] += 1
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(len(group.alerts) for group in self._groups.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing counters and current backlog"""
+        with self._lock:
+            groups = len(self._groups)
+        return {**self.stats, 'pending_groups': groups, 'pending_alerts': self.pending_count()}
@@ -0,0 +1,182 @@
+"""
+Executor layer for running blocking agent work from asyncio code.
+
+Handles:
+- A sized thread pool for SQLAlchemy- and I/O-bound agent calls
+- An optional process pool for pure CPU-bound computation (forecast models)
+- Per-endpoint concurrency limits and request timeouts
+- Per-endpoint call, timeout and rejection counters
+- Replacing a process pool broken by a crashed worker
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointBusyError(Exception):
+    """No execution slot for the endpoint freed up before the request timeout"""
+
+
+class EndpointTimeoutError(Exception):
+    """The offloaded call did not finish within the request timeout"""
+
+
+@dataclass
+class EndpointLimit:
+    """Concurrency limit, timeout and pool for one endpoint"""
+    max_concurrency: int = 4
+    timeout_seconds: float = 30.0
+    pool: str = "thread"  # thread or process
+
+
+@dataclass
+class EndpointStats:
+    """Counters for calls made through one endpoint"""
+    calls: int = 0
+    completed: int = 0
+    failed: int = 0
+    timeouts: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class AgentExecutor:
+    """
+    Runs blocking agent calls off the event loop.
+
+    Each endpoint has its own semaphore, so a burst of slow forecasts cannot
+    take every worker from cheaper endpoints. A call holds its slot until
+    the worker actually finishes, even after the caller timed out, so
+    abandoned work still counts against the limit.
+
+    Agent methods always run on threads in this process, where the agents,
+    their database sessions and their state live. The process pool only
+    runs pure functions that take and return picklable values.
+    """
+
+    def __init__(self,
+                 thread_workers: int = 8,
+                 process_workers: int = 0,
+                 default_limit: Optional[EndpointLimit] = None,
+                 limits: Optional[Dict[str, EndpointLimit]] = None):
+        self.thread_pool = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="agent-worker")
+        self.process_workers = process_workers
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        if process_workers > 0:
+            self.process_pool = ProcessPoolExecutor(max_workers=process_workers)
+        self.process_pool_restarts = 0
+
+        self.default_limit = default_limit or EndpointLimit()
+        self.limits: Dict[str, EndpointLimit] = dict(limits or {})
+        self.endpoint_stats: Dict[str, EndpointStats] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def configure(self, endpoint: str, limit: EndpointLimit):
+        """Set the limit for an endpoint (before its first call)"""
+        self.limits[endpoint] = limit
+        self._semaphores.pop(endpoint, None)
+
+    def _semaphore(self, endpoint: str, limit: EndpointLimit) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(limit.max_concurrency)
+            self._semaphores[endpoint] = semaphore
+        return semaphore
+
+    async def run(self, endpoint: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in the endpoint's pool
+
+        Endpoints configured for the process pool need a module-level
+        ``func`` and picklable arguments; without a process pool they run on
+        a thread like every other endpoint.
+        """
+        limit = self.limits.get(endpoint, self.default_limit)
+        pool = self.process_pool if limit.pool == "process" and self.process_pool is not None else self.thread_pool
+        return await self._submit(endpoint, pool, functools.partial(func, *args, **kwargs))
+
+    async def run_agent(self, endpoint: str, agent: Any, method: str, *args, **kwargs) -> Any:
+        """Run an agent method for an endpoint on a thread in this process"""
+        return await self._submit(endpoint, self.thread_pool, functools.partial(getattr(agent, method), *args, **kwargs))
+
+    async def _submit(self, endpoint: str, pool, call: Callable) -> Any:
+        loop = asyncio.get_running_loop()
+        limit = self.limits.get(endpoint, self.default_limit)
+        stats = self.endpoint_stats.setdefault(endpoint, EndpointStats())
+        semaphore = self._semaphore(endpoint, limit)
+        stats.calls += 1
+
+        deadline = loop.time() + limit.timeout_seconds
+        try:
+            await asyncio.wait_for(semaphore.acquire(), limit.timeout_seconds)
+        except asyncio.TimeoutError:
+            stats.rejected += 1
+            raise EndpointBusyError(f"{endpoint} is at its concurrency limit ({limit.max_concurrency})")
+
+        started = time.monotonic()
+        stats.in_flight += 1
+
+        def finished(_):
+            elapsed = time.monotonic() - started
+            stats.in_flight -= 1
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            semaphore.release()
+
+        try:
+            future = loop.run_in_executor(pool, call)
+        except Exception as e:
+            finished(None)
+            stats.failed += 1
+            self._replace_broken_pool(pool, e)
+            raise
+        future.add_done_callback(finished)
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise EndpointTimeoutError(f"{endpoint} did not finish within {limit.timeout_seconds}s")
+        except Exception as e:
+            stats.failed += 1
+            self._replace_broken_pool(pool, e)
+            raise
+
+        stats.completed += 1
+        return result
+
+    def _replace_broken_pool(self, pool, error: Exception):
+        """A crashed worker breaks the whole process pool; start a fresh one for later calls"""
+        if not isinstance(error, BrokenProcessPool) or pool is not self.process_pool:
+            return
+        logger.warning(f"Process pool broken ({error}); starting a new one")
+        self.process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        self.process_pool_restarts += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-endpoint counters with average latency"""
+        report = {}
+        for endpoint, stats in self.endpoint_stats.items():
+            finished = stats.completed + stats.failed + stats.timeouts
+            report[endpoint] = {
+                **asdict(stats),
+                "avg_seconds": round(stats.total_seconds / finished, 4) if finished else 0.0,
+                "limit": asdict(self.limits.get(endpoint, self.default_limit))
+            }
+        return report
+
+    def shutdown(self, wait: bool = True):
+        self.thread_pool.shutdown(wait=wait)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=wait)
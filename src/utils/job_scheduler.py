@@ -0,0 +1,330 @@
+"""
+Asyncio job scheduler for recurring agent work.
+
+Handles:
+- Interval, daily, weekly and monthly triggers on a single timer heap
+- Per-job executors so a long job never delays another
+- Overlap prevention, start jitter and missed-run catch-up
+- Per-job run counts and duration metrics
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from calendar import monthrange
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _parse_time(at: str) -> Tuple[int, int]:
+    hour, minute = at.split(':')
+    return int(hour), int(minute)
+
+
+class IntervalTrigger:
+    """Fires every ``seconds`` seconds"""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+
+class DailyTrigger:
+    """Fires every day at ``at`` (HH:MM, local time)"""
+
+    def __init__(self, at: str = "09:00"):
+        self.hour, self.minute = _parse_time(at)
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        return candidate if candidate > moment else candidate + timedelta(days=1)
+
+
+class WeeklyTrigger:
+    """Fires every week on ``weekday`` at ``at``"""
+
+    def __init__(self, weekday: str = "monday", at: str = "09:00"):
+        self.weekday = WEEKDAYS.index(weekday.lower())
+        self.hour, self.minute = _parse_time(at)
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        candidate += timedelta(days=(self.weekday - moment.weekday()) % 7)
+        return candidate if candidate > moment else candidate + timedelta(weeks=1)
+
+
+class MonthlyTrigger:
+    """Fires every month on ``day`` at ``at``; short months use their last day"""
+
+    def __init__(self, day: int = 1, at: str = "09:00"):
+        if not 1 <= day <= 31:
+            raise ValueError("Day of month must be between 1 and 31")
+        self.day = day
+        self.hour, self.minute = _parse_time(at)
+
+    def _in_month(self, year: int, month: int) -> datetime:
+        day = min(self.day, monthrange(year, month)[1])
+        return datetime(year, month, day, self.hour, self.minute)
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = self._in_month(moment.year, moment.month)
+        if candidate > moment:
+            return candidate
+        year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+        return self._in_month(year, month)
+
+
+@dataclass
+class JobStats:
+    """Run counters and durations for one job"""
+    runs: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped_overlap: int = 0
+    missed: int = 0
+    catch_up_runs: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+    last_started: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+@dataclass
+class Job:
+    """A recurring job and its scheduling policy"""
+    name: str
+    func: Callable
+    trigger: Any
+    args: tuple = ()
+    executor: Optional[Executor] = None
+    jitter_seconds: float = 0.0
+    catch_up: bool = True
+    misfire_grace_seconds: float = 60.0
+    next_run: Optional[datetime] = None
+    running: bool = False
+    pending_catch_up: bool = False
+    stats: JobStats = field(default_factory=JobStats)
+    generation: int = 0
+
+
+class AsyncJobScheduler:
+    """
+    Runs recurring jobs from one asyncio task and a heap of due times.
+
+    Coroutine functions run on the event loop; plain functions run on the
+    job's executor, which defaults to a dedicated single-thread pool, so a
+    slow weekly job cannot hold up an hourly one. A job that is still
+    running when it comes due again is not started twice: the occurrence is
+    recorded as an overlap and, with ``catch_up``, one run follows as soon
+    as the current one ends. Occurrences missed by more than
+    ``misfire_grace_seconds`` (e.g. the process was suspended) collapse
+    into a single catch-up run, or are dropped when ``catch_up`` is False.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.now, max_sleep_seconds: float = 60.0):
+        self.clock = clock
+        self.max_sleep_seconds = max_sleep_seconds
+        self.jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[datetime, int, str, int, datetime]] = []
+        self._sequence = itertools.count()
+        self._owned_executors: Dict[str, ThreadPoolExecutor] = {}
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def add_job(self, name: str, func: Callable, trigger: Any, *args,
+                executor: Optional[Executor] = None,
+                jitter_seconds: float = 0.0,
+                catch_up: bool = True,
+                misfire_grace_seconds: float = 60.0,
+                run_immediately: bool = False) -> Job:
+        """Register (or replace) a recurring job"""
+        previous = self.jobs.get(name)
+        job = Job(name=name, func=func, trigger=trigger, args=args, executor=executor,
+                  jitter_seconds=jitter_seconds, catch_up=catch_up,
+                  misfire_grace_seconds=misfire_grace_seconds,
+                  generation=previous.generation + 1 if previous else 0)
+        if previous:
+            job.stats = previous.stats
+        self.jobs[name] = job
+
+        now = self.clock()
+        self._push(job, now if run_immediately else trigger.next_after(now))
+        return job
+
+    def remove_job(self, name: str):
+        """Stop scheduling a job; a run in progress finishes normally"""
+        job = self.jobs.pop(name, None)
+        if job:
+            job.generation += 1
+        owned = self._owned_executors.pop(name, None)
+        if owned:
+            owned.shutdown(wait=False)
+
+    def next_run(self, name: str) -> Optional[datetime]:
+        job = self.jobs.get(name)
+        return job.next_run if job else None
+
+    def _push(self, job: Job, due: datetime):
+        fire_at = due + timedelta(seconds=random.uniform(0, job.jitter_seconds)) if job.jitter_seconds else due
+        job.next_run = fire_at
+        heapq.heappush(self._heap, (fire_at, next(self._sequence), job.name, job.generation, due))
+        if self._wakeup:
+            self._wakeup.set()
+
+    def start(self) -> asyncio.Task:
+        """Start the scheduler on the running event loop"""
+        if self._task and not self._task.done():
+            return self._task
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run_loop())
+        logger.info(f"Job scheduler started with {len(self.jobs)} jobs")
+        return self._task
+
+    async def stop(self, timeout: Optional[float] = 30.0):
+        """Stop scheduling and wait up to ``timeout`` for running jobs"""
+        self._stopping = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        running = list(self._running_tasks.values())
+        if running:
+            await asyncio.wait(running, timeout=timeout)
+
+        self._shutdown_executors()
+        logger.info("Job scheduler stopped")
+
+    def shutdown(self):
+        """Stop scheduling without waiting, for callers outside the event loop"""
+        self._stopping = True
+        tasks = [self._task, *self._running_tasks.values()] if self._task else list(self._running_tasks.values())
+        for task in tasks:
+            # A task whose loop has closed can no longer be cancelled, or run
+            if not task.done() and not task.get_loop().is_closed():
+                task.cancel()
+        self._task = None
+        self._shutdown_executors()
+        logger.info("Job scheduler shut down")
+
+    def _shutdown_executors(self):
+        for executor in self._owned_executors.values():
+            executor.shutdown(wait=False)
+        self._owned_executors.clear()
+
+    async def _run_loop(self):
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            fire_at, _, name, generation, due = self._heap[0]
+            delay = (fire_at - self.clock()).total_seconds()
+            if delay > 0:
+                # Capped so wall-clock changes are noticed
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(delay, self.max_sleep_seconds))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            job = self.jobs.get(name)
+            if job is None or job.generation != generation:
+                continue
+            self._dispatch(job, fire_at, due)
+
+    def _dispatch(self, job: Job, fire_at: datetime, due: datetime):
+        now = self.clock()
+        late_seconds = (now - fire_at).total_seconds()
+
+        if job.running:
+            job.stats.skipped_overlap += 1
+            job.pending_catch_up = job.pending_catch_up or job.catch_up
+        elif late_seconds > job.misfire_grace_seconds and not job.catch_up:
+            job.stats.missed += 1
+        else:
+            self._start_run(job, catch_up=late_seconds > job.misfire_grace_seconds)
+
+        # Occurrences already in the past are not replayed one by one
+        self._push(job, job.trigger.next_after(max(due, now)))
+
+    def _start_run(self, job: Job, catch_up: bool = False):
+        job.running = True
+        if catch_up:
+            job.stats.catch_up_runs += 1
+        self._running_tasks[job.name] = asyncio.ensure_future(self._execute(job))
+
+    def _executor_for(self, job: Job) -> Executor:
+        if job.executor is not None:
+            return job.executor
+        executor = self._owned_executors.get(job.name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"job-{job.name}")
+            self._owned_executors[job.name] = executor
+        return executor
+
+    async def _execute(self, job: Job):
+        stats = job.stats
+        stats.last_started = self.clock()
+        started = time.monotonic()
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                await job.func(*job.args)
+            else:
+                await asyncio.get_running_loop().run_in_executor(self._executor_for(job), job.func, *job.args)
+            stats.succeeded += 1
+            stats.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.failed += 1
+            stats.last_error = str(e)
+            logger.error(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            elapsed = time.monotonic() - started
+            stats.runs += 1
+            stats.total_seconds += elapsed
+            stats.last_seconds = elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            job.running = False
+            self._running_tasks.pop(job.name, None)
+
+        if job.pending_catch_up and not self._stopping and self.jobs.get(job.name) is job:
+            job.pending_catch_up = False
+            self._start_run(job, catch_up=True)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-job counters, durations and next run time"""
+        report = {}
+        for name, job in self.jobs.items():
+            stats = job.stats
+            report[name] = {
+                **asdict(stats),
+                'avg_seconds': round(stats.total_seconds / stats.runs, 4) if stats.runs else 0.0,
+                'last_started': stats.last_started.isoformat() if stats.last_started else None,
+                'next_run': job.next_run.isoformat() if job.next_run else None,
+                'running': job.running
+            }
+        return report
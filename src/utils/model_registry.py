@@ -0,0 +1,256 @@
+"""
+Process-wide registry for heavyweight NLP models.
+
+Handles:
+- Lazy loading of spaCy, transformers and NLTK models on first use
+- Sharing a single model instance across agents and threads
+- Optional warm-up at application startup
+- Cold-start reporting (load time and memory per model)
+- Remembering failed loads so they are not retried on every call
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelLoadStats:
+    """Cold-start cost of a single registered model"""
+    name: str
+    loaded: bool = False
+    load_seconds: Optional[float] = None
+    memory_mb: Optional[float] = None
+    loaded_at: Optional[float] = None
+    error: Optional[str] = None
+    failed_at: Optional[float] = None
+
+
+class ModelUnavailableError(RuntimeError):
+    """A model whose last load failed and is not due for a retry yet"""
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB, if it can be measured."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+
+    try:
+        import resource
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except (ImportError, OSError, ValueError, IndexError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Thread-safe registry of lazily loaded models.
+
+    Loaders are plain callables registered under a name. A model is built the
+    first time it is requested and the same instance is returned to every
+    caller afterwards. A loader that returns None (e.g. an optional model that
+    is not installed) is cached as well, so the failure is not retried on
+    every call. A loader that raises is remembered too: later calls raise
+    ``ModelUnavailableError`` without loading again until
+    ``retry_failed_after`` seconds have passed or the model is unloaded.
+    """
+
+    def __init__(self, retry_failed_after: float = 300.0):
+        self.retry_failed_after = retry_failed_after
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, ModelLoadStats] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], replace: bool = False):
+        """Register a loader for a model name"""
+        with self._registry_lock:
+            if name in self._loaders and not replace:
+                raise ValueError(f"Model '{name}' is already registered")
+
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+            self._stats[name] = ModelLoadStats(name=name)
+            self._models.pop(name, None)
+
+    def is_loaded(self, name: str) -> bool:
+        """Check whether a model has already been built"""
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        """Return the shared model instance, loading it on first use"""
+        if name in self._models:
+            return self._models[name]
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+
+            stats = self._stats[name]
+            if stats.failed_at is not None and time.monotonic() - stats.failed_at < self.retry_failed_after:
+                raise ModelUnavailableError(f"Model '{name}' failed to load: {stats.error}")
+
+            rss_before = _current_rss_mb()
+            start = time.perf_counter()
+
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                stats.error = str(e)
+                stats.failed_at = time.monotonic()
+                logger.error(f"Failed to load model '{name}': {e}")
+                raise
+
+            stats.load_seconds = round(time.perf_counter() - start, 3)
+            rss_after = _current_rss_mb()
+            if rss_before is not None and rss_after is not None:
+                stats.memory_mb = round(max(0.0, rss_after - rss_before), 1)
+            stats.loaded = model is not None
+            stats.loaded_at = time.time()
+            stats.error = stats.failed_at = None
+
+            self._models[name] = model
+            logger.info(
+                f"Loaded model '{name}' in {stats.load_seconds}s "
+                f"(+{stats.memory_mb if stats.memory_mb is not None else '?'} MB)"
+            )
+
+            return model
+
+    def get_optional(self, name: str) -> Any:
+        """Like ``get``, but None when the model cannot be loaded"""
+        try:
+            return self.get(name)
+        except Exception:
+            # Logged once by get(); the failure is cached until a retry is due
+            return None
+
+    def warm_up(self, names: Optional[Iterable[str]] = None,
+                background: bool = False) -> Optional[threading.Thread]:
+        """
+        Load models ahead of the first request.
+
+        Args:
+            names: Models to load (defaults to every registered model)
+            background: Load in a daemon thread and return it immediately
+
+        Returns:
+            The warm-up thread when background is True, otherwise None
+        """
+        names = list(names) if names is not None else list(self._loaders)
+
+        def _load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    # Already logged; warm-up should not take the process down
+                    pass
+
+        if background:
+            thread = threading.Thread(target=_load_all, name="model-warmup", daemon=True)
+            thread.start()
+            return thread
+
+        _load_all()
+        return None
+
+    def unload(self, name: str):
+        """Drop a loaded model (or a cached failure) so the next call reloads it"""
+        with self._locks[name]:
+            self._models.pop(name, None)
+            self._stats[name] = ModelLoadStats(name=name)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-model load time and memory, for cold-start reporting"""
+        return [asdict(stats) for stats in self._stats.values()]
+
+
+# Default loaders. Imports happen inside each loader so that importing an
+# agent module does not pull in spaCy, transformers or NLTK data.
+
+def _ensure_nltk_resource(resource_path: str, package: str):
+    import nltk
+
+    try:
+        nltk.data.find(resource_path)
+    except LookupError:
+        nltk.download(package, quiet=True)
+
+
+def _load_spacy_en():
+    import spacy
+
+    try:
+        return spacy.load("en_core_web_sm")
+    except OSError:
+        logger.warning("Please install spaCy English model: python -m spacy download en_core_web_sm")
+        return None
+
+
+def _load_transformer_ner():
+    from transformers import pipeline
+
+    # A checkpoint with a trained token-classification head (PER/ORG/LOC/MISC);
+    # base encoders such as legal-bert only yield untrained LABEL_x spans here
+    return pipeline(
+        "ner",
+        model="dslim/bert-base-NER",
+        aggregation_strategy="simple"
+    )
+
+
+def _load_roberta_sentiment():
+    from transformers import pipeline
+
+    return pipeline(
+        "sentiment-analysis",
+        model="cardiffnlp/twitter-roberta-base-sentiment-latest",
+        return_all_scores=True
+    )
+
+
+def _load_vader():
+    _ensure_nltk_resource('corpora/vader_lexicon', 'vader_lexicon')
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    return SentimentIntensityAnalyzer()
+
+
+def _load_nltk_punkt():
+    _ensure_nltk_resource('tokenizers/punkt', 'punkt')
+    return True
+
+
+model_registry = ModelRegistry()
+model_registry.register("spacy_en", _load_spacy_en)
+model_registry.register("transformer_ner", _load_transformer_ner)
+model_registry.register("roberta_sentiment", _load_roberta_sentiment)
+model_registry.register("vader", _load_vader)
+model_registry.register("nltk_punkt", _load_nltk_punkt)
+
+
+def get_model(name: str) -> Any:
+    """Shortcut for model_registry.get"""
+    return model_registry.get(name)
+
+
+def warm_up_models(names: Optional[Iterable[str]] = None,
+                   background: bool = False) -> Optional[threading.Thread]:
+    """Shortcut for model_registry.warm_up"""
+    return model_registry.warm_up(names, background=background)
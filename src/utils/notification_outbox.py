@@ -0,0 +1,545 @@
+"""
+Durable notification outbox and asynchronous dispatcher.
+
+Handles:
+- SQLite outbox rows, one per delivery target, surviving restarts
+- Leased claiming so crashed deliveries are retried, not lost
+- Persistent SMTP sessions and a shared HTTP session for Slack/webhooks
+- Concurrent channels, recipient batching and exponential backoff
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of delivering one outbox row"""
+    success: bool
+    error: Optional[str] = None
+    retry_after: Optional[float] = None
+    permanent: bool = False
+    refused: Optional[Dict[str, Any]] = None  # per-recipient SMTP refusals in a batch
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None  # HTTP-date form; fall back to normal backoff
+
+
+class NotificationOutbox:
+    """
+    SQLite outbox of pending notification deliveries.
+
+    Each row is one delivery target (an email address, phone number,
+    Slack webhook or webhook URL). Claimed rows are leased rather than
+    deleted, so a dispatcher that dies mid-send leaves them to be claimed
+    again once the lease expires (at-least-once delivery).
+    """
+
+    def __init__(self, db_path: str = "notification_outbox.db",
+                 max_attempts: int = 6,
+                 base_delay_seconds: float = 5.0,
+                 max_delay_seconds: float = 900.0,
+                 lease_seconds: float = 120.0):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.lease_seconds = lease_seconds
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Initialize SQLite table for queued deliveries"""
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS notification_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    batch_id TEXT,
+                    payload TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    priority_rank INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at TEXT NOT NULL,
+                    lease_until TEXT,
+                    last_error TEXT,
+                    created_at TEXT NOT NULL,
+                    sent_at TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_outbox_due
+                ON notification_outbox (status, next_attempt_at, priority_rank)
+            """)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(notification_outbox)")}
+            if 'batch_id' not in columns:
+                # Outboxes created before rows were tagged with their enqueue
+                conn.execute("ALTER TABLE notification_outbox ADD COLUMN batch_id TEXT")
+        finally:
+            conn.close()
+
+    def enqueue(self, channel: str, targets: List[str], title: str, message: str,
+                priority: str = 'medium', html_body: Optional[str] = None) -> List[int]:
+        """
+        Queue one delivery per target in a single transaction; returns row ids
+
+        Rows share a batch id, so only targets queued together are ever
+        addressed in the same email.
+        """
+        now = datetime.now().isoformat()
+        batch_id = uuid.uuid4().hex
+        payload = json.dumps({'title': title, 'message': message,
+                              'priority': priority, 'html_body': html_body})
+        rank = PRIORITY_RANK.get(priority, PRIORITY_RANK['medium'])
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            ids = [
+                conn.execute("""
+                    INSERT INTO notification_outbox
+                        (channel, target, batch_id, payload, priority, priority_rank, next_attempt_at, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (channel, target, batch_id, payload, priority, rank, now, now)).lastrowid
+                for target in targets
+            ]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return ids
+
+    def claim_due(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` due rows, most urgent first"""
+        now = datetime.now()
+        lease_until = (now + timedelta(seconds=self.lease_seconds)).isoformat()
+        now_iso = now.isoformat()
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("""
+                SELECT * FROM notification_outbox
+                WHERE (status = 'pending' AND next_attempt_at <= ?)
+                   OR (status = 'sending' AND lease_until <= ?)
+                ORDER BY priority_rank, next_attempt_at, id
+                LIMIT ?
+            """, (now_iso, now_iso, limit)).fetchall()
+            conn.executemany(
+                "UPDATE notification_outbox SET status = 'sending', lease_until = ? WHERE id = ?",
+                [(lease_until, row['id']) for row in rows]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        claimed = []
+        for row in rows:
+            item = dict(row)
+            item.update(json.loads(item.pop('payload')))
+            claimed.append(item)
+        return claimed
+
+    def mark_sent(self, ids: List[int]):
+        """Record successful deliveries"""
+        if not ids:
+            return
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            conn.executemany("""
+                UPDATE notification_outbox
+                SET status = 'sent', sent_at = ?, lease_until = NULL, last_error = NULL,
+                    attempts = attempts + 1
+                WHERE id = ?
+            """, [(now, row_id) for row_id in ids])
+        finally:
+            conn.close()
+
+    def retry_delay(self, attempts: int, retry_after: Optional[float] = None) -> float:
+        """Jittered exponential backoff, never sooner than the server asked"""
+        delay = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** max(attempts - 1, 0)))
+        delay *= random.uniform(0.5, 1.0)
+        return max(delay, retry_after or 0.0)
+
+    def mark_failed(self, ids: List[int], error: str, retry_after: Optional[float] = None,
+                    permanent: bool = False):
+        """Schedule a retry with backoff, or give up after ``max_attempts``"""
+        if not ids:
+            return
+        now = datetime.now()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for row_id in ids:
+                row = conn.execute("SELECT attempts FROM notification_outbox WHERE id = ?", (row_id,)).fetchone()
+                if row is None:
+                    continue
+                attempts = row['attempts'] + 1
+                if permanent or attempts >= self.max_attempts:
+                    conn.execute("""
+                        UPDATE notification_outbox
+                        SET status = 'dead', attempts = ?, last_error = ?, lease_until = NULL
+                        WHERE id = ?
+                    """, (attempts, error, row_id))
+                    logger.error(f"Notification {row_id} abandoned after {attempts} attempts: {error}")
+                else:
+                    next_attempt = now + timedelta(seconds=self.retry_delay(attempts, retry_after))
+                    conn.execute("""
+                        UPDATE notification_outbox
+                        SET status = 'pending', attempts = ?, last_error = ?, lease_until = NULL,
+                            next_attempt_at = ?
+                        WHERE id = ?
+                    """, (attempts, error, next_attempt.isoformat(), row_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def status_counts(self) -> Dict[str, int]:
+        """Number of rows in each status"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS count FROM notification_outbox GROUP BY status"
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row['status']: row['count'] for row in rows}
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of logged-in SMTP sessions.
+
+    Sessions are opened lazily up to ``size`` and reused across messages,
+    so STARTTLS and AUTH happen once per connection rather than once per
+    email. Idle sessions are checked with NOOP and reopened if the server
+    has dropped them.
+    """
+
+    def __init__(self, host: str, port: int, username: str = "", password: str = "",
+                 use_tls: bool = True, size: int = 2, timeout: float = 30.0,
+                 idle_check_seconds: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.idle_check_seconds = idle_check_seconds
+
+        self._idle: "queue.Queue" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._stats_lock = threading.Lock()
+        self.stats = {'connections_opened': 0, 'messages_sent': 0, 'reconnects': 0}
+
+    def _open(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        with self._stats_lock:
+            self.stats['connections_opened'] += 1
+        return server
+
+    def _checkout(self) -> smtplib.SMTP:
+        try:
+            server, idle_since = self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+        if time.monotonic() - idle_since > self.idle_check_seconds:
+            try:
+                if server.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP failed")
+            except (smtplib.SMTPException, OSError):
+                self._close(server)
+                return self._open()
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def send_message(self, msg, to_addrs: List[str]) -> Dict[str, Any]:
+        """Send one message to ``to_addrs``; returns refused recipients"""
+        with self._slots:
+            server = self._checkout()
+            try:
+                try:
+                    refused = server.send_message(msg, to_addrs=to_addrs)
+                except smtplib.SMTPServerDisconnected:
+                    # Server closed an idle session between checks
+                    self._close(server)
+                    with self._stats_lock:
+                        self.stats['reconnects'] += 1
+                    server = self._open()
+                    refused = server.send_message(msg, to_addrs=to_addrs)
+            except smtplib.SMTPRecipientsRefused:
+                self._idle.put((server, time.monotonic()))
+                raise
+            except Exception:
+                self._close(server)
+                raise
+
+            self._idle.put((server, time.monotonic()))
+            with self._stats_lock:
+                self.stats['messages_sent'] += 1
+            return refused
+
+    def close(self):
+        """Close all idle sessions"""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(server)
+
+
+class NotificationDispatcher:
+    """
+    Drains a NotificationOutbox in the background.
+
+    Each pass claims due rows and delivers every channel concurrently:
+    emails queued by the same ``enqueue`` call share one SMTP transaction
+    (up to ``email_batch_size`` recipients) on pooled sessions, Slack and webhook
+    posts share one HTTP session, and Twilio calls run on worker threads.
+    Failures are rescheduled with backoff by the outbox.
+    """
+
+    def __init__(self, manager, outbox: Optional[NotificationOutbox] = None,
+                 smtp_pool: Optional[SMTPConnectionPool] = None,
+                 poll_seconds: Optional[float] = None,
+                 batch_size: int = 200,
+                 email_batch_size: Optional[int] = None,
+                 http_timeout_seconds: float = 10.0,
+                 max_workers: int = 4):
+        config = manager.config
+        self.manager = manager
+        self.outbox = outbox or manager.outbox or NotificationOutbox(
+            config.outbox_db_path, max_attempts=config.outbox_max_attempts)
+        self.smtp_pool = smtp_pool or SMTPConnectionPool(
+            config.smtp_host, config.smtp_port, config.smtp_username, config.smtp_password,
+            use_tls=config.smtp_use_tls, size=config.smtp_pool_size)
+        self.poll_seconds = poll_seconds if poll_seconds is not None else config.outbox_poll_seconds
+        self.batch_size = batch_size
+        self.email_batch_size = email_batch_size or config.email_batch_size
+        self.http_timeout_seconds = http_timeout_seconds
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="notify")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._twilio_client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'passes': 0, 'delivered': 0, 'failed': 0}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.http_timeout_seconds))
+        return self._session
+
+    def start(self) -> asyncio.Task:
+        """Start draining on the running event loop"""
+        if self._task and not self._task.done():
+            return self._task
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run_loop())
+        logger.info("Notification dispatcher started")
+        return self._task
+
+    def wake(self):
+        """Ask for an immediate pass; safe to call from any thread"""
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def stop(self, drain: bool = True):
+        """Stop the loop, optionally deliver what is already due, and release connections"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if drain:
+            await self.dispatch_once()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.smtp_pool.close)
+        self._executor.shutdown(wait=False)
+        logger.info("Notification dispatcher stopped")
+
+    async def _run_loop(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                delivered = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Notification dispatch pass failed: {e}")
+                delivered = 0
+            if delivered >= self.batch_size:
+                continue  # backlog: go again without waiting
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def dispatch_once(self) -> int:
+        """Deliver one batch of due rows; returns the number claimed"""
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(self._executor, self.outbox.claim_due, self.batch_size)
+        if not rows:
+            return 0
+
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        deliveries = []
+        for row in rows:
+            if row['channel'] == 'email':
+                # Separate enqueues never share a To: header, even with identical content
+                groups.setdefault(row['batch_id'] or f"row:{row['id']}", []).append(row)
+            else:
+                deliveries.append(([row], self._deliver_one(row)))
+
+        for group in groups.values():
+            for start in range(0, len(group), self.email_batch_size):
+                batch = group[start:start + self.email_batch_size]
+                deliveries.append((batch, self._deliver_email(batch)))
+
+        results = await asyncio.gather(*(coro for _, coro in deliveries), return_exceptions=True)
+
+        sent, failures = [], []
+        for (batch, _), result in zip(deliveries, results):
+            if isinstance(result, Exception):
+                result = DeliveryResult(False, error=str(result))
+            if result.success and result.refused:
+                refused = [row['id'] for row in batch if row['target'] in result.refused]
+                failures.append((refused, DeliveryResult(False, error="Recipient refused", permanent=True)))
+                sent.extend(row['id'] for row in batch if row['target'] not in result.refused)
+            elif result.success:
+                sent.extend(row['id'] for row in batch)
+            else:
+                failures.append(([row['id'] for row in batch], result))
+
+        await loop.run_in_executor(self._executor, self._record, sent, failures)
+        self.stats['passes'] += 1
+        self.stats['delivered'] += len(sent)
+        self.stats['failed'] += sum(len(ids) for ids, _ in failures)
+        return len(rows)
+
+    def _record(self, sent: List[int], failures: List[tuple]):
+        self.outbox.mark_sent(sent)
+        for ids, result in failures:
+            self.outbox.mark_failed(ids, result.error or "delivery failed",
+                                    retry_after=result.retry_after, permanent=result.permanent)
+
+    async def _deliver_one(self, row: Dict[str, Any]) -> DeliveryResult:
+        channel = row['channel']
+        if channel == 'slack':
+            payload = self.manager.build_slack_payload(row['title'], row['message'])
+            return await self._post_json(row['target'], payload)
+        if channel == 'webhook':
+            payload = self.manager.build_webhook_payload(row['title'], row['message'], row['priority'])
+            return await self._post_json(row['target'], payload)
+        if channel == 'sms':
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._send_sms, row)
+        return DeliveryResult(False, error=f"Unknown channel {channel}", permanent=True)
+
+    async def _post_json(self, url: str, payload: Dict[str, Any]) -> DeliveryResult:
+        session = await self._get_session()
+        try:
+            async with session.post(url, json=payload) as response:
+                if response.status < 300:
+                    return DeliveryResult(True)
+                return DeliveryResult(
+                    False,
+                    error=f"HTTP {response.status}",
+                    retry_after=_parse_retry_after(response.headers.get('Retry-After')),
+                    permanent=400 <= response.status < 500 and response.status not in (408, 429)
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return DeliveryResult(False, error=str(e) or type(e).__name__)
+
+    async def _deliver_email(self, rows: List[Dict[str, Any]]) -> DeliveryResult:
+        first = rows[0]
+        recipients = [row['target'] for row in rows]
+        msg = self.manager.build_email_message(first['title'], first['message'], recipients, first['html_body'])
+        loop = asyncio.get_running_loop()
+        try:
+            refused = await loop.run_in_executor(self._executor, self.smtp_pool.send_message, msg, recipients)
+        except smtplib.SMTPRecipientsRefused as e:
+            return DeliveryResult(False, error=f"Recipients refused: {e.recipients}", permanent=True)
+        except (smtplib.SMTPException, OSError) as e:
+            return DeliveryResult(False, error=str(e) or type(e).__name__)
+        return DeliveryResult(True, refused=refused or None)
+
+    def _send_sms(self, row: Dict[str, Any]) -> DeliveryResult:
+        config = self.manager.config
+        try:
+            if self._twilio_client is None:
+                from twilio.rest import Client
+                self._twilio_client = Client(config.twilio_account_sid, config.twilio_auth_token)
+            self._twilio_client.messages.create(
+                body=self.manager.build_sms_body(row['title'], row['message']),
+                from_=config.twilio_from_number,
+                to=row['target']
+            )
+        except ImportError:
+            return DeliveryResult(False, error="Twilio library not installed", permanent=True)
+        except Exception as e:
+            return DeliveryResult(False, error=str(e))
+        return DeliveryResult(True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Dispatcher counters, SMTP pool usage and outbox depth"""
+        return {
+            **self.stats,
+            'smtp': dict(self.smtp_pool.stats),
+            'outbox': self.outbox.status_counts()
+        }
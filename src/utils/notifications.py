@@ -19,6 +19,9 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dataclasses import dataclass
 
+from .alert_coalescing import AlertCoalescer
+from .notification_outbox import NotificationOutbox
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -52,14 +55,41 @@ class NotificationConfig:
     default_email_recipients: List[str] = None
     default_sms_recipients: List[str] = None
 
+    # Delivery settings
+    smtp_use_tls: bool = True
+    outbox_enabled: bool = False  # enqueue for NotificationDispatcher instead of sending inline
+    outbox_db_path: str = "notification_outbox.db"
+    outbox_poll_seconds: float = 2.0
+    outbox_max_attempts: int = 6
+    smtp_pool_size: int = 2
+    email_batch_size: int = 50  # max recipients per SMTP transaction
+
+    # Alert coalescing (see AlertCoalescer)
+    alert_coalescing_enabled: bool = False
+    alert_window_seconds: float = 300.0
+    alert_dedupe_ttl_seconds: float = 3600.0
+    alert_digest_max_items: int = 50
+
 class NotificationManager:
     """
     Centralized notification management for automation agents.
     Handles multiple notification channels with priority routing.
     """
 
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, outbox: Optional[NotificationOutbox] = None):
         self.config = NotificationConfig(**config)
+        self.outbox = outbox
+        if self.outbox is None and self.config.outbox_enabled:
+            self.outbox = NotificationOutbox(self.config.outbox_db_path)
+
+        self.coalescer: Optional[AlertCoalescer] = None
+        if self.config.alert_coalescing_enabled:
+            self.coalescer = AlertCoalescer(
+                self.send_notification,
+                window_seconds=self.config.alert_window_seconds,
+                dedupe_ttl_seconds=self.config.alert_dedupe_ttl_seconds,
+                max_digest_items=self.config.alert_digest_max_items
+            )
 
         # Priority mapping
         self.priority_channels = {
@@ -92,6 +122,9 @@ class NotificationManager:
         if channels is None:
             channels = self.priority_channels.get(priority, ['email'])
 
+        if self.outbox is not None:
+            return self._enqueue(title, message, priority, recipients, channels)
+
         # Send through each channel
         for channel in channels:
             try:
@@ -116,8 +149,58 @@ class NotificationManager:
     def send_email(self, recipient: str, subject: str, body: str,
                    html_body: Optional[str] = None) -> bool:
         """Send email notification to specific recipient"""
+        if self.outbox is not None:
+            return bool(self.outbox.enqueue('email', [recipient], subject, body, html_body=html_body))
         return self._send_email(subject, body, [recipient], html_body)
 
+    def _enqueue(self, title: str, message: str, priority: str,
+                 recipients: Optional[List[str]], channels: List[str]) -> Dict[str, bool]:
+        """Queue one outbox row per delivery target; True means durably queued"""
+        results = {}
+        for channel in channels:
+            targets = self._channel_targets(channel, recipients)
+            if not targets:
+                results[channel] = False
+                logger.warning(f"Channel {channel} not enabled or has no recipients")
+                continue
+            results[channel] = bool(self.outbox.enqueue(channel, targets, title, message, priority))
+        return results
+
+    def _channel_targets(self, channel: str, recipients: Optional[List[str]]) -> List[str]:
+        if channel == 'email' and self.config.email_enabled:
+            return recipients or self.config.default_email_recipients or []
+        if channel == 'sms' and self.config.sms_enabled:
+            return recipients or self.config.default_sms_recipients or []
+        if channel == 'slack' and self.config.slack_enabled and self.config.slack_webhook_url:
+            return [self.config.slack_webhook_url]
+        if channel == 'webhook' and self.config.webhook_enabled:
+            return self.config.webhook_urls or []
+        return []
+
+    def send_alert_event(self, alert_type: str, title: str, message: str,
+                         priority: str = 'medium',
+                         recipients: Optional[List[str]] = None,
+                         dedupe_key: Optional[str] = None,
+                         summary: Optional[str] = None) -> bool:
+        """
+        Send an event-style alert, coalesced into digests when enabled.
+
+        With coalescing off this is a plain send_notification. With it on,
+        the alert joins a digest for its type, priority and recipients
+        (critical alerts go out at once) and repeats of ``dedupe_key`` are
+        dropped. ``summary`` is the one-line form used inside a digest.
+        """
+        if self.coalescer is not None:
+            return self.coalescer.submit(alert_type, title, message, priority, recipients,
+                                         dedupe_key=dedupe_key, summary=summary)
+        return any(self.send_notification(title, message, priority, recipients).values())
+
+    def flush_alerts(self, force: bool = False) -> int:
+        """Send digests whose window has closed (all pending ones with ``force``)"""
+        if self.coalescer is None:
+            return 0
+        return self.coalescer.flush() if force else self.coalescer.flush_due()
+
     def send_business_metric_alert(self, metric_name: str, current_value: float,
                                  threshold: float, trend: str) -> bool:
         """Send specialized business metric alert"""
@@ -165,7 +248,12 @@ class NotificationManager:
         Check the inventory management system for details.
         """
 
-        return any(self.send_notification(title, message, priority).values())
+        status = 'stockout' if current_stock == 0 else 'low_stock'
+        return self.send_alert_event(
+            'inventory_alert', title, message, priority,
+            dedupe_key=f"inventory:{product_name}:{location}:{status}",
+            summary=f"{product_name} @ {location}: {current_stock} on hand (reorder point {reorder_point})"
+        )
 
     def send_meeting_notification(self, meeting_title: str, scheduled_time: datetime,
                                 attendees: List[str], status: str) -> bool:
@@ -204,25 +292,14 @@ class NotificationManager:
                 logger.warning("No email recipients configured")
                 return False
 
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.config.from_email
-            msg['To'] = ', '.join(recipients)
-
-            # Add plain text part
-            text_part = MIMEText(body, 'plain')
-            msg.attach(text_part)
-
-            # Add HTML part if provided
-            if html_body:
-                html_part = MIMEText(html_body, 'html')
-                msg.attach(html_part)
+            msg = self.build_email_message(subject, body, recipients, html_body)
 
             # Send email
             with smtplib.SMTP(self.config.smtp_host, self.config.smtp_port) as server:
-                server.starttls()
-                server.login(self.config.smtp_username, self.config.smtp_password)
+                if self.config.smtp_use_tls:
+                    server.starttls()
+                if self.config.smtp_username:
+                    server.login(self.config.smtp_username, self.config.smtp_password)
                 server.send_message(msg)
 
             logger.info(f"Email sent successfully to {len(recipients)} recipients")
@@ -232,6 +309,56 @@ class NotificationManager:
             logger.error(f"Failed to send email: {e}")
             return False
 
+    def build_email_message(self, subject: str, body: str, recipients: List[str],
+                            html_body: Optional[str] = None) -> MIMEMultipart:
+        """Build the MIME message for a notification email"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.config.from_email
+        msg['To'] = ', '.join(recipients)
+
+        # Add plain text part
+        text_part = MIMEText(body, 'plain')
+        msg.attach(text_part)
+
+        # Add HTML part if provided
+        if html_body:
+            html_part = MIMEText(html_body, 'html')
+            msg.attach(html_part)
+
+        return msg
+
+    def build_slack_payload(self, title: str, message: str) -> Dict[str, Any]:
+        """Format a notification for the Slack incoming webhook"""
+        return {
+            "channel": self.config.slack_channel,
+            "username": "Automation Agent",
+            "icon_emoji": ":robot_face:",
+            "attachments": [
+                {
+                    "color": "warning",
+                    "title": title,
+                    "text": message,
+                    "footer": "Automation Agent",
+                    "ts": int(datetime.utcnow().timestamp())
+                }
+            ]
+        }
+
+    def build_webhook_payload(self, title: str, message: str, priority: str) -> Dict[str, Any]:
+        """Format a notification for generic webhooks"""
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "title": title,
+            "message": message,
+            "priority": priority,
+            "source": "automation_agent"
+        }
+
+    def build_sms_body(self, title: str, message: str) -> str:
+        """Format a notification for SMS (keep it short)"""
+        return f"{title}\n\n{message[:140]}..."  # Truncate for SMS
+
     def _send_slack(self, title: str, message: str) -> bool:
         """Send Slack notification"""
         try:
@@ -240,20 +367,7 @@ class NotificationManager:
                 return False
 
             # Format message for Slack
-            slack_message = {
-                "channel": self.config.slack_channel,
-                "username": "Automation Agent",
-                "icon_emoji": ":robot_face:",
-                "attachments": [
-                    {
-                        "color": "warning",
-                        "title": title,
-                        "text": message,
-                        "footer": "Automation Agent",
-                        "ts": int(datetime.utcnow().timestamp())
-                    }
-                ]
-            }
+            slack_message = self.build_slack_payload(title, message)
 
             response = requests.post(
                 self.config.slack_webhook_url,
@@ -294,7 +408,7 @@ class NotificationManager:
             client = Client(self.config.twilio_account_sid, self.config.twilio_auth_token)
 
             # Format SMS message (keep it short)
-            sms_body = f"{title}\n\n{message[:140]}..."  # Truncate for SMS
+            sms_body = self.build_sms_body(title, message)
 
             success_count = 0
             for recipient in recipients:
@@ -322,13 +436,7 @@ class NotificationManager:
                 logger.warning("No webhook URLs configured")
                 return False
 
-            webhook_payload = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "title": title,
-                "message": message,
-                "priority": priority,
-                "source": "automation_agent"
-            }
+            webhook_payload = self.build_webhook_payload(title, message, priority)
 
             success_count = 0
             for webhook_url in self.config.webhook_urls:
@@ -361,8 +469,10 @@ class AlertManager:
     Advanced alert management with rate limiting, escalation, and deduplication.
     """
 
-    def __init__(self, notification_manager: NotificationManager):
+    def __init__(self, notification_manager: NotificationManager,
+                 coalescer: Optional[AlertCoalescer] = None):
         self.notification_manager = notification_manager
+        self.coalescer = coalescer or notification_manager.coalescer
         self.alert_history = {}  # Track recent alerts
         self.escalation_rules = {}
 
@@ -377,9 +487,17 @@ class AlertManager:
             cooldown_minutes: Minimum time between same alerts
 
         Returns:
-            True if alert was sent, False if suppressed
+            True if alert was sent (or queued for a digest), False if suppressed
         """
         alert_key = f"{alert_type}_{hash(str(sorted(alert_data.items())))}"
+
+        if self.coalescer is not None:
+            # Cooldown becomes the dedupe TTL; non-critical alerts share a digest
+            title, message, priority = self._format_alert(alert_type, alert_data)
+            return self.coalescer.submit(alert_type, title, message, priority,
+                                         dedupe_key=alert_key, summary=title,
+                                         dedupe_ttl_seconds=cooldown_minutes * 60)
+
         current_time = datetime.utcnow()
 
         # Check if similar alert was sent recently
@@ -0,0 +1,180 @@
+"""
+Rate limiting utilities for outbound API calls.
+
+Handles:
+- Token-bucket limiting of request rates per provider
+- Bursts up to a configured capacity, steady rate afterwards
+- Fair (FIFO) waiting for concurrent asyncio callers
+- A thread-safe variant for blocking clients on worker threads
+- Parsing Retry-After headers from throttled responses
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def retry_after_seconds(value: Optional[str], default: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header
+
+    Accepts both delay-seconds and HTTP-date forms; returns ``default`` when
+    the header is missing or unparseable. Never negative.
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if moment is None:
+        return default
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+class AsyncTokenBucket:
+    """
+    Token-bucket rate limiter for asyncio code.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each request takes one token; callers wait only as long as needed for
+    the next token instead of sleeping a fixed interval after every call.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_interval(cls, seconds_between_requests: float, capacity: float = 1.0) -> "AsyncTokenBucket":
+        """Build a bucket from a minimum interval between requests"""
+        return cls(rate=1.0 / seconds_between_requests, capacity=capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    @property
+    def available_tokens(self) -> float:
+        """Tokens available right now"""
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens without waiting; return False if not enough are available"""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until tokens are available, then take them"""
+        if tokens > self.capacity:
+            raise ValueError("Cannot acquire more tokens than the bucket capacity")
+
+        # Created lazily so the lock binds to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so no tokens are issued for the given time (e.g. after a 429)"""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for blocking (``requests``-based) clients.
+
+    Same refill and penalty rules as ``AsyncTokenBucket``; ``acquire``
+    blocks the calling thread, so worker threads sharing one bucket stay
+    within the provider's quota together.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, capacity: float = 1.0) -> "TokenBucket":
+        """Build a bucket from a per-minute quota"""
+        return cls(rate=requests_per_minute / 60.0, capacity=capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens without waiting; return False if not enough are available"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until tokens are available, then take them"""
+        if tokens > self.capacity:
+            raise ValueError("Cannot acquire more tokens than the bucket capacity")
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so no tokens are issued for the given time (e.g. after a 429)"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
@@ -0,0 +1,201 @@
+"""
+Cached snapshots of expensive, read-mostly views such as the dashboard.
+
+Handles:
+- Serving the last built snapshot immediately (stale-while-revalidate)
+- Rebuilding only the sections invalidated by writes
+- Coalescing concurrent refreshes into a single build
+- ETags for conditional requests
+- Backing off after failed builds
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotUnavailableError(RuntimeError):
+    """No snapshot has been built yet and the last build failed too recently to retry"""
+
+
+@dataclass
+class Snapshot:
+    """One assembled snapshot, when its content last changed and when it was built"""
+    data: Dict[str, Any]
+    etag: str
+    generated_at: datetime
+    version: int
+    built_monotonic: float
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.built_monotonic
+
+
+class SnapshotService:
+    """
+    Keeps an assembled snapshot built from independently refreshed sections.
+
+    ``sections`` maps a section name to an async builder. ``assemble``
+    combines the latest section results into the served payload. Sections
+    are rebuilt when invalidated or older than ``max_age_seconds``; the rest
+    are reused from the previous build.
+
+    ``invalidate`` only marks sections and may be called from any thread;
+    builds always run on the event loop that calls ``get``/``refresh``.
+
+    After a failed build, ``get`` waits ``failure_backoff_seconds`` (doubling
+    per consecutive failure, up to ``max_backoff_seconds``) before starting
+    another one; explicit ``refresh`` calls are not delayed.
+    """
+
+    def __init__(self,
+                 sections: Dict[str, Callable[[], Awaitable[Any]]],
+                 assemble: Callable[[Dict[str, Any], datetime], Dict[str, Any]],
+                 max_age_seconds: float = 900.0,
+                 failure_backoff_seconds: float = 5.0,
+                 max_backoff_seconds: float = 300.0):
+        self.sections = sections
+        self.assemble = assemble
+        self.max_age_seconds = max_age_seconds
+        self.failure_backoff_seconds = failure_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.snapshot: Optional[Snapshot] = None
+        self.stats = {'refreshes': 0, 'coalesced': 0, 'invalidations': 0, 'failures': 0, 'sections_built': 0}
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+
+        self._section_data: Dict[str, Any] = {}
+        self._section_built: Dict[str, float] = {}
+        self._dirty = set(sections)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+
+    def invalidate(self, *sections: str):
+        """Mark sections (all when none are given) for rebuild"""
+        self._dirty.update(sections or self.sections)
+        self.stats['invalidations'] += 1
+
+    def _due_sections(self) -> set:
+        now = time.monotonic()
+        return {
+            name for name in self.sections
+            if name in self._dirty
+            or name not in self._section_built
+            or now - self._section_built[name] > self.max_age_seconds
+        }
+
+    @property
+    def is_stale(self) -> bool:
+        return self.snapshot is None or bool(self._due_sections())
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    @property
+    def backing_off(self) -> bool:
+        return time.monotonic() < self._retry_at
+
+    async def get(self) -> Snapshot:
+        """
+        Return the current snapshot without waiting on a rebuild
+
+        Only the very first call waits. Later calls that find the snapshot
+        stale start a background refresh and return the previous snapshot.
+        """
+        if self.snapshot is None:
+            if self.backing_off and not self.refreshing:
+                raise SnapshotUnavailableError(f"Snapshot build failed: {self.last_error}")
+            return await self.refresh()
+        if self.is_stale and not self.refreshing and not self.backing_off:
+            self._start_refresh()
+        return self.snapshot
+
+    async def refresh(self, force: bool = False) -> Snapshot:
+        """Rebuild due sections, joining a refresh that is already running"""
+        if force:
+            self._dirty.update(self.sections)
+        if self.refreshing:
+            self.stats['coalesced'] += 1
+        else:
+            self._start_refresh()
+        return await asyncio.shield(self._refresh_task)
+
+    def _start_refresh(self):
+        self._refresh_task = asyncio.ensure_future(self._rebuild())
+        self._refresh_task.add_done_callback(self._log_refresh_failure)
+
+    def _log_refresh_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Snapshot refresh failed: {task.exception()}")
+
+    async def _rebuild(self) -> Snapshot:
+        names = sorted(self._due_sections())
+        # Writes landing during the build mark their section dirty again
+        self._dirty.difference_update(names)
+
+        try:
+            results = await asyncio.gather(*(self.sections[name]() for name in names))
+        except Exception as e:
+            self._dirty.update(names)
+            self.stats['failures'] += 1
+            self.consecutive_failures += 1
+            self.last_error = str(e)
+            backoff = self.failure_backoff_seconds * 2 ** (self.consecutive_failures - 1)
+            self._retry_at = time.monotonic() + min(backoff, self.max_backoff_seconds)
+            raise
+
+        self.consecutive_failures = 0
+        self.last_error = None
+        self._retry_at = 0.0
+        built = time.monotonic()
+        for name, result in zip(names, results):
+            self._section_data[name] = result
+            self._section_built[name] = built
+        self.stats['sections_built'] += len(names)
+        self.stats['refreshes'] += 1
+
+        digest = hashlib.sha1(
+            json.dumps(self._section_data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        etag = f'W/"{digest}"'
+        previous = self.snapshot
+
+        if previous is not None and previous.etag == etag:
+            # Unchanged content keeps its payload and timestamp, so a 304 for
+            # this tag still matches exactly what a 200 would send
+            data, generated_at = previous.data, previous.generated_at
+        else:
+            generated_at = datetime.utcnow()
+            data = self.assemble(dict(self._section_data), generated_at)
+
+        self.snapshot = Snapshot(
+            data=data,
+            etag=etag,
+            generated_at=generated_at,
+            version=previous.version + 1 if previous else 1,
+            built_monotonic=built
+        )
+        return self.snapshot
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Weak comparison of an If-None-Match header against an ETag"""
+        if not if_none_match:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        if '*' in candidates:
+            return True
+        return _opaque_tag(etag) in {_opaque_tag(tag) for tag in candidates}
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith('W/') else tag
@@ -5,6 +5,7 @@ Tests campaign creation, personalization, A/B testing, and performance tracking
 
 import pytest
 import asyncio
+import sqlite3
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, AsyncMock
 import json
@@ -20,7 +21,10 @@ from src.agents.email_campaign_writer import (
     EmailCampaign,
     CampaignPerformance,
     CampaignType,
-    SegmentCriteria
+    SegmentCriteria,
+    SegmentRule,
+    DEFAULT_SEGMENT_RULES,
+    compile_template
 )
 
 
@@ -216,6 +220,241 @@ class TestEmailCampaignWriter:
         assert '{first_name}' not in personalized_content  # Should be replaced
         assert '$299.99' in personalized_content  # Total spent
 
+    def test_compiled_template(self):
+        """Templates should be parsed once into literals and placeholder names"""
+        template = compile_template("Hi {first_name}, {unknown} see {company}!")
+
+        assert template.fields == ['first_name', 'unknown', 'company']
+        assert template.render({'first_name': 'Ann', 'company': 'Acme'}) == "Hi Ann,  see Acme!"
+        assert compile_template("Hi {first_name}, {unknown} see {company}!") is template
+
+    def test_render_many_streams_personalized_emails(self, email_writer):
+        """Bulk rendering should personalize lazily from precomputed attributes"""
+        for i, category in enumerate(['books', 'games']):
+            email_writer.add_customer({
+                'id': f'cust_{i}',
+                'email': f'user{i}@example.com',
+                'name': f'User{i} Smith',
+                'purchase_history': [
+                    {'amount': 10.0, 'category': category, 'date': datetime(2024, 3, 1)},
+                    {'amount': 15.5, 'category': category, 'date': datetime(2024, 5, 1)},
+                    {'amount': 5.0, 'category': 'misc', 'date': datetime(2024, 1, 1)}
+                ],
+                'engagement_score': 60.0,
+                'preferences': {'cart_items': ['lamp', 'desk', 'chair', 'rug']}
+            })
+
+        campaign = EmailCampaign(
+            id='camp_bulk',
+            name='Cart Recovery',
+            campaign_type=CampaignType.ABANDONED_CART,
+            subject_lines=['Still there?'],
+            content_variants=["{first_name}: {favorite_category}, {total_spent}, {last_purchase_date}, {cart_items}{missing}"],
+            target_segments=['new'],
+            send_time=datetime.now(),
+            personalization_fields=[]
+        )
+
+        customers = (email_writer.customers[cid] for cid in ['cust_0', 'cust_1'])
+        rendered = email_writer.render_many(customers, campaign.content_variants[0], campaign)
+
+        customer, content = next(rendered)
+        assert customer.id == 'cust_0'
+        assert content == "User0: books, $30.50, May 2024, lamp, desk, chair"
+        assert [content for _, content in rendered] == ["User1: games, $30.50, May 2024, lamp, desk, chair"]
+
+        # Attributes follow edits once the customer is updated
+        customer = email_writer.customers['cust_0']
+        customer.purchase_history.append({'amount': 4.5, 'category': 'books', 'date': datetime(2024, 6, 1)})
+        customer.purchase_history[0]['category'] = 'games'
+        customer.demographics['company'] = 'Acme'
+        assert email_writer.update_customer('cust_0', name='Renamed Person') is customer
+        personalized = asyncio.run(email_writer.personalize_content(
+            customer, "Hello {first_name} from {company}: {total_spent}, {last_purchase_date}", campaign
+        ))
+        assert personalized == "Hello Renamed from Acme: $35.00, June 2024"
+        assert next(email_writer.render_many([customer], "{favorite_category}", campaign))[1] == 'books'
+        customer.purchase_history[2]['category'] = 'games'
+        email_writer.update_customer('cust_0')
+        assert next(email_writer.render_many([customer], "{favorite_category}", campaign))[1] == 'games'
+
+    def test_remove_customer_clears_cached_state(self, email_writer):
+        """Removed customers should leave no cached attributes or segment memberships"""
+        email_writer.add_customer({
+            'id': 'cust_gone',
+            'email': 'gone@example.com',
+            'name': 'Gone Person',
+            'purchase_history': [],
+            'engagement_score': 90.0,
+            'lifecycle_stage': 'new'
+        })
+        campaign = EmailCampaign(
+            id='camp_gone',
+            name='Welcome',
+            campaign_type=CampaignType.WELCOME,
+            subject_lines=['Hi'],
+            content_variants=['{first_name}'],
+            target_segments=['new'],
+            send_time=datetime.now(),
+            personalization_fields=[]
+        )
+        customer = email_writer.customers['cust_gone']
+        assert next(email_writer.render_many([customer], '{first_name}', campaign))[1] == 'Gone'
+        assert 'cust_gone' in email_writer._customer_attributes
+        assert email_writer.segments.has_member('new', 'cust_gone')
+
+        assert email_writer.remove_customer('cust_gone') is customer
+        assert 'cust_gone' not in email_writer.customers
+        assert 'cust_gone' not in email_writer._customer_attributes
+        assert not email_writer.segments.has_member('new', 'cust_gone')
+        email_writer.resegment_customers()
+        assert not email_writer.segments.has_member('new', 'cust_gone')
+        assert 'cust_gone' not in email_writer.select_customers()
+
+        # Rendering a customer that is not registered does not grow the cache
+        assert next(email_writer.render_many([customer], '{first_name}', campaign))[1] == 'Gone'
+        assert 'cust_gone' not in email_writer._customer_attributes
+        assert email_writer.remove_customer('cust_gone') is None
+
+    def _sending_writer(self, sample_config, tmp_path, count):
+        writer = EmailCampaignWriter({**sample_config, 'send_db_path': str(tmp_path / 'sends.db')})
+        for i in range(count):
+            writer.add_customer({
+                'id': f'cust_{i:03d}',
+                'email': f'user{i}@example.com',
+                'name': f'User{i} Smith',
+                'purchase_history': [],
+                'engagement_score': 50.0,
+                'lifecycle_stage': 'new'
+            })
+
+        campaign = EmailCampaign(
+            id='camp_send',
+            name='Welcome',
+            campaign_type=CampaignType.WELCOME,
+            subject_lines=['Hi {first_name}'],
+            content_variants=['<p>Welcome {first_name} ({email})</p>'],
+            target_segments=['new'],
+            send_time=datetime.now(),
+            personalization_fields=['first_name', 'email']
+        )
+        return writer, campaign
+
+    def test_send_campaign_resumes_from_checkpoint(self, sample_config, tmp_path):
+        """Interrupted sends should resume with only the unfinished recipients"""
+        writer, campaign = self._sending_writer(sample_config, tmp_path, 25)
+        calls = []
+        failures = {1: {'success': False, 'status': 429, 'retry_after': 0},
+                    3: {'success': False, 'status': 503, 'error': 'unavailable'},
+                    4: {'success': False, 'status': 503, 'error': 'unavailable'}}
+
+        async def flaky_sender(messages):
+            calls.append([m['customer_id'] for m in messages])
+            if len(calls) in failures:
+                return failures[len(calls)]
+            return {'success': True, 'results': [
+                {'message_id': m['message_id'], 'status': 'accepted'} for m in messages
+            ]}
+
+        summary = asyncio.run(writer.send_campaign(
+            campaign, flaky_sender, batch_size=10, max_concurrency=1, max_retries=1, base_delay=0
+        ))
+        assert summary['recipients'] == 25
+        assert summary['delivered'] == 15
+        assert summary['failed'] == 10
+        assert summary['retries'] == 2
+        assert campaign.status == 'draft'
+
+        failed = [row['customer_id'] for row in writer.get_send_status('camp_send') if row['status'] == 'failed']
+        assert failed == calls[2]
+        assert writer.get_send_status('camp_send', failed[0])[0]['attempts'] == 2
+
+        calls.clear()
+        failures.clear()
+        summary = asyncio.run(writer.send_campaign(campaign, flaky_sender, batch_size=10))
+        assert summary['skipped'] == 15
+        assert summary['delivered'] == 10
+        assert calls == [failed]
+        assert writer.get_send_status('camp_send', failed[0])[0]['attempts'] == 3
+        assert writer.send_store.status_counts('camp_send') == {'accepted': 25}
+        assert campaign.status == 'sent'
+
+    def test_send_campaign_counts_batches_that_raise(self, sample_config, tmp_path):
+        """A batch that raises is counted as failed and keeps the campaign unsent"""
+        writer, campaign = self._sending_writer(sample_config, tmp_path, 25)
+        record_results = writer.send_store.record_results
+        recorded = []
+
+        def flaky_record(campaign_id, results):
+            recorded.append(len(results))
+            if len(recorded) == 2:
+                raise sqlite3.OperationalError("database is locked")
+            record_results(campaign_id, results)
+
+        async def sender(messages):
+            return {'success': True, 'results': [
+                {'message_id': m['message_id'], 'status': 'accepted'} for m in messages
+            ]}
+
+        writer.send_store.record_results = flaky_record
+        summary = asyncio.run(writer.send_campaign(campaign, sender, batch_size=10, max_concurrency=2))
+
+        assert recorded == [10, 10, 5]
+        assert summary['delivered'] == 15
+        assert summary['failed'] == 10
+        assert summary['batch_errors'] == 1
+        assert summary['by_variant']['variant_a']['failed'] == 10
+        assert campaign.status == 'draft'
+
+        summary = asyncio.run(writer.send_campaign(campaign, sender, batch_size=10))
+        assert summary['skipped'] == 15 and summary['delivered'] == 10
+        assert campaign.status == 'sent'
+
+    def test_send_campaign_through_local_sink(self, sample_config, tmp_path):
+        """Batch senders should deliver personalized emails to the provider sink"""
+        from functools import partial
+        from tests.local_servers import LocalEmailSink
+        from src.integrations.platform_apis import PlatformAPIManager, PlatformConfig
+
+        writer, campaign = self._sending_writer(sample_config, tmp_path, 30)
+
+        async def run():
+            async with LocalEmailSink() as sink:
+                sink.fail_next(status=429, retry_after=0)
+                sink.rejected_emails.add('user7@example.com')
+                configs = [
+                    PlatformConfig(platform='sendgrid', api_key='test', base_url=sink.sendgrid_url),
+                    PlatformConfig(platform='mailchimp', api_key='test', base_url=sink.mailchimp_url)
+                ]
+                async with PlatformAPIManager(configs) as api:
+                    ab_config = writer.setup_ab_test(campaign)
+                    sendgrid = await writer.send_campaign(
+                        campaign, partial(api.send_email_batch, 'sendgrid', sender_email='hello@example.com'),
+                        batch_size=8, max_concurrency=2, base_delay=0
+                    )
+                    campaign.id = 'camp_send_mc'
+                    mailchimp = await writer.send_campaign(
+                        campaign, partial(api.send_email_batch, 'mailchimp', sender_email='hello@example.com'),
+                        ab_config=ab_config, batch_size=8
+                    )
+                return sink, sendgrid, mailchimp
+
+        sink, sendgrid, mailchimp = asyncio.run(run())
+
+        assert sendgrid['delivered'] == 30 and sendgrid['retries'] == 1
+        assert mailchimp['delivered'] == 29 and mailchimp['rejected'] == 1
+        assert set(mailchimp['by_variant']) == {'variant_a', 'variant_b'}
+
+        delivered = [m for m in sink.messages if m['provider'] == 'sendgrid']
+        assert len(delivered) == 30
+        first = next(m for m in delivered if m['recipient_email'] == 'user3@example.com')
+        assert first['subject'] == 'Hi User3'
+        assert first['content'] == '<p>Welcome User3 (user3@example.com)</p>'
+        assert first['message_id'] == 'camp_send:cust_003'
+
+        rejected = writer.get_send_status('camp_send_mc', 'cust_007')[0]
+        assert rejected['status'] == 'rejected' and rejected['error'] == 'hard-bounce'
+
     def test_ab_test_setup(self, email_writer, sample_customer):
         """Test A/B test setup"""
         # Add customers
@@ -231,9 +470,7 @@ class TestEmailCampaignWriter:
             email_writer.customers[customer.id] = customer
 
             # Add to new segment
-            if 'new' not in email_writer.segments:
-                email_writer.segments['new'] = []
-            email_writer.segments['new'].append(customer.id)
+            email_writer.segments.add('new', customer.id)
 
         # Create campaign
         campaign = EmailCampaign(
@@ -243,7 +480,8 @@ class TestEmailCampaignWriter:
             subject_lines=['Subject A', 'Subject B'],
             content_variants=['Content A', 'Content B'],
             target_segments=['new'],
-            send_time=datetime.now()
+            send_time=datetime.now(),
+            personalization_fields=['first_name']
         )
 
         ab_config = email_writer.setup_ab_test(campaign)
@@ -334,6 +572,37 @@ class TestEmailCampaignWriter:
         assert analysis['comparison']['open_rate']['winner'] == 'variant_b'
         assert analysis['overall_winner'] == 'variant_b'
 
+    def test_ab_test_sequential_early_winner(self, email_writer):
+        """Running variant totals should let a sequential test stop a losing variant early"""
+        # Small first batch: too little data to call
+        email_writer.track_campaign_performance('camp_seq', 'variant_a', {'sent': 100, 'delivered': 100, 'opened': 20, 'clicked': 4})
+        email_writer.track_campaign_performance('camp_seq', 'variant_b', {'sent': 100, 'delivered': 100, 'opened': 22, 'clicked': 6})
+
+        analysis = email_writer.analyze_ab_test_results('camp_seq')
+        assert analysis['early_stop'] is False
+        assert analysis['sequential_test']['winner'] is None
+        first_p = analysis['sequential_test']['p_value']
+
+        # Results keep arriving in batches; records appended directly are folded in too
+        for _ in range(9):
+            email_writer.track_campaign_performance('camp_seq', 'variant_a', {'sent': 100, 'delivered': 100, 'opened': 20, 'clicked': 3})
+            email_writer.performance_history.append(CampaignPerformance(
+                campaign_id='camp_seq', variant_id='variant_b', sent=100, delivered=100, opened=25, clicked=7
+            ))
+
+        analysis = email_writer.analyze_ab_test_results('camp_seq')
+        assert analysis['variant_a']['clicked'] == 31
+        assert analysis['variant_b']['clicked'] == 69
+        assert analysis['sequential_test']['metric'] == 'ctr'
+        assert analysis['sequential_test']['p_value'] < first_p
+        assert analysis['early_stop'] is True
+        assert analysis['sequential_test']['winner'] == 'variant_b'
+        assert analysis['recommendations'][0].endswith('stop sending variant_a')
+
+        # Campaign totals are shared with the dashboard helpers
+        top = email_writer._get_top_campaigns(1)
+        assert top[0]['campaign_id'] == 'camp_seq' and top[0]['total_sent'] == 2000
+
     def test_performance_prediction(self, email_writer):
         """Test campaign performance prediction"""
         # Add historical performance data
@@ -436,6 +705,66 @@ class TestEmailCampaignWriter:
         assert 'low_value' in low_segments
         assert 'at_risk' in low_segments
 
+    def test_segment_set_algebra(self, email_writer):
+        """Multi-segment targeting should support AND, OR and NOT"""
+        profiles = [
+            ('a', 90.0, [{'amount': 1500}]),   # high_engagement, high_value
+            ('b', 90.0, []),                   # high_engagement, no_purchase
+            ('c', 60.0, [{'amount': 1200}]),   # medium_engagement, high_value
+            ('d', 20.0, [{'amount': 50}])      # low_engagement, low_value
+        ]
+        for customer_id, engagement, purchases in profiles:
+            email_writer.add_customer({
+                'id': customer_id,
+                'email': f'{customer_id}@example.com',
+                'name': customer_id.upper(),
+                'purchase_history': purchases,
+                'engagement_score': engagement
+            })
+
+        assert email_writer.select_customers(all_of=['high_engagement', 'high_value']) == ['a']
+        assert email_writer.select_customers(any_of=['high_engagement', 'high_value']) == ['a', 'b', 'c']
+        assert email_writer.select_customers(any_of=['high_value'], none_of=['high_engagement']) == ['c']
+        assert email_writer.select_customers(none_of=['new']) == []
+        assert email_writer.select_customers(any_of=['missing_segment']) == []
+
+        # Read access still behaves like a dict of id lists
+        assert 'a' in email_writer.segments['high_value']
+        assert len(email_writer.segments['high_engagement']) == 2
+        assert email_writer.segments['new'][:1] == ['a']
+
+    def test_resegment_after_rule_change(self, email_writer):
+        """Re-segmenting should re-apply new rules to every customer in one pass"""
+        for i, spent in enumerate([100, 600, 1500]):
+            email_writer.add_customer({
+                'id': f'cust_{i}',
+                'email': f'user{i}@example.com',
+                'name': f'User {i}',
+                'purchase_history': [{'amount': spent}],
+                'engagement_score': 50.0,
+                'last_open': datetime.now() - timedelta(days=10 * i)
+            })
+        email_writer.segments.add('vip_list', 'cust_0')
+
+        rules = [rule for rule in DEFAULT_SEGMENT_RULES if rule.name != 'medium_value']
+        rules.append(SegmentRule('big_spender', (('total_spent', 500, None),)))
+        sizes = email_writer.resegment_customers(rules)
+
+        assert sizes['big_spender'] == 2
+        assert 'medium_value' not in email_writer.segments
+        assert email_writer.segments.members('big_spender') == ['cust_1', 'cust_2']
+        assert email_writer.segments.members('recently_engaged') == ['cust_0']
+        assert email_writer.segments.members('moderately_engaged') == ['cust_1', 'cust_2']
+        # Segments not owned by the rules are left alone
+        assert email_writer.segments.members('vip_list') == ['cust_0']
+
+        # The single-customer path applies the same rules
+        for i in range(3):
+            customer = email_writer.customers[f'cust_{i}']
+            segments = email_writer._auto_segment_customer(customer)
+            for segment in segments:
+                assert customer.id in email_writer.segments[segment]
+
     def test_campaign_automation_cycle(self, email_writer, mock_openai_response):
         """Test automated campaign creation cycle"""
         # Add customers for different segments
@@ -46,6 +46,30 @@ class TestOCREngine:
         assert len(processed.shape) == 2  # Should be grayscale
         assert processed.dtype == np.uint8
 
+    @patch('cv2.fastNlMeansDenoising')
+    def test_preprocess_clean_image_skips_denoising(self, mock_denoise):
+        """Clean scans should not pay for non-local-means denoising."""
+        image = np.ones((200, 300), dtype=np.uint8) * 255
+
+        processed = self.ocr_engine.preprocess_image(image)
+
+        assert processed.shape == image.shape
+        mock_denoise.assert_not_called()
+
+    def test_noisy_high_resolution_scan_is_denoised(self):
+        """Noise is measured before downscaling, so large noisy scans still get denoised."""
+        clean = np.ones((2400, 1800), dtype=np.uint8) * 200
+        noisy = np.clip(clean + np.random.normal(0, 8, clean.shape), 0, 255).astype(np.uint8)
+        threshold = self.ocr_engine.preprocessor.noise_threshold
+
+        small, _ = self.ocr_engine.preprocessor._downscale(noisy)
+        assert self.ocr_engine.preprocessor.estimate_noise(small) < threshold
+
+        with patch('cv2.fastNlMeansDenoising', side_effect=lambda tile, dst, h: tile) as mock_denoise:
+            self.ocr_engine.preprocess_image(noisy)
+
+        assert mock_denoise.called
+
     @patch('pytesseract.image_to_string')
     def test_extract_text_from_image(self, mock_tesseract):
         """Test text extraction from image."""
@@ -0,0 +1,348 @@
+"""
+Test suite for the QuickBooks and Xero accounting integrations
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+import requests
+
+from src.integrations.accounting_integrations import (
+    Account,
+    AccountingIntegrationManager,
+    AccountingTransaction,
+    QuickBooksIntegration,
+    ReferenceData,
+    Vendor,
+    XeroIntegration,
+)
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.headers = headers or {}
+        self.text = str(self._payload)
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+
+class FakeSession:
+    """Records calls and answers them with a handler; tracks peak concurrency"""
+
+    def __init__(self, handler, latency=0.0):
+        self.handler = handler
+        self.latency = latency
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers=None, json=None, params=None, timeout=None):
+        with self._lock:
+            self.calls.append((method, url, json, params, headers or {}))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return self.handler(method, url, json, params)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_transactions(count, vendor_id=None):
+    return [
+        AccountingTransaction(
+            id=f"txn{i}",
+            date=datetime(2024, 1, 15),
+            description=f"Expense {i}",
+            amount=10.0 + i,
+            account_id="Office Supplies",
+            category="office",
+            vendor_id=vendor_id if vendor_id is None or i % 2 == 0 else None
+        )
+        for i in range(count)
+    ]
+
+
+def quickbooks_handler(method, url, body, params):
+    if url.endswith('/accounts'):
+        return FakeResponse(payload={'QueryResponse': {'Account': [
+            {'Id': '64', 'Name': 'Office Supplies', 'AccountType': 'Expense', 'AcctNum': '6400'}
+        ]}})
+    if url.endswith('/vendors'):
+        return FakeResponse(payload={'QueryResponse': {'Vendor': [{'Id': '7', 'Name': 'Acme Paper'}]}})
+    if url.endswith('/batch'):
+        responses = []
+        for item in body['BatchItemRequest']:
+            entity = item.get('Bill') or item.get('Purchase')
+            if entity['Line'][0]['Amount'] == 13.0:
+                responses.append({'bId': item['bId'], 'Fault': {'Error': [{'Detail': 'Invalid amount'}]}})
+            else:
+                responses.append({'bId': item['bId'], 'Bill': {'Id': '1'}})
+        return FakeResponse(payload={'BatchItemResponse': responses})
+    return FakeResponse(status_code=404)
+
+
+class TestQuickBooksIntegration:
+    """Test cases for batched QuickBooks sync"""
+
+    def make_integration(self, handler, latency=0.0):
+        integration = QuickBooksIntegration({
+            'access_token': 'token', 'company_id': '123',
+            'requests_per_minute': 60000, 'batch_requests_per_minute': 60000
+        })
+        integration.session = FakeSession(handler, latency=latency)
+        return integration
+
+    def test_transactions_are_sent_in_parallel_batches(self):
+        """95 transactions take 4 batch requests, run concurrently, and keep per-item faults"""
+        integration = self.make_integration(quickbooks_handler, latency=0.05)
+        results = integration.sync_transactions(make_transactions(95, vendor_id='Acme Paper'))
+
+        batch_calls = [call for call in integration.session.calls if call[1].endswith('/batch')]
+        assert len(batch_calls) == 4
+        assert integration.session.peak > 1
+        assert results['total'] == 95
+        assert results['successful'] == 94
+        assert results['failed'] == 1
+        assert 'txn3' in results['errors'][0] and 'Invalid amount' in results['errors'][0]
+
+    def test_references_are_resolved_from_cached_lookups(self):
+        """Vendor names and account names map to ids; lookups load once"""
+        integration = self.make_integration(quickbooks_handler)
+        integration.sync_transactions(make_transactions(4, vendor_id='Acme Paper'))
+        integration.sync_transactions(make_transactions(4, vendor_id='Acme Paper'))
+
+        urls = [call[1] for call in integration.session.calls]
+        assert sum(url.endswith('/vendors') for url in urls) == 1
+        assert sum(url.endswith('/accounts') for url in urls) == 1
+
+        items = integration.session.calls[-1][2]['BatchItemRequest']
+        bill = items[0]['Bill']
+        assert bill['VendorRef']['value'] == '7'
+        assert bill['Line'][0]['AccountBasedExpenseLineDetail']['AccountRef']['value'] == '64'
+        assert 'Purchase' in items[1]
+
+    def test_rate_limited_requests_are_retried(self):
+        """A 429 with Retry-After pauses the client and the request then succeeds"""
+        failures = [FakeResponse(status_code=429, headers={'Retry-After': '0.2'})]
+
+        def handler(method, url, body, params):
+            if url.endswith('/companyinfo/1') and failures:
+                return failures.pop()
+            return FakeResponse(payload={'CompanyInfo': {'CompanyName': 'Example Co'}})
+
+        integration = self.make_integration(handler)
+        started = time.perf_counter()
+        info = integration.get_company_info()
+        elapsed = time.perf_counter() - started
+
+        assert info['CompanyInfo']['CompanyName'] == 'Example Co'
+        assert len(integration.session.calls) == 2
+        assert elapsed >= 0.15
+
+    def test_retried_posts_reuse_one_request_id(self):
+        """A POST retried after a server error keeps its requestid so QuickBooks applies it once"""
+        failures = [FakeResponse(status_code=503), FakeResponse(status_code=500)]
+
+        def handler(method, url, body, params):
+            return failures.pop() if failures else FakeResponse(payload={'Vendor': {'Id': '9'}})
+
+        integration = self.make_integration(handler)
+        integration.max_retries = 2
+        integration._make_request('POST', 'vendors', {'DisplayName': 'Globex'})
+
+        request_ids = {call[3]['requestid'] for call in integration.session.calls}
+        assert len(integration.session.calls) == 3
+        assert len(request_ids) == 1
+
+        # Without an idempotency key, a POST is only resent when throttled
+        integration._with_idempotency_key = lambda key, params, headers: None
+        failures.append(FakeResponse(status_code=500))
+        with pytest.raises(requests.exceptions.HTTPError):
+            integration._make_request('POST', 'vendors', {'DisplayName': 'Globex'})
+        assert len(integration.session.calls) == 4
+
+    def test_token_refresh_does_not_use_a_retry(self):
+        """An expired token is refreshed and resent even with no retries left; a second 401 is raised"""
+        def handler(method, url, body, params):
+            token = integration.session.calls[-1][4]['Authorization']
+            if token == 'Bearer fresh':
+                return FakeResponse(payload={'CompanyInfo': {'CompanyName': 'Example Co'}})
+            return FakeResponse(status_code=401)
+
+        integration = self.make_integration(handler)
+        integration.max_retries = 0
+        refreshes = []
+
+        def refresh():
+            refreshes.append(integration.access_token)
+            integration.access_token = 'fresh' if len(refreshes) == 1 else 'revoked'
+            return True
+
+        integration._refresh_access_token = refresh
+        assert integration.get_company_info()['CompanyInfo']['CompanyName'] == 'Example Co'
+        assert len(integration.session.calls) == 2
+
+        integration.access_token = 'expired'
+        with pytest.raises(requests.exceptions.HTTPError, match='401'):
+            integration.get_company_info()
+        assert len(refreshes) == 2
+
+
+class TestXeroIntegration:
+    """Test cases for batched Xero sync"""
+
+    def test_bills_and_spends_are_grouped_per_endpoint(self):
+        """Bills and bank transactions go to their own endpoints with per-record validation"""
+        def handler(method, url, body, params):
+            if url.endswith('/Accounts'):
+                return FakeResponse(payload={'Accounts': [
+                    {'AccountID': 'a-1', 'Name': 'Office Supplies', 'Type': 'EXPENSE', 'Code': '429'}
+                ]})
+            if url.endswith('/Contacts'):
+                return FakeResponse(payload={'Contacts': [
+                    {'ContactID': 'c-1', 'Name': 'Acme Paper', 'IsSupplier': True}
+                ]})
+            kind = url.rsplit('/', 1)[1]
+            assert params == {'summarizeErrors': 'false'}
+            records = []
+            for record in body[kind]:
+                if record['LineItems'][0]['UnitAmount'] == 12.0:
+                    records.append({'HasErrors': True, 'ValidationErrors': [{'Message': 'Date is required'}]})
+                else:
+                    records.append({'StatusAttributeString': 'OK'})
+            return FakeResponse(payload={kind: records})
+
+        integration = XeroIntegration({'access_token': 'token', 'tenant_id': 't', 'requests_per_minute': 60000})
+        integration.session = FakeSession(handler)
+        results = integration.sync_transactions(make_transactions(10, vendor_id='Acme Paper'))
+
+        posts = [call for call in integration.session.calls if call[0] == 'POST']
+        assert sorted(call[1].rsplit('/', 1)[1] for call in posts) == ['BankTransactions', 'Invoices']
+        assert results['successful'] == 9
+        assert results['failed'] == 1
+        assert 'Date is required' in results['errors'][0]
+
+        assert all(call[4]['Idempotency-Key'] for call in posts)
+        assert len({call[4]['Idempotency-Key'] for call in posts}) == 2
+        invoices = next(call[2]['Invoices'] for call in posts if call[1].endswith('/Invoices'))
+        assert invoices[0]['Contact']['ContactID'] == 'c-1'
+        assert invoices[0]['LineItems'][0]['AccountCode'] == '429'
+
+
+class XeroReferenceServer:
+    """Serves Xero accounts and contacts with ETags and answers 304 when unchanged"""
+
+    def __init__(self):
+        self.contacts = [{'ContactID': 'c-1', 'Name': 'Acme Paper', 'IsSupplier': True}]
+        self.versions = {'Accounts': 1, 'Contacts': 1}
+        self.session = FakeSession(self)
+
+    def __call__(self, method, url, body, params):
+        endpoint = url.rsplit('/', 1)[1]
+        if method == 'POST' and endpoint == 'Contacts':
+            contact = {'ContactID': f"c-{len(self.contacts) + 1}", **body['Contacts'][0]}
+            self.contacts.append(contact)
+            self.versions['Contacts'] += 1
+            return FakeResponse(payload={'Contacts': [contact]})
+
+        etag = f'"{endpoint}-{self.versions[endpoint]}"'
+        request_headers = self.session.calls[-1][4]
+        if request_headers.get('If-None-Match') == etag:
+            return FakeResponse(status_code=304, headers={'ETag': etag})
+        if endpoint == 'Accounts':
+            payload = {'Accounts': [
+                {'AccountID': 'a-1', 'Name': 'Office Supplies', 'Type': 'EXPENSE', 'Code': '429'},
+                {'AccountID': 'a-2', 'Name': 'Travel', 'Type': 'EXPENSE', 'Code': '493'}
+            ]}
+        else:
+            payload = {'Contacts': list(self.contacts)}
+        return FakeResponse(payload=payload, headers={'ETag': etag})
+
+
+class TestReferenceDataCache:
+    """Test cases for cached accounts and vendors in AccountingIntegrationManager"""
+
+    def make_manager(self):
+        session = XeroReferenceServer().session
+        integration = XeroIntegration({'access_token': 'token', 'tenant_id': 't', 'requests_per_minute': 60000})
+        integration.session = session
+        manager = AccountingIntegrationManager({})
+        manager.integrations['xero'] = integration
+        return manager, integration, session
+
+    def test_conversion_needs_no_round_trips_after_warm_up(self):
+        """A batch is converted from the cache, matching by name, code and vendor name"""
+        manager, integration, session = self.make_manager()
+        manager.get_reference_data('xero')
+        warm_calls = len(session.calls)
+
+        data = [
+            {'date': '2024-01-15', 'description': 'Taxi', 'amount': 20, 'category': '493', 'vendor_id': 'acme paper'},
+            {'date': '2024-01-15', 'description': 'Pens', 'amount': 5, 'category': 'office supplies'},
+            {'date': '2024-01-15', 'description': 'Misc', 'amount': 1, 'category': 'Unknown'}
+        ] * 100
+        transactions = manager.convert_transactions(data, 'xero')
+
+        assert len(session.calls) == warm_calls == 2
+        assert [t.account_id for t in transactions[:3]] == ['a-2', 'a-1', 'a-1']
+        assert transactions[0].vendor_id == 'c-1'
+        assert integration.reference_stats['hits'] == 1
+
+    def test_expired_cache_is_revalidated_with_etags(self):
+        """After the TTL, unchanged data is confirmed with 304 responses instead of re-downloaded"""
+        manager, integration, session = self.make_manager()
+        integration.reference_ttl_seconds = 0
+        manager.get_chart_of_accounts('xero')
+        accounts = manager.get_chart_of_accounts('xero')
+
+        assert [a.code for a in accounts] == ['429', '493']
+        assert session.calls[-1][4]['If-None-Match'] == '"Contacts-1"'
+        assert integration.reference_stats['downloads'] == 2
+        assert integration.reference_stats['not_modified'] == 2
+
+    def test_create_vendor_invalidates_vendors(self):
+        """A created vendor is visible on next use; unchanged accounts still revalidate"""
+        manager, integration, session = self.make_manager()
+        manager.get_reference_data('xero')
+        manager.create_vendor({'name': 'Globex'}, 'xero')
+
+        vendors = manager.get_vendors('xero')
+        assert [v.name for v in vendors] == ['Acme Paper', 'Globex']
+        assert integration.resolve_vendor_id('globex') == 'c-2'
+        assert integration.reference_stats['not_modified'] == 1
+
+    def test_ids_take_precedence_over_codes_and_names(self):
+        """Each key kind has its own index, so an id never resolves to a record with a matching code or name"""
+        reference = ReferenceData(
+            accounts=[
+                Account(id='64', name='Office Supplies', account_type='Expense', code='7'),
+                Account(id='7', name='Travel', account_type='Expense', code='6400'),
+                Account(id='90', name='64', account_type='Expense', code='9000')
+            ],
+            vendors=[Vendor(id='3', name='Acme Paper'), Vendor(id='12', name='3')]
+        )
+
+        assert reference.find_account('7').name == 'Travel'
+        assert reference.find_account('64').name == 'Office Supplies'
+        assert reference.find_account('6400').id == '7'
+        assert reference.find_account('office supplies').id == '64'
+        assert reference.find_account('9000').id == '90'
+        assert reference.find_vendor('3').name == 'Acme Paper'
+        assert reference.find_vendor('acme paper').id == '3'
+        assert reference.find_account('unknown') is None
+        assert reference.account_for_category('unknown').id == '64'
@@ -0,0 +1,159 @@
+"""
+Test suite for alert coalescing and digests
+"""
+
+from src.utils.alert_coalescing import AlertCoalescer
+from src.utils.notifications import NotificationManager, AlertManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_coalescer(**kwargs):
+    sent = []
+
+    def send(title, message, priority, recipients=None):
+        sent.append({'title': title, 'message': message, 'priority': priority, 'recipients': recipients})
+        return {'email': True}
+
+    clock = FakeClock()
+    coalescer = AlertCoalescer(send, window_seconds=300, dedupe_ttl_seconds=3600, clock=clock, **kwargs)
+    return coalescer, sent, clock
+
+
+class TestAlertCoalescer:
+    """Test cases for AlertCoalescer"""
+
+    def test_burst_becomes_one_digest(self):
+        """300 low-stock alerts in one cycle produce a single digest after the window"""
+        coalescer, sent, clock = make_coalescer(max_digest_items=500)
+
+        for i in range(300):
+            assert coalescer.submit('inventory_alert', f"Inventory Alert: SKU-{i}", "details", 'high',
+                                    dedupe_key=f"sku-{i}", summary=f"SKU-{i} low")
+
+        assert coalescer.flush_due() == 0
+        assert sent == []
+
+        clock.now += 300
+        assert coalescer.flush_due() == 1
+        assert len(sent) == 1
+        assert sent[0]['title'] == "300 inventory alert alerts (high)"
+        assert "- SKU-299 low" in sent[0]['message']
+        assert coalescer.get_stats()['alerts_in_digests'] == 300
+
+    def test_groups_by_type_priority_and_recipients(self):
+        """Different types, priorities or recipient sets are separate digests"""
+        coalescer, sent, clock = make_coalescer()
+
+        coalescer.submit('inventory_alert', 'a', 'm', 'high')
+        coalescer.submit('inventory_alert', 'b', 'm', 'high')
+        coalescer.submit('inventory_alert', 'c', 'm', 'medium')
+        coalescer.submit('purchase_order', 'd', 'm', 'high')
+        coalescer.submit('inventory_alert', 'e', 'm', 'high', recipients=['ops@example.com'])
+
+        clock.now += 301
+        assert coalescer.flush_due() == 4
+        by_title = {item['title'] for item in sent}
+        assert "2 inventory alert alerts (high)" in by_title
+        # Single-alert groups go out unchanged
+        assert {'c', 'd', 'e'} <= by_title
+        assert [item['recipients'] for item in sent if item['title'] == 'e'] == [['ops@example.com']]
+
+    def test_duplicates_are_dropped_until_ttl_expires(self):
+        """A repeated dedupe key is suppressed for the TTL"""
+        coalescer, sent, clock = make_coalescer()
+
+        assert coalescer.submit('inventory_alert', 'SKU-1', 'm', 'high', dedupe_key='sku-1')
+        assert not coalescer.submit('inventory_alert', 'SKU-1', 'm', 'high', dedupe_key='sku-1')
+
+        clock.now += 3601
+        assert coalescer.submit('inventory_alert', 'SKU-1', 'm', 'high', dedupe_key='sku-1')
+        assert coalescer.stats['deduplicated'] == 1
+
+    def test_critical_alerts_bypass_window(self):
+        """Critical alerts are sent immediately; a full group flushes without waiting"""
+        coalescer, sent, _ = make_coalescer(max_digest_items=3)
+
+        assert coalescer.submit('inventory_critical', 'Stockout', 'SKU-9 is out', 'critical')
+        assert sent[-1]['title'] == 'Stockout'
+
+        for i in range(3):
+            coalescer.submit('inventory_alert', f'low {i}', 'm', 'high')
+        assert sent[-1]['title'] == "3 inventory alert alerts (high)"
+        assert coalescer.pending_count() == 0
+
+    def test_failed_digest_is_requeued_then_dropped(self):
+        """A digest that fails to send is retried next window, then dropped with its dedupe keys released"""
+        results = [False, False, True, False, False, False]
+        sent = []
+
+        def send(title, message, priority, recipients=None):
+            sent.append(title)
+            return {'email': results.pop(0)}
+
+        clock = FakeClock()
+        coalescer = AlertCoalescer(send, window_seconds=300, clock=clock, max_send_attempts=3)
+
+        coalescer.submit('inventory_alert', 'SKU-1', 'm', 'high', dedupe_key='sku-1')
+        clock.now += 300
+        assert coalescer.flush_due() == 1
+        assert coalescer.pending_count() == 1
+        assert not coalescer.submit('inventory_alert', 'SKU-1', 'm', 'high', dedupe_key='sku-1')
+
+        coalescer.submit('inventory_alert', 'SKU-2', 'm', 'high', dedupe_key='sku-2')
+        assert coalescer.flush_due() == 0  # retry waits for another window
+        clock.now += 300
+        coalescer.flush_due()
+        clock.now += 300
+        coalescer.flush_due()
+
+        assert sent == ['SKU-1', '2 inventory alert alerts (high)', '2 inventory alert alerts (high)']
+        assert coalescer.pending_count() == 0
+        assert coalescer.stats['alerts_in_digests'] == 2
+        assert coalescer.stats['digests_requeued'] == 2
+
+        coalescer.submit('inventory_alert', 'SKU-3', 'm', 'high', dedupe_key='sku-3')
+        for _ in range(3):
+            clock.now += 300
+            coalescer.flush_due()
+        assert coalescer.pending_count() == 0
+        assert coalescer.stats['alerts_dropped'] == 1
+        assert coalescer.submit('inventory_alert', 'SKU-3', 'm', 'high', dedupe_key='sku-3')
+
+
+class TestNotificationManagerCoalescing:
+    """Test cases for coalescing through NotificationManager and AlertManager"""
+
+    def test_inventory_alerts_share_a_digest(self):
+        manager = NotificationManager({'alert_coalescing_enabled': True, 'alert_window_seconds': 60})
+        calls = []
+        manager.coalescer.send = lambda title, *args: calls.append(title) or {'email': True}
+
+        for i in range(5):
+            assert manager.send_inventory_alert(f"Widget {i}", 2, 10, "Main")
+        assert manager.send_inventory_alert("Gadget", 0, 10, "Main")  # stockout is critical
+        assert not manager.send_inventory_alert("Widget 1", 2, 10, "Main")  # duplicate
+
+        assert calls == ["Inventory Alert: Gadget"]
+        assert manager.flush_alerts(force=True) == 1
+        assert calls[-1] == "5 inventory alert alerts (high)"
+
+    def test_alert_manager_uses_cooldown_as_ttl(self):
+        sent = []
+        manager = NotificationManager({'email_enabled': False})
+        coalescer = AlertCoalescer(lambda *args: sent.append(args) or {'email': True}, window_seconds=0)
+        alerts = AlertManager(manager, coalescer=coalescer)
+
+        data = {'component': 'api', 'current_value': 950, 'threshold': 500}
+        assert alerts.send_alert('system_performance', data, cooldown_minutes=10)
+        assert not alerts.send_alert('system_performance', data, cooldown_minutes=10)
+
+        coalescer.flush_due()
+        assert len(sent) == 1
+        assert sent[0][0] == "Performance Alert: api"
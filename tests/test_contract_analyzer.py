@@ -4,6 +4,7 @@ Test suite for Contract Analyzer Agent
 
 import pytest
 import asyncio
+import re
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 
@@ -15,7 +16,10 @@ from src.agents.contract_analyzer import (
     ContractClause,
     ContractAnalysis,
     PaymentTerm,
-    ContractParty
+    ContractParty,
+    PortfolioRollup,
+    _is_contract_path,
+    _portfolio_item_ids
 )
 
 
@@ -359,6 +363,138 @@ class TestContractAnalyzerAgent:
         assert len(sections) > 0
         # Should split contract into logical sections
 
+    def test_section_offsets(self, agent, sample_contract):
+        """Section offsets should come from the split, including repeated sections"""
+        repeated = sample_contract + "\n    7. TERMINATION\n    Either party may terminate this agreement with 30 days written notice.\n"
+
+        segments = agent._segment_sections(repeated)
+
+        for section, start, end in segments:
+            assert repeated[start:end] == section
+
+        starts = [start for section, start, _ in segments if section.startswith("TERMINATION")]
+        assert len(starts) == 2
+        assert starts[0] != starts[1]
+
+    @pytest.mark.asyncio
+    async def test_clause_positions(self, agent, sample_contract):
+        """Clause positions should point at the clause content"""
+        clauses = await agent._extract_clauses(sample_contract, ContractType.SERVICE_AGREEMENT)
+
+        assert len(clauses) > 0
+        for clause in clauses:
+            assert sample_contract[clause.start_position:clause.end_position] == clause.content
+
+    def test_section_scan_matches_substring_counts(self, agent, sample_contract):
+        """The shared scan should count terms like str.count on lowercased text"""
+        scan = agent.section_scanner.scan(sample_contract)
+        text_lower = sample_contract.lower()
+
+        for term in agent.section_scanner.terms:
+            assert scan.count(term) == text_lower.count(term), term
+
+        assert "$50,000" in scan.matches["money"]
+        assert "2%" in scan.matches["percentages"]
+
+    def test_term_scanner_counts_overlapping_terms(self):
+        """Terms that overlap each other are all counted, not shadowed by the first match"""
+        from src.agents.contract_analyzer import TermScanner
+
+        terms = ["limited to", "unlimited", "limited", "assign", "assignment", "sign", "nment of"]
+        scanner = TermScanner(terms, {"money": [r'\$\d+']})
+        text = "Liability is UNLIMITED to the extent of $500; assignment of rights; consignment of goods"
+        scan = scanner.scan(text)
+
+        for term in terms:
+            assert scan.count(term) == text.lower().count(term), term
+        assert scan.count("limited to") == 1
+        assert scan.matches["money"] == ["$500"]
+
+    def test_ner_chunks_follow_sentences(self, agent):
+        """Chunks should end on sentence boundaries and stay within the size limit"""
+        text = " ".join(f"Clause {i} binds Acme Corp to deliver item {i} on time." for i in range(300))
+
+        chunks = agent._chunk_text(text)
+
+        assert len(chunks) > 1
+        assert chunks[0].start == 0 and chunks[-1].end == len(text)
+        for chunk in chunks:
+            assert chunk.end - chunk.start <= agent.ner_max_chunk_chars
+            assert text[chunk.end - 1] == "."
+            assert chunk.window_start <= chunk.start and chunk.end <= chunk.window_end
+        for previous, current in zip(chunks, chunks[1:]):
+            assert previous.end < current.start
+            assert previous.window_end > current.start
+
+    def test_entity_spans_merge_across_borders(self, agent):
+        """Overlapping spans of the same label should merge into one entity"""
+        spans = [
+            ("ORG", 10, 19, 0.9),
+            ("ORG", 10, 19, 1.0),
+            ("ORG", 15, 30, 0.7),
+            ("PERSON", 15, 30, 0.8),
+            ("ORG", 40, 50, 0.6)
+        ]
+
+        merged = agent._merge_entity_spans(spans)
+
+        assert ("ORG", 10, 30, 1.0) in merged
+        assert ("PERSON", 15, 30, 0.8) in merged
+        assert ("ORG", 40, 50, 0.6) in merged
+        assert len(merged) == 3
+
+    def test_amended_contract_only_recomputes_changed_chunks(self, agent):
+        """Re-running NER after an edit should hit the chunk cache for untouched text"""
+        seen_windows = []
+
+        class FakeNlp:
+            def pipe(self, texts, batch_size=None):
+                for window in texts:
+                    seen_windows.append(window)
+                    yield Mock(ents=[
+                        Mock(label_="ORG", start_char=m.start(), end_char=m.end())
+                        for m in re.finditer(r"Acme Corp", window)
+                    ])
+
+        text = " ".join(f"Clause {i} binds Acme Corp to deliver item {i} on time." for i in range(300))
+        amended = text.replace("deliver item 150 ", "deliver item 150 and a revised schedule ")
+
+        with patch.object(ContractAnalyzerAgent, "nlp", property(lambda self: FakeNlp())), \
+                patch.object(ContractAnalyzerAgent, "ner_model", property(lambda self: None)):
+            entities = agent._extract_model_entities(text)
+            first_pass = len(seen_windows)
+            amended_entities = agent._extract_model_entities(amended)
+
+        assert len(entities) == 300
+        assert all(e.text == "Acme Corp" for e in entities)
+        assert [amended[e.start_position:e.end_position] for e in amended_entities] == ["Acme Corp"] * 300
+        assert 0 < len(seen_windows) - first_pass < first_pass / 2
+
+    def test_transformer_ner_labels_and_unavailable_model(self, agent):
+        """CoNLL person labels map to spaCy's; a model that fails to load is skipped"""
+        def fake_pipeline(windows, batch_size=None):
+            return [
+                [{"entity_group": "PER", "start": m.start(), "end": m.end(), "score": 0.9}
+                 for m in re.finditer(r"Jane Smith", window)]
+                for window in windows
+            ]
+
+        text = "This agreement is signed by Jane Smith on behalf of the buyer."
+        with patch.object(ContractAnalyzerAgent, "nlp", property(lambda self: None)), \
+                patch.object(ContractAnalyzerAgent, "ner_model", property(lambda self: fake_pipeline)):
+            entities = agent._extract_model_entities(text)
+        assert [(e.entity_type, e.text) for e in entities] == [("PERSON", "Jane Smith")]
+
+        loader = Mock(side_effect=OSError("no such checkpoint"))
+        with patch.dict(agent.models._loaders, {"transformer_ner": loader}):
+            agent.models.unload("transformer_ner")
+            try:
+                assert agent.ner_model is None
+                assert agent.ner_model is None
+            finally:
+                agent.models.unload("transformer_ner")
+        assert loader.call_count == 1
+
     def test_overall_risk_calculation(self, agent):
         """Test overall risk level calculation"""
         # Critical risk
@@ -477,6 +613,87 @@ class TestContractAnalyzerAgent:
         assert isinstance(analysis, ContractAnalysis)
         # Should handle gracefully with minimal content
 
+    @pytest.mark.asyncio
+    async def test_portfolio_analysis(self, agent, sample_contract, high_risk_contract, tmp_path):
+        """Portfolio analysis should stream each contract and roll up the risk"""
+        contract_file = tmp_path / "vendor_msa.txt"
+        contract_file.write_text(high_risk_contract)
+        items = [sample_contract, str(contract_file), tmp_path / "missing.txt", tmp_path / "gone.txt"]
+        rollup = PortfolioRollup()
+
+        analyses = [
+            analysis async for analysis in agent.analyze_portfolio(items, max_workers=2, rollup=rollup)
+        ]
+
+        by_id = {analysis.contract_id: analysis for analysis in analyses}
+        single = await agent.analyze_contract(sample_contract)
+        assert set(by_id) == {single.contract_id, "vendor_msa"}
+        assert by_id[single.contract_id].clauses == single.clauses
+        assert by_id[single.contract_id].risk_assessment == single.risk_assessment
+
+        assert rollup.total_contracts == 2
+        assert sorted(rollup.failed) == ["gone", "missing"]
+        assert sum(rollup.overall_risk.values()) == 2
+        assert "vendor_msa" in rollup.flagged_contracts
+        assert rollup.to_dict()["total_contracts"] == 2
+        assert agent.build_portfolio_rollup(analyses).to_dict()["overall_risk"] == rollup.to_dict()["overall_risk"]
+
+    def test_portfolio_items_that_look_like_paths(self, tmp_path):
+        """Path objects and existing files are paths; any other string is contract text"""
+        contract_file = tmp_path / "nda.txt"
+        contract_file.write_text("Confidential.")
+
+        assert _is_contract_path(str(contract_file))
+        assert _is_contract_path(tmp_path / "missing")
+        assert not _is_contract_path(str(tmp_path / "missing.txt"))
+        assert not _is_contract_path("The total fee payable on signing is $1,000.00")
+        assert not _is_contract_path("The Buyer/Seller shall deliver goods.")
+        assert not _is_contract_path("SERVICE AGREEMENT\nThis agreement is made between A and B.")
+
+    def test_portfolio_item_ids_are_unique(self, tmp_path):
+        """Files sharing a stem and repeated texts get distinct ids"""
+        text = "The total fee payable on signing is $1,000.00"
+        ids = _portfolio_item_ids([tmp_path / "a" / "lease.pdf", tmp_path / "b" / "lease.pdf",
+                                   tmp_path / "nda.txt", text, text])
+
+        assert ids[:3] == ["lease-0", "lease-1", "nda"]
+        assert ids[3] != ids[4] and ids[3].endswith("-3")
+        assert len(set(ids)) == 5
+
+    @pytest.mark.asyncio
+    async def test_contract_versions_reanalyze_changed_clauses(self, sample_contract, tmp_path):
+        """A redlined version should only re-analyze changed sections and report the risk delta"""
+        agent = ContractAnalyzerAgent(db_path=str(tmp_path / "contracts.db"))
+
+        first, first_report = await agent.analyze_contract_version(sample_contract, "MSA-1")
+        assert first_report["version"] == 1
+        assert first_report["previous_version"] is None
+        assert first_report["sections"]["reanalyzed"] == first_report["sections"]["total"]
+
+        redlined = sample_contract.replace(
+            "Provider's total liability shall not exceed the total amount paid under this agreement.",
+            "Provider accepts unlimited liability for all damages under this agreement."
+        )
+        with patch.object(agent, "_analyze_section", wraps=agent._analyze_section) as analyze_section:
+            second, report = await agent.analyze_contract_version(redlined, "MSA-1")
+
+        assert analyze_section.call_count == 1
+        assert report["version"] == 2
+        assert report["previous_version"] == 1
+        assert report["sections"]["reanalyzed"] == 1
+        assert report["clauses"]["unchanged"] == len(first.clauses) - 1
+        assert report["clauses"]["modified"][0]["clause_type"] == "liability"
+        assert report["clauses"]["modified"][0]["risk_change"] == "increased"
+        assert report["risk_increased"]
+        for clause in second.clauses:
+            assert redlined[clause.start_position:clause.end_position] == clause.content
+
+        _, unchanged_report = await agent.analyze_contract_version(redlined, "MSA-1")
+        assert unchanged_report["sections"]["reanalyzed"] == 0
+        assert not unchanged_report["clauses"]["modified"]
+        assert not unchanged_report["risk_increased"]
+        assert [v["version"] for v in agent.version_store.list_versions("MSA-1")] == [1, 2, 3]
+
     def test_pattern_matching(self, agent):
         """Test regex pattern matching for entities"""
         text = "Payment of $50,000.00 due on January 15, 2024"
@@ -0,0 +1,150 @@
+"""
+Test suite for CRM integrations against the local CRM server
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.integrations.crm_integrations import CRMManager, CRMIntegration, CRMRequestError, HubSpotCRM, SupabaseCRM
+from tests.local_servers import LocalCRMServer, crm_manager_for
+
+
+def make_leads(count: int):
+    return [
+        {'email': f'lead{i}@example.com', 'first_name': 'Lead', 'last_name': str(i),
+         'company': 'Example Co', 'job_title': 'Owner', 'status': 'new'}
+        for i in range(count)
+    ]
+
+
+class SlowCRM(CRMIntegration):
+    """Integration that takes a fixed time per call"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def create_lead(self, lead_data):
+        await asyncio.sleep(self.delay)
+        return f"slow-{lead_data['email']}"
+
+    async def update_lead(self, lead_id, updates):
+        await asyncio.sleep(self.delay)
+        return True
+
+    async def get_lead(self, lead_id):
+        return None
+
+
+class TestCRMManager:
+    """Test cases for CRMManager fan-out and bulk sync"""
+
+    @pytest.mark.asyncio
+    async def test_fan_out_is_concurrent_with_timeouts(self):
+        """Integrations run in parallel and a slow one times out without blocking the rest"""
+        manager = CRMManager(timeout_seconds=0.3)
+        manager.add_integration('a', SlowCRM(0.1))
+        manager.add_integration('b', SlowCRM(0.1))
+        manager.add_integration('stuck', SlowCRM(5))
+
+        started = time.perf_counter()
+        results = await manager.sync_lead_to_all(make_leads(1)[0])
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 1.0
+        assert results['a'] == results['b'] == 'slow-lead0@example.com'
+        assert results['stuck'].startswith('ERROR: timed out')
+
+        updates = await manager.update_lead_in_all(results, {'status': 'qualified'})
+        assert updates == {'a': True, 'b': True}
+
+    @pytest.mark.asyncio
+    async def test_single_lead_round_trip(self):
+        """create_lead, update_lead and get_lead work against every provider"""
+        async with LocalCRMServer() as server:
+            async with crm_manager_for(server) as manager:
+                ids = await manager.sync_lead_to_all(make_leads(1)[0])
+                assert not any(value.startswith('ERROR') for value in ids.values())
+
+                assert await manager.update_lead_in_all(ids, {'status': 'qualified'}) == \
+                    {'supabase': True, 'airtable': True, 'hubspot': True}
+                contact = await manager.integrations['hubspot'].get_lead(ids['hubspot'])
+                assert contact['hs_lead_status'] == 'qualified'
+
+    @pytest.mark.asyncio
+    async def test_bulk_sync_uses_batch_endpoints(self):
+        """250 leads take one Supabase, 25 Airtable and 3 HubSpot requests"""
+        leads = make_leads(250)
+        async with LocalCRMServer() as server:
+            async with crm_manager_for(server) as manager:
+                manager.integrations['airtable'].requests_per_second = 100  # keep the test fast
+                results = await manager.sync_leads_bulk(leads)
+
+        assert server.requests == {'supabase': 1, 'airtable': 25, 'hubspot': 3}
+        for name, ids in results.items():
+            assert len(ids) == 250
+            assert not any(value.startswith('ERROR') for value in ids), name
+
+        # HubSpot answers out of order; ids are matched back by email
+        hubspot = server.records['hubspot']
+        assert hubspot[results['hubspot'][7]]['email'] == 'lead7@example.com'
+
+    @pytest.mark.asyncio
+    async def test_bad_record_is_isolated_by_splitting(self):
+        """A rejected batch is split until only the invalid lead fails"""
+        leads = make_leads(40)
+        async with LocalCRMServer() as server:
+            server.rejected_emails.add('lead13@example.com')
+            hubspot = HubSpotCRM(api_key='test', base_url=server.base_url)
+            results = await hubspot.create_leads(leads)
+            await hubspot.close()
+
+        failed = [i for i, item in enumerate(results) if isinstance(item, Exception)]
+        assert failed == [13]
+        assert len(server.records['hubspot']) == 39
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_responses_are_retried(self):
+        """429 with Retry-After pauses the integration and the batch succeeds"""
+        async with LocalCRMServer() as server:
+            server.fail_next(status=429, times=2, retry_after=0.1)
+            hubspot = HubSpotCRM(api_key='test', base_url=server.base_url)
+            started = time.perf_counter()
+            results = await hubspot.create_leads(make_leads(5))
+            elapsed = time.perf_counter() - started
+            await hubspot.close()
+
+        assert all(isinstance(item, str) for item in results)
+        assert server.requests['hubspot'] == 3
+        assert elapsed >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_plain_creates_are_only_retried_when_throttled(self):
+        """A failed POST create is not resent on 5xx; upserts and 429s are retried"""
+        async with LocalCRMServer() as server:
+            hubspot = HubSpotCRM(api_key='test', base_url=server.base_url)
+            supabase = SupabaseCRM(url=server.base_url, key='test')
+
+            server.fail_next(status=503)
+            with pytest.raises(CRMRequestError):
+                await hubspot.create_lead(make_leads(1)[0])
+            assert server.requests['hubspot'] == 1
+
+            server.fail_next(status=503)
+            assert all(isinstance(item, str) for item in await hubspot.create_leads(make_leads(2)))
+            assert server.requests['hubspot'] == 3
+
+            server.fail_next(status=500)
+            results = await supabase.create_leads(make_leads(3))
+            assert all(isinstance(item, CRMRequestError) for item in results)
+            assert server.requests['supabase'] == 1
+
+            server.fail_next(status=429, retry_after=0.05)
+            await supabase.create_lead(make_leads(1)[0])
+            assert server.requests['supabase'] == 3
+
+            await hubspot.close()
+            await supabase.close()
+
+        assert len(server.records['supabase']) == 1
@@ -0,0 +1,59 @@
+"""
+Test suite for the shared database engine factory
+"""
+
+import pytest
+from sqlalchemy import text
+
+from src.database.models import DatabaseManager, Product, get_engine, get_pool_metrics, dispose_engines
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    yield f"sqlite:///{tmp_path / 'agents.db'}"
+    dispose_engines()
+
+
+class TestEngineFactory:
+    """Test cases for get_engine and DatabaseManager engine sharing"""
+
+    def test_managers_share_one_tuned_engine(self, database_url):
+        """Every manager for a URL uses the same engine with pool settings and pragmas applied"""
+        first = DatabaseManager(database_url, pool_size=3, max_overflow=2, pool_timeout=5)
+        second = DatabaseManager(database_url)
+
+        assert first.engine is second.engine
+        assert get_engine(database_url) is first.engine
+        assert first.engine.pool.size() == 3
+
+        with first.engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+    def test_pool_checkout_metrics(self, database_url):
+        """Checkouts, checkins and hold times are counted per engine"""
+        manager = DatabaseManager(database_url)
+        manager.create_tables()
+
+        for i in range(3):
+            session = manager.get_session()
+            session.add(Product(sku=f"SKU-{i}", name=f"Product {i}", category="test",
+                                unit_cost=1.0, selling_price=2.0))
+            session.commit()
+            manager.close_session(session)
+
+        metrics = next(iter(get_pool_metrics().values()))
+        assert metrics['checkouts'] >= 3
+        assert metrics['checkins'] == metrics['checkouts']
+        assert metrics['checked_out'] == 0
+        assert metrics['peak_checked_out'] >= 1
+
+    def test_in_memory_databases_stay_separate(self):
+        """In-memory URLs keep one private database per manager"""
+        first = DatabaseManager("sqlite:///:memory:")
+        second = DatabaseManager("sqlite:///:memory:")
+        first.create_tables()
+
+        assert first.engine is not second.engine
+        with second.engine.connect() as connection:
+            assert connection.execute(text("SELECT name FROM sqlite_master WHERE name='products'")).first() is None
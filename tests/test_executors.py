@@ -0,0 +1,133 @@
+"""
+Test suite for the agent executor layer
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.utils.executors import AgentExecutor, EndpointLimit, EndpointBusyError, EndpointTimeoutError
+
+
+class TestAgentExecutor:
+    """Test cases for AgentExecutor"""
+
+    @pytest.mark.asyncio
+    async def test_blocking_calls_leave_the_loop_free(self):
+        """Offloaded work runs in parallel while the loop keeps serving"""
+        executor = AgentExecutor(thread_workers=4, default_limit=EndpointLimit(max_concurrency=4))
+        all_started = threading.Barrier(4)
+        release = threading.Event()
+        lock = threading.Lock()
+        active = peak = 0
+
+        def blocking_call():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            try:
+                # Passes only if all four calls are running at once
+                all_started.wait(timeout=5)
+                # Set by the event loop while every worker is blocked
+                release.wait(timeout=5)
+                return release.is_set()
+            finally:
+                with lock:
+                    active -= 1
+
+        async def ticker():
+            ticks = 0
+            while peak < 4 or ticks < 5:
+                ticks += 1
+                await asyncio.sleep(0.01)
+            release.set()
+            return ticks
+
+        try:
+            *results, ticks = await asyncio.gather(
+                *(executor.run('forecast', blocking_call) for _ in range(4)),
+                ticker()
+            )
+
+            assert results == [True] * 4
+            assert peak == 4
+            assert ticks >= 5
+            assert executor.get_stats()['forecast']['completed'] == 4
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_endpoint_limits_and_timeouts(self):
+        """A full endpoint rejects callers; a slow call times out but keeps its slot"""
+        executor = AgentExecutor(
+            thread_workers=4,
+            limits={'optimize': EndpointLimit(max_concurrency=1, timeout_seconds=0.1)}
+        )
+        try:
+            slow = asyncio.ensure_future(executor.run('optimize', time.sleep, 0.3))
+            await asyncio.sleep(0.01)
+
+            with pytest.raises(EndpointBusyError):
+                await executor.run('optimize', time.sleep, 0)
+            with pytest.raises(EndpointTimeoutError):
+                await slow
+
+            # Other endpoints are unaffected by the saturated one
+            assert await executor.run('alerts', sum, [1, 2, 3]) == 6
+
+            stats = executor.get_stats()
+            assert stats['optimize']['rejected'] == 1
+            assert stats['optimize']['timeouts'] == 1
+            assert stats['optimize']['in_flight'] == 1
+
+            await asyncio.sleep(0.3)
+            assert executor.get_stats()['optimize']['in_flight'] == 0
+            assert await executor.run('optimize', sum, [4]) == 4
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_process_endpoints_run_in_worker_processes(self):
+        """Pure functions go to the process pool; agent methods stay on threads here"""
+        executor = AgentExecutor(
+            thread_workers=1,
+            process_workers=1,
+            limits={'ranking': EndpointLimit(pool='process')}
+        )
+        try:
+            assert await executor.run('ranking', os.getpid) != os.getpid()
+            assert await executor.run('alerts', os.getpid) == os.getpid()
+
+            counter = Counter({'critical': 3, 'low': 1})
+            assert await executor.run_agent('ranking', counter, 'most_common', 1) == [('critical', 3)]
+            counter['low'] += 5
+            assert counter['low'] == 6
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_broken_process_pool_is_replaced(self):
+        """A worker that dies fails its call, and later calls get a new pool"""
+        executor = AgentExecutor(
+            thread_workers=1,
+            process_workers=1,
+            limits={'ranking': EndpointLimit(pool='process')}
+        )
+        try:
+            with pytest.raises(BrokenProcessPool):
+                await executor.run('ranking', os._exit, 1)
+
+            assert executor.process_pool_restarts == 1
+            assert await executor.run('ranking', sum, [1, 2]) == 3
+
+            stats = executor.get_stats()['ranking']
+            assert stats['failed'] == 1 and stats['completed'] == 1
+            assert stats['in_flight'] == 0
+        finally:
+            executor.shutdown()
@@ -494,4 +494,18 @@ class TestDemandForecaster:
         # Values should be reasonable
         assert accuracy['mae'] >= 0
         assert accuracy['mape'] >= 0
-        assert accuracy['rmse'] >= 0
\ No newline at end of file
+        assert accuracy['rmse'] >= 0
+    def test_compute_forecast_runs_in_a_worker_process(self, forecaster, sample_sales_data):
+        """The model step is pure, so it gives the same forecast in another process"""
+        from concurrent.futures import ProcessPoolExecutor
+        from src.agents.inventory_tracker import compute_forecast
+
+        local = compute_forecast(forecaster, 1, 2, 30, sample_sales_data)
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            remote = pool.submit(compute_forecast, forecaster, 1, 2, 30, sample_sales_data).result()
+
+        assert isinstance(remote, ForecastResult)
+        assert remote == local
+
+        short = compute_forecast(forecaster, 1, 2, 10, sample_sales_data.iloc[:4])
+        assert short.predicted_demand == sample_sales_data['quantity_sold'].iloc[:4].mean() * 10
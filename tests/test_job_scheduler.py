@@ -0,0 +1,147 @@
+"""
+Test suite for the asyncio job scheduler
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.job_scheduler import (
+    AsyncJobScheduler, IntervalTrigger, DailyTrigger, WeeklyTrigger, MonthlyTrigger
+)
+
+
+class TestTriggers:
+    """Test cases for trigger next-run calculation"""
+
+    def test_daily_and_weekly(self):
+        moment = datetime(2024, 5, 15, 10, 30)  # Wednesday
+
+        assert DailyTrigger("08:00").next_after(moment) == datetime(2024, 5, 16, 8, 0)
+        assert DailyTrigger("11:00").next_after(moment) == datetime(2024, 5, 15, 11, 0)
+        assert WeeklyTrigger("monday", "09:00").next_after(moment) == datetime(2024, 5, 20, 9, 0)
+        assert WeeklyTrigger("wednesday", "10:30").next_after(moment) == datetime(2024, 5, 22, 10, 30)
+
+    def test_monthly_clamps_short_months(self):
+        trigger = MonthlyTrigger(day=31, at="09:00")
+
+        assert trigger.next_after(datetime(2024, 1, 31, 9, 0)) == datetime(2024, 2, 29, 9, 0)
+        assert trigger.next_after(datetime(2024, 12, 31, 12, 0)) == datetime(2025, 1, 31, 9, 0)
+        assert MonthlyTrigger().next_after(datetime(2024, 3, 1, 8, 0)) == datetime(2024, 3, 1, 9, 0)
+
+
+class TestAsyncJobScheduler:
+    """Test cases for AsyncJobScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_slow_job_does_not_delay_others(self):
+        """Each job runs on its own executor, so a long job leaves others on time"""
+        scheduler = AsyncJobScheduler()
+        fast_runs = []
+
+        scheduler.add_job('weekly_optimization', time.sleep, IntervalTrigger(10), 0.5, run_immediately=True)
+        scheduler.add_job('inventory_monitoring', lambda: fast_runs.append(time.monotonic()), IntervalTrigger(0.05))
+        scheduler.start()
+        await asyncio.sleep(0.3)
+        await scheduler.stop(timeout=1)
+
+        assert len(fast_runs) >= 3
+        stats = scheduler.get_stats()
+        assert stats['weekly_optimization']['runs'] == 1
+        assert stats['weekly_optimization']['max_seconds'] >= 0.5
+        assert stats['inventory_monitoring']['failed'] == 0
+
+    @pytest.mark.asyncio
+    async def test_overlapping_runs_are_coalesced(self):
+        """A job still running when due is not started twice; one catch-up run follows"""
+        scheduler = AsyncJobScheduler()
+        active = 0
+        peak = 0
+
+        async def slow_job():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.12)
+            active -= 1
+
+        scheduler.add_job('report', slow_job, IntervalTrigger(0.03), run_immediately=True)
+        scheduler.start()
+        await asyncio.sleep(0.3)
+        await scheduler.stop(timeout=1)
+
+        stats = scheduler.get_stats()['report']
+        assert peak == 1
+        assert stats['skipped_overlap'] >= 3
+        assert stats['catch_up_runs'] >= 1
+        assert stats['runs'] >= 2
+
+    @pytest.mark.asyncio
+    async def test_missed_runs_catch_up_once_or_are_dropped(self):
+        """Runs missed beyond the grace period collapse into one run, or none without catch-up"""
+        offset = timedelta()
+        scheduler = AsyncJobScheduler(clock=lambda: datetime.now() + offset)
+        runs = {'metrics': 0, 'refresh': 0}
+
+        def bump(name):
+            runs[name] += 1
+
+        scheduler.add_job('metrics', bump, IntervalTrigger(60), 'metrics', misfire_grace_seconds=5)
+        scheduler.add_job('refresh', bump, IntervalTrigger(60), 'refresh', misfire_grace_seconds=5, catch_up=False)
+
+        # The process was suspended for an hour
+        offset = timedelta(hours=1)
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.stop(timeout=1)
+
+        stats = scheduler.get_stats()
+        assert runs == {'metrics': 1, 'refresh': 0}
+        assert stats['metrics']['catch_up_runs'] == 1
+        assert stats['refresh']['missed'] == 1
+        assert scheduler.next_run('metrics') > datetime.now() + offset
+
+    @pytest.mark.asyncio
+    async def test_failures_are_recorded(self):
+        """A failing job is logged and counted without stopping the scheduler"""
+        scheduler = AsyncJobScheduler()
+
+        def broken():
+            raise RuntimeError("database unavailable")
+
+        scheduler.add_job('broken', broken, IntervalTrigger(0.05), run_immediately=True, jitter_seconds=0.01)
+        scheduler.start()
+        await asyncio.sleep(0.2)
+        await scheduler.stop(timeout=1)
+
+        stats = scheduler.get_stats()['broken']
+        assert stats['failed'] >= 2
+        assert stats['succeeded'] == 0
+        assert stats['last_error'] == "database unavailable"
+
+    def test_shutdown_outside_the_event_loop(self):
+        """shutdown() stops a scheduler whose loop is no longer running"""
+        scheduler = AsyncJobScheduler()
+        loop = asyncio.new_event_loop()
+        runs = []
+
+        async def run_briefly():
+            scheduler.start()
+            await asyncio.sleep(0.02)
+
+        scheduler.add_job('poll', time.sleep, IntervalTrigger(0.01), 0.05, run_immediately=True)
+        loop.run_until_complete(run_briefly())
+        task = scheduler._task
+
+        scheduler.shutdown()
+        loop.run_until_complete(asyncio.sleep(0.01))
+        scheduler.add_job('later', runs.append, IntervalTrigger(0.01), 1)
+        loop.run_until_complete(asyncio.sleep(0.05))
+        loop.close()
+
+        assert task.cancelled()
+        assert scheduler._task is None
+        assert runs == []
+        assert scheduler._owned_executors == {}
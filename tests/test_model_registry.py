@@ -0,0 +1,125 @@
+"""
+Test suite for the shared model registry
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from src.utils.model_registry import ModelRegistry, ModelUnavailableError
+
+
+@pytest.fixture
+def registry():
+    """Create an empty ModelRegistry for testing"""
+    return ModelRegistry()
+
+
+class TestModelRegistry:
+    """Test cases for ModelRegistry"""
+
+    def test_loads_lazily(self, registry):
+        """Registering a model should not build it"""
+        loader = Mock(return_value="model")
+        registry.register("demo", loader)
+
+        assert not registry.is_loaded("demo")
+        loader.assert_not_called()
+
+        assert registry.get("demo") == "model"
+        assert registry.is_loaded("demo")
+
+    def test_shares_one_instance(self, registry):
+        """Repeated lookups should return the same object"""
+        registry.register("demo", lambda: object())
+
+        assert registry.get("demo") is registry.get("demo")
+
+    def test_loads_once_across_threads(self, registry):
+        """Concurrent first use should only run the loader once"""
+        loader = Mock(side_effect=lambda: object())
+        registry.register("demo", loader)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("demo"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loader.call_count == 1
+        assert all(result is results[0] for result in results)
+
+    def test_caches_missing_optional_model(self, registry):
+        """A loader returning None should not be retried"""
+        loader = Mock(return_value=None)
+        registry.register("optional", loader)
+
+        assert registry.get("optional") is None
+        assert registry.get("optional") is None
+        assert loader.call_count == 1
+
+    def test_failed_load_is_cached_until_retry(self, registry):
+        """Loader errors surface in stats and are not retried on every call"""
+        loader = Mock(side_effect=[RuntimeError("download failed"), "model"])
+        registry.register("flaky", loader)
+
+        with pytest.raises(RuntimeError):
+            registry.get("flaky")
+        with pytest.raises(ModelUnavailableError):
+            registry.get("flaky")
+        assert registry.get_optional("flaky") is None
+        assert loader.call_count == 1
+
+        stats = {s["name"]: s for s in registry.get_stats()}
+        assert stats["flaky"]["error"] == "download failed"
+
+        registry.unload("flaky")
+        assert registry.get("flaky") == "model"
+
+    def test_failed_load_is_retried_after_interval(self):
+        """Once retry_failed_after has passed the loader runs again"""
+        registry = ModelRegistry(retry_failed_after=0)
+        loader = Mock(side_effect=[RuntimeError("download failed"), "model"])
+        registry.register("flaky", loader)
+
+        assert registry.get_optional("flaky") is None
+        assert registry.get("flaky") == "model"
+        assert {s["name"]: s for s in registry.get_stats()}["flaky"]["error"] is None
+
+    def test_warm_up_and_stats(self, registry):
+        """Warm-up should load models and record cold-start cost"""
+        registry.register("a", lambda: "a")
+        registry.register("b", lambda: "b")
+
+        registry.warm_up(["a"])
+
+        stats = {s["name"]: s for s in registry.get_stats()}
+        assert stats["a"]["loaded"] is True
+        assert stats["a"]["load_seconds"] is not None
+        assert stats["b"]["loaded"] is False
+
+    def test_background_warm_up(self, registry):
+        """Background warm-up should return a joinable thread"""
+        registry.register("a", lambda: "a")
+
+        thread = registry.warm_up(background=True)
+        thread.join(timeout=5)
+
+        assert registry.is_loaded("a")
+
+    def test_unknown_model(self, registry):
+        """Unknown names should raise KeyError"""
+        with pytest.raises(KeyError):
+            registry.get("missing")
+
+    def test_duplicate_registration(self, registry):
+        """Registering the same name twice requires replace=True"""
+        registry.register("demo", lambda: 1)
+
+        with pytest.raises(ValueError):
+            registry.register("demo", lambda: 2)
+
+        registry.register("demo", lambda: 2, replace=True)
+        assert registry.get("demo") == 2
@@ -0,0 +1,130 @@
+"""
+Test suite for the notification outbox and dispatcher
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.notifications import NotificationManager
+from src.utils.notification_outbox import NotificationOutbox, NotificationDispatcher
+from tests.local_servers import LocalSMTPServer, FakeWebhookReceiver
+
+
+def make_manager(tmp_path, smtp_port: int, webhook_urls=None, **overrides):
+    config = {
+        'smtp_host': '127.0.0.1',
+        'smtp_port': smtp_port,
+        'smtp_use_tls': False,
+        'from_email': 'agent@example.com',
+        'webhook_enabled': bool(webhook_urls),
+        'webhook_urls': webhook_urls or [],
+        'outbox_enabled': True,
+        'outbox_db_path': str(tmp_path / 'outbox.db'),
+        **overrides
+    }
+    return NotificationManager(config)
+
+
+def make_dispatcher(manager, **kwargs):
+    outbox = NotificationOutbox(manager.config.outbox_db_path, base_delay_seconds=0.01,
+                                max_attempts=kwargs.pop('max_attempts', 6))
+    return NotificationDispatcher(manager, outbox=outbox, **kwargs)
+
+
+class TestNotificationOutbox:
+    """Test cases for NotificationOutbox and NotificationDispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_emails_reuse_pooled_smtp_sessions(self, tmp_path):
+        """Many queued emails share the pool's persistent connections"""
+        async with LocalSMTPServer() as smtp:
+            manager = make_manager(tmp_path, smtp.port)
+            for i in range(20):
+                assert manager.send_email(f'user{i}@example.com', f'Order {i} shipped', 'Body')
+
+            dispatcher = make_dispatcher(manager)
+            await dispatcher.dispatch_once()
+            await dispatcher.stop()
+
+        assert len(smtp.messages) == 20
+        assert 1 <= smtp.connections <= manager.config.smtp_pool_size
+        assert dispatcher.get_stats()['smtp']['messages_sent'] == 20
+        assert dispatcher.get_stats()['outbox'] == {'sent': 20}
+
+    @pytest.mark.asyncio
+    async def test_identical_emails_are_batched(self, tmp_path):
+        """One alert to many recipients is sent as one SMTP transaction per batch"""
+        async with LocalSMTPServer() as smtp:
+            manager = make_manager(tmp_path, smtp.port, email_batch_size=4)
+            recipients = [f'ops{i}@example.com' for i in range(10)]
+            results = manager.send_notification('Stockout', 'SKU-1 is out of stock', 'medium', recipients)
+            assert results == {'email': True}
+
+            dispatcher = make_dispatcher(manager)
+            await dispatcher.dispatch_once()
+            await dispatcher.stop()
+
+        assert smtp.transactions == 3
+        assert sorted(r for message in smtp.messages for r in message['recipients']) == sorted(recipients)
+
+    @pytest.mark.asyncio
+    async def test_separate_enqueues_are_not_merged(self, tmp_path):
+        """Identical emails queued separately go out separately, each addressed only to its recipient"""
+        async with LocalSMTPServer() as smtp:
+            manager = make_manager(tmp_path, smtp.port, email_batch_size=10)
+            for i in range(3):
+                assert manager.send_email(f'customer{i}@example.com', 'Your order shipped', 'Body')
+
+            dispatcher = make_dispatcher(manager)
+            await dispatcher.dispatch_once()
+            await dispatcher.stop()
+
+        assert smtp.transactions == 3
+        assert sorted(message['to'] for message in smtp.messages) == \
+            [f'customer{i}@example.com' for i in range(3)]
+        assert all(len(message['recipients']) == 1 for message in smtp.messages)
+
+    @pytest.mark.asyncio
+    async def test_channels_are_sent_concurrently_and_retried(self, tmp_path):
+        """A webhook that fails is retried with backoff while email goes out unaffected"""
+        async with LocalSMTPServer() as smtp, FakeWebhookReceiver(latency=0.05) as hooks:
+            urls = [hooks.url('a'), hooks.url('b')]
+            manager = make_manager(tmp_path, smtp.port, webhook_urls=urls,
+                                   default_email_recipients=['ops@example.com'])
+            hooks.fail_next(status=500)
+            manager.send_notification('Deploy', 'Finished', 'high', channels=['email', 'webhook'])
+
+            dispatcher = make_dispatcher(manager, poll_seconds=0.02)
+            dispatcher.start()
+            for _ in range(100):
+                if dispatcher.get_stats()['outbox'].get('sent') == 3:
+                    break
+                await asyncio.sleep(0.02)
+            await dispatcher.stop()
+
+        assert len(smtp.messages) == 1
+        assert sorted(post['path'] for post in hooks.posts) == ['/a', '/b']
+        assert hooks.posts[0]['payload']['priority'] == 'high'
+        assert dispatcher.stats['failed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_rows_survive_restart_and_give_up(self, tmp_path):
+        """Queued rows outlive the manager and are marked dead after max attempts"""
+        async with FakeWebhookReceiver() as hooks:
+            manager = make_manager(tmp_path, 1, webhook_urls=[hooks.url()])
+            manager.send_notification('Alert', 'Check inventory', 'low', channels=['webhook'])
+            del manager
+
+            # A fresh process sees the queued row
+            restarted = make_manager(tmp_path, 1, webhook_urls=[hooks.url()])
+            dispatcher = make_dispatcher(restarted, max_attempts=2)
+            hooks.fail_next(status=503, times=5)
+
+            await dispatcher.dispatch_once()
+            await asyncio.sleep(0.05)
+            await dispatcher.dispatch_once()
+            await dispatcher.stop()
+
+        assert dispatcher.outbox.status_counts() == {'dead': 1}
+        assert hooks.requests == 2
@@ -0,0 +1,101 @@
+"""
+Test suite for the shared OCR preprocessing utilities
+"""
+
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from src.utils.ocr_utils import DocumentPreprocessor, benchmark_preprocessing
+
+
+def make_page(height=600, width=800, noise=0.0, seed=0):
+    """A light page with dark text-like bars, optionally with Gaussian noise"""
+    page = np.full((height, width), 230, dtype=np.uint8)
+    for y in range(60, height - 60, 40):
+        page[y:y + 12, 60:width - 60] = 30
+    if noise:
+        rng = np.random.default_rng(seed)
+        page = np.clip(page + rng.normal(0, noise, page.shape), 0, 255).astype(np.uint8)
+    return page
+
+
+class TestDocumentPreprocessor:
+    """Test cases for quality assessment and gated preprocessing"""
+
+    def setup_method(self):
+        self.preprocessor = DocumentPreprocessor()
+
+    def test_assess_quality_measures_noise_at_full_resolution(self):
+        """Noise that downscaling would average away is still reported"""
+        clean = self.preprocessor.assess_quality(make_page(3000, 2000))
+        noisy = self.preprocessor.assess_quality(make_page(3000, 2000, noise=8))
+
+        assert clean.noise_sigma < self.preprocessor.noise_threshold
+        assert noisy.noise_sigma > self.preprocessor.noise_threshold
+        assert noisy.analysis_scale == pytest.approx(1000 / 3000, abs=1e-3)
+        assert clean.contrast > 0 and clean.sharpness > 0
+
+    def test_denoise_tiled_covers_the_whole_image(self):
+        """Large images are denoised in overlapping tiles stitched back to full size"""
+        preprocessor = DocumentPreprocessor(tile_size=256, tile_overlap=16)
+        image = np.random.default_rng(1).integers(0, 255, (600, 300), dtype=np.uint8)
+
+        with patch('cv2.fastNlMeansDenoising', side_effect=lambda tile, dst, h: tile) as mock_denoise:
+            denoised = preprocessor.denoise_tiled(image)
+
+        assert mock_denoise.call_count == 3 * 2
+        assert np.array_equal(denoised, image)
+
+        # Without mocking, tiled output matches the input shape and reduces noise
+        noisy = make_page(600, 300, noise=20)
+        result = preprocessor.denoise_tiled(noisy, strength=15)
+        assert result.shape == noisy.shape
+        assert preprocessor.estimate_noise(result) < preprocessor.estimate_noise(noisy)
+
+    def test_preprocess_for_ocr_skips_stages_a_clean_page_does_not_need(self):
+        """Adaptive preprocessing gates denoising on the metrics and reports timings"""
+        clean = cv2.cvtColor(make_page(), cv2.COLOR_GRAY2BGR)
+
+        with patch.object(DocumentPreprocessor, 'denoise_tiled') as mock_denoise:
+            processed, report = self.preprocessor.preprocess_for_ocr(clean)
+
+        mock_denoise.assert_not_called()
+        assert processed.ndim == 2 and processed.dtype == np.uint8
+        assert report['adaptive'] is True
+        assert report['quality_metrics']['noise_sigma'] < self.preprocessor.noise_threshold
+        assert set(report['stage_timings']) == {'assess', 'enhance', 'deskew', 'denoise', 'text_enhance'}
+
+        heavy = make_page(noise=25)
+        with patch.object(DocumentPreprocessor, 'denoise_tiled', side_effect=lambda gray, strength: gray) as mock_denoise:
+            self.preprocessor.preprocess_for_ocr(heavy)
+        assert mock_denoise.called
+
+        _, full = self.preprocessor.preprocess_for_ocr(clean, adaptive=False)
+        assert full['quality_metrics'] is None
+
+
+class TestBenchmarkPreprocessing:
+    """Test cases for the adaptive vs. full-resolution benchmark"""
+
+    def test_benchmark_scores_against_ground_truth(self, tmp_path):
+        """Files with a .txt sidecar are scored; others report agreement between modes"""
+        cv2.imwrite(str(tmp_path / 'a.png'), make_page())
+        (tmp_path / 'a.txt').write_text('TOTAL 12.50', encoding='utf-8')
+        cv2.imwrite(str(tmp_path / 'b.png'), make_page(noise=10))
+        (tmp_path / 'broken.jpg').write_bytes(b'not an image')
+
+        with patch('pytesseract.image_to_string', return_value='TOTAL 12.50'):
+            results = benchmark_preprocessing(str(tmp_path))
+
+        assert results['total_files'] == 3
+        files = {path.rsplit('/', 1)[1]: result for path, result in
+                 ((f['file_path'], f) for f in results['files'])}
+        assert files['a.png']['adaptive']['accuracy'] == 1.0
+        assert files['a.png']['accuracy_delta'] == 0.0
+        assert files['b.png']['agreement'] == 1.0
+        assert files['broken.jpg']['success'] is False
+        assert results['summary']['adaptive']['mean_accuracy'] == 1.0
+        assert results['summary']['speedup'] is not None
@@ -0,0 +1,201 @@
+"""
+Test suite for the rate-limited platform API client layer
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+
+import pytest
+from aiohttp import web
+
+from src.integrations.platform_apis import PlatformAPIManager, PlatformConfig, LatencyHistogram
+
+
+class FakeSocialAPI:
+    """Minimal Twitter and Facebook Graph endpoints with latency and injected failures"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = {'twitter': 0, 'facebook': 0}
+        self.active = {'twitter': 0, 'facebook': 0}
+        self.peak = {'twitter': 0, 'facebook': 0}
+        self.failures = deque()
+        self._ids = itertools.count(1)
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.router.add_post('/2/tweets', self._tweet)
+        self.app.router.add_get('/2/tweets/{post_id}', self._tweet_metrics)
+        self.app.router.add_post('/v18.0/{page_id}/feed', self._facebook_post)
+        self.app.router.add_get('/v18.0/{post_id}/insights', self._facebook_insights)
+
+    async def __aenter__(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        self.base_url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._runner.cleanup()
+
+    async def _serve(self, platform, status, payload):
+        self.requests[platform] += 1
+        self.active[platform] += 1
+        self.peak[platform] = max(self.peak[platform], self.active[platform])
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.failures:
+                failure_status, retry_after = self.failures.popleft()
+                return web.Response(status=failure_status, headers={'Retry-After': str(retry_after)})
+            return web.json_response(payload, status=status)
+        finally:
+            self.active[platform] -= 1
+
+    async def _tweet(self, request):
+        return await self._serve('twitter', 201, {'data': {'id': f"t{next(self._ids)}"}})
+
+    async def _tweet_metrics(self, request):
+        return await self._serve('twitter', 200, {'data': {'public_metrics': {'like_count': 3}}})
+
+    async def _facebook_post(self, request):
+        return await self._serve('facebook', 200, {'id': f"f{next(self._ids)}"})
+
+    async def _facebook_insights(self, request):
+        return await self._serve('facebook', 200, {'data': [{'name': 'post_impressions', 'values': [{'value': 40}]}]})
+
+
+def make_configs(base_url, **overrides):
+    return [
+        PlatformConfig(platform=platform, api_key='test', access_token='token', base_url=base_url, **overrides)
+        for platform in ('twitter', 'facebook')
+    ]
+
+
+class TestPlatformAPIManager:
+    """Test cases for concurrent, rate-limited platform calls"""
+
+    @pytest.mark.asyncio
+    async def test_publish_many_runs_concurrently_within_connection_limits(self):
+        """Posts go out in parallel, never exceeding each platform's connection limit"""
+        posts = [{'platform': 'twitter', 'content': f'post {i}'} for i in range(8)] + \
+                [{'platform': 'facebook', 'content': 'page post'}, {'platform': 'myspace', 'content': 'old'}]
+
+        async with FakeSocialAPI(latency=0.1) as server:
+            async with PlatformAPIManager(make_configs(server.base_url, max_concurrency=3)) as api:
+                started = time.perf_counter()
+                results = await api.publish_many(posts)
+                elapsed = time.perf_counter() - started
+                stats = api.get_stats()
+
+        assert [result['success'] for result in results] == [True] * 9 + [False]
+        assert results[0]['post_id'] != results[1]['post_id']
+        assert server.peak['twitter'] == 3
+        assert elapsed < 0.6  # 8 serial tweets would take 0.8s
+        assert stats['twitter']['requests'] == 8
+        assert stats['twitter']['latency']['count'] == 8
+        assert stats['twitter']['latency']['p50_ms'] >= 100
+
+    @pytest.mark.asyncio
+    async def test_throttled_requests_honor_retry_after(self):
+        """A 429 drains the platform bucket for Retry-After and the request is retried"""
+        async with FakeSocialAPI() as server:
+            server.failures.append((429, 0.3))
+            async with PlatformAPIManager(make_configs(server.base_url, rate_limit=360000)) as api:
+                started = time.perf_counter()
+                results = await api.fetch_analytics_many([
+                    {'platform': 'twitter', 'post_id': 't1'},
+                    {'platform': 'facebook', 'post_id': 'f1'}
+                ])
+                elapsed = time.perf_counter() - started
+                stats = api.get_stats()
+
+        assert results[0]['likes'] == 3 and results[1]['impressions'] == 40
+        throttled = [name for name, platform in stats.items() if platform['throttled']]
+        assert len(throttled) == 1
+        assert stats[throttled[0]]['retries'] == 1
+        assert elapsed >= 0.3
+
+    @pytest.mark.asyncio
+    async def test_requests_are_paced_by_the_hourly_quota(self):
+        """After the burst, requests are spaced at the configured rate"""
+        async with FakeSocialAPI() as server:
+            configs = make_configs(server.base_url, rate_limit=36000, burst=1)  # one every 0.1s
+            async with PlatformAPIManager(configs) as api:
+                started = time.perf_counter()
+                await api.fetch_analytics_many([{'platform': 'twitter', 'post_id': str(i)} for i in range(5)])
+                elapsed = time.perf_counter() - started
+
+        assert server.requests['twitter'] == 5
+        assert elapsed >= 0.35
+
+    @pytest.mark.asyncio
+    async def test_posts_are_only_retried_when_declined(self):
+        """A POST is not resent after a 5xx that may have published it, only after 429 or 503 with Retry-After"""
+        async with FakeSocialAPI() as server:
+            async with PlatformAPIManager(make_configs(server.base_url, rate_limit=360000)) as api:
+                server.failures.append((500, None))
+                failed = await api.post_to_twitter('first')
+                assert server.requests['twitter'] == 1
+
+                server.failures.extend([(429, 0.05), (503, 0.05)])
+                published = await api.post_to_twitter('second')
+                assert server.requests['twitter'] == 4
+
+                server.failures.extend([(502, None), (500, None)])
+                analytics = await api.get_post_analytics('twitter', 't1')
+                assert server.requests['twitter'] == 7
+
+        assert failed['success'] is False
+        assert published['success'] is True
+        assert analytics['likes'] == 3
+
+    @pytest.mark.asyncio
+    async def test_manager_can_be_entered_again(self):
+        """Re-entering the context manager uses the new session instead of the closed one"""
+        async with FakeSocialAPI() as server:
+            api = PlatformAPIManager(make_configs(server.base_url))
+            async with api:
+                assert (await api.post_to_twitter('first'))['success']
+            async with api:
+                assert (await api.post_to_twitter('second'))['success']
+            stats = api.get_stats()
+
+        assert server.requests['twitter'] == 2
+        assert stats['twitter']['requests'] == 1
+
+    @pytest.mark.asyncio
+    async def test_email_providers_default_to_their_own_quotas(self):
+        """Batch email senders are not held to the social posting default"""
+        configs = [PlatformConfig(platform=platform, api_key='test')
+                   for platform in ('sendgrid', 'mailchimp', 'twitter')]
+        configs.append(PlatformConfig(platform='facebook', api_key='test', rate_limit=500))
+
+        async with PlatformAPIManager(configs) as api:
+            rates = {platform: api._client(platform).rate_limiter.rate * 3600
+                     for platform in ('sendgrid', 'mailchimp', 'twitter', 'facebook')}
+
+        assert rates['sendgrid'] == pytest.approx(36000)
+        assert rates['mailchimp'] == pytest.approx(36000)
+        assert rates['twitter'] == pytest.approx(100)
+        assert rates['facebook'] == pytest.approx(500)
+
+
+class TestLatencyHistogram:
+    """Test cases for latency buckets and percentiles"""
+
+    def test_percentiles_use_bucket_bounds(self):
+        """Percentiles report the bucket bound, capped at the slowest request"""
+        histogram = LatencyHistogram()
+        for seconds in [0.01] * 90 + [0.3] * 9 + [0.7]:
+            histogram.record(seconds)
+
+        report = histogram.to_dict()
+        assert report['count'] == 100
+        assert report['p50_ms'] == 25
+        assert report['p95_ms'] == 500
+        assert report['buckets']['le_1000ms'] == 1
+        assert report['max_ms'] == pytest.approx(700, rel=0.01)
@@ -0,0 +1,98 @@
+"""
+Test suite for rate limiting utilities
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from src.utils.rate_limiter import AsyncTokenBucket, TokenBucket, retry_after_seconds
+
+
+class TestAsyncTokenBucket:
+    """Test cases for AsyncTokenBucket"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_steady_rate(self):
+        """Capacity is available immediately, then tokens arrive at the rate"""
+        bucket = AsyncTokenBucket(rate=20, capacity=2)
+
+        start = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # Two burst tokens, then four at 50ms each
+        assert 0.15 < elapsed < 0.4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_quota(self):
+        """Concurrent acquires should be paced by the bucket"""
+        bucket = AsyncTokenBucket.from_interval(0.05)
+
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+        elapsed = time.monotonic() - start
+
+        assert 0.12 < elapsed < 0.35
+
+    def test_try_acquire(self):
+        """Non-blocking acquire should fail once the bucket is empty"""
+        bucket = AsyncTokenBucket(rate=1, capacity=1)
+
+        assert bucket.try_acquire() is True
+        assert bucket.try_acquire() is False
+
+    @pytest.mark.asyncio
+    async def test_penalize_delays_next_token(self):
+        """A Retry-After penalty should hold off new tokens"""
+        bucket = AsyncTokenBucket(rate=10, capacity=1)
+        bucket.penalize(0.2)
+
+        start = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.2
+
+    def test_invalid_arguments(self):
+        """Rate and capacity must be positive"""
+        with pytest.raises(ValueError):
+            AsyncTokenBucket(rate=0)
+        with pytest.raises(ValueError):
+            AsyncTokenBucket(rate=1, capacity=0.5)
+
+
+class TestTokenBucket:
+    """Test cases for the thread-safe TokenBucket"""
+
+    def test_threads_share_quota(self):
+        """Worker threads together stay within the bucket's rate"""
+        bucket = TokenBucket(rate=20, capacity=2)
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: bucket.acquire(), range(8)))
+        elapsed = time.monotonic() - start
+
+        # Two burst tokens, then six at 50ms each
+        assert 0.25 < elapsed < 0.6
+
+
+class TestRetryAfterSeconds:
+    """Test cases for Retry-After parsing"""
+
+    def test_seconds_dates_and_fallbacks(self):
+        """Both header forms are parsed; missing or invalid values fall back to the default"""
+        later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        earlier = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=30), usegmt=True)
+
+        assert retry_after_seconds('2.5') == 2.5
+        assert 28 <= retry_after_seconds(later) <= 30
+        assert retry_after_seconds(earlier) == 0.0
+        assert retry_after_seconds(None) is None
+        assert retry_after_seconds('soon', default=4.0) == 4.0
+        assert retry_after_seconds('', default=1.0) == 1.0
@@ -17,9 +17,9 @@ from src.agents.review_responder import (
 
 
 @pytest.fixture
-def agent():
+def agent(tmp_path):
     """Create ReviewResponseAgent instance for testing"""
-    return ReviewResponseAgent()
+    return ReviewResponseAgent(db_path=str(tmp_path / "reviews.db"))
 
 
 @pytest.fixture
@@ -90,6 +90,39 @@ class TestReviewResponseAgent:
         sentiment = await agent.analyze_sentiment("")
         assert sentiment == SentimentScore.NEUTRAL
 
+    @pytest.mark.asyncio
+    async def test_sentiment_batch_matches_single(self, agent):
+        """Batched sentiment should agree with the single-text path"""
+        texts = [
+            "Amazing service! Absolutely love this place!",
+            "",
+            "Terrible service, very disappointed",
+            "It was okay, nothing special",
+            "   ",
+            "Good food and decent service. Would come back again.",
+        ]
+
+        expected = [await agent.analyze_sentiment(text) for text in texts]
+        batched = await agent.analyze_sentiment_batch(texts, batch_size=2)
+
+        assert batched == expected
+
+    @pytest.mark.asyncio
+    async def test_sentiment_batch_uses_length_buckets(self, agent):
+        """Transformer calls should receive mini-batches sorted by length"""
+        calls = []
+
+        def fake_model(inputs, **kwargs):
+            calls.append(list(inputs))
+            return [[{'label': 'LABEL_1', 'score': 1.0}] for _ in inputs]
+
+        texts = ["a much longer review text here", "short", "mid length", "tiny"]
+        with patch.object(type(agent), 'sentiment_model', new=property(lambda self: fake_model)):
+            results = await agent.analyze_sentiment_batch(texts, batch_size=2)
+
+        assert len(results) == len(texts)
+        assert calls == [["tiny", "short"], ["mid length", "a much longer review text here"]]
+
     def test_urgency_determination(self, agent):
         """Test urgency level determination"""
         # Critical: Low rating with viral potential
@@ -294,9 +327,53 @@ class TestReviewResponseAgent:
             assert mock_fetch.call_count == len(business_ids)
 
     @pytest.mark.asyncio
-    async def test_context_manager(self):
+    async def test_monitor_reviews_fetches_concurrently(self, agent):
+        """Fetches across platforms and locations should overlap, not add up"""
+        async def slow_fetch(platform, business_id):
+            await asyncio.sleep(0.2)
+            return []
+
+        agent.rate_limiters = {}
+        business_ids = {
+            ReviewPlatform.GOOGLE: ["place_1", "place_2", "place_3"],
+            ReviewPlatform.YELP: ["biz_1", "biz_2"],
+            ReviewPlatform.TRIPADVISOR: "loc_1"
+        }
+
+        with patch.object(agent, '_fetch_platform_reviews', side_effect=slow_fetch) as mock_fetch:
+            start = asyncio.get_running_loop().time()
+            reviews = await agent.monitor_reviews(business_ids)
+            elapsed = asyncio.get_running_loop().time() - start
+
+        assert reviews == []
+        assert mock_fetch.call_count == 6
+        assert elapsed < 0.6
+
+    @pytest.mark.asyncio
+    async def test_monitor_reviews_isolates_platform_errors(self, agent):
+        """One failing platform should not drop the others' reviews"""
+        mock_review = Mock()
+        mock_review.urgency = UrgencyLevel.LOW
+        mock_review.date = datetime.now()
+
+        async def fetch(platform, business_id):
+            if platform == ReviewPlatform.YELP:
+                raise ConnectionError("yelp down")
+            return [mock_review]
+
+        agent.rate_limiters = {}
+        with patch.object(agent, '_fetch_platform_reviews', side_effect=fetch):
+            reviews = await agent.monitor_reviews({
+                ReviewPlatform.GOOGLE: "place_1",
+                ReviewPlatform.YELP: "biz_1"
+            })
+
+        assert reviews == [mock_review]
+
+    @pytest.mark.asyncio
+    async def test_context_manager(self, tmp_path):
         """Test async context manager functionality"""
-        async with ReviewResponseAgent() as agent:
+        async with ReviewResponseAgent(db_path=str(tmp_path / "reviews.db")) as agent:
             assert agent.session is not None
 
         # Session should be closed after exiting context
@@ -383,6 +460,82 @@ class TestReviewResponseAgent:
         assert review.id == "tripadvisor_test_1"
         assert review.title == "Good Stay"
 
+    @pytest.mark.asyncio
+    async def test_incremental_ingestion_skips_seen_reviews(self, agent):
+        """A second poll should only ingest reviews past the high-water mark"""
+        raw_reviews = [
+            {"author_name": "A", "rating": 5, "text": "Great service!",
+             "time": int((datetime.now() - timedelta(hours=1)).timestamp()), "review_id": "g1"}
+        ]
+
+        with patch.object(agent, '_fetch_google_reviews', new_callable=AsyncMock, return_value=raw_reviews):
+            first = await agent._fetch_platform_reviews(ReviewPlatform.GOOGLE, "place_1")
+            second = await agent._fetch_platform_reviews(ReviewPlatform.GOOGLE, "place_1")
+
+        assert [r.id for r in first] == ["g1"]
+        assert second == []
+        assert agent.review_store.get_high_water_mark(ReviewPlatform.GOOGLE, "place_1") is not None
+
+    @pytest.mark.asyncio
+    async def test_unchanged_text_is_not_reanalyzed(self, agent):
+        """Reviews with a matching content hash should reuse stored analysis"""
+        timestamp = int((datetime.now() - timedelta(hours=1)).timestamp())
+        raw_reviews = [
+            {"author_name": "A", "rating": 5, "text": "Great service!", "time": timestamp, "review_id": "g1"},
+            {"author_name": "B", "rating": 2, "text": "Slow and rude", "time": timestamp, "review_id": "g2"}
+        ]
+
+        with patch.object(agent, '_fetch_google_reviews', new_callable=AsyncMock, return_value=raw_reviews):
+            await agent._fetch_platform_reviews(ReviewPlatform.GOOGLE, "place_1")
+
+        # g1 re-appears with a newer date but the same text; g2 was edited
+        newer = int(datetime.now().timestamp())
+        raw_reviews = [
+            dict(raw_reviews[0], time=newer),
+            dict(raw_reviews[1], time=newer, text="Slow, rude and the food was cold")
+        ]
+
+        with patch.object(agent, '_fetch_google_reviews', new_callable=AsyncMock, return_value=raw_reviews), \
+             patch.object(agent, 'analyze_sentiment_batch', wraps=agent.analyze_sentiment_batch) as mock_batch:
+            reviews = await agent._fetch_platform_reviews(ReviewPlatform.GOOGLE, "place_1")
+
+        assert {r.id for r in reviews} == {"g1", "g2"}
+        mock_batch.assert_called_once_with(["Slow, rude and the food was cold"])
+
+    @pytest.mark.asyncio
+    async def test_reviews_at_high_water_mark_are_not_dropped(self, agent):
+        """Late reviews sharing the newest timestamp and in-window edits should be ingested"""
+        timestamp = int((datetime.now() - timedelta(hours=1)).timestamp())
+        first_poll = [
+            {"author_name": "A", "rating": 5, "text": "Great service!", "time": timestamp, "review_id": "g1"}
+        ]
+
+        with patch.object(agent, '_fetch_google_reviews', new_callable=AsyncMock, return_value=first_poll):
+            await agent._fetch_platform_reviews(ReviewPlatform.GOOGLE, "place_1")
+
+        # g2 shares the high-water timestamp; g1 was edited without a new date
+        second_poll = [
+            dict(first_poll[0], text="Great service, and they fixed my order!"),
+            {"author_name": "B", "rating": 4, "text": "Nice place", "time": timestamp, "review_id": "g2"}
+        ]
+
+        with patch.object(agent, '_fetch_google_reviews', new_callable=AsyncMock, return_value=second_poll):
+            reviews = await agent._fetch_platform_reviews(ReviewPlatform.GOOGLE, "place_1")
+
+        assert {r.id for r in reviews} == {"g1", "g2"}
+
+    @pytest.mark.asyncio
+    async def test_reputation_insights_from_store(self, agent, sample_reviews):
+        """Insights aggregated from stored rows should match the in-memory path"""
+        for review in sample_reviews:
+            agent.review_store.save_reviews("biz_1", review.platform, [review])
+
+        from_list = await agent.get_reputation_insights(sample_reviews)
+        from_store = await agent.get_reputation_insights(business_id="biz_1")
+
+        assert from_store == from_list
+        assert await agent.get_reputation_insights(business_id="unknown") == {}
+
     def test_priority_score_calculation(self, agent, sample_reviews):
         """Test that priority scores are calculated and assigned"""
         prioritized = asyncio.run(agent.prioritize_responses(sample_reviews))
@@ -401,9 +554,9 @@ class TestReviewResponseAgent:
 
 
 @pytest.mark.asyncio
-async def test_integration_workflow():
+async def test_integration_workflow(tmp_path):
     """Test complete workflow integration"""
-    async with ReviewResponseAgent() as agent:
+    async with ReviewResponseAgent(db_path=str(tmp_path / "reviews.db")) as agent:
         # Mock business setup
         business_ids = {
             ReviewPlatform.GOOGLE: "test_place"
@@ -0,0 +1,153 @@
+"""
+Test suite for the ROI tracker and its bucketed metric store
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src.analytics.roi_tracker import ROITracker, ROIMetric, MetricType, MetricStore, REPORT_COLUMNS
+
+
+class TestMetricStore:
+    """Test cases for the time-bucketed metric store"""
+
+    def test_range_totals_match_a_full_scan(self):
+        """Full days come from pre-aggregates, partial edge days from their rows"""
+        store = MetricStore()
+        base = datetime(2024, 3, 1)
+        metrics = [
+            ROIMetric(MetricType.REVENUE_GENERATED, value=float(i), timestamp=base + timedelta(hours=7 * i),
+                      agent_source='agent_a' if i % 2 else 'agent_b', platform='email')
+            for i in range(200)
+        ]
+        for metric in reversed(metrics):  # out-of-order arrival
+            store.add(metric)
+
+        start = base + timedelta(days=3, hours=5)
+        end = base + timedelta(days=40, hours=13)
+
+        for include_end in (True, False):
+            expected = [m for m in metrics if start <= m.timestamp and (m.timestamp <= end if include_end else m.timestamp < end)]
+            totals = MetricStore.rollup(store.range_totals(start, end, include_end), 1)
+
+            assert sum(t.count for t in totals.values()) == len(expected)
+            assert totals['agent_a'].value == sum(m.value for m in expected if m.agent_source == 'agent_a')
+
+    def test_improvement_percent_is_numeric(self):
+        """Improvements are stored as numbers, with legacy notes parsed once"""
+        legacy = ROIMetric(MetricType.CONVERSION_IMPROVEMENT, value=10.0, notes="conversion improved 12.50% vs baseline")
+        assert legacy.improvement_percent == 12.5
+
+        tracker = ROITracker({})
+        metric = tracker.track_engagement_improvement(28.5, 21.3, 'open_rate', 'email_campaign_writer', 'email')
+        assert metric.improvement_percent == (28.5 - 21.3) / 21.3 * 100
+
+        summary = tracker.calculate_roi_summary(30)
+        assert summary.engagement_improvement_percent == metric.improvement_percent
+
+
+class TestROITracker:
+    """Test cases for ROI tracker queries over the store"""
+
+    def test_direct_appends_are_indexed(self):
+        """Metrics appended straight to the list are picked up by the next query"""
+        tracker = ROITracker({})
+        tracker.track_revenue_generated(100.0, 'email_campaign_writer', platform='email')
+        tracker.metrics.append(ROIMetric(MetricType.COST_REDUCTION, value=40.0, agent_source='social_media_manager',
+                                         platform='twitter', timestamp=datetime.now() - timedelta(days=45)))
+
+        comparison = tracker.get_agent_performance_comparison()
+        rankings = dict(comparison['agent_rankings'])
+        assert rankings['email_campaign_writer']['recent_30day_value'] == 100.0
+        assert rankings['social_media_manager']['cost_savings'] == 40.0
+        assert rankings['social_media_manager']['recent_30day_value'] == 0
+
+        assert tracker.calculate_roi_summary(30).total_roi_value == 100.0
+        assert tracker.calculate_roi_summary(60).total_roi_value == 140.0
+
+    def test_sqlite_persistence(self, tmp_path):
+        """Tracked metrics survive a restart when a database path is configured"""
+        config = {'metrics_db_path': str(tmp_path / 'roi.db')}
+        tracker = ROITracker(config)
+        tracker.track_time_saved(2.0, 'social_media_manager', 'scheduling', platform='twitter')
+        tracker.track_engagement_improvement(30.0, 20.0, 'open_rate', 'email_campaign_writer', 'email')
+
+        reloaded = ROITracker(config)
+        assert len(reloaded.metrics) == 2
+        assert reloaded.metrics[1].improvement_percent == 50.0
+
+        platforms = reloaded.get_platform_performance_analysis()['platform_performance']
+        assert platforms['twitter']['type_breakdown']['time_saved']['total_value'] == 100.0
+
+
+class TestReportExport:
+    """Test cases for streaming analytics report exports"""
+
+    @pytest.fixture
+    def tracker(self):
+        tracker = ROITracker({})
+        # Start of each calendar day, so the days in the period don't depend on the time of the run
+        midnight = datetime.combine(datetime.now().date(), datetime.min.time())
+        for day in range(120):
+            for agent, platform in (('email_campaign_writer', 'email'), ('social_media_manager', 'twitter')):
+                tracker.metrics.append(ROIMetric(MetricType.REVENUE_GENERATED, value=10.0, agent_source=agent,
+                                                 platform=platform, timestamp=midnight - timedelta(days=day)))
+        return tracker
+
+    def test_ndjson_stream_yields_header_first(self, tracker):
+        """The first chunk is available before the rest of the report is built"""
+        chunks = tracker.stream_analytics_report("ndjson", period_days=90, chunk_records=50)
+
+        first = next(chunks)
+        assert json.loads(first)['section'] == 'report'
+
+        records = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+        daily = [r for r in records if r['section'] == 'daily']
+        # Two agent/platform buckets for each of the 91 calendar days the 90-day period touches
+        assert len(daily) == 182
+        assert sum(r['value'] for r in records if r['section'] == 'category') == 2400.0
+        assert records[-1]['section'] == 'recommendation'
+
+    def test_csv_export_matches_ndjson(self, tracker, tmp_path):
+        """CSV rows use the shared column layout and carry the same records"""
+        path = tmp_path / 'report.csv'
+        written = tracker.export_analytics_report_to(str(path), format="csv")
+
+        with open(path, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        assert list(rows[0].keys()) == REPORT_COLUMNS
+        assert len(rows) == written
+
+        buffer = io.StringIO()
+        assert tracker.export_analytics_report_to(buffer, format="ndjson") == written
+
+    def test_csv_export_counts_records_with_embedded_newlines(self, tracker, tmp_path):
+        """Quoted multi-line fields count as one record each"""
+        records = [{'section': 'report', 'name': 'generated'}] + [
+            {'section': 'recommendation', 'detail': f"Line one\nline two of tip {i}"} for i in range(7)
+        ]
+        path = tmp_path / 'report.csv'
+        with patch.object(tracker, 'iter_report_records', return_value=iter(records)):
+            written = tracker.export_analytics_report_to(str(path), format="csv", chunk_records=3)
+
+        with open(path, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        assert written == len(rows) == 8
+        assert rows[-1]['detail'] == "Line one\nline two of tip 6"
+
+    def test_parquet_export(self, tracker, tmp_path):
+        """Parquet export writes row groups incrementally when pyarrow is installed"""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        path = str(tmp_path / 'report.parquet')
+        written = tracker.export_analytics_report_to(path, format="parquet", chunk_records=64)
+
+        parquet_file = pq.ParquetFile(path)
+        assert parquet_file.metadata.num_rows == written
+        assert parquet_file.metadata.num_row_groups > 1
+        assert parquet_file.schema_arrow.names == REPORT_COLUMNS
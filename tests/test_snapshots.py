@@ -0,0 +1,156 @@
+"""
+Test suite for cached snapshot service
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.utils.snapshots import SnapshotService, SnapshotUnavailableError
+
+
+def make_service(max_age_seconds: float = 900.0, delay: float = 0.0, **kwargs):
+    calls = {'inventory': 0, 'scheduling': 0}
+    values = {'inventory': {'total_alerts': 3}, 'scheduling': {'meetings': 1}}
+
+    def builder(name):
+        async def build():
+            calls[name] += 1
+            await asyncio.sleep(delay)
+            return dict(values[name])
+        return build
+
+    service = SnapshotService(
+        sections={name: builder(name) for name in calls},
+        assemble=lambda sections, generated_at: {**sections, 'last_updated': generated_at.isoformat()},
+        max_age_seconds=max_age_seconds,
+        **kwargs
+    )
+    return service, calls, values
+
+
+class TestSnapshotService:
+    """Test cases for SnapshotService"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_build(self):
+        """Requests arriving during a build wait on it instead of starting their own"""
+        service, calls, _ = make_service(delay=0.05)
+
+        snapshots = await asyncio.gather(*(service.get() for _ in range(10)))
+
+        assert calls == {'inventory': 1, 'scheduling': 1}
+        assert len({id(snapshot) for snapshot in snapshots}) == 1
+        assert service.stats['coalesced'] == 9
+
+    @pytest.mark.asyncio
+    async def test_invalidation_rebuilds_only_that_section(self):
+        """Stale snapshots are served while the invalidated section rebuilds"""
+        service, calls, values = make_service(delay=0.02)
+        first = await service.get()
+
+        values['scheduling'] = {'meetings': 2}
+        service.invalidate('scheduling')
+        assert service.is_stale
+
+        served = await service.get()
+        assert served is first  # last snapshot served without waiting
+
+        refreshed = await service.refresh()
+        assert refreshed.version == 2
+        assert refreshed.data['scheduling'] == {'meetings': 2}
+        assert calls == {'inventory': 1, 'scheduling': 2}
+        assert refreshed.etag != first.etag
+        assert not service.is_stale
+
+    @pytest.mark.asyncio
+    async def test_etag_tracks_content(self):
+        """Rebuilding unchanged data keeps the ETag, payload and timestamp so a 304 is exact"""
+        service, _, values = make_service()
+        first = await service.get()
+        second = await service.refresh(force=True)
+
+        assert second.version == 2
+        assert second.etag == first.etag
+        assert second.generated_at == first.generated_at
+        assert second.data == first.data
+        assert SnapshotService.etag_matches(first.etag, second.etag)
+        assert SnapshotService.etag_matches(f'"other", {first.etag[2:]}', second.etag)
+        assert not SnapshotService.etag_matches('"other"', second.etag)
+        assert not SnapshotService.etag_matches(None, second.etag)
+
+        values['inventory'] = {'total_alerts': 4}
+        third = await service.refresh(force=True)
+        assert third.etag != first.etag
+        assert third.generated_at > first.generated_at
+        assert third.data['last_updated'] == third.generated_at.isoformat()
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_last_snapshot(self):
+        """A failing builder leaves the previous snapshot in place and the section due"""
+        service, _, _ = make_service()
+        first = await service.get()
+
+        async def broken():
+            raise RuntimeError("database unavailable")
+
+        service.sections['inventory'] = broken
+        service.invalidate('inventory')
+
+        with pytest.raises(RuntimeError):
+            await service.refresh()
+        assert service.snapshot is first
+        assert service.is_stale
+        assert service.stats['failures'] == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_back_off_background_refreshes(self):
+        """After a failure, stale reads stop starting rebuilds until the backoff passes"""
+        service, calls, _ = make_service(max_age_seconds=0.0, failure_backoff_seconds=0.2)
+        first = await service.get()
+        attempts = 0
+
+        async def broken():
+            nonlocal attempts
+            attempts += 1
+            raise RuntimeError("database unavailable")
+
+        service.sections['inventory'] = broken
+        service.invalidate('inventory')
+        with pytest.raises(RuntimeError):
+            await service.refresh()
+        assert service.consecutive_failures == 1
+
+        for _ in range(5):
+            assert await service.get() is first
+            await asyncio.sleep(0)
+        assert attempts == 1
+
+        await asyncio.sleep(0.25)
+        await service.get()
+        await asyncio.sleep(0.01)
+        assert attempts == 2
+        assert service.consecutive_failures == 2
+        assert service.backing_off  # doubled to 0.4s
+
+        service.sections['inventory'] = make_service()[0].sections['inventory']
+        refreshed = await service.refresh()
+        assert refreshed is not first
+        assert service.consecutive_failures == 0
+        assert not service.backing_off
+
+    @pytest.mark.asyncio
+    async def test_first_build_failure_is_not_retried_during_backoff(self):
+        """Without a snapshot to serve, reads fail fast while backing off"""
+        service, _, _ = make_service(failure_backoff_seconds=60.0)
+
+        async def broken():
+            raise RuntimeError("database unavailable")
+
+        service.sections['inventory'] = broken
+        with pytest.raises(RuntimeError):
+            await service.get()
+        with pytest.raises(SnapshotUnavailableError, match="database unavailable"):
+            await service.get()
+        assert service.stats['failures'] == 1
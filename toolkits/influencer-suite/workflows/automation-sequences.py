@@ -4,16 +4,42 @@ Complete automation orchestration for micro-influencer growth
 """
 
 import json
+import sys
 import asyncio
+import importlib.util
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
-import schedule
-import time
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
+
+def _load_job_scheduler():
+    """
+    The core package's job scheduler, shared rather than copied
+
+    Loaded straight from src/utils/job_scheduler.py (stdlib only), so the
+    toolkit does not import the core ``src`` package and its dependencies.
+    """
+    name = "src.utils.job_scheduler"
+    if name in sys.modules:
+        return sys.modules[name]
+    path = Path(__file__).resolve().parents[3] / "src" / "utils" / "job_scheduler.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_job_scheduler = _load_job_scheduler()
+AsyncJobScheduler = _job_scheduler.AsyncJobScheduler
+DailyTrigger = _job_scheduler.DailyTrigger
+WeeklyTrigger = _job_scheduler.WeeklyTrigger
+MonthlyTrigger = _job_scheduler.MonthlyTrigger
+
 # Import our agents
 from ..agents.content_multiplication_engine import ContentMultiplicationEngine
 from ..agents.audience_growth_automator import AudienceGrowthAutomator
@@ -83,8 +109,8 @@ class AutomationOrchestrator:
         # Register built-in workflows
         self._register_built_in_workflows()
 
-        # Start scheduler
-        self.scheduler_running = False
+        # Scheduled workflows; started with start_scheduler()
+        self.scheduler = AsyncJobScheduler()
 
     def _register_built_in_workflows(self):
         """Register pre-built automation workflows"""
@@ -495,22 +521,23 @@ class AutomationOrchestrator:
         workflow = self.workflows[workflow_id]
 
         # Parse schedule configuration
+        time_str = schedule_config.get("time", "09:00")
         if schedule_config.get("schedule") == "daily":
-            time_str = schedule_config.get("time", "09:00")
-            schedule.every().day.at(time_str).do(self._run_scheduled_workflow, workflow_id)
-
+            trigger = DailyTrigger(time_str)
         elif schedule_config.get("schedule") == "weekly":
-            day = schedule_config.get("day", "monday")
-            time_str = schedule_config.get("time", "09:00")
-            getattr(schedule.every(), day).at(time_str).do(self._run_scheduled_workflow, workflow_id)
-
+            trigger = WeeklyTrigger(schedule_config.get("day", "monday"), time_str)
         elif schedule_config.get("schedule") == "monthly":
-            # Monthly scheduling (simplified - runs on 1st of month)
-            schedule.every().day.at("09:00").do(self._check_monthly_schedule, workflow_id)
+            trigger = MonthlyTrigger(schedule_config.get("day_of_month", 1), time_str)
+        else:
+            return {"error": f"Unsupported schedule: {schedule_config.get('schedule')}"}
+
+        # Re-scheduling replaces the previous job for this workflow
+        self.scheduler.add_job(f"workflow:{workflow_id}", self.execute_workflow, trigger, workflow_id,
+                               jitter_seconds=schedule_config.get("jitter_seconds", 0))
 
         # Update workflow config
         workflow.trigger_config = schedule_config
-        workflow.next_run = self._calculate_next_run(schedule_config)
+        workflow.next_run = self.scheduler.next_run(f"workflow:{workflow_id}")
 
         return {
             "scheduled": True,
@@ -518,45 +545,35 @@ class AutomationOrchestrator:
             "next_run": workflow.next_run.isoformat() if workflow.next_run else None
         }
 
-    def _run_scheduled_workflow(self, workflow_id: str):
-        """Run a scheduled workflow"""
-        asyncio.create_task(self.execute_workflow(workflow_id))
-
-    def _check_monthly_schedule(self, workflow_id: str):
-        """Check if monthly workflow should run"""
-        if datetime.now().day == 1:
-            self._run_scheduled_workflow(workflow_id)
-
-    def _calculate_next_run(self, schedule_config: Dict) -> Optional[datetime]:
-        """Calculate next run time based on schedule config"""
-        # Simplified calculation
-        if schedule_config.get("schedule") == "daily":
-            return datetime.now() + timedelta(days=1)
-        elif schedule_config.get("schedule") == "weekly":
-            return datetime.now() + timedelta(weeks=1)
-        elif schedule_config.get("schedule") == "monthly":
-            return datetime.now() + timedelta(days=30)
-        return None
-
     def start_scheduler(self):
-        """Start the workflow scheduler"""
-        self.scheduler_running = True
+        """Start the workflow scheduler (call from within the running event loop)"""
+        self.scheduler.start()
+        self.logger.info("Workflow scheduler started")
 
-        def run_scheduler():
-            while self.scheduler_running:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+    def stop_scheduler(self) -> Optional[asyncio.Task]:
+        """
+        Stop the workflow scheduler
 
-        import threading
-        scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
+        Inside the running event loop, returns a task that completes once
+        running workflows finish; otherwise the scheduler is shut down at once.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
 
-        self.logger.info("Workflow scheduler started")
+        if loop is None:
+            self.scheduler.shutdown()
+            self.logger.info("Workflow scheduler stopped")
+            return None
 
-    def stop_scheduler(self):
-        """Stop the workflow scheduler"""
-        self.scheduler_running = False
-        self.logger.info("Workflow scheduler stopped")
+        task = loop.create_task(self.scheduler.stop())
+        task.add_done_callback(lambda _: self.logger.info("Workflow scheduler stopped"))
+        return task
+
+    def get_scheduler_stats(self) -> Dict:
+        """Run counts, durations and next run per scheduled workflow"""
+        return self.scheduler.get_stats()
 
     def create_custom_workflow(self, workflow_definition: Dict) -> Dict:
         """Create a custom workflow from definition"""
@@ -731,11 +748,10 @@ if __name__ == "__main__":
     # Initialize orchestrator
     orchestrator = AutomationOrchestrator(config)
 
-    # Start scheduler
-    orchestrator.start_scheduler()
-
     # Example: Trigger a workflow manually
     async def run_example():
+        # The scheduler runs on this event loop
+        orchestrator.start_scheduler()
         result = await orchestrator.execute_workflow("daily_content_automation")
         print("Workflow result:", json.dumps(result, indent=2, default=str))
 